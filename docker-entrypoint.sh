@@ -26,5 +26,8 @@ else
   echo "RUN_MIGRATIONS is set to false; skipping migrations and related startup tasks."
 fi
 
+# Per-worker metric snapshots from a previous container run are stale
+rm -rf "${METRICS_DIR:-/code/metrics}"
+
 # Exec the container command (e.g. gunicorn) as PID 1, preserving signals
 exec "$@"
@@ -3,6 +3,11 @@ ASGI config for hebrewtool project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Production runs this under gunicorn with uvicorn workers (see Procfile). Sync
+views run in a thread per request; the views that wait on third-party HTTP
+(lexicon scraping, the BibleHub proxy, donation/crypto totals, Northflank
+stats) are async and share hebrewtool.http_client's connection pool.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
@@ -0,0 +1,138 @@
+"""
+Shared outbound HTTP for the async views that call third-party services
+(BibleHub/Logeion/Perseus lexicon scraping, Coinbase, PayPal, mempool.space,
+Etherscan, Northflank).
+
+Production serves hebrewtool.asgi under uvicorn workers, so these views
+await the upstream instead of holding a worker thread. All of them share one
+httpx.AsyncClient per event loop, which keeps connections alive between
+requests (HTTP_MAX_CONNECTIONS / HTTP_MAX_KEEPALIVE), and each upstream host
+gets at most HTTP_PER_HOST_LIMIT concurrent requests so a slow or hostile
+host cannot take the whole pool. Views fan out independent calls with
+asyncio.gather.
+
+Clients are bound to the loop they were created on. Under ASGI that is one
+loop per worker; under runserver/WSGI Django runs each async view in a fresh
+loop, so the pool only lives for that request.
+
+Profiles:
+- 'default': keep-alive pool, redirects followed.
+- 'tolerant': no keep-alive and TLS unexpected-EOF ignored, for hosts that
+  drop TLS sessions uncleanly (Logeion). Every request gets a fresh connection.
+"""
+
+import asyncio
+import ssl
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import certifi
+import httpx
+from django.conf import settings
+
+from hebrewtool import metrics
+
+BROWSER_USER_AGENT = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
+    'AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/123.0.0.0 Safari/537.36'
+)
+
+_loops = weakref.WeakKeyDictionary()  # event loop -> _LoopState
+
+
+def _tolerant_ssl_context():
+    ctx = ssl.create_default_context(cafile=certifi.where())
+    ctx.options |= getattr(ssl, 'OP_IGNORE_UNEXPECTED_EOF', 0)
+    return ctx
+
+
+def _build_client(profile):
+    timeout = httpx.Timeout(getattr(settings, 'HTTP_TIMEOUT', 15), connect=getattr(settings, 'HTTP_CONNECT_TIMEOUT', 5))
+    if profile == 'tolerant':
+        return httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            verify=_tolerant_ssl_context(),
+            limits=httpx.Limits(max_connections=getattr(settings, 'HTTP_MAX_CONNECTIONS', 100), max_keepalive_connections=0),
+        )
+    if profile != 'default':
+        raise ValueError(f'Unknown HTTP client profile: {profile}')
+    return httpx.AsyncClient(
+        timeout=timeout,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=getattr(settings, 'HTTP_MAX_CONNECTIONS', 100),
+            max_keepalive_connections=getattr(settings, 'HTTP_MAX_KEEPALIVE', 20),
+            keepalive_expiry=getattr(settings, 'HTTP_KEEPALIVE_EXPIRY', 30),
+        ),
+    )
+
+
+class _LoopState:
+    def __init__(self):
+        self.clients = {}
+        self.host_slots = {}
+
+    def client(self, profile):
+        client = self.clients.get(profile)
+        if client is None or client.is_closed:
+            client = self.clients[profile] = _build_client(profile)
+        return client
+
+    def host_slot(self, host):
+        slot = self.host_slots.get(host)
+        if slot is None:
+            slot = self.host_slots[host] = asyncio.Semaphore(getattr(settings, 'HTTP_PER_HOST_LIMIT', 8))
+        return slot
+
+
+def _state():
+    loop = asyncio.get_running_loop()
+    state = _loops.get(loop)
+    if state is None:
+        state = _loops[loop] = _LoopState()
+    return state
+
+
+def get_client(profile='default'):
+    """The shared AsyncClient for the running event loop."""
+    return _state().client(profile)
+
+
+async def request(method, url, *, profile='default', **kwargs):
+    """
+    Send one request through the shared pool, waiting for a free slot for the
+    upstream host first. kwargs are passed to httpx (params, data, json,
+    headers, auth, timeout). Raises httpx.HTTPError on transport failures;
+    status codes are left to the caller (response.raise_for_status()).
+    """
+    state = _state()
+    host = urlsplit(url).hostname or ''
+    started = time.perf_counter()
+    status = 'error'
+    try:
+        async with state.host_slot(host):
+            response = await state.client(profile).request(method, url, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.outbound_requests.inc(host=host, status=status)
+        metrics.outbound_seconds.observe(time.perf_counter() - started, host=host)
+
+
+async def get(url, **kwargs):
+    return await request('GET', url, **kwargs)
+
+
+async def post(url, **kwargs):
+    return await request('POST', url, **kwargs)
+
+
+async def aclose():
+    """Close the running loop's clients (tests, shutdown hooks)."""
+    state = _loops.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        for client in state.clients.values():
+            await client.aclose()
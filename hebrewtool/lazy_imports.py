@@ -0,0 +1,55 @@
+"""
+Deferred imports for URLconfs.
+
+Loading the URLconf imports every view module it references, and with
+gunicorn's --max-requests that cost is paid again on every worker recycle.
+Views that depend on heavy SDKs (google-genai, openai, httpx, bs4) are
+wired up through ``lazy_view`` (``lazy_async_view`` for async views) so
+their module is only imported on the first request that actually routes
+to them.
+"""
+
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path):
+    """Return a view callable that imports ``dotted_path`` on first call.
+
+    The target must be a plain function view (decorators such as
+    login_required/require_POST are fine). Views that rely on attributes
+    read before the call, e.g. ``csrf_exempt``, must not be wrapped.
+    """
+    module_path, _, view_name = dotted_path.rpartition('.')
+    resolved = []
+
+    def view(request, *args, **kwargs):
+        if not resolved:
+            resolved.append(import_string(dotted_path))
+        return resolved[0](request, *args, **kwargs)
+
+    view.__name__ = view_name
+    view.__qualname__ = view_name
+    view.__module__ = module_path
+    view.lazy_target = dotted_path
+    return view
+
+
+def lazy_async_view(dotted_path):
+    """``lazy_view`` for ``async def`` views.
+
+    Django decides between the sync and async handler paths from the
+    callable in the URLconf, so an async target needs a coroutine wrapper.
+    """
+    module_path, _, view_name = dotted_path.rpartition('.')
+    resolved = []
+
+    async def view(request, *args, **kwargs):
+        if not resolved:
+            resolved.append(import_string(dotted_path))
+        return await resolved[0](request, *args, **kwargs)
+
+    view.__name__ = view_name
+    view.__qualname__ = view_name
+    view.__module__ = module_path
+    view.lazy_target = dotted_path
+    return view
@@ -0,0 +1,432 @@
+"""
+Shared gateway for Gemini API calls.
+
+Every caller (chapter/footnote translation, Aeon embeddings and answers, the
+editor's Gemini suggestions) goes through get_gateway().call(fn), where fn
+receives a genai.Client and makes the actual request. The gateway
+
+- keeps one client per key for the life of the process instead of building
+  a new one (and a new HTTP connection pool) per call;
+- routes each call to the healthiest key: closed circuit first, then the
+  fewest 429s in the last LLM_HEALTH_WINDOW seconds, then the least
+  in-flight work, then the least recently used;
+- opens a key's circuit on a 429 (or LLM_BREAKER_FAILURES consecutive
+  errors) for LLM_BREAKER_COOLDOWN seconds, doubling up to
+  LLM_BREAKER_MAX_COOLDOWN while the key keeps failing; after the cooldown a
+  single probe call decides whether it closes again. Invalid or revoked keys
+  are parked for the maximum cooldown;
+- caps concurrent calls per process (LLM_MAX_CONCURRENCY) and per key
+  (LLM_PER_KEY_CONCURRENCY); callers wait up to LLM_ACQUIRE_TIMEOUT for a slot.
+
+Quota and key errors fail over to the next key; anything else is raised to
+the caller unchanged. When no key is left, call() raises QuotaExhausted (all
+rate-limited) or LLMUnavailable (none configured / no slot in time).
+
+Health is tracked per process, so each gunicorn worker learns a key's state
+from its own calls. LLM_BACKEND='stub' swaps the Gemini SDK for StubClient,
+which answers locally without network access.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from django.conf import settings
+
+from hebrewtool import metrics
+
+logger = logging.getLogger(__name__)
+
+# Outcomes that move a call on to the next key.
+FAILOVER_OUTCOMES = ('quota', 'auth')
+OUTCOME_STATUS = {'ok': 200, 'quota': 429, 'auth': 401, 'unsupported': 404, 'error': 500}
+
+_QUOTA_MARKERS = ('quota', 'rate limit', 'resource exhausted', 'resource_exhausted', 'too many requests')
+_AUTH_MARKERS = ('api key not valid', 'api_key_invalid', 'api key expired', 'permission denied', 'permission_denied')
+_UNSUPPORTED_MARKERS = ('not found', 'not supported')
+
+
+class LLMUnavailable(RuntimeError):
+    """No key could take the call (none configured, all parked, or no free slot in time)."""
+
+
+class QuotaExhausted(LLMUnavailable):
+    """Every configured key answered with a quota / key error."""
+
+
+def configured_keys():
+    """GEMINI_API_KEYS (comma-separated) followed by GEMINI_API_KEY, without duplicates."""
+    keys = [item.strip() for item in os.getenv('GEMINI_API_KEYS', '').split(',') if item.strip()]
+    single = os.getenv('GEMINI_API_KEY', '').strip()
+    if single:
+        keys.append(single)
+    return list(dict.fromkeys(keys))
+
+
+def key_abbrev(api_key):
+    return f"...{api_key[-4:]}" if api_key else "None"
+
+
+def classify_error(exc):
+    """'quota', 'auth', 'unsupported' (model missing) or 'error' for an SDK exception."""
+    code = getattr(exc, 'code', None) or getattr(exc, 'status_code', None)
+    message = str(exc).lower()
+    if code == 429 or any(marker in message for marker in _QUOTA_MARKERS):
+        return 'quota'
+    if code in (401, 403) or any(marker in message for marker in _AUTH_MARKERS):
+        return 'auth'
+    if code == 404 or any(marker in message for marker in _UNSUPPORTED_MARKERS):
+        return 'unsupported'
+    return 'error'
+
+
+class KeyState:
+    """Health and load of one API key; only touched under Gateway._cond."""
+
+    def __init__(self, key):
+        self.key = key
+        self.abbrev = key_abbrev(key)
+        self.in_flight = 0
+        self.recent_429 = deque()
+        self.failures = 0  # consecutive non-quota errors
+        self.trips = 0  # consecutive circuit openings, drives the cooldown backoff
+        self.open_until = 0.0
+        self.last_used = 0.0
+
+    def rate_limited(self, now, window):
+        while self.recent_429 and now - self.recent_429[0] > window:
+            self.recent_429.popleft()
+        return len(self.recent_429)
+
+    def is_open(self, now):
+        return now < self.open_until
+
+    def half_open(self, now):
+        return self.trips > 0 and now >= self.open_until
+
+    def open(self, now, cooldown):
+        self.trips += 1
+        self.open_until = now + cooldown
+
+    def as_dict(self, now, window):
+        return {
+            'key': self.abbrev,
+            'state': 'open' if self.is_open(now) else ('half-open' if self.half_open(now) else 'closed'),
+            'open_for': max(0, round(self.open_until - now)),
+            'in_flight': self.in_flight,
+            'recent_429': self.rate_limited(now, window),
+            'failures': self.failures,
+        }
+
+
+class Gateway:
+    def __init__(self, keys, backend='genai', max_concurrency=8, per_key_concurrency=2, acquire_timeout=30,
+                 cooldown=60, max_cooldown=900, failure_threshold=3, health_window=300):
+        self.states = [KeyState(key) for key in keys]
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.per_key_concurrency = per_key_concurrency
+        self.acquire_timeout = acquire_timeout
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failure_threshold = failure_threshold
+        self.health_window = health_window
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._clients = {}
+        self._client_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        backend = getattr(settings, 'LLM_BACKEND', 'genai')
+        keys = configured_keys()
+        if backend == 'stub' and not keys:
+            keys = ['stub-key-0001', 'stub-key-0002']
+        return cls(
+            keys,
+            backend=backend,
+            max_concurrency=getattr(settings, 'LLM_MAX_CONCURRENCY', 8),
+            per_key_concurrency=getattr(settings, 'LLM_PER_KEY_CONCURRENCY', 2),
+            acquire_timeout=getattr(settings, 'LLM_ACQUIRE_TIMEOUT', 30),
+            cooldown=getattr(settings, 'LLM_BREAKER_COOLDOWN', 60),
+            max_cooldown=getattr(settings, 'LLM_BREAKER_MAX_COOLDOWN', 900),
+            failure_threshold=getattr(settings, 'LLM_BREAKER_FAILURES', 3),
+            health_window=getattr(settings, 'LLM_HEALTH_WINDOW', 300),
+        )
+
+    @property
+    def keys(self):
+        return [state.key for state in self.states]
+
+    def client(self, key):
+        """The pooled client for `key`, created on first use."""
+        client = self._clients.get(key)
+        if client is None:
+            with self._client_lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = self._new_client(key)
+        return client
+
+    def _new_client(self, key):
+        if self.backend == 'stub':
+            return StubClient(key)
+        import httpx
+        from google import genai
+        # IPv4-only transport, as the editor endpoints have always used, to avoid DNS stalls.
+        transport = httpx.HTTPTransport(local_address='0.0.0.0')
+        return genai.Client(api_key=key, http_options={'client_args': {'transport': transport}})
+
+    # Scheduling -----------------------------------------------------------------
+
+    def _candidates(self, exclude, now):
+        """Keys that could serve this call now, or None when none ever will (all tried or parked)."""
+        usable = [s for s in self.states if s.key not in exclude and not s.is_open(now)]
+        if not usable:
+            return None
+        return [
+            s for s in usable
+            # A half-open key gets one probe call at a time.
+            if s.in_flight < (1 if s.half_open(now) else self.per_key_concurrency)
+        ]
+
+    def _acquire(self, exclude):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                candidates = self._candidates(exclude, now)
+                if candidates is None:
+                    return None
+                if candidates and self.in_flight < self.max_concurrency:
+                    state = min(candidates, key=lambda s: (
+                        s.rate_limited(now, self.health_window), s.in_flight, s.last_used,
+                    ))
+                    state.in_flight += 1
+                    state.last_used = now
+                    self.in_flight += 1
+                    return state
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise LLMUnavailable(f'No Gemini slot free within {self.acquire_timeout}s')
+                self._cond.wait(remaining)
+
+    def _release(self, state, outcome):
+        with self._cond:
+            now = time.monotonic()
+            state.in_flight -= 1
+            self.in_flight -= 1
+            if outcome == 'ok':
+                state.failures = 0
+                state.trips = 0
+                state.open_until = 0.0
+            elif outcome == 'quota':
+                state.recent_429.append(now)
+                state.failures = 0
+                state.open(now, min(self.cooldown * 2 ** state.trips, self.max_cooldown))
+            elif outcome == 'auth':
+                state.open(now, self.max_cooldown)
+            elif outcome == 'error':
+                state.failures += 1
+                if state.failures >= self.failure_threshold or state.half_open(now):
+                    state.failures = 0
+                    state.open(now, min(self.cooldown * 2 ** state.trips, self.max_cooldown))
+            parked_for = state.open_until - now if outcome != 'ok' and state.is_open(now) else 0
+            self._cond.notify_all()
+        if parked_for:
+            logger.warning('Gemini key %s parked for %.0fs after %s', state.abbrev, parked_for, outcome)
+
+    def _finish(self, state, outcome, started, purpose, on_attempt, error=None):
+        duration = time.perf_counter() - started
+        self._release(state, outcome)
+        status = OUTCOME_STATUS[outcome]
+        metrics.gemini_requests.inc(key=state.abbrev, request_type=purpose, status=str(status))
+        metrics.gemini_seconds.observe(duration, key=state.abbrev)
+        if on_attempt is not None:
+            try:
+                on_attempt(state.key, status, error, duration)
+            except Exception:
+                logger.exception('Gemini on_attempt callback failed')
+
+    def _exhausted(self, last_error):
+        if last_error is not None:
+            raise QuotaExhausted(f'All Gemini API keys exhausted: {last_error}') from last_error
+        if not self.states:
+            raise LLMUnavailable('No Gemini API key configured (GEMINI_API_KEYS / GEMINI_API_KEY)')
+        raise QuotaExhausted('All Gemini API keys are cooling down after quota or key errors')
+
+    # Public API -----------------------------------------------------------------
+
+    def call(self, fn, purpose='generate', on_attempt=None):
+        """
+        Return fn(client) run on the healthiest key, failing over on quota/key errors.
+
+        on_attempt(api_key, status_code, error, duration) is called after every
+        attempt, e.g. to write a GeminiUsageLog row.
+        """
+        tried = set()
+        last_error = None
+        while True:
+            state = self._acquire(tried)
+            if state is None:
+                self._exhausted(last_error)
+            started = time.perf_counter()
+            try:
+                result = fn(self.client(state.key))
+            except Exception as exc:
+                outcome = classify_error(exc)
+                self._finish(state, outcome, started, purpose, on_attempt, exc)
+                if outcome not in FAILOVER_OUTCOMES:
+                    raise
+                tried.add(state.key)
+                last_error = exc
+                continue
+            self._finish(state, 'ok', started, purpose, on_attempt)
+            return result
+
+    def stream(self, fn, purpose='generate', on_attempt=None):
+        """
+        Yield from fn(client) on the healthiest key, holding its slot until the stream ends.
+
+        Fails over only while nothing has been yielded yet.
+        """
+        tried = set()
+        last_error = None
+        while True:
+            state = self._acquire(tried)
+            if state is None:
+                self._exhausted(last_error)
+            started = time.perf_counter()
+            yielded = False
+            outcome, error = 'ok', None
+            try:
+                for chunk in fn(self.client(state.key)):
+                    yielded = True
+                    yield chunk
+            except GeneratorExit:
+                raise
+            except Exception as exc:
+                outcome, error = classify_error(exc), exc
+                if outcome in FAILOVER_OUTCOMES and not yielded:
+                    tried.add(state.key)
+                    last_error = exc
+                    continue
+                raise
+            finally:
+                self._finish(state, outcome, started, purpose, on_attempt, error)
+            return
+
+    def best_client(self):
+        """Client of the key call() would pick right now (without reserving it), or None."""
+        with self._cond:
+            now = time.monotonic()
+            candidates = self._candidates(set(), now) or []
+            if not candidates:
+                return None
+            state = min(candidates, key=lambda s: (s.rate_limited(now, self.health_window), s.in_flight, s.last_used))
+        return self.client(state.key)
+
+    def snapshot(self):
+        with self._cond:
+            now = time.monotonic()
+            return [state.as_dict(now, self.health_window) for state in self.states]
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = Gateway.from_settings()
+    return _gateway
+
+
+def reset_gateway():
+    """Drop the process gateway (pooled clients and key health), e.g. after changing settings."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
+
+
+def _key_health():
+    gateway = _gateway
+    if gateway is None:
+        return []
+    return [
+        ('rbt_gemini_key_open', (('key', item['key']),), 1 if item['state'] == 'open' else 0)
+        for item in gateway.snapshot()
+    ]
+
+
+metrics.REGISTRY.gauge_collector('rbt_gemini_key_open', 'Gemini keys with an open circuit breaker (summed over workers).', _key_health)
+
+
+# Stub backend ---------------------------------------------------------------------
+
+_MARKER_BLOCK_RE = re.compile(r'^(<<<(?:VERSE|FOOTNOTE)_[^>\n]+>>>)\n(.*?)(?=\n\n<<<|\n\nReturn|\Z)', re.DOTALL | re.MULTILINE)
+
+# key -> 'quota' | 'auth' | 'error': make calls on that key fail, to exercise failover locally.
+stub_failures = {}
+
+_STUB_ERRORS = {
+    'quota': '429 RESOURCE_EXHAUSTED. Quota exceeded (stub).',
+    'auth': '400 INVALID_ARGUMENT. API key not valid (stub).',
+    'error': '500 INTERNAL. Stub backend error.',
+}
+
+
+def _stub_reply(model, contents):
+    """Marker blocks echoed back tagged with the model (so the batch parsers work), else a short canned answer."""
+    text = contents if isinstance(contents, str) else str(contents)
+    blocks = _MARKER_BLOCK_RE.findall(text)
+    if blocks:
+        return '\n\n'.join(f'{marker}\n[{model}] {body.strip()}' for marker, body in blocks)
+    return f'[{model}] stub reply to: {text.strip()[:80]}'
+
+
+class _StubModels:
+    def __init__(self, key):
+        self.key = key
+
+    def _maybe_fail(self):
+        latency = getattr(settings, 'LLM_STUB_LATENCY_MS', 0)
+        if latency:
+            time.sleep(latency * random.uniform(0.5, 1.5) / 1000)
+        failure = stub_failures.get(self.key)
+        if failure:
+            raise RuntimeError(_STUB_ERRORS[failure])
+
+    def generate_content(self, model, contents, config=None):
+        self._maybe_fail()
+        return SimpleNamespace(text=_stub_reply(model, contents), candidates=[])
+
+    def generate_content_stream(self, model, contents, config=None):
+        self._maybe_fail()
+        reply = _stub_reply(model, contents)
+        for start in range(0, len(reply), 40):
+            yield SimpleNamespace(text=reply[start:start + 40])
+
+    def embed_content(self, model, contents, config=None):
+        self._maybe_fail()
+        seed = hashlib.sha256(str(contents).encode('utf-8')).digest()
+        rng = random.Random(seed)
+        values = [rng.uniform(-1, 1) for _ in range(getattr(settings, 'LLM_STUB_EMBED_DIM', 768))]
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=values)])
+
+
+class StubClient:
+    """Stand-in for genai.Client: deterministic local answers, optional latency and injected failures."""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.models = _StubModels(api_key)
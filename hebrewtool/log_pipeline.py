@@ -0,0 +1,221 @@
+"""
+Non-blocking logging for request threads.
+
+Django calls configure_logging() with settings.LOGGING (LOGGING_CONFIG). It
+applies the dict config as usual and then swaps the handlers of every
+configured logger for one QueueHandler per handler set, all feeding a single
+QueueListener thread that does the actual stream/file I/O. A request thread
+only runs the handler filters and puts the record on a bounded queue; when
+the queue is full the record is dropped and counted
+(rbt_log_records_dropped_total) instead of blocking.
+
+Filters, attached to handlers in settings.LOGGING and evaluated before a
+record is queued:
+
+- SampleFilter keeps a fraction of INFO/DEBUG records per category (the
+  `category` passed in `extra`, e.g. 'request' or 'cache'); warnings and
+  errors always pass.
+- ThrottleFilter lets through at most `limit` records per `window` seconds
+  for each logger + message template, and tags the next emitted record with
+  the number suppressed in between.
+
+JsonFormatter writes one JSON object per record including the `extra`
+fields, for the rate-limit audit logs.
+"""
+
+import atexit
+import json
+import logging
+import logging.config
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from django.utils.log import AdminEmailHandler
+
+# Attributes every LogRecord has; anything else on a record came from `extra`.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# AdminEmailHandler renders the live request and traceback, so it stays synchronous.
+_SYNCHRONOUS_HANDLERS = (AdminEmailHandler,)
+
+
+def _extra_fields(record):
+    return {
+        key: value for key, value in vars(record).items()
+        if key not in _RECORD_ATTRS and not key.startswith('_')
+    }
+
+
+class SampleFilter(logging.Filter):
+    """Keep `rates[category]` of the INFO/DEBUG records in each category."""
+
+    def __init__(self, rates=None, default=1.0):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.default = default
+
+    def filter(self, record):
+        decision = getattr(record, '_sampled', None)
+        if decision is None:
+            if record.levelno >= logging.WARNING:
+                decision = True
+            else:
+                rate = self.rates.get(getattr(record, 'category', None), self.default)
+                decision = rate >= 1 or random.random() < rate
+            # Decide once per record so every handler sees the same sample.
+            record._sampled = decision
+        return decision
+
+
+class ThrottleFilter(logging.Filter):
+    """
+    At most `limit` records per `window` seconds for each logging call site.
+
+    Records are keyed by logger and source line rather than message text, so
+    f-string messages that differ on every call are still throttled together.
+    """
+
+    MAX_KEYS = 4096
+
+    def __init__(self, limit=60, window=60):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._buckets = {}  # (logger, path, line) -> [window_start, emitted, suppressed]
+
+    def filter(self, record):
+        decision = getattr(record, '_throttled', None)
+        if decision is not None:
+            return decision
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or now - bucket[0] >= self.window:
+                if bucket is None and len(self._buckets) >= self.MAX_KEYS:
+                    self._evict(now)
+                suppressed = bucket[2] if bucket else 0
+                bucket = self._buckets[key] = [now, 0, 0]
+            else:
+                suppressed = 0
+            if bucket[1] < self.limit:
+                bucket[1] += 1
+                decision = True
+            else:
+                bucket[2] += 1
+                decision = False
+        if decision and suppressed:
+            record.suppressed = suppressed
+            record.msg = f'{record.msg} [{suppressed} similar suppressed]'
+        record._throttled = decision
+        return decision
+
+    def _evict(self, now):
+        # Drop call sites whose window has passed; if every site is still active, start over
+        expired = [key for key, bucket in self._buckets.items() if now - bucket[0] >= self.window]
+        for key in expired:
+            del self._buckets[key]
+        if len(self._buckets) >= self.MAX_KEYS:
+            self._buckets.clear()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any `extra` fields."""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update(_extra_fields(record))
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class AsyncHandler(QueueHandler):
+    """Runs the target handlers' level checks and filters here, their I/O on the listener thread."""
+
+    def __init__(self, log_queue, targets):
+        super().__init__(log_queue)
+        self.targets = tuple(targets)
+        self.setLevel(min(target.level for target in self.targets))
+
+    def handle(self, record):
+        accepted = tuple(
+            target for target in self.targets
+            if record.levelno >= target.level and target.filter(record)
+        )
+        if not accepted:
+            return False
+        record = self.prepare(record)
+        record._targets = accepted
+        self.enqueue(record)
+        return True
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            from hebrewtool import metrics
+            metrics.log_records_dropped.inc()
+
+
+class _DispatchListener(QueueListener):
+    def handle(self, record):
+        for target in getattr(record, '_targets', ()):
+            # The filters already ran in the emitting thread; go straight to emit().
+            target.acquire()
+            try:
+                target.emit(record)
+            finally:
+                target.release()
+
+
+_listener = None
+
+
+def _wrap_handlers(logger, log_queue, wrappers):
+    asynchronous = [h for h in logger.handlers if not isinstance(h, _SYNCHRONOUS_HANDLERS)]
+    if not asynchronous:
+        return
+    key = tuple(id(h) for h in asynchronous)
+    if key not in wrappers:
+        wrappers[key] = AsyncHandler(log_queue, asynchronous)
+    logger.handlers = [h for h in logger.handlers if isinstance(h, _SYNCHRONOUS_HANDLERS)] + [wrappers[key]]
+
+
+def configure_logging(config):
+    """LOGGING_CONFIG entry point: dictConfig(config), then move handler I/O to the listener thread."""
+    global _listener
+    from django.conf import settings
+
+    logging.config.dictConfig(config)
+    if not getattr(settings, 'LOG_ASYNC', True):
+        return
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue = queue.Queue(maxsize=getattr(settings, 'LOG_QUEUE_SIZE', 10000))
+    wrappers = {}
+    for name in config.get('loggers', {}):
+        _wrap_handlers(logging.getLogger(name), log_queue, wrappers)
+    if 'root' in config:
+        _wrap_handlers(logging.getLogger(), log_queue, wrappers)
+
+    _listener = _DispatchListener(log_queue)
+    _listener.start()
+
+
+@atexit.register
+def _drain():
+    if _listener is not None:
+        _listener.stop()
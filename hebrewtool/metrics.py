@@ -0,0 +1,330 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters and histograms live in a per-process registry (a dict guarded by a
+lock, so incrementing is cheap on hot paths). gunicorn runs several workers,
+so each process periodically writes its snapshot to METRICS_DIR/metrics_<pid>.json
+(every METRICS_FLUSH_INTERVAL seconds, and at exit); /metrics sums all
+snapshot files. Files left by workers that have exited (--max-requests
+recycling) are folded into metrics_archive.json so counters stay monotonic
+without the directory growing. Gauges that describe shared state (the
+translation job queue) are computed from the database at scrape time.
+
+Instrumented today:
+- rbt_cache_requests_total{family,result}   safe_cache_get hits/misses
+- rbt_view_requests_total / rbt_view_queries_total / rbt_view_db_seconds{view}
+  (QueryInstrumentationMiddleware)
+- rbt_translation_jobs_total{status}, rbt_translation_verses_total,
+  rbt_translation_job_seconds, rbt_translation_queue_jobs{status}
+- rbt_gemini_requests_total{key,request_type,status}, rbt_gemini_request_seconds{key}
+- rbt_rate_limit_exceeded_total{endpoint}, rbt_rate_limit_bans_total{endpoint}
+- rbt_outbound_requests_total{host,status}, rbt_outbound_request_seconds{host}
+  (hebrewtool/http_client.py)
+- rbt_db_slot_wait_seconds, rbt_db_slot_timeouts_total (DBConcurrencyMiddleware)
+"""
+
+import atexit
+import fcntl
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0)
+JOB_BUCKETS = (5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 2400.0)
+ARCHIVE_FILE = 'metrics_archive.json'
+
+
+class Registry:
+    """Metric metadata plus this process's counter and histogram values."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.meta = {}          # name -> (type, help, buckets)
+        self.counters = {}      # (name, labels) -> float
+        self.histograms = {}    # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.collectors = []    # callables returning [(name, labels, value), ...] at scrape time
+        self.dirty = False
+        self._flusher_pid = None
+
+    def counter(self, name, help_text):
+        self.meta[name] = ('counter', help_text, None)
+        return Counter(self, name)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.meta[name] = ('histogram', help_text, tuple(buckets))
+        return Histogram(self, name, tuple(buckets))
+
+    def gauge_collector(self, name, help_text, func):
+        self.meta[name] = ('gauge', help_text, None)
+        self.collectors.append((name, func))
+
+    def _touched(self):
+        self.dirty = True
+        if self._flusher_pid != os.getpid():
+            with self.lock:
+                if self._flusher_pid != os.getpid():
+                    self._start_flusher()
+
+    def _start_flusher(self):
+        # Forked workers inherit the parent's attributes but not its threads.
+        self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+        thread.start()
+
+    def _flush_loop(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 15)
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            time.sleep(interval)
+            if self.dirty:
+                self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            self.dirty = False
+            return {
+                'pid': os.getpid(),
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(values)] for (name, labels), values in self.histograms.items()],
+            }
+
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR atomically."""
+        try:
+            directory = metrics_dir()
+            target = directory / f'metrics_{os.getpid()}.json'
+            tmp = directory / f'.metrics_{os.getpid()}.tmp'
+            tmp.write_text(json.dumps(self.snapshot()), encoding='utf-8')
+            os.replace(tmp, target)
+        except Exception:
+            logger.exception('Failed to flush metrics snapshot')
+
+
+class Counter:
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def inc(self, amount=1, **labels):
+        key = (self.name, tuple(sorted(labels.items())))
+        registry = self.registry
+        with registry.lock:
+            registry.counters[key] = registry.counters.get(key, 0) + amount
+        registry._touched()
+
+
+class Histogram:
+    def __init__(self, registry, name, buckets):
+        self.registry = registry
+        self.name = name
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        key = (self.name, tuple(sorted(labels.items())))
+        registry = self.registry
+        with registry.lock:
+            values = registry.histograms.get(key)
+            if values is None:
+                values = registry.histograms[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[index] += 1
+                    break
+            else:
+                values[len(self.buckets)] += 1
+            values[-1] += value
+        registry._touched()
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+REGISTRY = Registry()
+
+cache_requests = REGISTRY.counter('rbt_cache_requests_total', 'Cache lookups by key family and result (hit/miss).')
+view_requests = REGISTRY.counter('rbt_view_requests_total', 'Requests per resolved view.')
+view_queries = REGISTRY.counter('rbt_view_queries_total', 'SQL queries executed per view.')
+view_db_seconds = REGISTRY.histogram('rbt_view_db_seconds', 'Database time per request, by view.')
+translation_jobs = REGISTRY.counter('rbt_translation_jobs_total', 'Translation jobs finished by the worker, by final status.')
+translation_verses = REGISTRY.counter('rbt_translation_verses_total', 'Verses and footnotes translated by finished jobs.')
+translation_job_seconds = REGISTRY.histogram('rbt_translation_job_seconds', 'Wall time per translation job.', JOB_BUCKETS)
+gemini_requests = REGISTRY.counter('rbt_gemini_requests_total', 'Gemini API calls by key, request type and HTTP-ish status.')
+gemini_seconds = REGISTRY.histogram('rbt_gemini_request_seconds', 'Gemini API call latency by key.', LLM_BUCKETS)
+rate_limit_exceeded = REGISTRY.counter('rbt_rate_limit_exceeded_total', 'Requests over a rate limit, by endpoint type.')
+rate_limit_bans = REGISTRY.counter('rbt_rate_limit_bans_total', 'IP bans issued, by endpoint type.')
+log_records_dropped = REGISTRY.counter('rbt_log_records_dropped_total', 'Log records dropped because the log queue was full.')
+outbound_requests = REGISTRY.counter('rbt_outbound_requests_total', 'Outbound HTTP requests from async views, by upstream host and status.')
+outbound_seconds = REGISTRY.histogram('rbt_outbound_request_seconds', 'Outbound HTTP latency by upstream host.')
+db_slot_wait_seconds = REGISTRY.histogram('rbt_db_slot_wait_seconds', 'Time sync requests waited for a DB concurrency slot.')
+db_slot_timeouts = REGISTRY.counter('rbt_db_slot_timeouts_total', 'Requests answered 503 because no DB concurrency slot freed up.')
+
+
+def _translation_queue():
+    from django.db.models import Count
+    from search.models import TranslationJob
+
+    counts = dict.fromkeys(('pending', 'processing'), 0)
+    for row in TranslationJob.objects.filter(status__in=counts).values('status').order_by().annotate(n=Count('job_id')):
+        counts[row['status']] = row['n']
+    return [('rbt_translation_queue_jobs', (('status', status),), n) for status, n in counts.items()]
+
+
+REGISTRY.gauge_collector('rbt_translation_queue_jobs', 'Translation jobs waiting or in progress.', _translation_queue)
+
+
+_FAMILY_SPLIT_RE = re.compile(r'[:_]')
+
+
+def cache_family(key):
+    """Low-cardinality family for a cache key: its leading word ('banned:1.2.3.4' -> 'banned')."""
+    head = _FAMILY_SPLIT_RE.split(str(key), 1)[0]
+    return head if head.isalpha() and len(head) <= 32 else 'other'
+
+
+def metrics_dir():
+    path = Path(getattr(settings, 'METRICS_DIR', Path(settings.BASE_DIR) / 'metrics'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(total, snapshot):
+    for name, labels, value in snapshot.get('counters', []):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        total['counters'][key] = total['counters'].get(key, 0) + value
+    for name, labels, values in snapshot.get('histograms', []):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        existing = total['histograms'].get(key)
+        total['histograms'][key] = [a + b for a, b in zip(existing, values)] if existing else list(values)
+
+
+def _serialise(total):
+    return {
+        'counters': [[name, list(labels), value] for (name, labels), value in total['counters'].items()],
+        'histograms': [[name, list(labels), values] for (name, labels), values in total['histograms'].items()],
+    }
+
+
+def collect():
+    """Sum every process snapshot in METRICS_DIR (flushing this process first)."""
+    REGISTRY.flush()
+    directory = metrics_dir()
+    total = {'counters': {}, 'histograms': {}}
+    with open(directory / '.lock', 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        archive_path = directory / ARCHIVE_FILE
+        archive = {'counters': {}, 'histograms': {}}
+        if archive_path.exists():
+            _merge(archive, json.loads(archive_path.read_text(encoding='utf-8')))
+        archived = False
+        for path in directory.glob('metrics_*.json'):
+            if path.name == ARCHIVE_FILE:
+                continue
+            try:
+                snapshot = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            if _pid_alive(snapshot.get('pid', 0)):
+                _merge(total, snapshot)
+            else:
+                _merge(archive, snapshot)
+                path.unlink(missing_ok=True)
+                archived = True
+        if archived:
+            tmp = directory / '.archive.tmp'
+            tmp.write_text(json.dumps(_serialise(archive)), encoding='utf-8')
+            os.replace(tmp, archive_path)
+    _merge(total, _serialise(archive))
+    return total
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', ' ').replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def render_text(total):
+    """Prometheus text exposition format (version 0.0.4)."""
+    gauges = {}
+    for name, func in REGISTRY.collectors:
+        try:
+            gauges[name] = func()
+        except Exception:
+            logger.exception('Metrics collector %s failed', name)
+
+    lines = []
+    for name, (kind, help_text, buckets) in REGISTRY.meta.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(total['counters'].items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {value:g}')
+        elif kind == 'histogram':
+            for (metric, labels), values in sorted(total['histograms'].items()):
+                if metric != name:
+                    continue
+                # Stored per-bucket; exposition wants cumulative counts.
+                cumulative = 0
+                for bound, count in zip(buckets, values):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", f"{bound:g}")])} {cumulative}')
+                cumulative += values[len(buckets)]
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {values[-1]:.6f}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        else:
+            for metric, labels, value in gauges.get(name, []):
+                lines.append(f'{metric}{_format_labels(labels)} {value:g}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """GET /metrics for Prometheus; staff session or `Authorization: Bearer METRICS_TOKEN`."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    user = getattr(request, 'user', None)
+    authorised = (
+        # Compared as bytes: compare_digest rejects non-ASCII str, which a client can send
+        (token and hmac.compare_digest(
+            request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode(),
+        ))
+        or (user is not None and user.is_staff)
+    )
+    if not authorised:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(render_text(collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+atexit.register(lambda: REGISTRY.dirty and REGISTRY.flush())
@@ -1,20 +1,168 @@
 """
-Rate limiting and bot protection middleware.
+Rate limiting, bot protection and request instrumentation middleware.
 
 Prevents bot flooding by implementing IP-based rate limiting
-and User-Agent filtering for suspicious crawlers.
+and User-Agent filtering for suspicious crawlers (one cached
+classify_user_agent() verdict per request, shared by the bot filter and
+visitor tracking), reports per-request
+SQL cost (QueryInstrumentationMiddleware), bounds how many sync views hold a
+database connection at once (DBConcurrencyMiddleware) and samples
+staff-selected requests with a statistical profiler (ProfilingMiddleware).
 """
 
 import re
+import json
 import time
 import logging
+import threading
+from collections import Counter, namedtuple
+from functools import lru_cache
+from asgiref.sync import iscoroutinefunction
 from django.http import HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
 from django.core import signing
 from django.core.cache import cache
 from django.conf import settings
 import traceback
 
+from hebrewtool import metrics
+from search.visitor_ingest import enqueue_visit
+
 logger = logging.getLogger(__name__)
+# Rate-limit audit trail: rate_limit_events.log / blocked_ips.log plus console (see settings.LOGGING)
+rate_limit_log = logging.getLogger('hebrewtool.ratelimit.events')
+ban_log = logging.getLogger('hebrewtool.ratelimit.bans')
+
+
+# ---------------------------------------------------------------------------
+# User-agent classification, shared by BotFilter, RateLimit and VisitorTracking
+# ---------------------------------------------------------------------------
+
+# Crawlers BotFilterMiddleware lets through
+ALLOWED_BOTS = (
+    'googlebot',
+    'bingbot',
+    'slurp',  # Yahoo
+    'duckduckbot',
+    'baiduspider',
+    'yandexbot',
+    'facebookexternalhit',
+    'twitterbot',
+    'linkedinbot',
+)
+
+# Substrings BotFilterMiddleware answers with 403
+BLOCKED_USER_AGENTS = (
+    'python-requests',
+    'curl',
+    'wget',
+    'scrapy',
+    'bot',
+    'spider',
+    'crawler',
+    'scraper',
+    'http',
+    'libwww',
+    'snoopy',
+    'mechanize',
+    'java',
+    'headless',
+)
+
+# Substrings VisitorTrackingMiddleware does not record
+TRACKING_BOT_KEYWORDS = (
+    'bot', 'spider', 'crawler', 'scraper', 'google', 'bing', 'yandex', 'baidu', 'curl', 'wget', 'python-requests',
+)
+
+UAVerdict = namedtuple('UAVerdict', 'allowed_bot blocked bot')
+
+_UA_KEYWORD_SETS = {
+    'allowed_bot': ALLOWED_BOTS,
+    'blocked': BLOCKED_USER_AGENTS,
+    'bot': TRACKING_BOT_KEYWORDS,
+}
+_UA_KEYWORDS = sorted({kw for kws in _UA_KEYWORD_SETS.values() for kw in kws})
+# Keyword -> every list it satisfies, including through the keywords it contains
+# ('googlebot' is also 'google' and 'bot'), so one match per position is enough.
+_UA_KEYWORD_FLAGS = {
+    kw: frozenset(name for name, kws in _UA_KEYWORD_SETS.items() if any(other in kw for other in kws))
+    for kw in _UA_KEYWORDS
+}
+
+
+def _trie_pattern(words):
+    """Prefix-factored alternation ('bing(?:bot)?') that matches the longest word at a position."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ''
+        body = alts[0] if len(alts) == 1 else '(?:' + '|'.join(alts) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+# Lookahead so overlapping keywords are seen at every offset.
+_UA_KEYWORD_RE = re.compile('(?=(' + _trie_pattern(_UA_KEYWORDS) + '))')
+_UA_CHROME_RE = re.compile(r'Chrome/(\d+)\.')
+_UA_OLD_WINDOWS_RE = re.compile(r'Windows NT [56]\.[01]')
+
+
+@lru_cache(maxsize=getattr(settings, 'UA_CLASSIFIER_CACHE_SIZE', 4096))
+def classify_user_agent(user_agent):
+    """
+    Classify a raw User-Agent string in one scan of the keyword pattern.
+
+    allowed_bot / blocked follow BotFilterMiddleware's lists; bot is
+    VisitorTrackingMiddleware's wider test (keywords, Chrome < 100,
+    Windows XP/Vista/7, or no UA at all).
+    """
+    flags = set()
+    for match in _UA_KEYWORD_RE.finditer(user_agent.lower()):
+        flags |= _UA_KEYWORD_FLAGS[match.group(1)]
+        if len(flags) == len(_UA_KEYWORD_SETS):
+            break
+
+    bot = 'bot' in flags or not user_agent
+    if not bot:
+        # Old Chrome versions (< 100) are almost always headless bots or scrapers
+        # in 2026 — Chrome 100 shipped April 2022, anything older is suspicious.
+        chrome_match = _UA_CHROME_RE.search(user_agent)
+        bot = bool(chrome_match and int(chrome_match.group(1)) < 100)
+    if not bot:
+        # Windows NT 5.x / 6.0 / 6.1 (XP / Vista / Win 7) are all end-of-life and
+        # overwhelmingly used as fake UA strings by bot networks.
+        bot = bool(_UA_OLD_WINDOWS_RE.search(user_agent))
+
+    return UAVerdict('allowed_bot' in flags, 'blocked' in flags, bot)
+
+
+def classify_request(request):
+    """The request's UAVerdict, computed on first use and kept on request.ua_verdict."""
+    verdict = getattr(request, 'ua_verdict', None)
+    if verdict is None:
+        verdict = request.ua_verdict = classify_user_agent(request.META.get('HTTP_USER_AGENT', ''))
+    return verdict
+
+
+def get_client_ip(request):
+    """Client IP (first X-Forwarded-For hop, else REMOTE_ADDR), kept on request.client_ip."""
+    ip = getattr(request, 'client_ip', None)
+    if ip is None:
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            ip = x_forwarded_for.split(',')[0].strip()
+        else:
+            ip = request.META.get('REMOTE_ADDR')
+        request.client_ip = ip
+    return ip
 
 
 class RateLimitMiddleware:
@@ -32,12 +180,7 @@ class RateLimitMiddleware:
         
     def get_client_ip(self, request):
         """Extract client IP from request headers."""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
     
     def __call__(self, request):
         # Skip rate limiting for authenticated users (editors)
@@ -199,9 +342,13 @@ class RateLimitMiddleware:
                         strikes = 1
                 
                 user_agent = request.META.get('HTTP_USER_AGENT', '')[:200]
-                logger.warning(f"[RATE LIMIT] IP {ip} exceeded {endpoint_type} limit (strike {strikes}/{max_strikes}) UA={user_agent}")
-                # Also print to stdout so platform logs capture the IP immediately
-                print(f"[RATE_LIMIT] ip={ip} endpoint={endpoint_type} count={rate_data['count']} strikes={strikes} ua={user_agent} path={path}")
+                metrics.rate_limit_exceeded.inc(endpoint=endpoint_type)
+                rate_limit_log.warning(
+                    '[RATE_LIMIT] ip=%s endpoint=%s count=%s strikes=%s/%s ua=%s path=%s',
+                    ip, endpoint_type, rate_data['count'], strikes, max_strikes, user_agent, path,
+                    extra={'ip': ip, 'endpoint': endpoint_type, 'count': rate_data['count'], 'strikes': strikes,
+                           'limit': limit, 'ua': user_agent, 'path': path},
+                )
 
                 # If we have not yet reached the strike threshold for banning, challenge the client
                 # with a simple human verification flow rather than immediately banning. This avoids
@@ -218,13 +365,6 @@ class RateLimitMiddleware:
                     # If redirect fails for any reason, continue with normal rate-limit response
                     logger.exception('Failed to redirect to human challenge page')
 
-                # Record event to audit log for analysis
-                try:
-                    with open('rate_limit_events.log', 'a') as rf:
-                        rf.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} | {ip} | {endpoint_type} | count={rate_data['count']} | strikes={strikes} | limit={limit} | ua={user_agent} | path={path}\n")
-                except Exception:
-                    logger.exception('Failed to write rate_limit_events.log')
-                
                 # Ban if too many strikes
                 if strikes >= max_strikes:
                     ban_until = current_time + ban_duration
@@ -245,14 +385,13 @@ class RateLimitMiddleware:
                         except Exception:
                             logger.exception('Failed to set ban_key in cache')
 
-                    print(f"[BOT_BANNED] ip={ip} endpoint={endpoint_type} strikes={strikes} ban_duration={ban_duration} ua={user_agent} path={path}")
-                    
-                    # Log to file for monitoring
-                    try:
-                        with open('blocked_ips.log', 'a') as f:
-                            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} | {ip} | {endpoint_type} | {strikes} strikes | {ban_duration}s | ua={user_agent} | path={path}\n")
-                    except Exception:
-                        logger.exception('Failed to write blocked_ips.log')
+                    metrics.rate_limit_bans.inc(endpoint=endpoint_type)
+                    ban_log.warning(
+                        '[BOT_BANNED] ip=%s endpoint=%s strikes=%s ban_duration=%s ua=%s path=%s',
+                        ip, endpoint_type, strikes, ban_duration, user_agent, path,
+                        extra={'ip': ip, 'endpoint': endpoint_type, 'strikes': strikes,
+                               'ban_duration': ban_duration, 'ua': user_agent, 'path': path},
+                    )
                     
                     response = HttpResponse(
                         f'Your IP has been temporarily blocked due to excessive {endpoint_type} requests.\n'
@@ -328,6 +467,45 @@ class AjaxExceptionMiddleware:
             raise
 
 
+class DBConcurrencyMiddleware:
+    """
+    Bound how many requests per worker run sync views (and so hold a Postgres
+    connection) at once.
+
+    Under uvicorn every sync view runs on its own thread with its own
+    connection, and nothing else limits how many run together. Requests over
+    DB_CONCURRENCY wait up to DB_CONCURRENCY_TIMEOUT seconds for a slot and
+    only get a 503 if none frees up. Async views (outbound I/O, see
+    hebrewtool/http_client.py) skip the queue, and static files never reach
+    it because WhiteNoise answers them first.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slots = threading.BoundedSemaphore(getattr(settings, 'DB_CONCURRENCY', 20))
+        self.timeout = getattr(settings, 'DB_CONCURRENCY_TIMEOUT', 30)
+
+    def __call__(self, request):
+        try:
+            match = resolve(request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            match = None
+        if match is not None and iscoroutinefunction(match.func):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        acquired = self.slots.acquire(timeout=self.timeout)
+        metrics.db_slot_wait_seconds.observe(time.perf_counter() - started)
+        if not acquired:
+            metrics.db_slot_timeouts.inc()
+            logger.warning('No DB slot free after %ss for %s', self.timeout, request.path)
+            return HttpResponse('Server busy, please retry shortly.', status=503, headers={'Retry-After': '5'})
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release()
+
+
 class BotFilterMiddleware:
     """
     Block known bad bots and suspicious user agents.
@@ -338,35 +516,9 @@ class BotFilterMiddleware:
     - Empty or suspicious user agents
     """
     
-    BLOCKED_USER_AGENTS = [
-        'python-requests',
-        'curl',
-        'wget',
-        'scrapy',
-        'bot',
-        'spider',
-        'crawler',
-        'scraper',
-        'http',
-        'libwww',
-        'snoopy',
-        'mechanize',
-        'java',
-        'headless',
-    ]
-    
-    ALLOWED_BOTS = [
-        'googlebot',
-        'bingbot',
-        'slurp',  # Yahoo
-        'duckduckbot',
-        'baiduspider',
-        'yandexbot',
-        'facebookexternalhit',
-        'twitterbot',
-        'linkedinbot',
-    ]
-    
+    BLOCKED_USER_AGENTS = BLOCKED_USER_AGENTS
+    ALLOWED_BOTS = ALLOWED_BOTS
+
     def __init__(self, get_response):
         self.get_response = get_response
         
@@ -386,21 +538,15 @@ class BotFilterMiddleware:
         if request.path in skip_paths or request.path.startswith('/api/'):
             return self.get_response(request)
 
-        user_agent = request.META.get('HTTP_USER_AGENT', '').lower()
-        
-        # Allow empty user agent from browsers (some privacy tools strip UA)
-        if not user_agent:
-            # But rate limit more aggressively
-            pass
-        
+        # Empty user agents pass (some privacy tools strip the UA)
+        verdict = classify_request(request)
+
         # Check if it's an allowed bot
-        is_allowed_bot = any(allowed in user_agent for allowed in self.ALLOWED_BOTS)
-        if is_allowed_bot:
+        if verdict.allowed_bot:
             return self.get_response(request)
         
         # Block known bad bots
-        is_blocked = any(blocked in user_agent for blocked in self.BLOCKED_USER_AGENTS)
-        if is_blocked:
+        if verdict.blocked:
             return HttpResponse(
                 'Access denied. If you are a legitimate bot, please contact the site administrator.',
                 status=403,
@@ -409,25 +555,19 @@ class BotFilterMiddleware:
         
         return self.get_response(request)
 
-import threading
-import requests
 
 class VisitorTrackingMiddleware:
     """
     Tracks visitor locations for the heatmap analytics.
-    Filters out bots and uses ip-api.com for geolocation.
+    Filters out bots and hands the visit to search.visitor_ingest, which
+    geolocates and stores it in batches off the request path.
     """
     
     def __init__(self, get_response):
         self.get_response = get_response
         
     def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
         
     def __call__(self, request):
         response = self.get_response(request)
@@ -444,102 +584,151 @@ class VisitorTrackingMiddleware:
         if getattr(settings, 'DEBUG', False) and ip in ('127.0.0.1', 'localhost'):
             # For local testing, we can mock a location or just skip
             # Let's mock a location for local testing so the map works
-            threading.Thread(target=self.log_visitor_mock, args=(ip, user_agent, path)).start()
+            enqueue_visit(ip, user_agent, path, mock=True)
             return response
             
-        # Basic bot detection — keyword check
-        bot_keywords = ['bot', 'spider', 'crawler', 'scraper', 'google', 'bing', 'yandex', 'baidu', 'curl', 'wget', 'python-requests']
-        is_bot = any(keyword in user_agent.lower() for keyword in bot_keywords)
-
-        if not is_bot:
-            # Heuristic: old Chrome versions (< 100) are almost always headless bots or
-            # scrapers in 2026 — Chrome 100 shipped April 2022, anything older is suspicious.
-            chrome_match = re.search(r'Chrome/(\d+)\.', user_agent)
-            if chrome_match and int(chrome_match.group(1)) < 100:
-                is_bot = True
-
-        if not is_bot:
-            # Heuristic: Windows NT 5.x / 6.0 / 6.1 (XP / Vista / Win 7) are all
-            # end-of-life and overwhelmingly used as fake UA strings by bot networks.
-            if re.search(r'Windows NT [56]\.[01]', user_agent):
-                is_bot = True
-
-        if not is_bot and not user_agent:
-            is_bot = True  # Empty UA = bot
+        # Keyword list, Chrome < 100, Windows XP/Vista/7 and empty UAs (classify_user_agent)
+        is_bot = classify_request(request).bot
 
         if is_bot:
             return response  # Don't log bots to save DB space and API calls
             
-        # Run geolocation and logging in a background thread to avoid blocking the response
-        threading.Thread(target=self.log_visitor, args=(ip, user_agent, path)).start()
+        # Non-blocking put onto the bounded ingest queue; dropped if the queue is full
+        enqueue_visit(ip, user_agent, path)
         
         return response
-        
-    def log_visitor_mock(self, ip, user_agent, path):
-        """Mock visitor logging for local development."""
-        from search.models import VisitorLocation
-        import random
-        
+
+
+_SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_IN_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)')
+
+
+@lru_cache(maxsize=2048)
+def _sql_shape(sql):
+    """Collapse literals and IN-lists so queries that differ only by values share a shape."""
+    shape = _SQL_LITERAL_RE.sub('?', sql)
+    shape = _SQL_IN_LIST_RE.sub('(?)', shape)
+    return ' '.join(shape.split())
+
+
+class QueryStats:
+    """Per-request SQL counters collected through connection.execute_wrapper."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
         try:
-            VisitorLocation.objects.create(
-                ip_address=None,
-                user_agent=user_agent,
-                path=path,
-                country='Localhost',
-                city='Local City',
-                # Random coordinates for testing the heatmap
-                latitude=random.uniform(-90, 90),
-                longitude=random.uniform(-180, 180),
-                is_bot=False
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[_sql_shape(sql)] += 1
+
+    def repeated(self, threshold):
+        """[(shape, count), ...] for shapes executed at least `threshold` times."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Count SQL queries, DB time and repeated query shapes (N+1 patterns) per request.
+
+    Adds a Server-Timing header (db / app durations) when SQL_SERVER_TIMING is
+    on (by default only under DEBUG) and logs a JSON line to the
+    'hebrewtool.sql' logger when a request exceeds SQL_BUDGET_QUERIES,
+    SQL_BUDGET_DB_MS or runs one shape SQL_BUDGET_REPEATS+ times. Stats are also
+    left on request.sql_stats for other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'SQL_INSTRUMENTATION', True)
+        self.server_timing = getattr(settings, 'SQL_SERVER_TIMING', settings.DEBUG)
+        self.budget_queries = getattr(settings, 'SQL_BUDGET_QUERIES', 50)
+        self.budget_db_ms = getattr(settings, 'SQL_BUDGET_DB_MS', 500)
+        self.budget_repeats = getattr(settings, 'SQL_BUDGET_REPEATS', 10)
+        self.budget_logger = logging.getLogger('hebrewtool.sql')
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        from django.db import connection
+
+        stats = QueryStats()
+        request.sql_stats = stats
+        started = time.perf_counter()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = stats.duration * 1000
+
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{stats.count} queries", '
+                f'app;dur={max(total_ms - db_ms, 0):.1f}'
             )
-        except Exception as e:
-            logger.error(f"Error saving mock visitor log: {e}")
-            
-    def log_visitor(self, ip, user_agent, path):
-        from search.models import VisitorLocation
-        from django.core.cache import cache
-        
-        # Check if we already have this IP's location cached
-        cache_key = f'geoip_{ip}'
-        geo_data = cache.get(cache_key)
-        
-        if not geo_data:
-            try:
-                # Use ip-api.com (free, no key required, 45 requests/minute limit)
-                res = requests.get(f'http://ip-api.com/json/{ip}?fields=status,country,city,lat,lon,proxy,hosting', timeout=5)
-                if res.status_code == 200:
-                    data = res.json()
-                    if data.get('status') == 'success':
-                        is_bot_network = data.get('proxy', False) or data.get('hosting', False)
-                        # Filter out extreme bot traffic from typical scraping countries if they are abnormally high
-                        if data.get('country') in ['Vietnam', 'China', 'Singapore', 'Bangladesh', 'Hong Kong', 'Russia']:
-                            is_bot_network = True
-                        geo_data = {
-                            'country': data.get('country'),
-                            'city': data.get('city'),
-                            'latitude': data.get('lat'),
-                            'longitude': data.get('lon'),
-                            'is_bot': is_bot_network
-                        }
-                        # Cache for 24 hours (including bot-network flag so we skip them on repeat visits)
-                        cache.set(cache_key, geo_data, 60 * 60 * 24)
-            except Exception as e:
-                logger.error(f"Error fetching geoip for {ip}: {e}")
-                
-        if geo_data:
-            # Skip storing records for known proxy/hosting IPs — they're bots and waste DB space.
-            if geo_data.get('is_bot', False):
-                return
-            try:
-                VisitorLocation.objects.create(
-                    ip_address=None,  # Privacy: don't store raw IP
-                    user_agent=user_agent,
-                    path=path,
-                    country=geo_data.get('country'),
-                    city=geo_data.get('city'),
-                    latitude=geo_data.get('latitude'),
-                    longitude=geo_data.get('longitude'),
-                    is_bot=False
-                )
-            except Exception as e:
-                logger.error(f"Error saving visitor log: {e}")
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.url_name or 'unnamed') if match else 'unresolved'
+        metrics.view_requests.inc(view=view)
+        metrics.view_queries.inc(stats.count, view=view)
+        metrics.view_db_seconds.observe(stats.duration, view=view)
+
+        repeated = stats.repeated(self.budget_repeats)
+        if stats.count > self.budget_queries or db_ms > self.budget_db_ms or repeated:
+            self.budget_logger.warning(json.dumps({
+                'path': request.path,
+                'query_string': request.META.get('QUERY_STRING', '')[:200],
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'queries': stats.count,
+                'db_ms': round(db_ms, 1),
+                'total_ms': round(total_ms, 1),
+                'repeated': [{'sql': shape[:300], 'count': n} for shape, n in repeated[:5]],
+            }))
+
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Sample the call stack of selected requests (see hebrewtool/profiling.py).
+
+    Staff can profile one request by adding ?_profile=1; ProfilingRule rows
+    (admin) profile a fraction of requests under a path prefix. The profile id
+    is returned in an X-Profile-Id header and listed under Request profiles in
+    the admin. Must sit after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PROFILER_ENABLED', True)
+        self.interval = getattr(settings, 'PROFILER_INTERVAL_MS', 5) / 1000
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        from hebrewtool.profiling import StackSampler, choose_trigger, save_profile
+
+        trigger, rule = choose_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        sampler = StackSampler(interval=self.interval).start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+
+        try:
+            profile = save_profile(sampler, request, response, trigger, rule)
+            response['X-Profile-Id'] = str(profile.pk)
+        except Exception:
+            logger.exception('Failed to save request profile for %s', request.path)
+        return response
@@ -0,0 +1,220 @@
+"""
+On-demand statistical profiler for single requests.
+
+StackSampler polls one thread's Python stack via sys._current_frames() every
+PROFILER_INTERVAL_MS on a helper thread, so the profiled request runs at full
+speed apart from the GIL hand-offs; there is no tracing hook on every call
+like cProfile. A finished sample set is written to PROFILER_DIR as collapsed
+stacks ("frame;frame;frame count" per line, the input format of
+flamegraph.pl / speedscope) and summarised into per-function self/total
+times on a search.models.RequestProfile row, listed in the admin.
+
+ProfilingMiddleware decides which requests to profile: staff requests with
+?_profile=1, and a sampled fraction of requests matching an enabled
+search.models.ProfilingRule.
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TOP_FUNCTIONS = 50
+
+
+def _frame_label(code, base_dir):
+    filename = code.co_filename
+    if filename.startswith(base_dir):
+        filename = filename[len(base_dir):].lstrip(os.sep)
+    else:
+        marker = filename.rfind('site-packages' + os.sep)
+        if marker != -1:
+            filename = filename[marker + len('site-packages' + os.sep):]
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """Sample one thread's call stack at a fixed interval until stop() is called."""
+
+    def __init__(self, thread_id=None, interval=0.005, max_depth=128):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._base_dir = str(settings.BASE_DIR)
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = 0.0
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code, self._base_dir)
+        return label
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    def sample_ms(self):
+        """Wall time represented by one sample (measured, not the nominal interval)."""
+        return (self.elapsed * 1000 / self.samples) if self.samples else self.interval * 1000
+
+    def collapsed(self):
+        return '\n'.join(
+            f"{';'.join(stack)} {count}"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        )
+
+    def function_stats(self, limit=TOP_FUNCTIONS):
+        """[{'function', 'self_ms', 'total_ms', 'self_samples', 'total_samples'}, ...] by self time."""
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+        per_sample = self.sample_ms()
+        ranked = sorted(total_counts, key=lambda label: (-self_counts[label], -total_counts[label]))
+        return [
+            {
+                'function': label,
+                'self_ms': round(self_counts[label] * per_sample, 2),
+                'total_ms': round(total_counts[label] * per_sample, 2),
+                'self_samples': self_counts[label],
+                'total_samples': total_counts[label],
+            }
+            for label in ranked[:limit]
+        ]
+
+
+def profile_dir():
+    path = Path(getattr(settings, 'PROFILER_DIR', Path(settings.BASE_DIR) / 'profiles'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def save_profile(sampler, request, response, trigger, rule=None):
+    """Write the collapsed stacks to disk and record a RequestProfile row."""
+    from search.models import RequestProfile
+
+    user = getattr(request, 'user', None)
+    filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{time.time_ns() % 10**9:09d}.collapsed"
+    (profile_dir() / filename).write_text(sampler.collapsed(), encoding='utf-8')
+
+    profile = RequestProfile.objects.create(
+        method=request.method,
+        path=request.path[:255],
+        query_string=request.META.get('QUERY_STRING', '')[:500],
+        status_code=getattr(response, 'status_code', None),
+        duration_ms=round(sampler.elapsed * 1000, 1),
+        samples=sampler.samples,
+        interval_ms=round(sampler.interval * 1000, 2),
+        trigger=trigger,
+        rule=rule,
+        user=user.get_username() if user is not None and user.is_authenticated else None,
+        filename=filename,
+        top_functions=sampler.function_stats(),
+    )
+    if rule is not None:
+        from django.db.models import F
+        type(rule).objects.filter(pk=rule.pk).update(profiles_taken=F('profiles_taken') + 1)
+        rule.profiles_taken += 1
+        if rule.profiles_taken >= rule.max_profiles:
+            rule_cache.invalidate()
+    prune_profiles(getattr(settings, 'PROFILER_KEEP', 200))
+    return profile
+
+
+def prune_profiles(keep):
+    """Delete all but the newest `keep` profiles and their files."""
+    from search.models import RequestProfile
+
+    stale = list(RequestProfile.objects.order_by('-created_at').values_list('id', 'filename')[keep:])
+    if not stale:
+        return 0
+    directory = profile_dir()
+    for _, filename in stale:
+        try:
+            (directory / filename).unlink()
+        except FileNotFoundError:
+            pass
+    RequestProfile.objects.filter(id__in=[profile_id for profile_id, _ in stale]).delete()
+    return len(stale)
+
+
+class _RuleCache:
+    """Enabled ProfilingRule rows, reloaded at most every PROFILER_RULE_REFRESH seconds per process."""
+
+    def __init__(self):
+        self.rules = []
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        refresh = getattr(settings, 'PROFILER_RULE_REFRESH', 30)
+        now = time.monotonic()
+        if self.loaded_at is not None and now - self.loaded_at < refresh:
+            return self.rules
+        with self.lock:
+            if self.loaded_at is None or now - self.loaded_at >= refresh:
+                try:
+                    from search.models import ProfilingRule
+                    self.rules = list(ProfilingRule.active())
+                except Exception:
+                    logger.exception('Could not load profiling rules')
+                    self.rules = []
+                self.loaded_at = now
+        return self.rules
+
+    def invalidate(self):
+        self.loaded_at = None
+
+
+rule_cache = _RuleCache()
+
+
+def choose_trigger(request):
+    """('manual', None), ('sampled', rule) or (None, None) for this request."""
+    user = getattr(request, 'user', None)
+    if request.GET.get('_profile') == '1' and user is not None and user.is_staff:
+        return 'manual', None
+    for rule in rule_cache.get():
+        if request.path.startswith(rule.path_prefix) and random.random() < rule.sample_rate:
+            return 'sampled', rule
+    return None, None
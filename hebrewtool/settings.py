@@ -123,9 +123,11 @@ REST_FRAMEWORK = {
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'hebrewtool.middleware.QueryInstrumentationMiddleware',  # SQL count/time, Server-Timing
     'hebrewtool.middleware.AjaxExceptionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'hebrewtool.middleware.DBConcurrencyMiddleware',  # Queue sync views for a DB slot; static files bypass
     'hebrewtool.middleware.BotFilterMiddleware',  # Block bad bots early
     'hebrewtool.middleware.RateLimitMiddleware',  # Rate limit after bot filtering
     'hebrewtool.middleware.VisitorTrackingMiddleware', # Track visitor locations
@@ -133,6 +135,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'hebrewtool.middleware.ProfilingMiddleware',  # staff ?_profile=1 / admin sampling rules
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -157,6 +160,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'hebrewtool.wsgi.application'
+ASGI_APPLICATION = 'hebrewtool.asgi.application'  # served in production (Procfile)
 
 
 # Database
@@ -165,7 +169,10 @@ WSGI_APPLICATION = 'hebrewtool.wsgi.application'
 
 _db_config = dj_database_url.config(
     default=os.environ.get('DATABASE_URL'),
-    conn_max_age=60,  # Reuse connections for 60s to avoid per-request SSL handshake overhead
+    # Production runs under ASGI, where each sync view gets a new thread; persistent
+    # connections are per thread there and would pile up instead of being reused.
+    # Keep 0 unless DATABASE_URL points at a pooler such as PgBouncer.
+    conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', '0')),
     conn_health_checks=True
 )
 # Set statement/lock timeouts at connection-creation time rather than per-query.
@@ -177,6 +184,12 @@ if _db_config:
 
 DATABASES = {'default': _db_config}
 
+# Per-worker cap on requests running sync (database-backed) views at once
+# (hebrewtool.middleware.DBConcurrencyMiddleware). Extra requests wait up to
+# DB_CONCURRENCY_TIMEOUT seconds for a slot before getting a 503.
+DB_CONCURRENCY = int(os.getenv('DB_CONCURRENCY', '20'))
+DB_CONCURRENCY_TIMEOUT = int(os.getenv('DB_CONCURRENCY_TIMEOUT', '30'))
+
 # Cache configuration - use database cache for rate limiting persistence
 CACHES = {
     'default': {
@@ -211,6 +224,88 @@ RATE_LIMIT_GENERAL_WINDOW = int(os.getenv('RATE_LIMIT_GENERAL_WINDOW', '60'))
 RATE_LIMIT_GENERAL_MAX_STRIKES = int(os.getenv('RATE_LIMIT_GENERAL_MAX_STRIKES', '6'))
 RATE_LIMIT_GENERAL_BAN_DURATION = int(os.getenv('RATE_LIMIT_GENERAL_BAN_DURATION', '300'))  # seconds (5m)
 
+# User-agent verdicts shared by the bot filter, rate limiter and visitor tracking
+# (hebrewtool.middleware.classify_user_agent): distinct UA strings kept in the LRU
+UA_CLASSIFIER_CACHE_SIZE = int(os.getenv('UA_CLASSIFIER_CACHE_SIZE', '4096'))
+
+# NT/OT find-and-replace (search.find_replace): candidate rows per review page
+FIND_REPLACE_PAGE_SIZE = int(os.getenv('FIND_REPLACE_PAGE_SIZE', '200'))
+
+# Consonantal Hebrew search (search.consonantal_search): results per page, and how long a
+# query's ranked hit list stays cached for paging
+CONSONANTAL_SEARCH_PAGE_SIZE = int(os.getenv('CONSONANTAL_SEARCH_PAGE_SIZE', '100'))
+CONSONANTAL_SEARCH_CACHE_SECONDS = int(os.getenv('CONSONANTAL_SEARCH_CACHE_SECONDS', '600'))
+
+# Strong's concordance API (search.concordance): entries per page
+CONCORDANCE_PAGE_SIZE = int(os.getenv('CONCORDANCE_PAGE_SIZE', '200'))
+
+# Search autocomplete (search.suggestion_index): how often the in-memory index is rebuilt, and
+# how many days of search_queries_daily count toward popular queries
+SEARCH_SUGGEST_REFRESH_SECONDS = int(os.getenv('SEARCH_SUGGEST_REFRESH_SECONDS', '3600'))
+SEARCH_SUGGEST_POPULAR_DAYS = int(os.getenv('SEARCH_SUGGEST_POPULAR_DAYS', '30'))
+# Search counts are buffered per worker and written every SEARCH_SUGGEST_FLUSH_INTERVAL seconds
+SEARCH_SUGGEST_FLUSH_INTERVAL = int(os.getenv('SEARCH_SUGGEST_FLUSH_INTERVAL', '30'))
+SEARCH_SUGGEST_MAX_BUFFER = int(os.getenv('SEARCH_SUGGEST_MAX_BUFFER', '5000'))
+
+# Search pagination (search.search_cursor): page 1 counts each category up to this many matches
+SEARCH_COUNT_LIMIT = int(os.getenv('SEARCH_COUNT_LIMIT', '1000'))
+
+# Visitor heatmap ingest (search/visitor_ingest.py)
+# GEOIP_DB_PATH: MaxMind .mmdb (read with maxminddb) or a CSV of
+# start_ip,end_ip,country,city,latitude,longitude rows. Without it, ip-api.com
+# is used as a fallback, capped at VISITOR_GEOIP_REMOTE_PER_MINUTE (0 disables).
+VISITOR_GEOIP_DB = os.getenv('GEOIP_DB_PATH', '')
+VISITOR_GEOIP_CACHE_SIZE = int(os.getenv('VISITOR_GEOIP_CACHE_SIZE', '20000'))
+VISITOR_GEOIP_REMOTE_PER_MINUTE = int(os.getenv('VISITOR_GEOIP_REMOTE_PER_MINUTE', '40'))
+VISITOR_QUEUE_MAXSIZE = int(os.getenv('VISITOR_QUEUE_MAXSIZE', '5000'))
+VISITOR_BATCH_SIZE = int(os.getenv('VISITOR_BATCH_SIZE', '200'))
+VISITOR_FLUSH_INTERVAL = int(os.getenv('VISITOR_FLUSH_INTERVAL', '10'))  # seconds
+# Heatmap rollups (search/visitor_rollups.py, `manage.py rollup_visitors`)
+VISITOR_GRID_DEGREES = float(os.getenv('VISITOR_GRID_DEGREES', '0.1'))  # ~11km cells
+VISITOR_RAW_RETENTION_DAYS = int(os.getenv('VISITOR_RAW_RETENTION_DAYS', '90'))
+
+# Per-request SQL instrumentation (hebrewtool.middleware.QueryInstrumentationMiddleware)
+# Requests over any budget are logged as JSON to RBT_sql_budget.log.
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'True') == 'True'
+# Server-Timing exposes DB time and query counts to any client: off unless DEBUG or opted in
+SQL_SERVER_TIMING = os.getenv('SQL_SERVER_TIMING', str(DEBUG)) == 'True'
+SQL_BUDGET_QUERIES = int(os.getenv('SQL_BUDGET_QUERIES', '50'))
+SQL_BUDGET_DB_MS = int(os.getenv('SQL_BUDGET_DB_MS', '500'))
+SQL_BUDGET_REPEATS = int(os.getenv('SQL_BUDGET_REPEATS', '10'))  # same query shape N+ times = likely N+1
+
+# Request profiler (hebrewtool.middleware.ProfilingMiddleware, hebrewtool/profiling.py)
+# Collapsed-stack files are written to PROFILER_DIR; the newest PROFILER_KEEP are kept.
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'True') == 'True'
+PROFILER_DIR = os.getenv('PROFILER_DIR', str(BASE_DIR / 'profiles'))
+PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '5'))
+PROFILER_KEEP = int(os.getenv('PROFILER_KEEP', '200'))
+PROFILER_RULE_REFRESH = int(os.getenv('PROFILER_RULE_REFRESH', '30'))  # seconds between rule reloads
+
+# Prometheus metrics (hebrewtool/metrics.py, served at /metrics)
+# Each gunicorn worker flushes its counters to METRICS_DIR every METRICS_FLUSH_INTERVAL
+# seconds; a scrape sums all workers. Scrapers authenticate with "Authorization: Bearer METRICS_TOKEN".
+METRICS_DIR = os.getenv('METRICS_DIR', str(BASE_DIR / 'metrics'))
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', '15'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Outbound HTTP for the async proxy/scrape/donation/Northflank views (hebrewtool/http_client.py).
+# One keep-alive pool per worker; HTTP_PER_HOST_LIMIT caps concurrent requests to any one upstream.
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '100'))
+HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', '20'))
+HTTP_KEEPALIVE_EXPIRY = int(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30'))  # seconds
+HTTP_PER_HOST_LIMIT = int(os.getenv('HTTP_PER_HOST_LIMIT', '8'))
+HTTP_TIMEOUT = int(os.getenv('HTTP_TIMEOUT', '15'))  # seconds, per request unless the view passes its own
+HTTP_CONNECT_TIMEOUT = int(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+
+# Dashboard snapshots (search/dashboard_snapshots.py): a collector thread per worker refreshes the
+# Coinbase, donation and Northflank payloads before they go stale; views always serve the last
+# good snapshot. DASHBOARD_REFRESH_* are the seconds after which a snapshot counts as stale.
+DASHBOARD_COLLECTOR_ENABLED = os.getenv('DASHBOARD_COLLECTOR_ENABLED', 'True') == 'True'
+DASHBOARD_COLLECT_INTERVAL = int(os.getenv('DASHBOARD_COLLECT_INTERVAL', '60'))  # seconds between passes
+DASHBOARD_REFRESH_CRYPTO = int(os.getenv('DASHBOARD_REFRESH_CRYPTO', '300'))
+DASHBOARD_REFRESH_DONATIONS = int(os.getenv('DASHBOARD_REFRESH_DONATIONS', '3600'))
+DASHBOARD_REFRESH_NORTHFLANK = int(os.getenv('NORTHFLANK_STATS_CACHE_TTL', '300'))
+
 
 
 # Password validation
@@ -264,6 +359,43 @@ WHITENOISE_USE_FINDERS = True
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Gemini gateway (hebrewtool/llm_gateway.py): pooled client per key, routed to the key
+# with the fewest recent 429s and least in-flight work. A 429 parks the key for
+# LLM_BREAKER_COOLDOWN seconds (doubling up to LLM_BREAKER_MAX_COOLDOWN).
+# LLM_BACKEND='stub' answers locally, for development and tests without API access.
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'genai')
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))  # per process
+LLM_PER_KEY_CONCURRENCY = int(os.getenv('LLM_PER_KEY_CONCURRENCY', '2'))
+LLM_ACQUIRE_TIMEOUT = int(os.getenv('LLM_ACQUIRE_TIMEOUT', '30'))  # seconds to wait for a free slot
+LLM_BREAKER_COOLDOWN = int(os.getenv('LLM_BREAKER_COOLDOWN', '60'))
+LLM_BREAKER_MAX_COOLDOWN = int(os.getenv('LLM_BREAKER_MAX_COOLDOWN', '900'))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', '3'))  # consecutive non-quota errors that open the circuit
+LLM_HEALTH_WINDOW = int(os.getenv('LLM_HEALTH_WINDOW', '300'))  # seconds of 429 history used for routing
+LLM_STUB_LATENCY_MS = int(os.getenv('LLM_STUB_LATENCY_MS', '0'))
+LLM_STUB_EMBED_DIM = int(os.getenv('LLM_STUB_EMBED_DIM', '768'))
+# Gemini usage log (search/gemini_usage.py): rows are buffered per process and written
+# with bulk_create every GEMINI_USAGE_FLUSH_INTERVAL seconds or GEMINI_USAGE_BATCH_SIZE rows,
+# updating the per-key and per-target rollups read by the Gemini dashboard.
+GEMINI_USAGE_BATCH_SIZE = int(os.getenv('GEMINI_USAGE_BATCH_SIZE', '100'))
+GEMINI_USAGE_FLUSH_INTERVAL = int(os.getenv('GEMINI_USAGE_FLUSH_INTERVAL', '10'))  # seconds
+GEMINI_USAGE_MAX_BUFFER = int(os.getenv('GEMINI_USAGE_MAX_BUFFER', '5000'))  # rows dropped beyond this
+GEMINI_USAGE_RETENTION_DAYS = int(os.getenv('GEMINI_USAGE_RETENTION_DAYS', '90'))  # raw rows, `rollup_gemini_usage --prune`
+GEMINI_DASHBOARD_DAYS = int(os.getenv('GEMINI_DASHBOARD_DAYS', '7'))
+
+# Logging (hebrewtool/log_pipeline.py): handler I/O runs on a QueueListener thread so
+# request threads never block on stdout or log files. INFO/DEBUG records tagged with
+# extra={'category': ...} are sampled at LOG_SAMPLE_RATES; console output is throttled to
+# LOG_THROTTLE_LIMIT records per LOG_THROTTLE_WINDOW seconds per logging call site.
+LOGGING_CONFIG = 'hebrewtool.log_pipeline.configure_logging'
+LOG_ASYNC = os.getenv('LOG_ASYNC', 'True') == 'True'
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_SAMPLE_RATES = {
+    'request': float(os.getenv('LOG_SAMPLE_REQUEST', '1.0')),  # [REQUEST] access lines
+    'cache': float(os.getenv('LOG_SAMPLE_CACHE', '0.1')),  # get_results cache hit/miss
+}
+LOG_THROTTLE_LIMIT = int(os.getenv('LOG_THROTTLE_LIMIT', '120'))
+LOG_THROTTLE_WINDOW = int(os.getenv('LOG_THROTTLE_WINDOW', '60'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -272,6 +404,21 @@ LOGGING = {
             'format': '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
             'datefmt': '%Y-%m-%d %H:%M:%S',
         },
+        'json': {
+            '()': 'hebrewtool.log_pipeline.JsonFormatter',
+            'datefmt': '%Y-%m-%d %H:%M:%S',
+        },
+    },
+    'filters': {
+        'sample': {
+            '()': 'hebrewtool.log_pipeline.SampleFilter',
+            'rates': LOG_SAMPLE_RATES,
+        },
+        'throttle': {
+            '()': 'hebrewtool.log_pipeline.ThrottleFilter',
+            'limit': LOG_THROTTLE_LIMIT,
+            'window': LOG_THROTTLE_WINDOW,
+        },
     },
     'handlers': {
         'mail_admins': {
@@ -282,6 +429,7 @@ LOGGING = {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
             'formatter': 'standard',
+            'filters': ['sample', 'throttle'],
         },
         'file': {
             'level': 'ERROR',
@@ -300,6 +448,35 @@ LOGGING = {
             'interval': 1,
             'backupCount': 7,
             'formatter': 'standard',
+            'filters': ['sample'],
+        },
+        'sql_budget': {
+            'level': 'WARNING',
+            'class': 'logging.handlers.TimedRotatingFileHandler',
+            'filename': 'RBT_sql_budget.log',
+            'when': 'D',
+            'interval': 1,
+            'backupCount': 7,
+            'formatter': 'standard',
+        },
+        # Rate-limit audit trail, one JSON object per line (ip, endpoint, count, strikes, ua, path)
+        'rate_limit_events': {
+            'level': 'INFO',
+            'class': 'logging.handlers.TimedRotatingFileHandler',
+            'filename': 'rate_limit_events.log',
+            'when': 'D',
+            'interval': 1,
+            'backupCount': 7,
+            'formatter': 'json',
+        },
+        'blocked_ips': {
+            'level': 'INFO',
+            'class': 'logging.handlers.TimedRotatingFileHandler',
+            'filename': 'blocked_ips.log',
+            'when': 'D',
+            'interval': 1,
+            'backupCount': 30,
+            'formatter': 'json',
         },
     },
     'loggers': {
@@ -313,5 +490,30 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'search': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'hebrewtool': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'hebrewtool.sql': {
+            'handlers': ['sql_budget', 'console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'hebrewtool.ratelimit.events': {
+            'handlers': ['rate_limit_events', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'hebrewtool.ratelimit.bans': {
+            'handlers': ['blocked_ips', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
\ No newline at end of file
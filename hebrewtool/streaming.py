@@ -0,0 +1,32 @@
+"""
+Streaming responses from sync generators under ASGI.
+
+Django's ASGI handler serves a StreamingHttpResponse built on a sync iterator
+by collecting the whole iterator into a list first, so chunked output (the
+Gemini editor stream, the Hebrew data updater) would only arrive when it is
+finished. ThreadedStreamingHttpResponse pulls one chunk at a time in the
+request's sync thread instead, which keeps generators that hold DB cursors or
+other thread-bound state working. Under WSGI it behaves like the base class.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+
+_DONE = object()
+
+
+class ThreadedStreamingHttpResponse(StreamingHttpResponse):
+    """StreamingHttpResponse that streams sync iterators chunk by chunk under ASGI."""
+
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in self.streaming_content:
+                yield part
+            return
+        iterator = iter(self.streaming_content)
+        next_part = sync_to_async(next)
+        while True:
+            part = await next_part(iterator, _DONE)
+            if part is _DONE:
+                break
+            yield part
@@ -24,6 +24,8 @@ from search.sitemaps import BibleChapterSitemap, StaticViewSitemap
 from translate import views
 from search.views import update_count
 from .human_verification import human_challenge, human_verify
+from .lazy_imports import lazy_view
+from .metrics import metrics_view
 
 def health_check(request):
     return HttpResponse("OK", content_type="text/plain")
@@ -35,6 +37,7 @@ def robots_txt(request):
         "Disallow: /edit/",
         "Disallow: /edit_nt_chapter/",
         "Disallow: /translate/",
+        "Disallow: /metrics",
         "Sitemap: https://read.realbible.tech/sitemap.xml"
     ]
     return HttpResponse("\n".join(lines), content_type="text/plain")
@@ -46,6 +49,7 @@ sitemaps_dict = {
 
 urlpatterns = [
     path('health', health_check, name='health_check'),
+    path('metrics', metrics_view, name='metrics'),
     path('sitemap.xml', sitemap, {'sitemaps': sitemaps_dict}, name='django.contrib.sitemaps.views.sitemap'),
     path('robots.txt', robots_txt, name='robots_txt'),
     path('admin/', admin.site.urls),
@@ -61,7 +65,7 @@ urlpatterns = [
     path('find_and_replace_nt/accounts/', include('django.contrib.auth.urls')),
     path('find_and_replace_ot', views.find_and_replace_ot, name='find_and_replace_ot'),
     path('find_and_replace_ot/accounts/', include('django.contrib.auth.urls')),
-    path('lexicon/<str:lexicon_type>/<str:page>', views.lexicon_viewer, name='lexicon_viewer'),
+    path('lexicon/<str:lexicon_type>/<str:page>', lazy_view('translate.lexicon_views.lexicon_viewer'), name='lexicon_viewer'),
     path('translate/', include('translate.urls')),
     path('search_footnotes/', views.search_footnotes, name='search_footnotes'),
     path('edit_footnote/', views.edit_footnote, name='edit_footnote'),
@@ -0,0 +1,25 @@
+"""
+Gunicorn worker class for production (see Procfile and Dockerfile).
+
+The gthread WSGI setup this replaced served at most workers x threads
+requests at once (2 x 2), which also bounded the number of Postgres
+connections. Under uvicorn that bound is DBConcurrencyMiddleware
+(DB_CONCURRENCY per worker), which queues sync views for a slot rather than
+refusing them.
+
+limit_concurrency here is only a last-resort guard against connection
+floods. Uvicorn counts every open connection towards it, idle keep-alive
+ones and static file requests included, and answers anything above it with
+a 503, so WEB_CONCURRENCY_LIMIT is kept far above normal traffic.
+"""
+
+import os
+
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        'limit_concurrency': int(os.getenv('WEB_CONCURRENCY_LIMIT', '1000')),
+    }
@@ -1,9 +1,10 @@
 from django.contrib import admin, messages
 from django.core.cache import cache
 from django.urls import path, reverse
-from django.utils.html import format_html
-from django.shortcuts import redirect
-from .models import InterlinearConfig, InterlinearApplyLog
+from django.http import FileResponse, Http404
+from django.utils.html import format_html, format_html_join
+from django.shortcuts import get_object_or_404, redirect
+from .models import InterlinearConfig, InterlinearApplyLog, ProfilingRule, RequestProfile
 from . import utils
 from search.views.chapter_views_part1 import INTERLINEAR_CACHE_VERSION
 
@@ -130,3 +131,66 @@ class InterlinearApplyLogAdmin(admin.ModelAdmin):
     readonly_fields = ('applied_at', 'user', 'committed', 'applied_count', 'total_candidates', 'sample', 'backup_file')
     search_fields = ('user',)
     ordering = ('-applied_at',)
+
+
+@admin.register(ProfilingRule)
+class ProfilingRuleAdmin(admin.ModelAdmin):
+    list_display = ('path_prefix', 'sample_rate', 'profiles_taken', 'max_profiles', 'enabled', 'expires_at', 'created_by')
+    list_editable = ('enabled',)
+    readonly_fields = ('profiles_taken', 'created_by', 'created_at')
+    ordering = ('-created_at',)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user.username
+        super().save_model(request, obj, form, change)
+        from hebrewtool.profiling import rule_cache
+        rule_cache.invalidate()
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'method', 'path', 'status_code', 'duration_ms', 'samples', 'trigger', 'user', 'collapsed_link')
+    list_filter = ('trigger', 'method')
+    search_fields = ('path', 'user')
+    ordering = ('-created_at',)
+    exclude = ('top_functions',)
+    readonly_fields = (
+        'created_at', 'method', 'path', 'query_string', 'status_code', 'duration_ms', 'samples',
+        'interval_ms', 'trigger', 'rule', 'user', 'filename', 'collapsed_link', 'function_table',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom = [
+            path('<int:profile_id>/collapsed/', self.admin_site.admin_view(self.collapsed_view), name='search_requestprofile_collapsed'),
+        ]
+        return custom + urls
+
+    def collapsed_view(self, request, profile_id):
+        from hebrewtool.profiling import profile_dir
+
+        profile = get_object_or_404(RequestProfile, pk=profile_id)
+        file_path = profile_dir() / profile.filename
+        if not file_path.is_file():
+            raise Http404('Profile file has been removed')
+        return FileResponse(open(file_path, 'rb'), as_attachment=True, filename=profile.filename, content_type='text/plain')
+
+    @admin.display(description='Collapsed stacks')
+    def collapsed_link(self, obj):
+        url = reverse('admin:search_requestprofile_collapsed', args=[obj.pk])
+        return format_html('<a href="{}">download</a>', url)
+
+    @admin.display(description='Functions (by self time)')
+    def function_table(self, obj):
+        rows = format_html_join(
+            '', '<tr><td>{}</td><td>{}</td><td style="text-align:right">{}</td><td style="text-align:right">{}</td></tr>',
+            ((i, row['function'], row['self_ms'], row['total_ms']) for i, row in enumerate(obj.top_functions or [], start=1)),
+        )
+        return format_html(
+            '<table><thead><tr><th>#</th><th>Function</th><th>Self ms</th><th>Total ms</th></tr></thead>'
+            '<tbody>{}</tbody></table>', rows,
+        )
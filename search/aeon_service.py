@@ -13,8 +13,8 @@ from urllib.parse import urlparse
 
 from django.conf import settings
 from django.utils import timezone
-from bs4 import BeautifulSoup
-from google import genai
+
+from hebrewtool.llm_gateway import FAILOVER_OUTCOMES, classify_error, get_gateway
 
 from .models import AeonChunk, AeonCorpusSource
 
@@ -56,37 +56,6 @@ class TextChunk:
     metadata: dict[str, Any]
 
 
-def _get_gemini_api_keys() -> list[str]:
-    keys = os.getenv('GEMINI_API_KEYS', '')
-    parsed = [item.strip() for item in keys.split(',') if item.strip()]
-    single = os.getenv('GEMINI_API_KEY', '').strip()
-    if single:
-        parsed.append(single)
-
-    unique: list[str] = []
-    seen: set[str] = set()
-    for key in parsed:
-        if key not in seen:
-            seen.add(key)
-            unique.append(key)
-    return unique
-
-
-def _is_key_or_quota_error(message: str) -> bool:
-    lowered = message.lower()
-    indicators = [
-        'api key',
-        'api_key',
-        'expired',
-        'invalid',
-        'quota',
-        'rate limit',
-        'resource exhausted',
-        'permission denied',
-    ]
-    return any(item in lowered for item in indicators)
-
-
 def _resolve_source_path(source_file: str) -> Path:
     candidate = Path(source_file)
     if candidate.is_absolute():
@@ -368,6 +337,7 @@ def _fetch_wordpress_post_from_web(url: str) -> dict[str, Any] | None:
         logger.error('Failed to fetch URL %s from web: %s', url, exc)
         return None
 
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, 'html.parser')
     title = ''
     title_tag = soup.find('h1') or soup.find('title')
@@ -390,6 +360,7 @@ def _fetch_wordpress_post_from_web(url: str) -> dict[str, Any] | None:
 
 
 def _html_to_text(html: str) -> str:
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html or '', 'html.parser')
     for tag in soup(['script', 'style', 'noscript']):
         tag.decompose()
@@ -401,44 +372,54 @@ def _hash_text(text: str) -> str:
     return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
 
+def _first_success(client, model_names: list[str], request):
+    """request(client, model_name) for each model until one returns a value; quota/key errors go back to the gateway."""
+    last_error: Exception | None = None
+    for model_name in model_names:
+        try:
+            value = request(client, model_name)
+            if value:
+                return value
+        except Exception as exc:
+            if classify_error(exc) in FAILOVER_OUTCOMES:
+                raise
+            last_error = exc
+    if last_error:
+        raise last_error
+    return None
+
+
 def _embed_text(text: str, task_type: str) -> list[float]:
-    api_keys = _get_gemini_api_keys()
-    if not api_keys:
+    gateway = get_gateway()
+    if not gateway.keys:
         raise RuntimeError('No Gemini API key found in GEMINI_API_KEYS/GEMINI_API_KEY')
 
-    last_error: Exception | None = None
-    for api_key in api_keys:
-        client = genai.Client(api_key=api_key)
-        for model_name in DEFAULT_EMBEDDING_MODELS:
-            try:
-                response = client.models.embed_content(
-                    model=model_name,
-                    contents=text,
-                    config={
-                        'task_type': task_type,
-                    },
-                )
-
-                embeddings = getattr(response, 'embeddings', None)
-                if not embeddings:
-                    continue
-
-                first_embedding = embeddings[0]
-                values = getattr(first_embedding, 'values', None)
-                if isinstance(values, list) and values:
-                    return [float(value) for value in values]
-            except Exception as exc:
-                last_error = exc
-                message = str(exc)
-                lowered = message.lower()
-                if 'not found' in lowered or 'not supported' in lowered:
-                    continue
-                if _is_key_or_quota_error(message):
-                    break
+    def embed(client, model_name):
+        response = client.models.embed_content(
+            model=model_name,
+            contents=text,
+            config={
+                'task_type': task_type,
+            },
+        )
 
-    if last_error:
-        raise RuntimeError(f'Embedding failed across available Gemini keys/models: {last_error}') from last_error
-    raise RuntimeError('Embedding failed across available Gemini keys/models')
+        embeddings = getattr(response, 'embeddings', None)
+        if not embeddings:
+            return None
+
+        first_embedding = embeddings[0]
+        values = getattr(first_embedding, 'values', None)
+        if isinstance(values, list) and values:
+            return [float(value) for value in values]
+        return None
+
+    try:
+        values = gateway.call(lambda client: _first_success(client, DEFAULT_EMBEDDING_MODELS, embed), purpose='embedding')
+    except Exception as exc:
+        raise RuntimeError(f'Embedding failed across available Gemini keys/models: {exc}') from exc
+    if not values:
+        raise RuntimeError('Embedding failed across available Gemini keys/models')
+    return values
 
 
 def _ingest_conversation_object(
@@ -694,8 +675,8 @@ def _build_context(snippets: list[dict[str, Any]]) -> str:
 
 
 def _generate_answer(question: str, context: str) -> str:
-    api_keys = _get_gemini_api_keys()
-    if not api_keys:
+    gateway = get_gateway()
+    if not gateway.keys:
         raise RuntimeError('No Gemini API key found in GEMINI_API_KEYS/GEMINI_API_KEY')
 
     system_prompt = (
@@ -710,31 +691,21 @@ def _generate_answer(question: str, context: str) -> str:
         'Answer with concise, direct prose and include a short evidence note listing relevant chunk ids.'
     )
 
-    last_error: Exception | None = None
-    for api_key in api_keys:
-        client = genai.Client(api_key=api_key)
-        for model_name in DEFAULT_GENERATION_MODELS:
-            try:
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=prompt,
-                )
-                text = getattr(response, 'text', '') or ''
-                text_value = str(text).strip()
-                if text_value:
-                    return text_value
-            except Exception as exc:
-                last_error = exc
-                message = str(exc)
-                lowered = message.lower()
-                if 'not found' in lowered or 'not supported' in lowered:
-                    continue
-                if _is_key_or_quota_error(message):
-                    break
+    def generate(client, model_name):
+        response = client.models.generate_content(
+            model=model_name,
+            contents=prompt,
+        )
+        text = getattr(response, 'text', '') or ''
+        return str(text).strip()
 
-    if last_error:
-        raise RuntimeError(f'Generation failed across available Gemini keys/models: {last_error}') from last_error
-    raise RuntimeError('Generation failed across available Gemini keys/models')
+    try:
+        answer = gateway.call(lambda client: _first_success(client, DEFAULT_GENERATION_MODELS, generate), purpose='aeon_answer')
+    except Exception as exc:
+        raise RuntimeError(f'Generation failed across available Gemini keys/models: {exc}') from exc
+    if not answer:
+        raise RuntimeError('Generation failed across available Gemini keys/models')
+    return answer
 
 
 def query_aeon(question: str, top_k: int = 6) -> dict[str, Any]:
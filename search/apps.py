@@ -7,7 +7,7 @@ class SearchConfig(AppConfig):
     name = 'search'
     
     def ready(self):
-        """Start the translation worker when Django starts"""
+        """Start the translation worker and dashboard snapshot collector, and warm the search suggestion index, when Django starts"""
         # Only start worker in the main process, not in management commands
         # and not during migrations or other special operations
         if os.environ.get('RUN_MAIN') == 'true' or os.environ.get('GUNICORN_WORKER', False):
@@ -15,3 +15,9 @@ class SearchConfig(AppConfig):
             from search.translation_worker import ensure_worker_running
             ensure_worker_running()
             print("[APP] Translation worker auto-started")
+
+            from search.dashboard_snapshots import ensure_collector_running
+            ensure_collector_running()
+
+            from search.suggestion_index import warm_in_background
+            warm_in_background()
@@ -0,0 +1,476 @@
+"""
+Synthetic multi-schema fixture database for the benchmark suite.
+
+The production corpus lives in several Postgres schemas that ship without
+DDL (old_testament, new_testament, rbt_greek, smith_translation,
+joseph_aseneth, gospel_of_judas). seed_fixture_database() recreates them on a
+local database with the columns and indexes the views actually query, and
+fills them with deterministic pseudo-text sized like the real corpus:
+
+- one ot / nt row per verse of the 66-book canon (verse counts from pythonbible)
+- ~13 hebrewdata rows per OT verse and ~17 strongs_greek rows per NT verse,
+  with footnote links wired the same way the real HTML is
+- Strong's/BDB/Fuerst/Gesenius lexicon rows for H1..H8674
+- Genesis, Brenton LXX, LITV and Aeon chunks through the ORM
+
+Everything is driven by one seeded random.Random, so two runs with the same
+seed and scale produce byte-identical tables. The schemas are DROPPED and
+recreated; `manage.py bench_seed` refuses to run against a non-local host.
+"""
+
+import io
+import logging
+import random
+
+import pythonbible as bible
+from django.db import connection, transaction
+
+from translate.translator import book_abbreviations, nt_abbrev
+
+logger = logging.getLogger(__name__)
+
+SCHEMAS = (
+    'old_testament', 'new_testament', 'rbt_greek',
+    'smith_translation', 'joseph_aseneth', 'gospel_of_judas',
+)
+
+HEBREW_STRONGS = 8674
+GREEK_STRONGS = 5624
+HEBREW_WORDS_PER_VERSE = (6, 20)
+GREEK_WORDS_PER_VERSE = (8, 26)
+OT_FOOTNOTE_RATE = 0.08     # share of Hebrew words carrying a footnote
+NT_FOOTNOTE_RATE = 0.30     # share of NT verses with at least one footnote
+ASENETH_CHAPTERS = 29
+JUDAS_CODEX_PAGES = 26
+
+HEBREW_LETTERS = 'אבגדהוזחטיכלמנסעפצקרשת'
+HEBREW_FINALS = {'כ': 'ך', 'מ': 'ם', 'נ': 'ן', 'פ': 'ף', 'צ': 'ץ'}
+NIQQUD = '\u05b0\u05b4\u05b5\u05b6\u05b7\u05b8\u05b9\u05bb\u05bc'
+GREEK_LETTERS = 'αβγδεζηθικλμνξοπρστυφχψω'
+COPTIC_LETTERS = 'ⲁⲃⲅⲇⲉⲍⲏⲑⲓⲕⲗⲙⲛⲝⲟⲡⲣⲥⲧⲩⲫⲭⲯⲱ'
+ENGLISH_WORDS = (
+    'the', 'and', 'of', 'to', 'in', 'he', 'said', 'unto', 'land', 'house', 'son', 'king',
+    'light', 'darkness', 'water', 'earth', 'heavens', 'spirit', 'word', 'life', 'death',
+    'name', 'seed', 'fire', 'voice', 'hand', 'face', 'blood', 'bread', 'covenant', 'soul',
+    'mountain', 'sea', 'garden', 'tree', 'city', 'gate', 'way', 'day', 'night', 'glory',
+    'lamb', 'throne', 'temple', 'messenger', 'shepherd', 'bride', 'image', 'breath', 'dust',
+    'hearing', 'seeing', 'walking', 'becoming', 'calling', 'giving', 'making', 'dwelling',
+    'beginning', 'separating', 'gathering', 'forming', 'resting', 'sending', 'raising',
+    'faithful', 'holy', 'great', 'living', 'hidden', 'eternal', 'first', 'upper', 'beloved',
+)
+MORPH_CODES = ('HNcmsa', 'HVqp3ms', 'HR/Ncfsa', 'HC/Vqw3ms', 'HTd/Ncmpa', 'HNp', 'HAamsa', 'HVhi3ms')
+GREEK_MORPH = (
+    ('N-NSM', 'Noun, Nominative Singular Masculine'),
+    ('V-AAI-3S', 'Verb, Aorist Active Indicative, 3rd Singular'),
+    ('T-NSM', 'Article, Nominative Singular Masculine'),
+    ('P', 'Preposition'),
+    ('CONJ', 'Conjunction'),
+    ('A-GSF', 'Adjective, Genitive Singular Feminine'),
+    ('V-PAP-NSM', 'Verb, Present Active Participle, Nominative Singular Masculine'),
+)
+COLORS = ('', '', '', 'blue', 'green', 'purple')
+LEXICON_POS = ('noun masc.', 'noun fem.', 'verb', 'adj.', 'particle', 'proper name')
+
+DDL = [
+    'CREATE SCHEMA {schema}',
+    # -- old_testament --------------------------------------------------------
+    """CREATE TABLE old_testament.ot (
+        id SERIAL PRIMARY KEY, ref TEXT NOT NULL, book TEXT, chapter INTEGER, verse INTEGER,
+        html TEXT, hebrew TEXT, footnote TEXT, literal TEXT)""",
+    'CREATE UNIQUE INDEX ot_ref_idx ON old_testament.ot (ref)',
+    'CREATE INDEX ot_book_chapter_idx ON old_testament.ot (book, chapter)',
+    """CREATE TABLE old_testament.hebrewdata (
+        id SERIAL PRIMARY KEY, ref TEXT NOT NULL, eng TEXT,
+        heb1 TEXT, heb2 TEXT, heb3 TEXT, heb4 TEXT, heb5 TEXT, heb6 TEXT,
+        morph TEXT, uniq TEXT, strongs TEXT, color TEXT, html TEXT,
+        heb1_n TEXT, heb2_n TEXT, heb3_n TEXT, heb4_n TEXT, heb5_n TEXT, heb6_n TEXT,
+        combined_heb TEXT, combined_heb_niqqud TEXT, footnote TEXT, morphology TEXT, lxx TEXT)""",
+    'CREATE INDEX hebrewdata_ref_idx ON old_testament.hebrewdata (ref text_pattern_ops)',
+    'CREATE TABLE old_testament.ot_consonantal (ref TEXT PRIMARY KEY, hebrew TEXT)',
+    """CREATE TABLE old_testament.strongs_hebrew_dictionary (
+        strong_number TEXT PRIMARY KEY, lemma TEXT, xlit TEXT, derivation TEXT,
+        strongs_def TEXT, description TEXT)""",
+    'CREATE TABLE old_testament.bdb_lexicon (strongs_num INTEGER PRIMARY KEY, bdb_html TEXT)',
+    """CREATE TABLE old_testament.fuerst_lexicon (
+        id SERIAL PRIMARY KEY, hebrew_word TEXT, hebrew_consonantal TEXT, definition TEXT,
+        part_of_speech TEXT, root TEXT, source_page TEXT, strongs_numbers TEXT)""",
+    'CREATE INDEX fuerst_consonantal_idx ON old_testament.fuerst_lexicon (hebrew_consonantal)',
+    """CREATE TABLE old_testament.lexemes (
+        lexeme_id SERIAL PRIMARY KEY, lexeme TEXT, consonantal TEXT, strongs TEXT)""",
+    'CREATE INDEX lexemes_strongs_idx ON old_testament.lexemes (strongs)',
+    """CREATE TABLE old_testament.lexeme_fuerst (
+        lexeme_id INTEGER, fuerst_id INTEGER, confidence TEXT, mapping_basis TEXT, notes TEXT)""",
+    'CREATE INDEX lexeme_fuerst_lexeme_idx ON old_testament.lexeme_fuerst (lexeme_id)',
+    """CREATE TABLE old_testament.fuerst_strongs_map (
+        fuerst_id INTEGER, strongs_id TEXT, method TEXT, score REAL)""",
+    """CREATE TABLE old_testament.gesenius_lexicon (
+        id SERIAL PRIMARY KEY, "hebrewWord" TEXT, "hebrewConsonantal" TEXT, transliteration TEXT,
+        "partOfSpeech" TEXT, definition TEXT, root TEXT, "sourcePage" TEXT, "sourceUrl" TEXT,
+        "strongsNumbers" TEXT)""",
+    """CREATE TABLE old_testament.manual_lexicon_mappings (
+        mapping_id SERIAL PRIMARY KEY, hebrew_word TEXT, hebrew_consonantal TEXT,
+        strong_number TEXT, lexicon_type TEXT, fuerst_id INTEGER, gesenius_id INTEGER,
+        book TEXT, chapter INTEGER, verse INTEGER, notes TEXT, updated_at TIMESTAMP)""",
+    # -- new_testament (per-book footnote tables are created in _seed_nt_book) 
+    """CREATE TABLE new_testament.nt (
+        nt_id SERIAL PRIMARY KEY, book TEXT, chapter INTEGER, startverse INTEGER,
+        verseid TEXT, versetext TEXT, rbt TEXT)""",
+    'CREATE INDEX nt_book_chapter_verse_idx ON new_testament.nt (book, chapter, startverse)',
+    # -- rbt_greek ------------------------------------------------------------
+    """CREATE TABLE rbt_greek.strongs_greek (
+        id SERIAL PRIMARY KEY, verse TEXT, strongs TEXT, translit TEXT, lemma TEXT,
+        english TEXT, morph TEXT, morph_desc TEXT)""",
+    'CREATE INDEX strongs_greek_verse_idx ON rbt_greek.strongs_greek (verse text_pattern_ops)',
+    # -- storehouse texts -----------------------------------------------------
+    """CREATE TABLE smith_translation.verses (
+        book TEXT, chapter INTEGER, verse INTEGER, content TEXT)""",
+    'CREATE INDEX smith_verses_idx ON smith_translation.verses (book, chapter, verse)',
+    """CREATE TABLE joseph_aseneth.aseneth (
+        chapter INTEGER, verse INTEGER, english TEXT, greek TEXT)""",
+    """CREATE TABLE gospel_of_judas.judas_prose (
+        id SERIAL PRIMARY KEY, codex TEXT, scene_title TEXT, content TEXT)""",
+    """CREATE TABLE gospel_of_judas.judas_interlinear (
+        id SERIAL PRIMARY KEY, codex TEXT, line_num INTEGER, coptic TEXT, greek TEXT,
+        english TEXT, notes TEXT)""",
+    'CREATE TABLE gospel_of_judas.judas_commentary (id SERIAL PRIMARY KEY, content TEXT)',
+]
+
+
+def canon():
+    """[(title, abbrev, testament, [verses per chapter], slt_book, book_number), ...] for the 66 books."""
+    books = []
+    for index, book in enumerate(list(bible.Book)[:66]):
+        title = 'Song of Solomon' if book.title == 'Song of Songs' else book.title
+        abbrev = book_abbreviations[title]
+        chapters = [
+            bible.get_number_of_verses(book, chapter)
+            for chapter in range(1, bible.get_number_of_chapters(book) + 1)
+        ]
+        testament = 'NT' if abbrev in nt_abbrev else 'OT'
+        books.append((title, abbrev, testament, chapters, book.name.title(), index + 1))
+    return books
+
+
+def nt_footnote_table(abbrev):
+    table_abbrev = abbrev.lower()
+    return f'table_{table_abbrev}_footnotes' if table_abbrev[0].isdigit() else f'{table_abbrev}_footnotes'
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def _copy(cursor, table, columns, rows):
+    """Bulk load rows with COPY FROM STDIN; returns the row count."""
+    buf = io.StringIO()
+    count = 0
+    for row in rows:
+        buf.write('\t'.join(_copy_value(value) for value in row))
+        buf.write('\n')
+        count += 1
+    if count:
+        buf.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+    return count
+
+
+class TextFactory:
+    """Deterministic pseudo-text in the scripts the corpus uses."""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def english(self, low, high):
+        return ' '.join(self.rng.choice(ENGLISH_WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def consonantal(self, low=2, high=4):
+        letters = [self.rng.choice(HEBREW_LETTERS) for _ in range(self.rng.randint(low, high))]
+        letters[-1] = HEBREW_FINALS.get(letters[-1], letters[-1])
+        return ''.join(letters)
+
+    def pointed(self, consonantal):
+        return ''.join(letter + self.rng.choice(NIQQUD) for letter in consonantal)
+
+    def greek(self, low=3, high=9):
+        word = ''.join(self.rng.choice(GREEK_LETTERS) for _ in range(self.rng.randint(low, high)))
+        return word[:-1] + 'ς' if word.endswith('σ') else word
+
+    def greek_text(self, low, high):
+        return ' '.join(self.greek() for _ in range(self.rng.randint(low, high)))
+
+    def coptic_text(self, low, high):
+        return ' '.join(
+            ''.join(self.rng.choice(COPTIC_LETTERS) for _ in range(self.rng.randint(3, 8)))
+            for _ in range(self.rng.randint(low, high))
+        )
+
+
+def _create_schemas(cursor):
+    for schema in SCHEMAS:
+        cursor.execute(f'DROP SCHEMA IF EXISTS {schema} CASCADE')
+        cursor.execute(DDL[0].format(schema=schema))
+    for statement in DDL[1:]:
+        cursor.execute(statement)
+
+
+def _hebrew_word_row(text, ref, strong, footnote):
+    consonantal = text.consonantal()
+    pointed = text.pointed(consonantal)
+    prefix = text.rng.random() < 0.35
+    heb1 = text.pointed(text.rng.choice('ובלהמ')) if prefix else ''
+    strongs = f'H9003/H{strong:04d}' if prefix else f'H{strong:04d}'
+    morph = text.rng.choice(MORPH_CODES)
+    return (
+        ref, text.english(1, 3),
+        heb1, '', pointed, '', '', '',
+        morph, '', strongs, text.rng.choice(COLORS), None,
+        heb1, '', consonantal, '', '', '',
+        (heb1 + consonantal).replace('\u05bc', ''), heb1 + pointed, footnote, morph,
+        text.greek() if text.rng.random() < 0.25 else None,
+    )
+
+
+HEBREWDATA_COLUMNS = (
+    'ref', 'eng', 'heb1', 'heb2', 'heb3', 'heb4', 'heb5', 'heb6', 'morph', 'uniq', 'strongs',
+    'color', 'html', 'heb1_n', 'heb2_n', 'heb3_n', 'heb4_n', 'heb5_n', 'heb6_n',
+    'combined_heb', 'combined_heb_niqqud', 'footnote', 'morphology', 'lxx',
+)
+
+
+def _seed_ot_book(cursor, text, abbrev, chapters, scale):
+    """hebrewdata, ot and ot_consonantal rows for one OT book. Returns (verses, words, genesis_rows)."""
+    hebrewdata, ot_rows, consonantal_rows, genesis_rows = [], [], [], []
+    low, high = HEBREW_WORDS_PER_VERSE
+    for chapter, verse_count in enumerate(chapters, start=1):
+        for verse in range(1, verse_count + 1):
+            ref = f'{abbrev}.{chapter}.{verse}'
+            words, paraphrase, footnote_links = [], [], []
+            for position in range(1, max(1, round(text.rng.randint(low, high) * scale)) + 1):
+                word_ref = f'{ref}-{position:02d}'
+                footnote = None
+                if text.rng.random() < OT_FOOTNOTE_RATE:
+                    footnote = f'<p>{text.english(12, 40)}</p>'
+                    footnote_links.append(f'{abbrev}-{chapter}-{verse}-{position:02d}')
+                row = _hebrew_word_row(text, word_ref, text.rng.randint(1, HEBREW_STRONGS), footnote)
+                words.append(row)
+                paraphrase.append(row[1])
+            links = ''.join(
+                f'<sup><a class="footnote" href="?footnote={link}">{n}</a></sup>'
+                for n, link in enumerate(footnote_links, start=1)
+            )
+            html = f'<p>{" ".join(paraphrase)}{links}</p>'
+            # The verse HTML rides on the first word row (chapter reader queries).
+            words[0] = words[0][:12] + (html,) + words[0][13:]
+            hebrew = ' '.join(row[20] for row in words)
+            hebrewdata.extend(words)
+            ot_rows.append((ref, abbrev, chapter, verse, html, hebrew, None, ' '.join(paraphrase)))
+            consonantal_rows.append((ref, ' '.join(row[19] for row in words)))
+            if abbrev == 'Gen':
+                genesis_rows.append((chapter, verse, ' '.join(paraphrase), hebrew))
+    _copy(cursor, 'old_testament.hebrewdata', HEBREWDATA_COLUMNS, hebrewdata)
+    _copy(cursor, 'old_testament.ot', ('ref', 'book', 'chapter', 'verse', 'html', 'hebrew', 'footnote', 'literal'), ot_rows)
+    _copy(cursor, 'old_testament.ot_consonantal', ('ref', 'hebrew'), consonantal_rows)
+    return len(ot_rows), len(hebrewdata), genesis_rows
+
+
+def _seed_nt_book(cursor, text, abbrev, chapters, book_number, scale):
+    """nt, per-book footnote table and strongs_greek rows for one NT book. Returns (verses, words)."""
+    footnote_table = f'new_testament.{nt_footnote_table(abbrev)}'
+    cursor.execute(
+        f'CREATE TABLE {footnote_table} (id SERIAL PRIMARY KEY, footnote_id TEXT UNIQUE, footnote_html TEXT, vrs TEXT)'
+    )
+    nt_rows, footnotes, greek_rows = [], [], []
+    footnote_number = 0
+    low, high = GREEK_WORDS_PER_VERSE
+    for chapter, verse_count in enumerate(chapters, start=1):
+        for verse in range(1, verse_count + 1):
+            words = []
+            for position in range(1, max(1, round(text.rng.randint(low, high) * scale)) + 1):
+                morph, morph_desc = text.rng.choice(GREEK_MORPH)
+                lemma = text.greek()
+                words.append((
+                    f'{abbrev}.{chapter}.{verse}-{position:02d}',
+                    f'G{text.rng.randint(1, GREEK_STRONGS)}',
+                    lemma, lemma, text.english(1, 3), morph, morph_desc,
+                ))
+            links = ''
+            if text.rng.random() < NT_FOOTNOTE_RATE:
+                for _ in range(text.rng.randint(1, 2)):
+                    footnote_number += 1
+                    footnotes.append((f'{abbrev}-{footnote_number}', f'<p>{text.english(15, 60)}</p>', f'{chapter}:{verse}'))
+                    links += (
+                        f'<sup><a class="footnote" href="?footnote={chapter}-{verse}-{footnote_number}">'
+                        f'{footnote_number}</a></sup>'
+                    )
+            greek_rows.extend(words)
+            nt_rows.append((
+                abbrev, chapter, verse, f'{book_number:02d}{chapter:03d}{verse:03d}',
+                ' '.join(word[2] for word in words),
+                f'<p>{" ".join(word[4] for word in words)}{links}</p>',
+            ))
+    _copy(cursor, 'new_testament.nt', ('book', 'chapter', 'startverse', 'verseid', 'versetext', 'rbt'), nt_rows)
+    _copy(cursor, footnote_table, ('footnote_id', 'footnote_html', 'vrs'), footnotes)
+    _copy(
+        cursor, 'rbt_greek.strongs_greek',
+        ('verse', 'strongs', 'translit', 'lemma', 'english', 'morph', 'morph_desc'), greek_rows,
+    )
+    return len(nt_rows), len(greek_rows)
+
+
+def _seed_lexicons(cursor, text):
+    """Strong's, BDB, Fuerst, Gesenius and lexeme tables keyed by H1..H8674."""
+    strongs, bdb, fuerst, lexemes, lexeme_fuerst, fuerst_map, gesenius = [], [], [], [], [], [], []
+    for number in range(1, HEBREW_STRONGS + 1):
+        consonantal = text.consonantal()
+        pointed = text.pointed(consonantal)
+        definition = text.english(4, 20)
+        pos = text.rng.choice(LEXICON_POS)
+        strongs.append((f'H{number}', pointed, text.english(1, 1), f'from H{text.rng.randint(1, HEBREW_STRONGS)}', definition, text.english(10, 30)))
+        bdb.append((number, f'<div class="bdb"><b>{pointed}</b> {text.english(20, 80)}</div>'))
+        fuerst.append((pointed, consonantal, definition, pos, consonantal[:3], str(text.rng.randint(1, 1500)), f'H{number}'))
+        lexemes.append((pointed, consonantal, f'H{number}'))
+        lexeme_fuerst.append((number, number, text.rng.choice(('high', 'medium', 'low')), 'consonantal', None))
+        fuerst_map.append((number, f'H{number}', 'auto', round(text.rng.random(), 3)))
+        gesenius.append((pointed, consonantal, text.english(1, 1), pos, definition, consonantal[:3], str(text.rng.randint(1, 900)), '', f'H{number}'))
+    _copy(cursor, 'old_testament.strongs_hebrew_dictionary', ('strong_number', 'lemma', 'xlit', 'derivation', 'strongs_def', 'description'), strongs)
+    _copy(cursor, 'old_testament.bdb_lexicon', ('strongs_num', 'bdb_html'), bdb)
+    _copy(cursor, 'old_testament.fuerst_lexicon', ('hebrew_word', 'hebrew_consonantal', 'definition', 'part_of_speech', 'root', 'source_page', 'strongs_numbers'), fuerst)
+    _copy(cursor, 'old_testament.lexemes', ('lexeme', 'consonantal', 'strongs'), lexemes)
+    _copy(cursor, 'old_testament.lexeme_fuerst', ('lexeme_id', 'fuerst_id', 'confidence', 'mapping_basis', 'notes'), lexeme_fuerst)
+    _copy(cursor, 'old_testament.fuerst_strongs_map', ('fuerst_id', 'strongs_id', 'method', 'score'), fuerst_map)
+    _copy(
+        cursor, 'old_testament.gesenius_lexicon',
+        ('"hebrewWord"', '"hebrewConsonantal"', 'transliteration', '"partOfSpeech"', 'definition', 'root', '"sourcePage"', '"sourceUrl"', '"strongsNumbers"'),
+        gesenius,
+    )
+    return len(strongs)
+
+
+def _seed_storehouse(cursor, text, books):
+    slt = [
+        (slt_book, chapter, verse, text.english(8, 30))
+        for _title, _abbrev, _testament, chapters, slt_book, _number in books
+        for chapter, verse_count in enumerate(chapters, start=1)
+        for verse in range(1, verse_count + 1)
+    ]
+    _copy(cursor, 'smith_translation.verses', ('book', 'chapter', 'verse', 'content'), slt)
+
+    aseneth = [
+        (chapter, verse, text.english(10, 35), text.greek_text(8, 25))
+        for chapter in range(1, ASENETH_CHAPTERS + 1)
+        for verse in range(1, text.rng.randint(12, 30) + 1)
+    ]
+    _copy(cursor, 'joseph_aseneth.aseneth', ('chapter', 'verse', 'english', 'greek'), aseneth)
+
+    prose, interlinear = [], []
+    for page in range(33, 33 + JUDAS_CODEX_PAGES):
+        prose.append((str(page), text.english(2, 5).title(), text.english(120, 260)))
+        for line in range(1, text.rng.randint(20, 28) + 1):
+            interlinear.append((str(page), line, text.coptic_text(3, 7), text.greek_text(0, 2), text.english(4, 10), text.english(0, 8) or None))
+    _copy(cursor, 'gospel_of_judas.judas_prose', ('codex', 'scene_title', 'content'), prose)
+    _copy(cursor, 'gospel_of_judas.judas_interlinear', ('codex', 'line_num', 'coptic', 'greek', 'english', 'notes'), interlinear)
+    _copy(cursor, 'gospel_of_judas.judas_commentary', ('content',), [(text.english(200, 400),) for _ in range(12)])
+    return len(slt), len(aseneth), len(interlinear)
+
+
+def _seed_django_tables(text, books, genesis_rows, aeon_chunks, aeon_dim):
+    """Genesis, englxxup, litv and Aeon corpus rows through the ORM."""
+    from search.models import (
+        AeonChunk, AeonCorpusSource, EngLXX, Genesis, GenesisFootnotes, LITV,
+    )
+
+    Genesis.objects.all().delete()
+    GenesisFootnotes.objects.all().delete()
+    genesis, genesis_notes = [], []
+    for chapter, verse, paraphrase, hebrew in genesis_rows:
+        note_ids = []
+        if text.rng.random() < NT_FOOTNOTE_RATE:
+            for _ in range(text.rng.randint(1, 3)):
+                note_id = f'{chapter}-{verse}-{len(genesis_notes) + 1}'
+                note_ids.append(note_id)
+                note_html = f'<p>{text.english(15, 60)}</p>'
+                genesis_notes.append(GenesisFootnotes(footnote_id=note_id, footnote_html=note_html, original_footnotes_html=note_html))
+        links = ''.join(f'<sup><a href="?footnote={note_id}">{note_id.split("-")[-1]}</a></sup>' for note_id in note_ids)
+        html = f'<p>{paraphrase}{links}</p>'
+        genesis.append(Genesis(chapter=chapter, verse=verse, html=html, text=paraphrase, hebrew=hebrew, rbt_reader=html))
+    Genesis.objects.bulk_create(genesis, batch_size=2000)
+    GenesisFootnotes.objects.bulk_create(genesis_notes, batch_size=2000)
+
+    EngLXX.objects.all().delete()
+    LITV.objects.all().delete()
+    lxx, litv = [], []
+    for title, abbrev, testament, chapters, _slt_book, number in books:
+        for chapter, verse_count in enumerate(chapters, start=1):
+            for verse in range(1, verse_count + 1):
+                litv.append(LITV(book=title, chapter=str(chapter), verse=str(verse), text=text.english(8, 30)))
+                if testament == 'OT':
+                    lxx.append(EngLXX(
+                        verseID=f'{abbrev.upper()}{chapter}_{verse}', canon_order=str(number), book=abbrev.upper(),
+                        chapter=str(chapter), startVerse=str(verse), endVerse=str(verse), verseText=text.english(8, 30),
+                    ))
+    EngLXX.objects.bulk_create(lxx, batch_size=5000)
+    LITV.objects.bulk_create(litv, batch_size=5000)
+
+    AeonCorpusSource.objects.filter(source_identifier__startswith='bench-').delete()
+    chunks = []
+    per_source = 250
+    for source_index in range(max(1, -(-aeon_chunks // per_source))):
+        source = AeonCorpusSource.objects.create(
+            source_type='conversation', source_identifier=f'bench-{source_index}',
+            title=f'Benchmark corpus {source_index}', status='ready',
+        )
+        for chunk_index in range(min(per_source, aeon_chunks - source_index * per_source)):
+            body = text.english(120, 300)
+            chunks.append(AeonChunk(
+                source=source, chunk_index=chunk_index, role_mix='user+assistant', text=body,
+                text_hash=f'{source_index:04d}{chunk_index:060d}',
+                embedding=[round(text.rng.uniform(-1, 1), 6) for _ in range(aeon_dim)],
+            ))
+    AeonChunk.objects.bulk_create(chunks, batch_size=200)
+    return len(genesis), len(litv), len(chunks)
+
+
+def seed_fixture_database(scale=1.0, seed=1611, books=None, aeon_chunks=1500, aeon_dim=3072, log=None):
+    """
+    Drop and recreate the corpus schemas and fill them with synthetic rows.
+
+    `books` optionally limits the canon to those titles (e.g. ['Genesis', 'John']).
+    Returns a dict of row counts per table family.
+    """
+    log = log or logger.info
+    rng = random.Random(seed)
+    text = TextFactory(rng)
+    selected = [book for book in canon() if not books or book[0] in books]
+    counts = {'ot_verses': 0, 'hebrewdata': 0, 'nt_verses': 0, 'strongs_greek': 0}
+    genesis_rows = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        _create_schemas(cursor)
+        for title, abbrev, testament, chapters, _slt_book, number in selected:
+            if testament == 'OT':
+                verses, words, book_genesis = _seed_ot_book(cursor, text, abbrev, chapters, scale)
+                genesis_rows.extend(book_genesis)
+                counts['ot_verses'] += verses
+                counts['hebrewdata'] += words
+            else:
+                verses, words = _seed_nt_book(cursor, text, abbrev, chapters, number, scale)
+                counts['nt_verses'] += verses
+                counts['strongs_greek'] += words
+            log(f'{title}: {verses} verses, {words} words')
+        counts['lexicon_entries'] = _seed_lexicons(cursor, text)
+        counts['smith_verses'], counts['aseneth_verses'], counts['judas_lines'] = _seed_storehouse(cursor, text, selected)
+        counts['genesis_verses'], counts['litv_verses'], counts['aeon_chunks'] = _seed_django_tables(
+            text, selected, genesis_rows, aeon_chunks, aeon_dim,
+        )
+        for schema in SCHEMAS:
+            cursor.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema = %s", [schema]
+            )
+            for (table,) in cursor.fetchall():
+                cursor.execute(f'ANALYZE {schema}.{table}')
+    return counts
@@ -0,0 +1,278 @@
+"""
+Hot-path benchmarks, meant to run against the synthetic fixture database
+(search.bench_fixtures / `manage.py bench_seed`).
+
+Each BenchCase wraps one call into a path that serves most traffic:
+get_results (verse and chapter, cold and warm result cache),
+build_heb_interlinear, search_api per scope, query_aeon retrieval and the
+chapter handlers. run_case() times it after a few untimed warmup calls and
+counts SQL through the same QueryStats wrapper QueryInstrumentationMiddleware
+uses; the report is plain JSON so it can be saved as a baseline and diffed by
+compare_reports() (`manage.py bench_run --compare baseline.json`).
+"""
+
+import contextlib
+import hashlib
+import io
+import math
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from hebrewtool.middleware import QueryStats
+
+# (book, chapter, verse) samples: Genesis goes through the ORM, the others
+# through the old_testament / new_testament schemas.
+VERSE_SAMPLES = (('Genesis', 1, 1), ('Isaiah', 53, 5), ('John', 3, 16))
+CHAPTER_SAMPLES = (('Genesis', 1), ('Psalms', 119), ('Matthew', 5))
+SEARCH_SCOPES = (
+    ('all', 'light'),
+    ('ot', 'covenant'),
+    ('nt', 'shepherd'),
+    ('hebrew', 'אור'),
+    ('greek', 'λογος'),
+    ('footnotes', 'darkness'),
+    ('storehouse', 'glory'),
+)
+AEON_QUESTIONS = ('What is the hidden name?', 'Where does the living water come from?')
+
+LATENCY_METRICS = ('p50_ms', 'p90_ms')
+
+
+@dataclass
+class BenchCase:
+    name: str
+    group: str
+    func: Callable[[], Any]
+    setup: Callable[[], Any] | None = None  # runs before every call, untimed
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return sorted_values[low]
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarise(timings_ms, query_counts, db_ms):
+    ordered = sorted(timings_ms)
+    return {
+        'iterations': len(ordered),
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p90_ms': round(percentile(ordered, 90), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'min_ms': round(ordered[0], 3),
+        'max_ms': round(ordered[-1], 3),
+        'queries_p50': statistics.median(query_counts),
+        'queries_max': max(query_counts),
+        'db_p50_ms': round(statistics.median(db_ms), 3),
+    }
+
+
+def run_case(case, iterations=20, warmup=2):
+    """Time `iterations` calls of case.func and return its summary dict."""
+    timings, queries, db_ms = [], [], []
+    # The views print progress lines; keep them out of the report but inside the timing.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            if case.setup:
+                case.setup()
+            case.func()
+        for _ in range(iterations):
+            if case.setup:
+                case.setup()
+            stats = QueryStats()
+            with connection.execute_wrapper(stats):
+                started = time.perf_counter()
+                case.func()
+                elapsed = time.perf_counter() - started
+            timings.append(elapsed * 1000)
+            queries.append(stats.count)
+            db_ms.append(stats.duration * 1000)
+    return summarise(timings, queries, db_ms)
+
+
+def compare_reports(current, baseline, threshold=0.20, min_delta_ms=1.0):
+    """
+    Regressions of `current` against `baseline` (both run reports).
+
+    A latency metric regresses when it is more than `threshold` slower and at
+    least `min_delta_ms` slower in absolute terms; any increase in the median
+    query count is a regression. Returns [{'case', 'metric', 'baseline', 'current'}, ...].
+    """
+    regressions = []
+    for name, result in current.get('cases', {}).items():
+        previous = baseline.get('cases', {}).get(name)
+        if not previous:
+            continue
+        for metric in LATENCY_METRICS:
+            before, after = previous.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if after - before >= min_delta_ms and after > before * (1 + threshold):
+                regressions.append({'case': name, 'metric': metric, 'baseline': before, 'current': after})
+        before, after = previous.get('queries_p50'), result.get('queries_p50')
+        if before is not None and after is not None and after > before:
+            regressions.append({'case': name, 'metric': 'queries_p50', 'baseline': before, 'current': after})
+    return regressions
+
+
+def _request(path, params=None):
+    request = RequestFactory().get(path, params or {})
+    request.user = AnonymousUser()
+    request.session = {}
+    return request
+
+
+def _results_cache_key(book, chapter, verse, language='en'):
+    from search.views.chapter_views_part1 import INTERLINEAR_CACHE_VERSION
+
+    sanitized_book = book.replace(':', '_').replace(' ', '')
+    return f'{sanitized_book}_{chapter}_{verse}_{language}_{INTERLINEAR_CACHE_VERSION}'
+
+
+def _cold_results(book, chapter, verse):
+    """Drop the get_results cache entry and the translator's in-process lexicon memos."""
+    from search.db_utils import safe_cache_delete
+    from translate import translator
+
+    def reset():
+        safe_cache_delete(_results_cache_key(book, chapter, verse))
+        for value in vars(translator).values():
+            if callable(getattr(value, 'cache_clear', None)):
+                value.cache_clear()
+    return reset
+
+
+def get_results_cases():
+    from search.views.chapter_views_part1 import get_results
+
+    cases = []
+    samples = [(book, chapter, verse, 'verse') for book, chapter, verse in VERSE_SAMPLES]
+    samples += [(book, chapter, None, 'chapter') for book, chapter in CHAPTER_SAMPLES]
+    for book, chapter, verse, kind in samples:
+        label = f'{book} {chapter}' + (f':{verse}' if verse else '')
+        call = (lambda b=book, c=chapter, v=verse: get_results(b, c, v, 'en'))
+        cases.append(BenchCase(f'get_results {kind} cold [{label}]', 'get_results', call, _cold_results(book, chapter, verse)))
+        cases.append(BenchCase(f'get_results {kind} warm [{label}]', 'get_results', call))
+    return cases
+
+
+def interlinear_cases():
+    from search.db_utils import execute_query
+    from translate.translator import book_abbreviations, build_heb_interlinear, nt_abbrev
+
+    cases = []
+    for book, chapter, verse in VERSE_SAMPLES:
+        if book_abbreviations[book] in nt_abbrev:
+            continue
+        rows = execute_query(
+            """
+            SELECT id, Ref, Eng, Heb1, Heb2, Heb3, Heb4, Heb5, Heb6, Morph, uniq, Strongs, color, html,
+                   heb1_n, heb2_n, heb3_n, heb4_n, heb5_n, heb6_n, combined_heb, combined_heb_niqqud,
+                   footnote, morphology, lxx
+            FROM old_testament.hebrewdata WHERE ref LIKE %s ORDER BY ref
+            """,
+            (f'{book_abbreviations[book]}.{chapter}.{verse}-%',),
+            fetch='all',
+        )
+        cases.append(BenchCase(
+            f'build_heb_interlinear [{book} {chapter}:{verse}]', 'interlinear',
+            lambda r=rows: build_heb_interlinear(r),
+        ))
+    return cases
+
+
+def search_cases():
+    from search.views.search_views import search_api
+
+    return [
+        BenchCase(
+            f'search_api [{scope}: {query}]', 'search',
+            lambda s=scope, q=query: search_api(_request('/live/', {'q': q, 'scope': s})),
+        )
+        for scope, query in SEARCH_SCOPES
+    ]
+
+
+def _stub_embedding(dim):
+    def embed(text, task_type):
+        rng = random.Random(hashlib.sha256(text.encode('utf-8')).digest())
+        return [rng.uniform(-1, 1) for _ in range(dim)]
+    return embed
+
+
+def aeon_cases():
+    """query_aeon with the Gemini embedding/answer calls replaced, so only retrieval is timed."""
+    from search import aeon_service
+    from search.models import AeonChunk
+
+    sample = AeonChunk.objects.filter(source__status='ready').values_list('embedding', flat=True).first()
+    if not isinstance(sample, list):
+        return []
+
+    def query(question):
+        with mock.patch.object(aeon_service, '_embed_text', _stub_embedding(len(sample))), \
+                mock.patch.object(aeon_service, '_generate_answer', lambda question, context: ''):
+            return aeon_service.query_aeon(question)
+
+    return [
+        BenchCase(f'query_aeon retrieval [{question}]', 'aeon', lambda q=question: query(q))
+        for question in AEON_QUESTIONS
+    ]
+
+
+def chapter_handler_cases():
+    """Chapter handlers on warm get_results output (the render half of a chapter page)."""
+    from search.views.chapter_handlers import handle_genesis_chapter, handle_nt_chapter, handle_ot_chapter
+    from search.views.chapter_views_part1 import get_results
+    from translate.translator import new_testament_books
+
+    cases = []
+    for book, chapter in CHAPTER_SAMPLES:
+        if book == 'Genesis':
+            handler = handle_genesis_chapter
+        elif book in new_testament_books:
+            handler = handle_nt_chapter
+        else:
+            handler = handle_ot_chapter
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = get_results(book, chapter, None, 'en')
+        cases.append(BenchCase(
+            f'{handler.__name__} [{book} {chapter}]', 'chapter',
+            lambda h=handler, b=book, c=chapter, r=results: h(
+                _request('/', {'book': b, 'chapter': c}), b, c, r, 'en', b,
+            ),
+        ))
+    return cases
+
+
+CASE_GROUPS = {
+    'get_results': get_results_cases,
+    'interlinear': interlinear_cases,
+    'search': search_cases,
+    'aeon': aeon_cases,
+    'chapter': chapter_handler_cases,
+}
+
+
+def build_cases(groups=None):
+    cases = []
+    for group, factory in CASE_GROUPS.items():
+        if groups and group not in groups:
+            continue
+        cases.extend(factory())
+    return cases
@@ -0,0 +1,230 @@
+"""
+Per-chapter translation progress for the "recently completed chapters" widget.
+
+_get_recently_completed_chapters used to load every TranslationUpdates row,
+parse each reference in Python and GROUP BY the whole NT/OT verse tables.
+Two small tables now hold that state and are updated on every editor save
+(translate.views._safe_save_update -> record_chapter_progress):
+- chapter_verse_first_saves: first audit-log date per (book, chapter, verse)
+- chapter_progress: total/filled/audited verse counts and completion date per
+  chapter
+
+A chapter's completion date is the first-save date of its highest-numbered
+audited verse, and it is only set once every verse in the chapter is filled.
+rebuild_chapter_progress() recomputes everything from scratch
+(`manage.py rebuild_chapter_progress`).
+"""
+
+import logging
+import re
+
+from django.db import connection, transaction
+
+from translate.translator import book_abbreviations, nt_abbrev
+
+logger = logging.getLogger(__name__)
+
+NT_COUNTS_SQL = """SELECT book, chapter, COUNT(*) AS total,
+                          COUNT(CASE WHEN rbt IS NOT NULL AND TRIM(rbt) != '' THEN 1 END) AS filled
+                   FROM new_testament.nt {where} GROUP BY book, chapter"""
+OT_COUNTS_SQL = """SELECT book, chapter, COUNT(*) AS total,
+                          COUNT(CASE WHEN html IS NOT NULL AND TRIM(html) != '' THEN 1 END) AS filled
+                   FROM old_testament.ot {where} GROUP BY book, chapter"""
+
+# Minimum share of verses with an audit record before a chapter is shown. OT
+# is lower because the [] bulk-edit bug lost some OT references.
+AUDIT_COVERAGE = {'NT': 0.50, 'OT': 0.30}
+
+
+def _naive(dt):
+    """Strip timezone so naive/aware comparisons don't raise."""
+    if hasattr(dt, 'tzinfo') and dt.tzinfo is not None:
+        return dt.replace(tzinfo=None)
+    return dt
+
+
+def parse_ref_to_chapter(ref_str):
+    """Parse a reference string to (book_abbreviation, chapter_number) or None."""
+    ref_str = re.sub(r'\s*-\s*\S+$', '', ref_str.strip())
+    # Dot format: 'Job.1.21', '1Ki.18.16', 'Act.16.3'
+    dot_match = re.match(r'^([A-Za-z0-9]+)\.(\d+)\.', ref_str)
+    if dot_match:
+        return dot_match.group(1), int(dot_match.group(2))
+    # Space:colon format: 'Acts 16:3', '1 John 1:5', 'Genesis 10:22'
+    space_match = re.match(r'^(.+?)\s+(\d+):', ref_str)
+    if space_match:
+        book_name = space_match.group(1).strip()
+        chapter = int(space_match.group(2))
+        abbrev = book_abbreviations.get(book_name, book_name)
+        return abbrev, chapter
+    return None
+
+
+def parse_ref_verse_num(ref_str):
+    """Extract the verse number from a reference string, or None."""
+    ref_str = re.sub(r'\s*-\s*\S+$', '', ref_str.strip())
+    dot_match = re.match(r'^[A-Za-z0-9]+\.\d+\.(\d+)', ref_str)
+    if dot_match:
+        return int(dot_match.group(1))
+    space_match = re.match(r'^.+?\s+\d+:(\d+)', ref_str)
+    if space_match:
+        return int(space_match.group(1))
+    return None
+
+
+def testament_for(book_abbrev):
+    return 'NT' if book_abbrev in nt_abbrev else 'OT'
+
+
+def _chapter_counts(book_abbrev, chapter):
+    """(total, filled) verse counts for a single chapter from its testament table."""
+    sql = NT_COUNTS_SQL if testament_for(book_abbrev) == 'NT' else OT_COUNTS_SQL
+    # Plain cursor rather than execute_query, which commits: this runs inside
+    # record_chapter_progress's transaction
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(where='WHERE book = %s AND chapter = %s'), [book_abbrev, chapter])
+        row = cursor.fetchone()
+    if not row:
+        return 0, 0
+    return int(row[2]), int(row[3])
+
+
+def _refresh_chapter(book_abbrev, chapter, total, filled):
+    """Recompute audited count and completion date for one chapter and store it."""
+    from search.models import ChapterProgress, ChapterVerseFirstSave
+
+    first_saves = ChapterVerseFirstSave.objects.filter(book=book_abbrev, chapter=chapter)
+    audited = first_saves.count()
+    completed_at = None
+    if total and filled >= total and audited:
+        # Chapters are worked sequentially, so completion is the first save of
+        # the highest-numbered audited verse (later spot-edits to early verses
+        # must not move it forward).
+        completed_at = first_saves.order_by('-verse').values_list('first_saved', flat=True).first()
+
+    ChapterProgress.objects.update_or_create(
+        book=book_abbrev,
+        chapter=chapter,
+        defaults={
+            'testament': testament_for(book_abbrev),
+            'total_verses': total,
+            'filled_verses': filled,
+            'audited_verses': audited,
+            'completed_at': _naive(completed_at) if completed_at else None,
+        },
+    )
+
+
+def record_chapter_progress(instance):
+    """Update first-save and chapter progress rows for one saved TranslationUpdates row."""
+    reference = instance.reference or ''
+    if reference == '[]' or instance.date is None:
+        return
+    parsed = parse_ref_to_chapter(reference)
+    verse = parse_ref_verse_num(reference)
+    if not parsed or verse is None:
+        return
+    book_abbrev, chapter = parsed
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO chapter_verse_first_saves (book, chapter, verse, first_saved)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (book, chapter, verse) DO UPDATE SET first_saved = CASE
+                    WHEN EXCLUDED.first_saved < chapter_verse_first_saves.first_saved
+                    THEN EXCLUDED.first_saved ELSE chapter_verse_first_saves.first_saved END
+                """,
+                [book_abbrev, chapter, verse, _naive(instance.date)],
+            )
+        total, filled = _chapter_counts(book_abbrev, chapter)
+        _refresh_chapter(book_abbrev, chapter, total, filled)
+
+
+def rebuild_chapter_progress(TranslationUpdates=None, ChapterProgress=None, ChapterVerseFirstSave=None):
+    """
+    Recompute both tables from translation_updates and the NT/OT verse tables.
+
+    Model classes can be passed in so migrations can use historical models.
+    Returns the number of chapter rows written.
+    """
+    if TranslationUpdates is None:
+        from search.models import ChapterProgress, ChapterVerseFirstSave, TranslationUpdates
+
+    verse_first_save = {}   # (abbrev, chapter, verse) -> earliest date
+    entries = (
+        TranslationUpdates.objects
+        .exclude(reference='[]')
+        .values_list('reference', 'date')
+        .iterator(chunk_size=5000)
+    )
+    for ref_str, dt in entries:
+        parsed = parse_ref_to_chapter(ref_str)
+        if not parsed:
+            continue
+        verse = parse_ref_verse_num(ref_str)
+        if verse is None:
+            continue
+        key = parsed + (verse,)
+        dt = _naive(dt)
+        if key not in verse_first_save or dt < verse_first_save[key]:
+            verse_first_save[key] = dt
+
+    # Plain cursor rather than execute_query, which commits: this also runs inside
+    # the seeding migration's transaction
+    counts = {}
+    with connection.cursor() as cursor:
+        for sql in (NT_COUNTS_SQL, OT_COUNTS_SQL):
+            cursor.execute(sql.format(where=''))
+            for book_abbrev, chapter, total, filled in cursor.fetchall():
+                counts[(book_abbrev, int(chapter))] = (int(total), int(filled))
+
+    per_chapter = {}
+    for (book_abbrev, chapter, verse), dt in verse_first_save.items():
+        per_chapter.setdefault((book_abbrev, chapter), {})[verse] = dt
+
+    progress_rows = []
+    for key in set(counts) | set(per_chapter):
+        book_abbrev, chapter = key
+        total, filled = counts.get(key, (0, 0))
+        first_saves = per_chapter.get(key, {})
+        completed_at = None
+        if total and filled >= total and first_saves:
+            completed_at = first_saves[max(first_saves)]
+        progress_rows.append(ChapterProgress(
+            book=book_abbrev,
+            chapter=chapter,
+            testament=testament_for(book_abbrev),
+            total_verses=total,
+            filled_verses=filled,
+            audited_verses=len(first_saves),
+            completed_at=completed_at,
+        ))
+
+    with transaction.atomic():
+        ChapterVerseFirstSave.objects.all().delete()
+        ChapterProgress.objects.all().delete()
+        ChapterVerseFirstSave.objects.bulk_create(
+            [
+                ChapterVerseFirstSave(book=book_abbrev, chapter=chapter, verse=verse, first_saved=dt)
+                for (book_abbrev, chapter, verse), dt in verse_first_save.items()
+            ],
+            batch_size=2000,
+        )
+        ChapterProgress.objects.bulk_create(progress_rows, batch_size=2000)
+    return len(progress_rows)
+
+
+def recently_completed_chapters(cutoff, limit):
+    """ChapterProgress rows completed on/after cutoff that meet the audit coverage bar, newest first."""
+    from search.models import ChapterProgress
+
+    rows = []
+    for progress in ChapterProgress.objects.filter(completed_at__gte=cutoff).order_by('-completed_at'):
+        if progress.audited_verses < progress.total_verses * AUDIT_COVERAGE.get(progress.testament, 0.5):
+            continue
+        rows.append(progress)
+        if len(rows) >= limit:
+            break
+    return rows
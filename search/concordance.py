@@ -0,0 +1,452 @@
+"""
+Strong's-number concordance for both testaments.
+
+`manage.py build_concordance` (also run by migration 0021) reads every
+Strong's-tagged word of old_testament.hebrewdata and rbt_greek.strongs_greek
+into concordance_entries: one row per Strong's number per word, inserted in
+canonical order (OT verses in old_testament.ot order, NT books in nt_abbrev
+order), so ids double as the keyset cursor. Numbers are normalized: 'H0430',
+'H430=...' and 'h430' are all 'H430'; a hebrewdata letter suffix (H5921a) is
+kept in `variant`.
+
+Hebrew words take their lemma from the lexicons (Fürst via lexeme_fuerst,
+then Gesenius, lexemes and the Strong's dictionary); Greek words from
+strongs_greek.lemma. Editor changes are applied incrementally:
+update_interlinear_word refreshes the glosses of one Greek strongs/lemma
+(refresh_greek_word), the Hebrew editors the glosses and morphology of the
+hebrewdata rows they change (refresh_hebrew_words), and update_lexicon_entry
+the lemmas of the Strong's numbers an entry maps (refresh_hebrew_lemmas).
+
+lookup() answers a word study from the (strongs, id) / (lemma, id) indexes
+instead of a LIKE scan, filtered by testament, book and morphology prefix.
+"""
+
+import io
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Min
+
+logger = logging.getLogger(__name__)
+
+STRONGS_RE = re.compile(r'(?<![A-Za-z])([HG])0*(\d+)([a-z]?)(?![a-z0-9])')
+REF_RE = re.compile(r'^(.+)\.(\d+)\.(\d+)-(\d+)$')
+MAX_PAGE_SIZE = 1000
+
+# Lexicon headword for each OT Strong's number, best source first
+LEMMA_SOURCES = """
+    fuerst AS (
+        SELECT DISTINCT ON (key) key, lemma FROM (
+            SELECT regexp_replace(upper(l.strongs), '^([HG])0*(\\d+).*$', '\\1\\2') AS key,
+                   fl.hebrew_word AS lemma, lf.confidence, fl.id
+            FROM old_testament.lexemes l
+            JOIN old_testament.lexeme_fuerst lf ON lf.lexeme_id = l.lexeme_id
+            JOIN old_testament.fuerst_lexicon fl ON fl.id = lf.fuerst_id
+            WHERE fl.hebrew_word <> ''
+        ) f
+        ORDER BY key, CASE confidence WHEN 'high' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END, id
+    ),
+    gesenius AS (
+        SELECT DISTINCT ON (key) key, lemma FROM (
+            SELECT regexp_replace(upper(trim(n.number)), '^([HG])0*(\\d+).*$', '\\1\\2') AS key,
+                   g."hebrewWord" AS lemma, g.id
+            FROM old_testament.gesenius_lexicon g
+            CROSS JOIN LATERAL unnest(string_to_array(g."strongsNumbers", ',')) AS n(number)
+            WHERE g."hebrewWord" <> ''
+        ) g
+        ORDER BY key, id
+    ),
+    lexeme AS (
+        SELECT DISTINCT ON (key) key, lemma FROM (
+            SELECT regexp_replace(upper(strongs), '^([HG])0*(\\d+).*$', '\\1\\2') AS key,
+                   COALESCE(NULLIF(lexeme, ''), consonantal) AS lemma, lexeme_id
+            FROM old_testament.lexemes
+        ) x
+        WHERE lemma <> ''
+        ORDER BY key, lexeme_id
+    ),
+    dictionary AS (
+        SELECT regexp_replace(upper(strong_number), '^([HG])0*(\\d+).*$', '\\1\\2') AS key, max(lemma) AS lemma
+        FROM old_testament.strongs_hebrew_dictionary
+        GROUP BY 1
+    )
+"""
+
+LEXICON_TABLES = (
+    'old_testament.lexemes', 'old_testament.lexeme_fuerst', 'old_testament.fuerst_lexicon',
+    'old_testament.gesenius_lexicon', 'old_testament.strongs_hebrew_dictionary',
+)
+
+
+def page_size():
+    return getattr(settings, 'CONCORDANCE_PAGE_SIZE', 200)
+
+
+def normalize_strongs(value):
+    """('H430', '') for 'H0430', 'h430' or 'H430=אֱלֹהִים'; ('H5921', 'a') for 'H5921a'. None if not a Strong's number."""
+    value = (value or '').strip()
+    match = STRONGS_RE.match(value[:1].upper() + value[1:])
+    if not match:
+        return None
+    return f'{match.group(1)}{int(match.group(2))}', match.group(3)
+
+
+def parse_strongs(value):
+    """Normalized (strongs, variant) of each '/'-separated morpheme of a Strongs column, in order."""
+    segments = []
+    for part in (value or '').split('/'):
+        numbers = []
+        for letter, digits, variant in STRONGS_RE.findall(part):
+            number = (f'{letter}{int(digits)}', variant)
+            if number not in numbers:
+                numbers.append(number)
+        segments.append(numbers)
+    return segments
+
+
+def _hebrew_morphs(morph, count):
+    # 'HR/Ncfsa': language letter, then one code per morpheme
+    codes = (morph or '').strip()
+    if codes[:1] in ('H', 'A'):
+        codes = codes[1:]
+    parts = codes.split('/')
+    return parts if len(parts) == count else [codes] * count
+
+
+def _parse_ref(ref):
+    match = REF_RE.match((ref or '').strip())
+    if not match:
+        return None
+    book, chapter, verse, word = match.groups()
+    return book, int(chapter), int(verse), int(word)
+
+
+COLUMNS = (
+    'strongs', 'variant', 'lemma', 'testament', 'book', 'chapter', 'verse', 'word', 'segment',
+    'source_id', 'morph', 'english',
+)
+
+
+def _hebrew_entries(rows, lemmas):
+    for source_id, ref, strongs, morph, english in rows:
+        parsed = _parse_ref(ref)
+        if not parsed:
+            continue
+        book, chapter, verse, word = parsed
+        segments = parse_strongs(strongs)
+        morphs = _hebrew_morphs(morph, len(segments))
+        for segment, numbers in enumerate(segments):
+            for number, variant in numbers:
+                if number[0] != 'H':
+                    continue
+                yield (
+                    number, variant, lemmas.get(number, ''), 'OT', book, chapter, verse, word, segment,
+                    source_id, morphs[segment][:30], english or '',
+                )
+
+
+def _greek_entries(rows):
+    for source_id, ref, strongs, morph, english, lemma in rows:
+        parsed = _parse_ref(ref)
+        if not parsed:
+            continue
+        book, chapter, verse, word = parsed
+        for segment, numbers in enumerate(parse_strongs(strongs)):
+            for number, variant in numbers:
+                yield (
+                    number, variant, (lemma or '')[:100], 'NT', book, chapter, verse, word, segment,
+                    source_id, (morph or '')[:30], english or '',
+                )
+
+
+def _copy_value(value):
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy_entries(cursor, table, entries):
+    """COPY entry tuples into the table in the given order (ids follow it); returns the count."""
+    buf = io.StringIO()
+    count = 0
+    for entry in entries:
+        buf.write('\t'.join(_copy_value(value) for value in entry))
+        buf.write('\n')
+        count += 1
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(COLUMNS)}) FROM STDIN", buf)
+    return count
+
+
+def _table_exists(cursor, table):
+    cursor.execute('SELECT to_regclass(%s)', [table])
+    return cursor.fetchone()[0] is not None
+
+
+def build_concordance(entry_model=None):
+    """
+    Rebuild concordance_entries from hebrewdata and strongs_greek.
+
+    The model class can be passed in so the migration can use the historical
+    model. Returns (ot_entries, nt_entries).
+    """
+    from translate.translator import nt_abbrev
+
+    if entry_model is None:
+        from search.models import ConcordanceEntry
+        entry_model = ConcordanceEntry
+
+    with connection.cursor() as cursor:
+        # old_testament.ot ids follow canonical book order; hebrewdata has no order column
+        cursor.execute(
+            """
+            SELECT h.id, h.ref, h.strongs, h.morph, h.eng
+            FROM old_testament.hebrewdata h
+            LEFT JOIN old_testament.ot o ON o.ref = split_part(h.ref, '-', 1)
+            WHERE h.strongs <> ''
+            ORDER BY o.id NULLS LAST, h.ref, h.id
+            """
+        )
+        hebrew_rows = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT id, verse, strongs, morph, english, lemma
+            FROM rbt_greek.strongs_greek
+            WHERE strongs <> ''
+            """
+        )
+        greek_rows = cursor.fetchall()
+        lemmas = _hebrew_lemmas(cursor)
+
+    book_order = {abbrev: index for index, abbrev in enumerate(nt_abbrev)}
+
+    def greek_order(row):
+        parsed = _parse_ref(row[1]) or ('', 0, 0, 0)
+        return (book_order.get(parsed[0], len(book_order)), parsed[0]) + parsed[1:] + (row[0],)
+
+    greek_rows.sort(key=greek_order)
+
+    table = entry_model._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        entry_model.objects.all().delete()
+        ot_entries = _copy_entries(cursor, table, _hebrew_entries(hebrew_rows, lemmas))
+        nt_entries = _copy_entries(cursor, table, _greek_entries(greek_rows))
+    logger.info('Concordance built: %s OT and %s NT entries', ot_entries, nt_entries)
+    return ot_entries, nt_entries
+
+
+def _hebrew_lemmas(cursor, numbers=None):
+    """{strongs: lemma} from the lexicons, for all numbers or only the given ones."""
+    if not all(_table_exists(cursor, table) for table in LEXICON_TABLES):
+        logger.warning('Lexicon tables missing; concordance Hebrew lemmas not resolved')
+        return {}
+    only = 'WHERE k.key = ANY(%s)' if numbers is not None else ''
+    cursor.execute(
+        f"""
+        WITH {LEMMA_SOURCES}
+        SELECT k.key, left(COALESCE(f.lemma, g.lemma, x.lemma, d.lemma, ''), 100)
+        FROM (
+            SELECT key FROM fuerst UNION SELECT key FROM gesenius
+            UNION SELECT key FROM lexeme UNION SELECT key FROM dictionary
+        ) k
+        LEFT JOIN fuerst f ON f.key = k.key
+        LEFT JOIN gesenius g ON g.key = k.key
+        LEFT JOIN lexeme x ON x.key = k.key
+        LEFT JOIN dictionary d ON d.key = k.key
+        {only}
+        """,
+        [list(numbers)] if numbers is not None else [],
+    )
+    return dict(cursor.fetchall())
+
+
+def refresh_hebrew_lemmas(numbers):
+    """Re-resolve the lexicon lemma of the given OT Strong's numbers (after a lexicon edit)."""
+    from search.models import ConcordanceEntry
+
+    normalized = sorted({number[0] for number in map(normalize_strongs, numbers) if number})
+    if not normalized:
+        return 0
+    with connection.cursor() as cursor:
+        lemmas = _hebrew_lemmas(cursor, normalized)
+    changed = 0
+    with transaction.atomic():
+        for number in normalized:
+            lemma = lemmas.get(number, '')
+            changed += (
+                ConcordanceEntry.objects.filter(testament='OT', strongs=number)
+                .exclude(lemma=lemma)
+                .update(lemma=lemma)
+            )
+    return changed
+
+
+def refresh_greek_word(strongs, lemma):
+    """Copy the current gloss and morphology of one strongs/lemma from strongs_greek (after an interlinear edit)."""
+    number = normalize_strongs(strongs)
+    if not number:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE concordance_entries c
+            SET english = COALESCE(g.english, ''), morph = left(COALESCE(g.morph, ''), 30)
+            FROM rbt_greek.strongs_greek g
+            WHERE c.testament = 'NT' AND c.strongs = %s AND c.lemma = %s AND g.id = c.source_id
+            """,
+            [number[0], lemma[:100]],
+        )
+        return cursor.rowcount
+
+
+def refresh_hebrew_words(source_ids):
+    """Copy the current gloss and morphology of the given hebrewdata rows (after an Eng/morphology edit)."""
+    source_ids = sorted({int(source_id) for source_id in source_ids})
+    if not source_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT id, strongs, morph, eng FROM old_testament.hebrewdata WHERE id = ANY(%s)',
+            [source_ids],
+        )
+        rows = cursor.fetchall()
+    updates = []
+    for source_id, strongs, morph, english in rows:
+        segments = parse_strongs(strongs)
+        for segment, morph_code in enumerate(_hebrew_morphs(morph, len(segments))):
+            updates.append((english or '', morph_code[:30], source_id, segment))
+    if not updates:
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            """
+            UPDATE concordance_entries SET english = %s, morph = %s
+            WHERE testament = 'OT' AND source_id = %s AND segment = %s
+            """,
+            updates,
+        )
+    return len(rows)
+
+
+def ready():
+    from search.models import ConcordanceEntry
+
+    return ConcordanceEntry.objects.exists()
+
+
+def _lemma_forms(lemma):
+    lemma = lemma.strip()[:100]
+    return {lemma, unicodedata.normalize('NFC', lemma), unicodedata.normalize('NFD', lemma)}
+
+
+def _filtered(strongs=None, lemma=None, testament=None, book=None, morph=None):
+    from search.models import ConcordanceEntry
+
+    entries = ConcordanceEntry.objects.all()
+    if strongs:
+        number = normalize_strongs(strongs)
+        if not number:
+            raise ValueError(f"Not a Strong's number: {strongs}")
+        entries = entries.filter(strongs=number[0])
+        if number[1]:
+            entries = entries.filter(variant=number[1])
+    elif lemma:
+        entries = entries.filter(lemma__in=_lemma_forms(lemma))
+    else:
+        raise ValueError("A Strong's number or lemma is required")
+    if testament:
+        testament = testament.upper()
+        if testament not in ('OT', 'NT'):
+            raise ValueError('testament must be OT or NT')
+        entries = entries.filter(testament=testament)
+    if book:
+        entries = entries.filter(book=book)
+    if morph:
+        entries = entries.filter(morph__startswith=morph)
+    return entries
+
+
+def lookup(strongs=None, lemma=None, testament=None, book=None, morph=None, cursor=None, limit=None):
+    """
+    One page of concordance entries in canonical order.
+
+    Filter by a Strong's number (with a variant letter only that variant) or
+    a lemma, plus testament, book and a morphology-code prefix ('V' verbs,
+    'Vq' qal, 'N-NSM'...). cursor is the next_cursor of the previous page.
+    Returns {results, count, books, next_cursor}; books (occurrences per book)
+    only on the first page.
+    """
+    entries = _filtered(strongs, lemma, testament, book, morph)
+    limit = max(1, min(int(limit or page_size()), MAX_PAGE_SIZE))
+
+    page = entries
+    if cursor not in (None, ''):
+        page = page.filter(id__gt=int(cursor))
+    rows = list(
+        page.order_by('id').values(
+            'id', 'strongs', 'variant', 'lemma', 'testament', 'book', 'chapter', 'verse',
+            'word', 'segment', 'morph', 'english',
+        )[:limit + 1]
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1]['id'])
+
+    results = []
+    for row in rows:
+        results.append({
+            'ref': f"{row['book']}.{row['chapter']}.{row['verse']}",
+            'word_ref': f"{row['book']}.{row['chapter']}.{row['verse']}-{row['word']:02d}",
+            'testament': row['testament'],
+            'book': row['book'],
+            'chapter': row['chapter'],
+            'verse': row['verse'],
+            'word': row['word'],
+            'segment': row['segment'],
+            'strongs': row['strongs'] + row['variant'],
+            'lemma': row['lemma'],
+            'english': row['english'],
+            'morph': row['morph'],
+        })
+
+    books = None
+    if cursor in (None, ''):
+        books = []
+        for book_name, count in _book_counts(entries):
+            books.append({'book': book_name, 'count': count})
+
+    return {
+        'results': results,
+        'count': entries.count(),
+        'books': books,
+        'next_cursor': next_cursor,
+    }
+
+
+def _book_counts(entries):
+    # Books in canonical order: by their first entry id
+    rows = entries.order_by().values('book').annotate(count=Count('id'), first=Min('id')).order_by('first')
+    return [(row['book'], row['count']) for row in rows]
+
+
+def source_ids(testament, strongs, variant=None):
+    """
+    hebrewdata/strongs_greek ids of the words tagged with a Strong's number, in
+    canonical order, or None when the concordance has not been built.
+    variant=None matches every variant; '' only the unsuffixed number.
+    """
+    from search.models import ConcordanceEntry
+
+    number = normalize_strongs(strongs)
+    if not number or not ready():
+        return None
+    entries = ConcordanceEntry.objects.filter(testament=testament, strongs=number[0])
+    if variant is not None:
+        entries = entries.filter(variant=variant)
+    ids = []
+    for source_id in entries.order_by('id').values_list('source_id', flat=True):
+        if not ids or ids[-1] != source_id:
+            ids.append(source_id)
+    return ids
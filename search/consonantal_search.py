@@ -0,0 +1,340 @@
+"""
+Consonantal Hebrew search over old_testament.ot_consonantal.
+
+`manage.py build_consonantal_index` (also run by migration 0020) copies the
+corpus into two tables:
+- consonantal_verses: each verse in canonical OT order (position) with its text
+  normalized: niqqud, cantillation and morpheme slashes removed, final letters
+  folded (ך→כ ם→מ ן→נ ף→פ ץ→צ), maqaf and punctuation turned into spaces.
+- consonantal_grams: for every letter bigram and trigram inside a word, the
+  sorted positions of the verses containing it.
+
+search() normalizes the terms the same way, intersects the posting lists of
+their n-grams to get candidate verses, and checks each candidate with a
+regex. Terms can match anywhere (like the old ILIKE), or as whole words with
+optional prefixes (ו ה ב ל מ) and/or pronominal suffixes. A second term can
+be required within N words of the first. Every match is counted and ranked,
+and pages are cut with a keyset cursor rather than a fixed LIMIT. The ranked
+(score, position) list of a query is cached, so later pages only score
+their own verses.
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from array import array
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.html import escape
+
+from search.db_utils import safe_cache_get, safe_cache_set
+
+logger = logging.getLogger(__name__)
+
+FINAL_FORMS = str.maketrans('ךםןףץ', 'כמנפצ')
+PREFIX_LETTERS = 'והבלמ'
+MAX_PREFIXES = 2  # e.g. ו+ב, ו+ה
+# Pronominal/plural suffixes, final forms folded; longer ones first
+SUFFIXES = ('יהמ', 'יהנ', 'יכמ', 'ינו', 'כמ', 'המ', 'הנ', 'נו', 'ימ', 'ות', 'תי', 'יו', 'יה', 'ו', 'ה', 'י', 'כ', 'מ', 'נ', 'ת')
+MAX_PAGE_SIZE = 500
+VERSION_KEY = 'consonantal_search:version'  # changes on every rebuild
+
+
+def page_size():
+    return getattr(settings, 'CONSONANTAL_SEARCH_PAGE_SIZE', 100)
+
+
+def hits_timeout():
+    return getattr(settings, 'CONSONANTAL_SEARCH_CACHE_SECONDS', 600)
+
+
+def _is_letter(ch):
+    return 'א' <= ch <= 'ת'
+
+
+def _is_mark(ch):
+    # Niqqud and cantillation (combining marks in the Hebrew block)
+    return '֑' <= ch <= 'ׇ' and unicodedata.combining(ch) != 0
+
+
+def normalize(text):
+    """
+    Normalized consonantal text and, for each of its characters, the index of
+    the original character it came from (used to highlight the original).
+    """
+    out, index = [], []
+    for i, ch in enumerate(text or ''):
+        if _is_letter(ch):
+            out.append(ch.translate(FINAL_FORMS))
+            index.append(i)
+        elif _is_mark(ch) or ch == '/':
+            continue
+        elif out and out[-1] != ' ':
+            out.append(' ')
+            index.append(i)
+    if out and out[-1] == ' ':
+        out.pop()
+        index.pop()
+    return ''.join(out), index
+
+
+def word_grams(normalized):
+    """Letter bigrams and trigrams that do not cross a word boundary."""
+    grams = set()
+    for word in normalized.split():
+        for n in (2, 3):
+            grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+def _query_grams(normalized):
+    # Trigrams are far more selective; bigrams only for words too short for one
+    grams = set()
+    for word in normalized.split():
+        n = 3 if len(word) >= 3 else 2
+        grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+def build_index(verse_model=None, gram_model=None):
+    """
+    Rebuild consonantal_verses and consonantal_grams from ot_consonantal.
+
+    The model classes can be passed in so the migration can use historical
+    models. Returns (verses, grams).
+    """
+    if verse_model is None:
+        from search.models import ConsonantalGram, ConsonantalVerse
+        verse_model, gram_model = ConsonantalVerse, ConsonantalGram
+
+    with connection.cursor() as cursor:
+        # old_testament.ot ids follow canonical book order; ot_consonantal has no order column
+        cursor.execute(
+            """
+            SELECT c.ref, c.hebrew
+            FROM old_testament.ot_consonantal c
+            LEFT JOIN old_testament.ot o ON o.ref = c.ref
+            ORDER BY o.id NULLS LAST, c.ref
+            """
+        )
+        rows = cursor.fetchall()
+
+    verses = []
+    postings = {}
+    for position, (ref, hebrew) in enumerate(rows, start=1):
+        normalized = normalize(hebrew)[0]
+        verses.append(verse_model(position=position, ref=ref, hebrew=hebrew or '', normalized=normalized))
+        for gram in word_grams(normalized):
+            postings.setdefault(gram, array('I')).append(position)
+
+    with transaction.atomic():
+        gram_model.objects.all().delete()
+        verse_model.objects.all().delete()
+        verse_model.objects.bulk_create(verses, batch_size=2000)
+        gram_model.objects.bulk_create(
+            [gram_model(gram=gram, postings=positions.tobytes()) for gram, positions in postings.items()],
+            batch_size=2000,
+        )
+    safe_cache_set(VERSION_KEY, int(time.time() * 1000), None)
+    logger.info('Consonantal index built: %d verses, %d grams', len(verses), len(postings))
+    return len(verses), len(postings)
+
+
+def index_ready():
+    from search.models import ConsonantalVerse
+
+    return ConsonantalVerse.objects.exists()
+
+
+def _candidates(grams):
+    """Positions of verses containing every gram, or None for "all verses" (no grams)."""
+    from search.models import ConsonantalGram
+
+    if not grams:
+        return None
+    lists = dict(ConsonantalGram.objects.filter(gram__in=grams).values_list('gram', 'postings'))
+    if len(lists) < len(grams):
+        return set()
+    result = None
+    for raw in sorted(lists.values(), key=len):
+        positions = array('I')
+        positions.frombytes(bytes(raw))
+        result = set(positions) if result is None else result.intersection(positions)
+        if not result:
+            break
+    return result
+
+
+def compile_term(term, prefixes=False, suffixes=False):
+    """Regex for a normalized term: a substring, or a whole word with optional affixes."""
+    body = r' '.join(re.escape(word) for word in term.split())
+    if not (prefixes or suffixes):
+        return re.compile(f'(?P<pre>)(?P<term>{body})(?P<suf>)')
+    pre = f'[{PREFIX_LETTERS}]{{0,{MAX_PREFIXES}}}' if prefixes else ''
+    suf = f'(?:{"|".join(SUFFIXES)})?' if suffixes else ''
+    return re.compile(f'(?<!\\S)(?P<pre>{pre})(?P<term>{body})(?P<suf>{suf})(?!\\S)')
+
+
+def _quality(text, match):
+    """3 for the bare word, 2 for the word with affixes, 1 for a match inside a word."""
+    start, end = match.span('term')
+    whole = (start == 0 or text[start - 1] == ' ') and (end == len(text) or text[end] == ' ')
+    if whole:
+        return 3
+    if match.group('pre') or match.group('suf'):
+        return 2
+    return 1
+
+
+def _word_at(text, offset):
+    return text.count(' ', 0, offset)
+
+
+def _score_verse(text, pattern, pattern2, within):
+    """(score, spans, spans2) for one normalized verse, or None if it does not match."""
+    matches = list(pattern.finditer(text))
+    if not matches:
+        return None
+    score = 10 * max(_quality(text, m) for m in matches) + min(len(matches), 9)
+    spans2 = []
+    if pattern2 is not None:
+        matches2 = list(pattern2.finditer(text))
+        if within is not None:
+            if not matches2:
+                return None
+            distance = min(
+                abs(_word_at(text, a.start()) - _word_at(text, b.start())) for a in matches for b in matches2
+            )
+            if distance > within:
+                return None
+            score += 100 * (within - distance + 1)
+        spans2 = [m.span() for m in matches2]
+    return score, [m.span() for m in matches], spans2
+
+
+def highlight(hebrew, spans, spans2=()):
+    """Wrap matched spans (offsets into the normalized text) in the original verse text."""
+    normalized, index = normalize(hebrew)
+    marks = []
+    for spans_, css in ((spans, 'search-highlight'), (spans2, 'search-highlight-2')):
+        for start, end in spans_:
+            if start >= end or end > len(index):
+                continue
+            o_start, o_end = index[start], index[end - 1] + 1
+            while o_end < len(hebrew) and _is_mark(hebrew[o_end]):
+                o_end += 1
+            if any(o_start < e and s < o_end for s, e, _ in marks):
+                continue
+            marks.append((o_start, o_end, css))
+    parts, last = [], 0
+    for start, end, css in sorted(marks):
+        parts.append(escape(hebrew[last:start]))
+        parts.append(f'<span class="{css}">{escape(hebrew[start:end])}</span>')
+        last = end
+    parts.append(escape(hebrew[last:]))
+    return ''.join(parts)
+
+
+def encode_cursor(score, position):
+    return f'{score}:{position}'
+
+
+def decode_cursor(cursor):
+    try:
+        score, position = cursor.split(':')
+        return int(score), int(position)
+    except (AttributeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def _ranked_hits(norm1, norm2, prefixes, suffixes, within, order):
+    """Sorted [(-score, position)] of every matching verse, cached per query and index build."""
+    from search.models import ConsonantalVerse
+
+    version = safe_cache_get(VERSION_KEY, 0)
+    query = json.dumps([version, norm1, norm2, prefixes, suffixes, within, order])
+    key = 'consonantal_search:' + hashlib.md5(query.encode('utf-8')).hexdigest()
+    hits = safe_cache_get(key)
+    if hits is not None:
+        return hits
+
+    pattern = compile_term(norm1, prefixes, suffixes)
+    pattern2 = compile_term(norm2, prefixes, suffixes) if within is not None else None
+    grams = _query_grams(norm1)
+    if within is not None:
+        grams |= _query_grams(norm2)
+    candidates = _candidates(grams)
+
+    hits = []
+    if candidates != set():
+        verses = ConsonantalVerse.objects.all()
+        if candidates is not None:
+            verses = verses.filter(position__in=sorted(candidates))
+        rows = verses.order_by('position').values_list('position', 'normalized').iterator(chunk_size=5000)
+        for position, normalized in rows:
+            scored = _score_verse(normalized, pattern, pattern2, within)
+            if scored is not None:
+                hits.append((-scored[0] if order == 'rank' else 0, position))
+        hits.sort()
+    safe_cache_set(key, hits, hits_timeout())
+    return hits
+
+
+def search(term, term2='', prefixes=False, suffixes=False, within=None, order='rank', cursor=None, limit=None):
+    """
+    One page of verses matching term (and term2 within `within` words, if given).
+
+    order is 'rank' (best matches first) or 'canonical' (OT order). Returns
+    {'results': [...], 'count': total matches, 'next_cursor': str or None}.
+    Raises ValueError for an empty term or a bad cursor.
+    """
+    from search.models import ConsonantalVerse
+
+    norm1 = normalize(term)[0]
+    norm2 = normalize(term2)[0] if term2 else ''
+    if not norm1:
+        raise ValueError('Search term has no Hebrew letters')
+    if order not in ('rank', 'canonical'):
+        raise ValueError("order must be 'rank' or 'canonical'")
+    limit = max(1, min(int(limit or page_size()), MAX_PAGE_SIZE))
+    prefixes, suffixes = bool(prefixes), bool(suffixes)
+    if not norm2:
+        within = None
+
+    hits = _ranked_hits(norm1, norm2, prefixes, suffixes, within, order)
+    start = 0
+    if cursor:
+        score, position = decode_cursor(cursor)
+        start = bisect.bisect_right(hits, (-score, position))
+    page = hits[start:start + limit]
+    next_cursor = encode_cursor(-page[-1][0], page[-1][1]) if start + limit < len(hits) else None
+
+    # Spans for highlighting are only computed for the verses on this page
+    pattern = compile_term(norm1, prefixes, suffixes)
+    pattern2 = compile_term(norm2, prefixes, suffixes) if norm2 else None
+    rows = {
+        position: (ref, hebrew, normalized)
+        for position, ref, hebrew, normalized in ConsonantalVerse.objects.filter(
+            position__in=[position for _, position in page]
+        ).values_list('position', 'ref', 'hebrew', 'normalized')
+    }
+    results = []
+    for _, position in page:
+        ref, hebrew, normalized = rows[position]
+        score, spans, spans2 = _score_verse(normalized, pattern, pattern2, within)
+        ref_parts = ref.split('.')
+        results.append({
+            'ref': ref,
+            'book': ref_parts[0] if len(ref_parts) > 0 else '',
+            'chapter': ref_parts[1] if len(ref_parts) > 1 else '',
+            'verse': ref_parts[2] if len(ref_parts) > 2 else '',
+            'hebrew': hebrew,
+            'hebrew_highlighted': highlight(hebrew, spans, spans2),
+            'score': score,
+        })
+    return {'results': results, 'count': len(hits), 'next_cursor': next_cursor}
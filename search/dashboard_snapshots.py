@@ -0,0 +1,237 @@
+"""
+Stale-while-revalidate snapshots for the dashboard endpoints that depend on
+third-party APIs (Coinbase balances, PayPal/crypto donation totals, Northflank
+stats).
+
+Each source is an async collect function in its view module that returns the
+JSON-ready payload. Its latest good result is kept in the cache as a snapshot
+({'data', 'fetched_at'}) for SNAPSHOT_RETENTION seconds, far longer than it
+is considered fresh, so views can always answer from it:
+
+- A view calls get_snapshot(). A snapshot is returned immediately, however
+  old; if it is older than the source's refresh interval the collector thread
+  is woken to refresh it.
+- Only with no snapshot at all (first deploy, cache cleared) or an explicit
+  force (Northflank ?refresh=1) does the request wait for the upstream.
+- SnapshotCollector, one daemon thread per worker process, refreshes the
+  default sources shortly before they go stale, every
+  DASHBOARD_COLLECT_INTERVAL seconds.
+
+Refreshes are single-flight: a cache.add() lock per snapshot key (the cache
+is the shared database cache, so this holds across gunicorn workers) lets
+one refresh run while the others keep serving the old snapshot or, on a cold
+start, wait for the winner's result. A failed refresh leaves the last good
+snapshot in place.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_RETENTION = 60 * 60 * 24 * 7  # last good snapshot is kept a week
+LOCK_TIMEOUT = 120  # a crashed refresh frees its key after this long
+COLD_WAIT = 30  # seconds a cold request waits for another worker's refresh
+
+# name -> (dotted path of the async collect function, refresh interval setting, default)
+SOURCES = {
+    'crypto_balances': ('search.views.crypto_views.collect_crypto_balances', 'DASHBOARD_REFRESH_CRYPTO', 300),
+    'donation_totals': ('search.views.donation_views.collect_donation_totals', 'DASHBOARD_REFRESH_DONATIONS', 3600),
+    'northflank_stats': ('search.views.northflank_stats_views.collect_northflank_stats', 'DASHBOARD_REFRESH_NORTHFLANK', 300),
+}
+
+
+class SnapshotUnavailable(RuntimeError):
+    """Raised when there is no snapshot and the upstream could not produce one."""
+
+
+def snapshot_key(name, *args):
+    return ':'.join(['dashboard_snapshot', name, *map(str, args)])
+
+
+def refresh_interval(name):
+    _, setting, default = SOURCES[name]
+    return getattr(settings, setting, default)
+
+
+def _default_jobs():
+    """(name, args) for the snapshots the collector keeps warm."""
+    from search.views.northflank_stats_views import DEFAULT_PROJECT_ID
+
+    return [('crypto_balances', ()), ('donation_totals', ()), ('northflank_stats', (DEFAULT_PROJECT_ID,))]
+
+
+async def peek(name, *args):
+    """The stored snapshot envelope, or None. Never triggers a refresh."""
+    return await cache.aget(snapshot_key(name, *args))
+
+
+async def refresh(name, *args):
+    """
+    Collect one source and store it as the new snapshot.
+
+    Returns the new envelope, or None if another refresh of the same snapshot
+    is already running. Collect errors propagate; the old snapshot is kept.
+    """
+    key = snapshot_key(name, *args)
+    lock_key = f'{key}:lock'
+    if not await cache.aadd(lock_key, os.getpid(), timeout=LOCK_TIMEOUT):
+        return None
+    try:
+        collect = import_string(SOURCES[name][0])
+        started = time.monotonic()
+        data = await collect(*args)
+        envelope = {'data': data, 'fetched_at': time.time()}
+        await cache.aset(key, envelope, SNAPSHOT_RETENTION)
+        logger.info('Refreshed %s in %.2fs', key, time.monotonic() - started)
+        return envelope
+    finally:
+        await cache.adelete(lock_key)
+
+
+async def _wait_for_refresh(name, *args):
+    """Poll for a snapshot while another worker's refresh holds the lock."""
+    deadline = time.monotonic() + COLD_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.25)
+        envelope = await peek(name, *args)
+        if envelope is not None:
+            return envelope
+        if await cache.aget(f'{snapshot_key(name, *args)}:lock') is None:
+            break
+    return await peek(name, *args)
+
+
+async def get_snapshot(name, *args, force=False):
+    """
+    The latest snapshot envelope for a source ({'data', 'fetched_at'}).
+
+    Returns the stored snapshot without waiting whenever there is one, and
+    wakes the collector if it is stale. With no snapshot, or with force=True,
+    refreshes inline (single-flight). Raises SnapshotUnavailable, or the
+    collect function's own exception, if nothing can be served.
+    """
+    # Workers not started with GUNICORN_WORKER get their collector on first use.
+    ensure_collector_running()
+    envelope = None if force else await peek(name, *args)
+    if envelope is not None:
+        if time.time() - envelope['fetched_at'] >= refresh_interval(name):
+            if collector_enabled():
+                get_collector().wake(name, *args)
+            else:
+                # No collector thread (e.g. management commands): revalidate inline.
+                try:
+                    envelope = await refresh(name, *args) or envelope
+                except Exception as e:
+                    logger.warning('Refreshing %s failed: %s', snapshot_key(name, *args), e)
+        return envelope
+
+    envelope = await refresh(name, *args)
+    if envelope is None:
+        envelope = await _wait_for_refresh(name, *args)
+    if envelope is None:
+        raise SnapshotUnavailable(f'{name} is being refreshed; try again shortly')
+    return envelope
+
+
+def snapshot_age(envelope):
+    return round(time.time() - envelope['fetched_at'], 1)
+
+
+class SnapshotCollector:
+    """Daemon thread that refreshes the dashboard snapshots before they go stale."""
+
+    def __init__(self):
+        self.interval = getattr(settings, 'DASHBOARD_COLLECT_INTERVAL', 60)
+        self._wake = threading.Event()
+        self._requested = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.stats = {'refreshed': 0, 'skipped': 0, 'failed': 0}
+
+    def start(self):
+        # Restarted in forked gunicorn workers (see visitor_ingest).
+        pid = os.getpid()
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='dashboard-snapshots', daemon=True)
+            self._thread.start()
+
+    def wake(self, name, *args):
+        """Ask for a refresh of one (non-default) snapshot on the next pass."""
+        self.start()
+        with self._lock:
+            self._requested.add((name, args))
+        self._wake.set()
+
+    def _run(self):
+        # One long-lived loop so hebrewtool.http_client keeps its connection pool.
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                try:
+                    loop.run_until_complete(self.collect_due())
+                except Exception:
+                    logger.exception('Dashboard snapshot pass failed')
+                self._wake.wait(self.interval)
+                self._wake.clear()
+        finally:
+            loop.close()
+
+    async def collect_due(self):
+        """Refresh every snapshot that will be stale before the next pass."""
+        await sync_to_async(close_old_connections)()
+        with self._lock:
+            requested, self._requested = self._requested, set()
+        jobs = list(dict.fromkeys(_default_jobs() + sorted(requested)))
+        due = []
+        for name, args in jobs:
+            envelope = await peek(name, *args)
+            if envelope is None or time.time() - envelope['fetched_at'] + self.interval >= refresh_interval(name):
+                due.append((name, args))
+        results = await asyncio.gather(*(refresh(name, *args) for name, args in due), return_exceptions=True)
+        for (name, args), result in zip(due, results):
+            if isinstance(result, Exception):
+                self.stats['failed'] += 1
+                logger.warning('Refreshing %s failed: %s', snapshot_key(name, *args), result)
+            elif result is None:
+                self.stats['skipped'] += 1
+            else:
+                self.stats['refreshed'] += 1
+        await sync_to_async(close_old_connections)()
+        return len(due)
+
+
+_collector = None
+_collector_lock = threading.Lock()
+
+
+def get_collector():
+    """Get or create the per-process collector (not started until start()/wake())."""
+    global _collector
+    if _collector is None:
+        with _collector_lock:
+            if _collector is None:
+                _collector = SnapshotCollector()
+    return _collector
+
+
+def collector_enabled():
+    return getattr(settings, 'DASHBOARD_COLLECTOR_ENABLED', True)
+
+
+def ensure_collector_running():
+    if collector_enabled():
+        get_collector().start()
@@ -5,6 +5,8 @@ from typing import Any, List, Optional, Sequence, Tuple, Union, Literal, overloa
 from django.conf import settings
 from django.db import connection
 
+from hebrewtool import metrics
+
 
 RowType = Tuple[Any, ...]
 FetchMode = Optional[Literal['one', 'all']]
@@ -146,12 +148,25 @@ def _maybe_disable_db_cache_from_exception(exc: Exception) -> bool:
 
     return False
 
-def safe_cache_get(key, default=None):
-    """Safely get value from Django cache, handling DB cache failures gracefully."""
+
+_CACHE_MISS = object()
+
+
+def safe_cache_get(key, default=None, family=None):
+    """Safely get value from Django cache, handling DB cache failures gracefully.
+
+    Hits and misses are counted in rbt_cache_requests_total under `family`
+    (default: the key's leading word, see hebrewtool.metrics.cache_family).
+    """
     if _db_cache_disabled_reason:
         return default
     try:
-        return cache.get(key, default)
+        value = cache.get(key, _CACHE_MISS)
+        metrics.cache_requests.inc(
+            family=family or metrics.cache_family(key),
+            result='miss' if value is _CACHE_MISS else 'hit',
+        )
+        return default if value is _CACHE_MISS else value
     except (DatabaseError, ProgrammingError, Exception) as e:
         _maybe_disable_db_cache_from_exception(e)
         logger_verbose.exception('safe_cache_get failed for key=%s: %s', key, e)
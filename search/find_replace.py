@@ -0,0 +1,183 @@
+"""
+Set-based find-and-replace for the NT/OT editors (translate.views
+find_and_replace_nt / find_and_replace_ot).
+
+- Matching runs in Postgres: find_page() selects candidate rows with a POSIX
+  regex (`column ~ pattern`) in key order, FIND_REPLACE_PAGE_SIZE rows at a
+  time, so the review screen pages through matches instead of loading every
+  LIKE hit into Python. The view's Python regex still decides the exact
+  replacement for each candidate. With the trigram indexes from
+  `manage.py find_replace_indexes` the regex is an index scan.
+- apply_changes() writes all approved rows of a target in one transaction:
+  each chunk is a single statement that locks the rows, journals their old
+  values into find_replace_journal and runs UPDATE ... FROM (VALUES ...).
+- undo_batch() reverts a whole ReplacementBatch with one UPDATE ... FROM
+  find_replace_journal per target, skipping rows edited since (their md5 no
+  longer matches the journalled replacement).
+"""
+
+import logging
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+Target = namedtuple('Target', 'table key column')
+
+TARGETS = {
+    'nt': Target('new_testament.nt', 'verseid', 'rbt'),
+    'ot': Target('old_testament.ot', 'id', 'html'),
+    'hebrewdata_html': Target('old_testament.hebrewdata', 'ref', 'html'),
+    'hebrewdata_footnote': Target('old_testament.hebrewdata', 'id', 'footnote'),
+}
+
+# Trigram GIN indexes that let `column ~ pattern` use an index (pg_trgm)
+TRIGRAM_INDEXES = (
+    ('nt_rbt_trgm_idx', 'new_testament.nt', 'rbt'),
+    ('ot_html_trgm_idx', 'old_testament.ot', 'html'),
+    ('hebrewdata_footnote_trgm_idx', 'old_testament.hebrewdata', 'footnote'),
+)
+
+APPLY_CHUNK = 500
+
+Page = namedtuple('Page', 'rows next_after')
+
+
+def page_size():
+    return getattr(settings, 'FIND_REPLACE_PAGE_SIZE', 200)
+
+
+@lru_cache(maxsize=None)
+def key_type(target):
+    """SQL type of a target's key column, for casting keys passed in as text."""
+    spec = TARGETS[target]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = %s::regclass AND attname = %s",
+            [spec.table, spec.key],
+        )
+        return cursor.fetchone()[0]
+
+
+def find_page(target, pattern, columns, after=None, where='', params=(), limit=None):
+    """
+    One page of rows whose target column matches the Postgres regex `pattern`.
+
+    columns[0] must be the target's key; rows come back in key order after
+    `after`. next_after is the cursor for the following page, or None on the
+    last page.
+    """
+    spec = TARGETS[target]
+    limit = limit or page_size()
+    sql = f"SELECT {', '.join(columns)} FROM {spec.table} WHERE {spec.column} ~ %s"
+    args = [pattern]
+    if where:
+        sql += f" AND {where}"
+        args += list(params)
+    if after is not None:
+        sql += f" AND {spec.key} > %s::{key_type(target)}"
+        args.append(after)
+    sql += f" ORDER BY {spec.key} LIMIT %s"
+    args.append(limit + 1)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, args)
+        rows = cursor.fetchall()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return Page(rows, rows[-1][0])
+    return Page(rows, None)
+
+
+def start_batch(user, description):
+    from search.models import ReplacementBatch
+
+    return ReplacementBatch.objects.create(user=user, description=description[:255])
+
+
+def apply_changes(batch, target, changes, guard='', guard_params=()):
+    """
+    Set target rows {key: new_text} and journal their old values under batch.
+
+    guard is an extra SQL condition on the target row (alias t), e.g. the NT
+    Greek-lemma filter. Rows already holding the new text are skipped.
+    Returns the number of rows changed. Call inside transaction.atomic() to
+    make several targets one unit; each call is atomic on its own.
+    """
+    spec = TARGETS[target]
+    items = [(str(key), text) for key, text in changes.items() if text is not None]
+    changed = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(items), APPLY_CHUNK):
+            chunk = items[start:start + APPLY_CHUNK]
+            values = ', '.join(['(%s, %s)'] * len(chunk))
+            params = [value for item in chunk for value in item]
+            cursor.execute(
+                f"""
+                WITH changes (row_key, new_text) AS (VALUES {values}),
+                locked AS (
+                    SELECT t.{spec.key} AS row_key, t.{spec.column} AS old_text, c.new_text
+                    FROM {spec.table} t
+                    JOIN changes c ON t.{spec.key} = c.row_key::{key_type(target)}
+                    WHERE t.{spec.column} IS DISTINCT FROM c.new_text {'AND ' + guard if guard else ''}
+                    FOR UPDATE OF t
+                ),
+                updated AS (
+                    UPDATE {spec.table} t SET {spec.column} = locked.new_text
+                    FROM locked WHERE t.{spec.key} = locked.row_key
+                )
+                INSERT INTO find_replace_journal (batch_id, target, row_key, old_text, new_md5)
+                SELECT %s, %s, locked.row_key::text, locked.old_text, md5(locked.new_text)
+                FROM locked
+                """,
+                params + list(guard_params) + [batch.pk, target],
+            )
+            changed += cursor.rowcount
+        if changed:
+            type(batch).objects.filter(pk=batch.pk).update(row_count=F('row_count') + changed)
+    return changed
+
+
+def undo_batch(batch):
+    """
+    Restore every row a batch changed, one statement per target.
+
+    Rows whose current text is no longer the batch's replacement were edited
+    afterwards and are left alone. Returns (restored, skipped).
+    """
+    from search.models import ReplacementJournal
+
+    restored = 0
+    journalled = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        targets = ReplacementJournal.objects.filter(batch=batch).values_list('target', flat=True).distinct()
+        for target in sorted(targets):
+            spec = TARGETS[target]
+            cursor.execute(
+                f"""
+                UPDATE {spec.table} t SET {spec.column} = j.old_text
+                FROM find_replace_journal j
+                WHERE j.batch_id = %s AND j.target = %s
+                  AND t.{spec.key} = j.row_key::{key_type(target)}
+                  AND md5(t.{spec.column}) = j.new_md5
+                """,
+                [batch.pk, target],
+            )
+            restored += cursor.rowcount
+        journalled = ReplacementJournal.objects.filter(batch=batch).count()
+        type(batch).objects.filter(pk=batch.pk).update(undone_at=timezone.now())
+    return restored, journalled - restored
+
+
+def ensure_trigram_indexes():
+    """Create pg_trgm and the trigram indexes used by find_page(). Returns the index names."""
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, table, column in TRIGRAM_INDEXES:
+            logger.info('Creating %s on %s (%s)', name, table, column)
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)')
+    return [name for name, _, _ in TRIGRAM_INDEXES]
@@ -0,0 +1,298 @@
+"""
+Buffered GeminiUsageLog writes and the rollups behind gemini_dashboard_view.
+
+_log_gemini_usage used to insert one row per Gemini attempt on the calling
+thread. record_usage() now only appends an unsaved row to an in-process
+buffer; a flusher thread per worker writes the buffer with bulk_create every
+GEMINI_USAGE_FLUSH_INTERVAL seconds, or as soon as GEMINI_USAGE_BATCH_SIZE
+rows are waiting, and adds the batch to two counter tables in the same
+transaction:
+- gemini_key_daily: calls per (day, key) split into success / 429 / other errors
+- gemini_target_usage: successful calls per (book, chapter, language)
+
+The dashboard reads only these plus the newest raw rows, so its cost no
+longer grows with the log. rebuild_usage_rollups() recomputes both tables
+from gemini_usage_logs (0016 migration, `manage.py rollup_gemini_usage`).
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+
+logger = logging.getLogger(__name__)
+
+
+def _outcome_counts(status_code):
+    """(success, rate_limited, errors) increments for one call."""
+    if status_code == 200:
+        return 1, 0, 0
+    if status_code == 429:
+        return 0, 1, 0
+    return 0, 0, 1
+
+
+def _count_usage(rows):
+    """Fold (timestamp, key, status, book, chapter, language) tuples into the two rollups."""
+    per_key = defaultdict(lambda: [0, 0, 0])
+    per_target = {}
+    for timestamp, key, status_code, book, chapter, language_code in rows:
+        counts = per_key[(timestamp.date(), key)]
+        for index, increment in enumerate(_outcome_counts(status_code)):
+            counts[index] += increment
+        if status_code == 200:
+            target = (book or '', chapter or 0, language_code)
+            requests, last = per_target.get(target, (0, timestamp))
+            per_target[target] = (requests + 1, max(last, timestamp))
+    return per_key, per_target
+
+
+def _upsert(cursor, per_key, per_target):
+    if per_key:
+        cursor.executemany(
+            """
+            INSERT INTO gemini_key_daily (date, api_key_abbrev, success_count, rate_limit_count, error_count)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (date, api_key_abbrev) DO UPDATE SET
+                success_count = gemini_key_daily.success_count + EXCLUDED.success_count,
+                rate_limit_count = gemini_key_daily.rate_limit_count + EXCLUDED.rate_limit_count,
+                error_count = gemini_key_daily.error_count + EXCLUDED.error_count
+            """,
+            [key + tuple(counts) for key, counts in per_key.items()],
+        )
+    if per_target:
+        cursor.executemany(
+            """
+            INSERT INTO gemini_target_usage (book, chapter, language_code, requests, last_requested_at)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (book, chapter, language_code) DO UPDATE SET
+                requests = gemini_target_usage.requests + EXCLUDED.requests,
+                last_requested_at = CASE
+                    WHEN gemini_target_usage.last_requested_at IS NULL
+                      OR EXCLUDED.last_requested_at > gemini_target_usage.last_requested_at
+                    THEN EXCLUDED.last_requested_at
+                    ELSE gemini_target_usage.last_requested_at
+                END
+            """,
+            [target + (requests, last) for target, (requests, last) in per_target.items()],
+        )
+
+
+def _lock_rollups():
+    """Block rollup writers until the current transaction ends (PostgreSQL only)."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('LOCK TABLE gemini_key_daily, gemini_target_usage IN EXCLUSIVE MODE')
+
+
+def add_to_rollups(rows):
+    """Count freshly inserted GeminiUsageLog objects into the rollup tables."""
+    per_key, per_target = _count_usage(
+        (row.timestamp, row.api_key_abbrev, row.status_code, row.book, row.chapter, row.language_code)
+        for row in rows
+        if row.timestamp is not None
+    )
+    if not per_key:
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        _upsert(cursor, per_key, per_target)
+
+
+def rebuild_usage_rollups(log_model=None, key_model=None, target_model=None):
+    """
+    Recompute both rollup tables from gemini_usage_logs.
+
+    Model classes can be passed in so migrations can use historical models.
+    Returns (key_rows, target_rows).
+    """
+    if log_model is None:
+        from search.models import GeminiKeyDaily, GeminiTargetUsage, GeminiUsageLog
+        log_model, key_model, target_model = GeminiUsageLog, GeminiKeyDaily, GeminiTargetUsage
+
+    with transaction.atomic():
+        # The flusher inserts raw rows and increments the rollups in one
+        # transaction; locking the rollups before the raw reads means each
+        # batch is counted here or added on top afterwards, never both.
+        _lock_rollups()
+        keys, targets = _count_all(log_model, key_model, target_model)
+        key_model.objects.all().delete()
+        target_model.objects.all().delete()
+        key_model.objects.bulk_create(keys, batch_size=1000)
+        target_model.objects.bulk_create(targets, batch_size=1000)
+    return len(keys), len(targets)
+
+
+def _count_all(log_model, key_model, target_model):
+    """Unsaved key-day and target rollup rows computed from every raw usage row."""
+    keys = [
+        key_model(
+            date=row['day'],
+            api_key_abbrev=row['api_key_abbrev'],
+            success_count=row['success'],
+            rate_limit_count=row['rate_limited'],
+            error_count=row['errors'],
+        )
+        for row in log_model.objects.annotate(day=TruncDate('timestamp'))
+        .values('day', 'api_key_abbrev')
+        .annotate(
+            success=Count('id', filter=Q(status_code=200)),
+            rate_limited=Count('id', filter=Q(status_code=429)),
+            errors=Count('id', filter=~Q(status_code__in=(200, 429))),
+        )
+        .order_by()
+    ]
+
+    # NULL book/chapter collapse onto ''/0 so they share one counter row.
+    per_target = defaultdict(lambda: [0, None])
+    for row in (
+        log_model.objects.filter(status_code=200)
+        .values('book', 'chapter', 'language_code')
+        .annotate(n=Count('id'), last=Max('timestamp'))
+        .order_by().iterator(chunk_size=5000)
+    ):
+        entry = per_target[(row['book'] or '', row['chapter'] or 0, row['language_code'])]
+        entry[0] += row['n']
+        entry[1] = max(filter(None, (entry[1], row['last'])), default=None)
+    targets = [
+        target_model(book=book, chapter=chapter, language_code=language_code, requests=n, last_requested_at=last)
+        for (book, chapter, language_code), (n, last) in per_target.items()
+    ]
+
+    return keys, targets
+
+
+def key_summary(days):
+    """Per-key success / 429 / error totals over the last `days` days, busiest first."""
+    from search.models import GeminiKeyDaily
+
+    since = datetime.now().date() - timedelta(days=max(0, days - 1))
+    return list(
+        GeminiKeyDaily.objects.filter(date__gte=since)
+        .values('api_key_abbrev')
+        .annotate(
+            success_count=Sum('success_count'),
+            rate_limit_count=Sum('rate_limit_count'),
+            error_count=Sum('error_count'),
+        )
+        .order_by('-success_count')
+    )
+
+
+def prune_usage_logs(retention_days):
+    """Delete raw GeminiUsageLog rows older than retention_days (rollups are kept)."""
+    from search.models import GeminiUsageLog
+
+    cutoff = datetime.combine(datetime.now().date() - timedelta(days=retention_days), datetime.min.time())
+    deleted, _ = GeminiUsageLog.objects.filter(timestamp__lt=cutoff).delete()
+    return deleted
+
+
+class UsageWriter:
+    """In-memory buffer of unsaved GeminiUsageLog rows, flushed in batches by one thread per process."""
+
+    def __init__(self):
+        self.batch_size = getattr(settings, 'GEMINI_USAGE_BATCH_SIZE', 100)
+        self.flush_interval = getattr(settings, 'GEMINI_USAGE_FLUSH_INTERVAL', 10)
+        self.max_buffer = getattr(settings, 'GEMINI_USAGE_MAX_BUFFER', 5000)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.stats = {'recorded': 0, 'dropped': 0, 'written': 0}
+
+    def record(self, **fields):
+        """Buffer one usage row; never touches the database. Returns False if it was dropped."""
+        from search.models import GeminiUsageLog
+
+        self._ensure_flusher()
+        with self._lock:
+            if len(self._pending) >= self.max_buffer:
+                self.stats['dropped'] += 1
+                return False
+            self._pending.append(GeminiUsageLog(**fields))
+            self.stats['recorded'] += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+        return True
+
+    def _ensure_flusher(self):
+        # Started lazily and restarted in forked gunicorn workers (see visitor_ingest).
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='gemini-usage-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Gemini usage flush failed')
+
+    def flush(self):
+        """Write buffered rows in one bulk_create and add them to the rollups."""
+        from search.models import GeminiUsageLog
+
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            close_old_connections()
+            # Raw rows and their rollup counts commit together, so a concurrent
+            # rebuild_usage_rollups() sees both or neither.
+            with transaction.atomic():
+                GeminiUsageLog.objects.bulk_create(batch, batch_size=self.batch_size)
+                add_to_rollups(batch)
+            self.stats['written'] += len(batch)
+        except Exception as e:
+            logger.error(f"Error saving Gemini usage batch ({len(batch)} rows): {e}")
+            return 0
+        finally:
+            close_old_connections()
+        return len(batch)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_usage_writer():
+    """Get or create the per-process usage writer."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = UsageWriter()
+    return _writer
+
+
+def record_usage(**fields):
+    """Buffer a GeminiUsageLog row (api_key_abbrev, request_type, language_code, ...) for batched writing."""
+    return get_usage_writer().record(**fields)
+
+
+@atexit.register
+def _flush_on_exit():
+    if _writer is not None and _writer._pending:
+        try:
+            _writer.flush()
+        except Exception:
+            pass
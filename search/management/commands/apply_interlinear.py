@@ -41,25 +41,15 @@ class Command(BaseCommand):
         if not isinstance(mapping, dict):
             raise CommandError('Interlinear mapping must be a JSON object (dict).')
 
-        # Prepare replacement function
-        def replace_func(strongs, lemma, english):
-            for cond, replacement in mapping.items():
-                # exact match on strongs or lemma
-                try:
-                    cond_s = str(cond)
-                except Exception:
-                    cond_s = cond
-                if strongs == cond_s or (lemma is not None and lemma == cond_s):
-                    return replacement
-            return english
-
-        # Use shared utils to compute/apply replacements
-        result = utils.apply_interlinear(mapping, dry_run=not commit, limit=limit, clear_mapping_on_commit=commit, user='CLI') # type: ignore
+        # Counts and samples come from SQL aggregates over a temp-table join
+        result = utils.apply_interlinear(mapping, dry_run=True, limit=limit)
 
         total = result.get('total_candidates')
         samples = result.get('samples', [])
 
         self.stdout.write(f"Found {total} potential replacements.")
+        for key, count in list(result.get('per_key', {}).items())[:limit]:
+            self.stdout.write(f" {count:>8}  {key}")
 
         if not commit:
             # dry-run: show samples and exit
@@ -86,7 +76,9 @@ class Command(BaseCommand):
                 self.stdout.write('Aborted by user. No changes made.')
                 return
 
-        # result already applied by utils.apply_interlinear
+        result = utils.apply_interlinear(mapping, dry_run=False, limit=limit, clear_mapping_on_commit=True, user='CLI')
+        total = result.get('total_candidates')
+        samples = result.get('samples', [])
         applied = result.get('applied', 0)
         backup_file = result.get('backup_file')
 
@@ -0,0 +1,81 @@
+import json
+import platform
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from search.benchmarks import CASE_GROUPS, build_cases, compare_reports, run_case
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark get_results, build_heb_interlinear, search_api, query_aeon retrieval and the '
+        'chapter handlers against the bench_seed fixture database; report latency percentiles and '
+        'query counts, optionally saving or comparing a JSON baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Timed calls per case (default 20).')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed calls per case before timing (default 2).')
+        parser.add_argument(
+            '--group', action='append', choices=sorted(CASE_GROUPS), default=None,
+            help='Only run this case group (repeatable).',
+        )
+        parser.add_argument('--filter', default='', help='Only run cases whose name contains this text.')
+        parser.add_argument('--output', default='', help='Write the JSON report to this path (e.g. baseline.json).')
+        parser.add_argument('--compare', default='', help='Compare against a saved JSON report and exit non-zero on regressions.')
+        parser.add_argument('--threshold', type=float, default=0.20, help='Relative slowdown counted as a regression (default 0.20).')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Ignore slowdowns smaller than this many ms (default 1.0).')
+        parser.add_argument('--json', action='store_true', default=False, help='Emit the JSON report instead of a table.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Could not read baseline {options["compare"]}: {exc}')
+
+        cases = [case for case in build_cases(options['group']) if options['filter'] in case.name]
+        if not cases:
+            raise CommandError('No benchmark cases selected (is the fixture database seeded?).')
+
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'machine': platform.node(),
+            'iterations': max(1, options['iterations']),
+            'cases': {},
+        }
+        if not options['json']:
+            self.stdout.write(f"{'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'queries':>8}  case")
+        for case in cases:
+            report['cases'][case.name] = run_case(case, report['iterations'], max(0, options['warmup']))
+            if not options['json']:
+                result = report['cases'][case.name]
+                self.stdout.write(
+                    f"{result['p50_ms']:>10.2f} {result['p90_ms']:>10.2f} {result['p99_ms']:>10.2f} "
+                    f"{result['queries_p50']:>8g}  {case.name}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        if baseline is None:
+            return
+        regressions = compare_reports(report, baseline, options['threshold'], options['min_delta_ms'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {options["compare"]}'))
+            return
+        for item in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"{item['case']}: {item['metric']} {item['baseline']} -> {item['current']}"
+            ))
+        raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}')
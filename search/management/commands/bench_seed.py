@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from search.bench_fixtures import SCHEMAS, seed_fixture_database
+
+LOCAL_HOSTS = ('', 'localhost', '127.0.0.1', '::1')
+
+
+class Command(BaseCommand):
+    help = (
+        'Drop and recreate the corpus schemas (old_testament, new_testament, rbt_greek, ...) '
+        'on a LOCAL Postgres and fill them with a deterministic synthetic dataset for bench_run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for words per verse (default 1.0 ~ real corpus).')
+        parser.add_argument('--seed', type=int, default=1611, help='Random seed; the same seed and scale give identical data.')
+        parser.add_argument('--books', default='', help='Comma-separated book titles to limit the canon (e.g. "Genesis,Psalms,John").')
+        parser.add_argument('--aeon-chunks', type=int, default=1500, help='Number of Aeon chunks to create (default 1500).')
+        parser.add_argument('--aeon-dim', type=int, default=3072, help='Embedding dimension for Aeon chunks (default 3072).')
+        parser.add_argument(
+            '--allow-remote', action='store_true', default=False,
+            help='Allow seeding a database whose HOST is not local. This DROPS the corpus schemas.',
+        )
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES['default']
+        if db['ENGINE'] != 'django.db.backends.postgresql':
+            raise CommandError('bench_seed needs a PostgreSQL database (the corpus lives in Postgres schemas).')
+        host = db.get('HOST') or ''
+        if host not in LOCAL_HOSTS and not host.startswith('/') and not options['allow_remote']:
+            raise CommandError(
+                f'Refusing to drop {", ".join(SCHEMAS)} on non-local host {host!r}; pass --allow-remote to override.'
+            )
+
+        books = [title.strip() for title in options['books'].split(',') if title.strip()]
+        counts = seed_fixture_database(
+            scale=options['scale'],
+            seed=options['seed'],
+            books=books or None,
+            aeon_chunks=options['aeon_chunks'],
+            aeon_dim=options['aeon_dim'],
+            log=lambda line: self.stdout.write(f'  {line}'),
+        )
+        summary = ', '.join(f'{name}={count}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Seeded fixture database ({summary})'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from search.concordance import build_concordance
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the Strong's concordance (concordance_entries) from old_testament.hebrewdata "
+        'and rbt_greek.strongs_greek. Run after the interlinear corpus is reloaded.'
+    )
+
+    def handle(self, *args, **options):
+        ot_entries, nt_entries = build_concordance()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {ot_entries} OT and {nt_entries} NT words'))
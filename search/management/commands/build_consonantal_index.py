@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from search.consonantal_search import build_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the consonantal Hebrew search index (consonantal_verses and consonantal_grams) '
+        'from old_testament.ot_consonantal. Run after the consonantal corpus changes.'
+    )
+
+    def handle(self, *args, **options):
+        verses, grams = build_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {verses} verses ({grams} letter n-grams)'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from search.translation_store import dedupe_verse_translations
+
+
+class Command(BaseCommand):
+    help = (
+        'Collapse duplicate verse_translations rows to one per verse (book, chapter, verse, language) '
+        'and one per footnote (language, footnote_id, book, chapter), keeping the row with usable text, '
+        'the most reviewed status and the newest id. Migration 0018 runs this before adding the unique '
+        'constraints; run it with --dry-run to check a database first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', default=False, help='Count duplicates without deleting.')
+
+    def handle(self, *args, **options):
+        verses, footnotes = dedupe_verse_translations(dry_run=options['dry_run'])
+        action = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {verses} duplicate verse rows and {footnotes} duplicate footnote rows'
+        ))
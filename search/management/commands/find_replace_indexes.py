@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from search.find_replace import ensure_trigram_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the pg_trgm extension and trigram GIN indexes on new_testament.nt.rbt, '
+        'old_testament.ot.html and old_testament.hebrewdata.footnote, so the NT/OT '
+        'find-and-replace regex searches use an index. The corpus schemas are not '
+        'managed by migrations; the command is idempotent.'
+    )
+
+    def handle(self, *args, **options):
+        for name in ensure_trigram_indexes():
+            self.stdout.write(f'{name} ready')
+        self.stdout.write(self.style.SUCCESS('Trigram indexes are in place'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from search.chapter_progress import rebuild_chapter_progress
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute chapter_progress and chapter_verse_first_saves from translation_updates '
+        'and the NT/OT verse tables (e.g. after bulk edits that bypass the editor).'
+    )
+
+    def handle(self, *args, **options):
+        chapters = rebuild_chapter_progress()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt progress for {chapters} chapters'))
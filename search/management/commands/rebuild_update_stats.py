@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from search.update_stats import rebuild_update_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the /statistics/ rollups (update_stats_hourly, update_stats_reference_daily) '
+        'from translation_updates. Only needed if rows were written outside the editor.'
+    )
+
+    def handle(self, *args, **options):
+        hourly_rows, reference_rows = rebuild_update_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt update statistics: {hourly_rows} hourly buckets, {reference_rows} reference/day counters'
+        ))
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from search.gemini_usage import prune_usage_logs, rebuild_usage_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the Gemini dashboard rollups (gemini_key_daily / gemini_target_usage) from raw '
+        'gemini_usage_logs rows and/or prune raw rows past retention. The rollups are kept current '
+        'as usage is flushed; a rebuild only counts raw rows still present, so run it before pruning.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', default=False, help='Recompute both rollup tables from raw rows.')
+        parser.add_argument('--prune', action='store_true', default=False, help='Delete raw usage rows older than the retention window.')
+        parser.add_argument(
+            '--retention-days', type=int, default=None,
+            help='Raw row retention for --prune (default GEMINI_USAGE_RETENTION_DAYS).',
+        )
+
+    def handle(self, *args, **options):
+        if not options['rebuild'] and not options['prune']:
+            raise CommandError('Nothing to do: pass --rebuild and/or --prune.')
+
+        if options['rebuild']:
+            key_rows, target_rows = rebuild_usage_rollups()
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt Gemini usage rollups: {key_rows} key-day rows, {target_rows} target rows'
+            ))
+
+        if options['prune']:
+            retention = options['retention_days'] or getattr(settings, 'GEMINI_USAGE_RETENTION_DAYS', 90)
+            deleted = prune_usage_logs(retention)
+            self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} raw Gemini usage rows older than {retention} days'))
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from search.visitor_rollups import prune_raw_visits, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the daily visitor heatmap rollups (visitor_geo_daily / visitor_country_daily) '
+        'from raw visitor_locations rows, optionally pruning raw rows past retention.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Rebuild this many days back, including today (default 30).')
+        parser.add_argument('--prune', action='store_true', default=False, help='Delete raw visitor rows older than the retention window.')
+        parser.add_argument(
+            '--retention-days', type=int, default=None,
+            help='Raw row retention for --prune (default VISITOR_RAW_RETENTION_DAYS).',
+        )
+        parser.add_argument('--skip-rebuild', action='store_true', default=False, help='Only prune; leave rollups untouched.')
+
+    def handle(self, *args, **options):
+        if not options['skip_rebuild']:
+            since = datetime.now().date() - timedelta(days=max(0, options['days'] - 1))
+            geo_rows, country_rows = rebuild_rollups(since)
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt rollups since {since}: {geo_rows} grid cells, {country_rows} country rows'
+            ))
+
+        if options['prune']:
+            retention = options['retention_days'] or getattr(settings, 'VISITOR_RAW_RETENTION_DAYS', 90)
+            if retention < options['days'] and not options['skip_rebuild']:
+                self.stdout.write(self.style.WARNING(
+                    f'Retention ({retention}d) is shorter than the rebuilt window ({options["days"]}d); '
+                    'older rollups can no longer be rebuilt after pruning.'
+                ))
+            deleted = prune_raw_visits(retention)
+            self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} raw visitor rows older than {retention} days'))
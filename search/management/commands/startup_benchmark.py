@@ -0,0 +1,124 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Imported in a fresh interpreter so nothing is already cached in sys.modules;
+# this is what a gunicorn worker pays on boot and on every --max-requests recycle.
+BOOT_SNIPPET = (
+    'import django; django.setup(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns'
+)
+
+PROJECT_PACKAGES = ('hebrewtool', 'search', 'translate')
+
+
+def _parse_importtime(stderr):
+    """Parse `python -X importtime` output into {module: (self_us, cumulative_us)}."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header row
+        name = parts[2].strip()
+        # A module can appear once per interpreter; keep the largest if it somehow repeats.
+        previous = timings.get(name)
+        if previous is None or cumulative_us > previous[1]:
+            timings[name] = (self_us, cumulative_us)
+    return timings
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure worker boot cost: runs django.setup() + URLconf loading in fresh '
+        'interpreters and reports wall time plus per-module import times.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help='Number of cold boots to time (default 3).')
+        parser.add_argument('--top', type=int, default=25, help='How many of the slowest modules to list.')
+        parser.add_argument('--project-only', action='store_true', default=False, help='Only list hebrewtool/search/translate modules.')
+        parser.add_argument('--json', action='store_true', default=False, help='Emit a JSON report instead of a table.')
+
+    def _boot_once(self, env):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SNIPPET],
+            cwd=str(settings.BASE_DIR),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if proc.returncode != 0:
+            tail = '\n'.join(proc.stderr.strip().splitlines()[-15:])
+            raise CommandError(f'Boot subprocess failed:\n{tail}')
+        return elapsed, _parse_importtime(proc.stderr)
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        top = max(1, options['top'])
+
+        env = os.environ.copy()
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'hebrewtool.settings')
+        # Never let the benchmark boot start the translation worker thread.
+        env.pop('RUN_MAIN', None)
+        env.pop('GUNICORN_WORKER', None)
+
+        wall_times = []
+        per_module = {}
+        for _ in range(repeat):
+            elapsed, timings = self._boot_once(env)
+            wall_times.append(elapsed)
+            for name, (self_us, cumulative_us) in timings.items():
+                per_module.setdefault(name, []).append((self_us, cumulative_us))
+
+        rows = []
+        for name, samples in per_module.items():
+            if options['project_only'] and name.split('.')[0] not in PROJECT_PACKAGES:
+                continue
+            rows.append({
+                'module': name,
+                'self_ms': round(statistics.median(s for s, _ in samples) / 1000, 2),
+                'cumulative_ms': round(statistics.median(c for _, c in samples) / 1000, 2),
+            })
+        rows.sort(key=lambda r: r['cumulative_ms'], reverse=True)
+
+        report = {
+            'python': sys.version.split()[0],
+            'runs': repeat,
+            'wall_ms': {
+                'median': round(statistics.median(wall_times) * 1000, 1),
+                'min': round(min(wall_times) * 1000, 1),
+                'max': round(max(wall_times) * 1000, 1),
+            },
+            'modules_imported': len(per_module),
+            'slowest_modules': rows[:top],
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        wall = report['wall_ms']
+        self.stdout.write(
+            f"Worker boot (django.setup + URLconf), {repeat} run(s): "
+            f"median {wall['median']} ms (min {wall['min']}, max {wall['max']}), "
+            f"{report['modules_imported']} modules imported"
+        )
+        self.stdout.write(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+        for row in report['slowest_modules']:
+            self.stdout.write(f"{row['cumulative_ms']:>14.2f} {row['self_ms']:>9.2f}  {row['module']}")
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0011_geminiusagelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorCountryDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('country', models.CharField(max_length=100)),
+                ('visits', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'visitor_country_daily',
+                'constraints': [models.UniqueConstraint(fields=('date', 'country'), name='visitor_country_daily_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VisitorGeoDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('lat_cell', models.IntegerField()),
+                ('lon_cell', models.IntegerField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('visits', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'visitor_geo_daily',
+                'constraints': [models.UniqueConstraint(fields=('date', 'lat_cell', 'lon_cell'), name='visitor_geo_daily_cell_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+def backfill_update_stats(apps, schema_editor):
+    from search.update_stats import rebuild_update_stats
+
+    rebuild_update_stats(
+        apps.get_model('search', 'TranslationUpdates'),
+        apps.get_model('search', 'UpdateStatsHourly'),
+        apps.get_model('search', 'UpdateStatsReferenceDaily'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0012_visitor_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpdateStatsHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(unique=True)),
+                ('updates', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'update_stats_hourly',
+            },
+        ),
+        migrations.CreateModel(
+            name='UpdateStatsReferenceDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('reference', models.CharField(max_length=255)),
+                ('updates', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'update_stats_reference_daily',
+                'constraints': [models.UniqueConstraint(fields=('date', 'reference'), name='update_stats_reference_daily_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_update_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0013_update_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChapterProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book', models.CharField(max_length=10)),
+                ('chapter', models.IntegerField()),
+                ('testament', models.CharField(max_length=2)),
+                ('total_verses', models.IntegerField(default=0)),
+                ('filled_verses', models.IntegerField(default=0)),
+                ('audited_verses', models.IntegerField(default=0)),
+                ('completed_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'chapter_progress',
+                'constraints': [models.UniqueConstraint(fields=('book', 'chapter'), name='chapter_progress_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChapterVerseFirstSave',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book', models.CharField(max_length=10)),
+                ('chapter', models.IntegerField()),
+                ('verse', models.IntegerField()),
+                ('first_saved', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'chapter_verse_first_saves',
+                'constraints': [models.UniqueConstraint(fields=('book', 'chapter', 'verse'), name='chapter_verse_first_saves_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.4 on 2026-10-19 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0014_chapter_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path_prefix', models.CharField(max_length=255)),
+                ('sample_rate', models.FloatField(default=0.05)),
+                ('max_profiles', models.IntegerField(default=20)),
+                ('profiles_taken', models.IntegerField(default=0)),
+                ('enabled', models.BooleanField(default=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.CharField(blank=True, max_length=150, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'profiling_rules',
+            },
+        ),
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(db_index=True, max_length=255)),
+                ('query_string', models.TextField(blank=True, default='')),
+                ('status_code', models.IntegerField(blank=True, null=True)),
+                ('duration_ms', models.FloatField(default=0)),
+                ('samples', models.IntegerField(default=0)),
+                ('interval_ms', models.FloatField(default=0)),
+                ('trigger', models.CharField(choices=[('manual', 'Manual (?_profile=1)'), ('sampled', 'Sampling rule')], default='manual', max_length=10)),
+                ('user', models.CharField(blank=True, max_length=150, null=True)),
+                ('filename', models.CharField(max_length=255)),
+                ('top_functions', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('rule', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profiles', to='search.profilingrule')),
+            ],
+            options={
+                'db_table': 'request_profiles',
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.4 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+def backfill_gemini_usage(apps, schema_editor):
+    from search.gemini_usage import rebuild_usage_rollups
+
+    rebuild_usage_rollups(
+        apps.get_model('search', 'GeminiUsageLog'),
+        apps.get_model('search', 'GeminiKeyDaily'),
+        apps.get_model('search', 'GeminiTargetUsage'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0015_request_profiling'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeminiKeyDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('api_key_abbrev', models.CharField(max_length=20)),
+                ('success_count', models.IntegerField(default=0)),
+                ('rate_limit_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'gemini_key_daily',
+                'constraints': [models.UniqueConstraint(fields=('date', 'api_key_abbrev'), name='gemini_key_daily_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GeminiTargetUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book', models.CharField(default='', max_length=50)),
+                ('chapter', models.IntegerField(default=0)),
+                ('language_code', models.CharField(max_length=10)),
+                ('requests', models.IntegerField(default=0)),
+                ('last_requested_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'gemini_target_usage',
+                'indexes': [models.Index(fields=['-requests'], name='gemini_target_requests_idx')],
+                'constraints': [models.UniqueConstraint(fields=('book', 'chapter', 'language_code'), name='gemini_target_usage_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_gemini_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.4 on 2026-10-19 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0016_gemini_usage_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NorthflankStatsPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_id', models.CharField(max_length=100)),
+                ('ts', models.BigIntegerField()),
+                ('resolution', models.IntegerField(default=0)),
+                ('running_services', models.FloatField(default=0)),
+                ('paused_services', models.FloatField(default=0)),
+                ('running_addons', models.FloatField(default=0)),
+                ('paused_addons', models.FloatField(default=0)),
+            ],
+            options={
+                'db_table': 'northflank_stats_points',
+                'indexes': [models.Index(fields=['project_id', 'ts'], name='northflank_points_range_idx')],
+                'constraints': [models.UniqueConstraint(fields=('project_id', 'resolution', 'ts'), name='northflank_stats_points_uniq')],
+            },
+        ),
+    ]
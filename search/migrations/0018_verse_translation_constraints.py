@@ -0,0 +1,32 @@
+# Generated by Django 5.0.4 on 2026-10-19 12:50
+
+from django.db import migrations, models
+
+
+def dedupe_translations(apps, schema_editor):
+    from search.translation_store import dedupe_verse_translations
+
+    dedupe_verse_translations(apps.get_model('search', 'VerseTranslation'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0017_northflank_stats_points'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_translations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='versetranslation',
+            index=models.Index(fields=['book', 'chapter', 'language_code', 'status'], include=('verse', 'footnote_id'), name='idx_vt_chapter_lang_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='versetranslation',
+            constraint=models.UniqueConstraint(condition=models.Q(('footnote_id__isnull', True)), fields=('book', 'chapter', 'verse', 'language_code'), name='verse_translation_verse_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='versetranslation',
+            constraint=models.UniqueConstraint(condition=models.Q(('footnote_id__isnull', False)), fields=('language_code', 'footnote_id', 'book', 'chapter'), name='verse_translation_footnote_uniq'),
+        ),
+    ]
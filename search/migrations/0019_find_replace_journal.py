@@ -0,0 +1,44 @@
+# Generated by Django 5.0.4 on 2026-10-19 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0018_verse_translation_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplacementBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.CharField(blank=True, max_length=150, null=True)),
+                ('description', models.CharField(blank=True, default='', max_length=255)),
+                ('row_count', models.IntegerField(default=0)),
+                ('undone_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'find_replace_batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReplacementJournal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(max_length=30)),
+                ('row_key', models.CharField(max_length=100)),
+                ('old_text', models.TextField(blank=True, null=True)),
+                ('new_md5', models.CharField(max_length=32)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='search.replacementbatch')),
+            ],
+            options={
+                'db_table': 'find_replace_journal',
+                'indexes': [models.Index(fields=['batch', 'target'], name='find_replace_journal_idx')],
+            },
+        ),
+    ]
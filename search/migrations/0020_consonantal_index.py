@@ -0,0 +1,55 @@
+# Generated by Django 5.0.4 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+def build_consonantal_index(apps, schema_editor):
+    # The corpus tables are not managed by migrations; skip when they are absent
+    # (fresh or SQLite databases) and build later with `manage.py build_consonantal_index`.
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('old_testament.ot_consonantal'), to_regclass('old_testament.ot')")
+        if None in cursor.fetchone():
+            return
+
+    from search.consonantal_search import build_index
+
+    build_index(apps.get_model('search', 'ConsonantalVerse'), apps.get_model('search', 'ConsonantalGram'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0019_find_replace_journal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsonantalGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3, unique=True)),
+                ('postings', models.BinaryField()),
+            ],
+            options={
+                'db_table': 'consonantal_grams',
+            },
+        ),
+        migrations.CreateModel(
+            name='ConsonantalVerse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField(unique=True)),
+                ('ref', models.CharField(max_length=30, unique=True)),
+                ('hebrew', models.TextField()),
+                ('normalized', models.TextField()),
+            ],
+            options={
+                'db_table': 'consonantal_verses',
+                'ordering': ['position'],
+            },
+        ),
+        migrations.RunPython(build_consonantal_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.4 on 2026-10-19 13:35
+
+from django.db import migrations, models
+
+
+def build_concordance(apps, schema_editor):
+    # The corpus tables are not managed by migrations; skip when they are absent
+    # (fresh or SQLite databases) and build later with `manage.py build_concordance`.
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT to_regclass('old_testament.hebrewdata'), to_regclass('old_testament.ot'), "
+            "to_regclass('rbt_greek.strongs_greek')"
+        )
+        if None in cursor.fetchone():
+            return
+
+    from search.concordance import build_concordance as build
+
+    build(apps.get_model('search', 'ConcordanceEntry'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0020_consonantal_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConcordanceEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('strongs', models.CharField(max_length=10)),
+                ('variant', models.CharField(blank=True, max_length=3)),
+                ('lemma', models.CharField(blank=True, max_length=100)),
+                ('testament', models.CharField(max_length=2)),
+                ('book', models.CharField(max_length=10)),
+                ('chapter', models.IntegerField()),
+                ('verse', models.IntegerField()),
+                ('word', models.SmallIntegerField()),
+                ('segment', models.SmallIntegerField(default=0)),
+                ('source_id', models.IntegerField()),
+                ('morph', models.CharField(blank=True, max_length=30)),
+                ('english', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'concordance_entries',
+                'ordering': ['id'],
+                'indexes': [
+                    models.Index(fields=['strongs', 'id'], name='concordance_strongs_idx'),
+                    models.Index(fields=['lemma', 'id'], name='concordance_lemma_idx'),
+                    models.Index(fields=['testament', 'source_id'], name='concordance_source_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(build_concordance, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.4 on 2026-10-19 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0021_concordance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQueryDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('query', models.CharField(max_length=100)),
+                ('searches', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'search_queries_daily',
+                'constraints': [
+                    models.UniqueConstraint(fields=('date', 'query'), name='search_queries_daily_uniq'),
+                ],
+            },
+        ),
+    ]
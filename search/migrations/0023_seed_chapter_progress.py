@@ -0,0 +1,38 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:05
+
+from django.db import migrations
+
+
+def seed_chapter_progress(apps, schema_editor):
+    # The NT/OT verse tables are not managed by migrations; skip when they are absent
+    # (fresh or SQLite databases) and seed later with `manage.py rebuild_chapter_progress`.
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('new_testament.nt'), to_regclass('old_testament.ot')")
+        if None in cursor.fetchone():
+            return
+
+    ChapterProgress = apps.get_model('search', 'ChapterProgress')
+    if ChapterProgress.objects.exists():
+        return
+
+    from search.chapter_progress import rebuild_chapter_progress
+
+    rebuild_chapter_progress(
+        apps.get_model('search', 'TranslationUpdates'),
+        ChapterProgress,
+        apps.get_model('search', 'ChapterVerseFirstSave'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0022_search_queries_daily'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_chapter_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0023_seed_chapter_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchquerydaily',
+            name='visitors',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='SearchQueryVisitor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('query', models.CharField(max_length=100)),
+                ('visitor', models.CharField(max_length=32)),
+            ],
+            options={
+                'db_table': 'search_query_visitors',
+                'constraints': [
+                    models.UniqueConstraint(fields=('date', 'query', 'visitor'), name='search_query_visitors_uniq'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:35
+
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_visitor_rollups(apps, schema_editor):
+    from search.visitor_rollups import rebuild_rollups
+
+    # 0012 created the rollup tables empty; /visitor_locations/ reads only them.
+    rebuild_rollups(
+        date.today() - timedelta(days=getattr(settings, 'VISITOR_RAW_RETENTION_DAYS', 90)),
+        None,
+        apps.get_model('search', 'VisitorLocation'),
+        apps.get_model('search', 'VisitorGeoDaily'),
+        apps.get_model('search', 'VisitorCountryDaily'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0024_search_query_visitors'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_visitor_rollups, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # Django genesis database 
 class Genesis(models.Model):
@@ -75,6 +76,76 @@ class TranslationUpdates(models.Model):
         return f"Date {self.date}, Reference {self.reference}, Update {self.update_text}"
 
 
+class UpdateStatsHourly(models.Model):
+    """Number of TranslationUpdates rows per clock hour (rollup for /statistics/)."""
+
+    hour = models.DateTimeField(unique=True)
+    updates = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'update_stats_hourly'
+
+    def __str__(self):
+        return f"{self.hour}: {self.updates}"
+
+
+class UpdateStatsReferenceDaily(models.Model):
+    """Number of TranslationUpdates rows per reference per day (rollup for /statistics/)."""
+
+    date = models.DateField()
+    reference = models.CharField(max_length=255)
+    updates = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'update_stats_reference_daily'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'reference'], name='update_stats_reference_daily_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.reference}: {self.updates}"
+
+
+class ChapterVerseFirstSave(models.Model):
+    """Earliest TranslationUpdates date for each verse (see search/chapter_progress.py)."""
+
+    book = models.CharField(max_length=10)
+    chapter = models.IntegerField()
+    verse = models.IntegerField()
+    first_saved = models.DateTimeField()
+
+    class Meta:
+        db_table = 'chapter_verse_first_saves'
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'chapter', 'verse'], name='chapter_verse_first_saves_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.book} {self.chapter}:{self.verse} ({self.first_saved})"
+
+
+class ChapterProgress(models.Model):
+    """Per-chapter filled/audited verse counts and completion date."""
+
+    book = models.CharField(max_length=10)
+    chapter = models.IntegerField()
+    testament = models.CharField(max_length=2)
+    total_verses = models.IntegerField(default=0)
+    filled_verses = models.IntegerField(default=0)
+    audited_verses = models.IntegerField(default=0)
+    completed_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'chapter_progress'
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'chapter'], name='chapter_progress_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.book} {self.chapter}: {self.filled_verses}/{self.total_verses}"
+
+
 class VerseTranslation(models.Model):
     """Multi-lingual translations for verses and footnotes"""
     
@@ -99,6 +170,25 @@ class VerseTranslation(models.Model):
         db_table = 'verse_translations'
         indexes = [
             models.Index(fields=['book', 'chapter', 'verse', 'language_code'], name='idx_verse_lang'),
+            # Chapter overlays and "which verses exist" checks (see search/translation_overlay.py)
+            models.Index(
+                fields=['book', 'chapter', 'language_code', 'status'],
+                include=['verse', 'footnote_id'],
+                name='idx_vt_chapter_lang_status',
+            ),
+        ]
+        # One row per verse and per footnote (see search/translation_store.py)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['book', 'chapter', 'verse', 'language_code'],
+                condition=models.Q(footnote_id__isnull=True),
+                name='verse_translation_verse_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['language_code', 'footnote_id', 'book', 'chapter'],
+                condition=models.Q(footnote_id__isnull=False),
+                name='verse_translation_footnote_uniq',
+            ),
         ]
     
     def __str__(self):
@@ -207,6 +297,43 @@ class VisitorLocation(models.Model):
         return f"{self.country} - {self.city} ({self.timestamp})"
 
 
+class VisitorGeoDaily(models.Model):
+    """Daily visit counts per heatmap grid cell (rollup of VisitorLocation)."""
+
+    date = models.DateField()
+    lat_cell = models.IntegerField()
+    lon_cell = models.IntegerField()
+    latitude = models.FloatField()  # cell centre
+    longitude = models.FloatField()
+    visits = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'visitor_geo_daily'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'lat_cell', 'lon_cell'], name='visitor_geo_daily_cell_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} ({self.latitude}, {self.longitude}): {self.visits}"
+
+
+class VisitorCountryDaily(models.Model):
+    """Daily visit counts per country (rollup of VisitorLocation)."""
+
+    date = models.DateField()
+    country = models.CharField(max_length=100)
+    visits = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'visitor_country_daily'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'country'], name='visitor_country_daily_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.country}: {self.visits}"
+
+
 class AeonCorpusSource(models.Model):
     """Tracks source documents ingested into Aeon Bot corpus."""
 
@@ -278,3 +405,250 @@ class GeminiUsageLog(models.Model):
     class Meta:
         db_table = 'gemini_usage_logs'
 
+
+class GeminiKeyDaily(models.Model):
+    """Daily Gemini call counts per API key by outcome (rollup of GeminiUsageLog)."""
+
+    date = models.DateField()
+    api_key_abbrev = models.CharField(max_length=20)
+    success_count = models.IntegerField(default=0)
+    rate_limit_count = models.IntegerField(default=0)  # 429s
+    error_count = models.IntegerField(default=0)  # any other failure
+
+    class Meta:
+        db_table = 'gemini_key_daily'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'api_key_abbrev'], name='gemini_key_daily_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.api_key_abbrev}: {self.success_count}/{self.rate_limit_count}/{self.error_count}"
+
+
+class GeminiTargetUsage(models.Model):
+    """Successful Gemini calls per book/chapter/language (rollup of GeminiUsageLog)."""
+
+    book = models.CharField(max_length=50, default='')  # '' when the call had no book
+    chapter = models.IntegerField(default=0)  # 0 when the call had no chapter
+    language_code = models.CharField(max_length=10)
+    requests = models.IntegerField(default=0)
+    last_requested_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'gemini_target_usage'
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'chapter', 'language_code'], name='gemini_target_usage_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['-requests'], name='gemini_target_requests_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.book} {self.chapter} ({self.language_code}): {self.requests}"
+
+
+
+class ProfilingRule(models.Model):
+    """Profile a sampled fraction of requests under a path prefix (see hebrewtool/profiling.py)."""
+
+    path_prefix = models.CharField(max_length=255)
+    sample_rate = models.FloatField(default=0.05)  # 0..1 share of matching requests
+    max_profiles = models.IntegerField(default=20)
+    profiles_taken = models.IntegerField(default=0)
+    enabled = models.BooleanField(default=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+    created_by = models.CharField(max_length=150, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'profiling_rules'
+
+    @classmethod
+    def active(cls):
+        return cls.objects.filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=timezone.now()),
+            enabled=True,
+            profiles_taken__lt=models.F('max_profiles'),
+        )
+
+    def __str__(self):
+        return f"{self.path_prefix} @ {self.sample_rate:.0%} ({self.profiles_taken}/{self.max_profiles})"
+
+
+class RequestProfile(models.Model):
+    """One sampled request profile; the collapsed stacks live in PROFILER_DIR/<filename>."""
+
+    TRIGGER_CHOICES = [
+        ('manual', 'Manual (?_profile=1)'),
+        ('sampled', 'Sampling rule'),
+    ]
+
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255, db_index=True)
+    query_string = models.TextField(blank=True, default='')
+    status_code = models.IntegerField(blank=True, null=True)
+    duration_ms = models.FloatField(default=0)
+    samples = models.IntegerField(default=0)
+    interval_ms = models.FloatField(default=0)
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES, default='manual')
+    rule = models.ForeignKey(ProfilingRule, on_delete=models.SET_NULL, blank=True, null=True, related_name='profiles')
+    user = models.CharField(max_length=150, blank=True, null=True)
+    filename = models.CharField(max_length=255)
+    top_functions = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'request_profiles'
+
+    def __str__(self):
+        return f"{self.method} {self.path} {self.duration_ms:.0f}ms ({self.created_at})"
+
+
+class NorthflankStatsPoint(models.Model):
+    """One point of the Northflank uptime history (see search/northflank_history.py)."""
+
+    project_id = models.CharField(max_length=100)
+    ts = models.BigIntegerField()  # epoch seconds (bucket start for downsampled points)
+    resolution = models.IntegerField(default=0)  # 0 = raw, else bucket width in seconds
+    running_services = models.FloatField(default=0)
+    paused_services = models.FloatField(default=0)
+    running_addons = models.FloatField(default=0)
+    paused_addons = models.FloatField(default=0)
+
+    class Meta:
+        db_table = 'northflank_stats_points'
+        constraints = [
+            models.UniqueConstraint(fields=['project_id', 'resolution', 'ts'], name='northflank_stats_points_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['project_id', 'ts'], name='northflank_points_range_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} @ {self.ts} ({self.resolution or 'raw'})"
+
+
+class ReplacementBatch(models.Model):
+    """One approved find-and-replace run; its undo journal is in ReplacementJournal (search/find_replace.py)."""
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    user = models.CharField(max_length=150, blank=True, null=True)
+    description = models.CharField(max_length=255, blank=True, default='')
+    row_count = models.IntegerField(default=0)
+    undone_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'find_replace_batches'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"ReplacementBatch {self.pk} {self.description!r} rows={self.row_count}"
+
+
+class ReplacementJournal(models.Model):
+    """Pre-replacement value of one row changed by a ReplacementBatch."""
+
+    batch = models.ForeignKey(ReplacementBatch, on_delete=models.CASCADE, related_name='entries')
+    target = models.CharField(max_length=30)  # key of search.find_replace.TARGETS
+    row_key = models.CharField(max_length=100)
+    old_text = models.TextField(blank=True, null=True)
+    new_md5 = models.CharField(max_length=32)  # md5 of the replacement; undo skips rows edited since
+
+    class Meta:
+        db_table = 'find_replace_journal'
+        indexes = [
+            models.Index(fields=['batch', 'target'], name='find_replace_journal_idx'),
+        ]
+
+
+class ConsonantalVerse(models.Model):
+    """One old_testament.ot_consonantal verse in the consonantal search index (search/consonantal_search.py)."""
+
+    position = models.IntegerField(unique=True)  # canonical OT order; the keyset cursor
+    ref = models.CharField(max_length=30, unique=True)
+    hebrew = models.TextField()  # as stored in ot_consonantal
+    normalized = models.TextField()  # letters only, final forms folded, single spaces
+
+    class Meta:
+        db_table = 'consonantal_verses'
+        ordering = ['position']
+
+    def __str__(self):
+        return self.ref
+
+
+class ConsonantalGram(models.Model):
+    """Posting list of one letter bigram/trigram: the sorted positions of the verses containing it."""
+
+    gram = models.CharField(max_length=3, unique=True)
+    postings = models.BinaryField()  # array('I') of ConsonantalVerse.position
+
+    class Meta:
+        db_table = 'consonantal_grams'
+
+    def __str__(self):
+        return self.gram
+
+
+class ConcordanceEntry(models.Model):
+    """One Strong's-tagged word of hebrewdata/strongs_greek in the concordance (search/concordance.py)."""
+
+    strongs = models.CharField(max_length=10)  # normalized: 'H430', 'G2316' (no zero padding, no variant letter)
+    variant = models.CharField(max_length=3, blank=True)  # hebrewdata letter suffix, e.g. the 'a' of H5921a
+    lemma = models.CharField(max_length=100, blank=True)
+    testament = models.CharField(max_length=2)  # 'OT' or 'NT'
+    book = models.CharField(max_length=10)
+    chapter = models.IntegerField()
+    verse = models.IntegerField()
+    word = models.SmallIntegerField()  # the -NN word number of the source ref
+    segment = models.SmallIntegerField(default=0)  # morpheme within a hebrewdata word (prefixes first)
+    source_id = models.IntegerField()  # old_testament.hebrewdata.id / rbt_greek.strongs_greek.id
+    morph = models.CharField(max_length=30, blank=True)
+    english = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'concordance_entries'
+        ordering = ['id']  # ids are assigned in canonical order; the keyset cursor
+        indexes = [
+            models.Index(fields=['strongs', 'id'], name='concordance_strongs_idx'),
+            models.Index(fields=['lemma', 'id'], name='concordance_lemma_idx'),
+            models.Index(fields=['testament', 'source_id'], name='concordance_source_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.strongs}{self.variant} {self.book}.{self.chapter}.{self.verse}-{self.word:02d}"
+
+
+class SearchQueryDaily(models.Model):
+    """Successful search_api queries and distinct visitors per (day, query); popular ones feed search/suggestion_index.py."""
+
+    date = models.DateField()
+    query = models.CharField(max_length=100)  # lowercased, whitespace collapsed
+    searches = models.IntegerField(default=0)
+    visitors = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'search_queries_daily'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'query'], name='search_queries_daily_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.query}: {self.searches}"
+
+
+class SearchQueryVisitor(models.Model):
+    """Today's (query, visitor) pairs, so SearchQueryDaily.visitors counts each visitor once; older days are pruned."""
+
+    date = models.DateField()
+    query = models.CharField(max_length=100)
+    visitor = models.CharField(max_length=32)  # keyed hash of the client IP and the day
+
+    class Meta:
+        db_table = 'search_query_visitors'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'query', 'visitor'], name='search_query_visitors_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.query}: {self.visitor}"
@@ -0,0 +1,92 @@
+"""
+Append-only time series for the Northflank uptime chart.
+
+The history used to be one cached list of up to 2000 dicts that every stats
+refresh read, re-parsed (ISO timestamps), filtered and wrote back, and every
+request parsed again to cut out its lookback window. It is now a table of
+fixed-width rows, northflank_stats_points: epoch-second timestamp, resolution
+and the four counters.
+
+- append_point() is one INSERT, plus maintenance that only does work once per
+  downsampling bucket.
+- Raw points older than NORTHFLANK_STATS_HISTORY_HOURS are averaged into
+  NORTHFLANK_STATS_DOWNSAMPLE_SECONDS buckets (resolution = bucket width).
+- Points older than NORTHFLANK_STATS_RETENTION_HOURS are deleted.
+- query_points() is a range scan on (project_id, ts) returning only the rows
+  in the window, oldest first, in the chart's {"timestamp", ...} format.
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+
+from django.db import connection, transaction
+
+FIELDS = ('running_services', 'paused_services', 'running_addons', 'paused_addons')
+
+RAW_RETENTION_SECONDS = int(os.getenv('NORTHFLANK_STATS_HISTORY_HOURS', '24')) * 3600
+DOWNSAMPLE_SECONDS = int(os.getenv('NORTHFLANK_STATS_DOWNSAMPLE_SECONDS', '3600'))
+RETENTION_SECONDS = int(os.getenv('NORTHFLANK_STATS_RETENTION_HOURS', '168')) * 3600
+
+
+def _isoformat(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat() + 'Z'
+
+
+def _number(value):
+    return int(value) if float(value).is_integer() else round(value, 2)
+
+
+def append_point(project_id, values, ts=None):
+    """Store one raw point ({field: count}) for project_id at ts (default now)."""
+    from search.models import NorthflankStatsPoint
+
+    ts = int(ts if ts is not None else time.time())
+    NorthflankStatsPoint.objects.create(
+        project_id=project_id, ts=ts, resolution=0,
+        **{field: values.get(field, 0) for field in FIELDS},
+    )
+    compact(project_id, ts)
+
+
+def compact(project_id, now):
+    """
+    Downsample raw points of whole buckets older than the raw window and drop
+    points past retention. The cutoff is aligned to a bucket boundary so each
+    bucket is averaged exactly once; between boundaries this is an index probe.
+    """
+    from search.models import NorthflankStatsPoint
+
+    cutoff = (now - RAW_RETENTION_SECONDS) // DOWNSAMPLE_SECONDS * DOWNSAMPLE_SECONDS
+    raw = NorthflankStatsPoint.objects.filter(project_id=project_id, resolution=0)
+    with transaction.atomic():
+        if raw.filter(ts__lt=cutoff).exists():
+            averages = ', '.join(f'AVG({field})' for field in FIELDS)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO northflank_stats_points (project_id, ts, resolution, {', '.join(FIELDS)})
+                    SELECT project_id, (ts / %s) * %s, %s, {averages}
+                    FROM northflank_stats_points
+                    WHERE project_id = %s AND resolution = 0 AND ts < %s
+                    GROUP BY project_id, (ts / %s) * %s
+                    ON CONFLICT (project_id, resolution, ts) DO NOTHING
+                    """,
+                    [DOWNSAMPLE_SECONDS, DOWNSAMPLE_SECONDS, DOWNSAMPLE_SECONDS,
+                     project_id, cutoff, DOWNSAMPLE_SECONDS, DOWNSAMPLE_SECONDS],
+                )
+            raw.filter(ts__lt=cutoff).delete()
+        NorthflankStatsPoint.objects.filter(project_id=project_id, ts__lt=now - RETENTION_SECONDS).delete()
+
+
+def query_points(project_id, since, until=None):
+    """Points with since <= ts (< until), oldest first, as chart dicts."""
+    from search.models import NorthflankStatsPoint
+
+    rows = NorthflankStatsPoint.objects.filter(project_id=project_id, ts__gte=int(since))
+    if until is not None:
+        rows = rows.filter(ts__lt=int(until))
+    return [
+        {'timestamp': _isoformat(row[0]), **{field: _number(value) for field, value in zip(FIELDS, row[1:])}}
+        for row in rows.order_by('ts').values_list('ts', *FIELDS)
+    ]
@@ -0,0 +1,143 @@
+"""
+Query planning for search_api and search_results_page.
+
+plan_query() turns a query into a QueryPlan once per distinct (query, scope,
+type): its whitespace-normalized tokens, the detected script, the parsed
+Bible references and the search categories worth running, each with the
+columns it should match. Plans and reference parses are memoized, so paging,
+repeat searches and the API call made by the results page parse once.
+
+Categories are pruned by script: each searches only the columns that can
+hold the query's script (English columns for Latin queries, Hebrew columns
+for Hebrew, Greek for Greek). A Latin query no longer scans combined_heb
+and a Hebrew query no longer scans the English html/rbt columns. Footnotes
+mix languages and are searched for every script. References are only parsed
+for Latin-script queries, since pythonbible only knows English book names.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import pythonbible as bible
+
+from search.seo_utils import _get_verse_url, book_to_slug
+from search.views.utils import detect_script, strip_hebrew_vowels
+
+PLAN_CACHE_SIZE = 1024
+
+SCRIPTS = ('latin', 'hebrew', 'greek')
+
+# category -> (scopes that include it, {script: columns matched})
+CATEGORIES = {
+    'genesis': (('all', 'ot', 'english'), {'latin': ('html', 'rbt_reader'), 'hebrew': ('hebrew',)}),
+    'ot_verses': (('all', 'ot', 'english'), {'latin': ('html', 'literal')}),
+    'hebrewdata': (('all', 'ot', 'hebrew'), {'latin': ('Eng',), 'hebrew': ('combined_heb', 'combined_heb_niqqud')}),
+    'ot_consonantal': (('all', 'ot', 'hebrew'), {'hebrew': ('hebrew',)}),
+    'nt_verses': (('all', 'nt', 'english'), {'latin': ('rbt',), 'greek': ('verseText',)}),
+    'nt_greek': (('all', 'nt', 'greek'), {'latin': ('english',), 'greek': ('lemma',)}),
+    # Footnotes span many tables and languages; search_api only asks whether they run
+    'footnotes': (('all', 'footnotes'), {script: ('footnote',) for script in SCRIPTS}),
+    'aseneth': (('all', 'storehouse'), {'latin': ('english',), 'greek': ('greek',)}),
+    'judas_prose': (('all', 'storehouse'), {'latin': ('content', 'scene_title')}),
+    'judas_interlinear': (('all', 'storehouse'), {
+        'latin': ('english', 'coptic', 'notes'),
+        'greek': ('greek', 'coptic', 'notes'),
+        'hebrew': ('notes',),
+    }),
+}
+
+# Consonantal columns are matched with the vowel-stripped query
+STRIPPED_COLUMNS = {('hebrewdata', 'combined_heb'), ('ot_consonantal', 'hebrew')}
+
+NON_ASCII = re.compile(r'[^\x00-\x7F]')
+
+
+class QueryPlan(namedtuple('QueryPlan', 'query tokens script stripped search_type references translations_only categories')):
+    """
+    A planned search. Plans are cached and shared between requests: treat
+    them, and the reference dicts they hold, as read-only.
+    """
+
+    __slots__ = ()
+
+    def runs(self, category):
+        return category in self.categories
+
+    def columns(self, category):
+        return self.categories.get(category, ())
+
+    def where(self, category):
+        """SQL condition and parameters matching the query in the category's columns."""
+        columns = self.columns(category)
+        params = [
+            f'%{self.stripped if (category, column) in STRIPPED_COLUMNS else self.query}%'
+            for column in columns
+        ]
+        return ' OR '.join(f'{column} ILIKE %s' for column in columns), params
+
+
+def _display_book(name):
+    if name == 'SONG_OF_SONGS':
+        return 'Song of Solomon'
+    if name.endswith('_1'):
+        return '1 ' + name[:-2].capitalize()
+    if name.endswith('_2'):
+        return '2 ' + name[:-2].capitalize()
+    return name.replace('_', ' ').title()
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _references(query):
+    try:
+        refs = bible.get_references(query)
+    except Exception:
+        return ()
+    if not refs:
+        return ()
+    ref = refs[0]
+    book_name = _display_book(ref.book.name)
+    return ({
+        'type': 'reference',
+        'book': book_name,
+        'chapter': ref.start_chapter,
+        'verse': ref.start_verse,
+        'url': _get_verse_url('en', book_name, ref.start_chapter, ref.start_verse) if ref.start_verse else f'/{book_to_slug(book_name)}/{ref.start_chapter}/',
+        'display': f'{book_name} {ref.start_chapter}' + (f':{ref.start_verse}' if ref.start_verse else ''),
+    },)
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _plan(query, scope, search_type):
+    tokens = tuple(query.split())
+    script = detect_script(query)
+    stripped = strip_hebrew_vowels(query) if script['hebrew'] else query
+    translations_only = bool(NON_ASCII.search(query)) and script['latin'] and scope == 'all'
+
+    references = ()
+    if search_type in ('auto', 'reference') and script['latin']:
+        references = _references(query)
+    if search_type == 'auto':
+        search_type = 'reference' if references else 'keyword'
+
+    # A recognised reference answers the query; otherwise run every category
+    # in scope that has columns for the query's script
+    categories = {}
+    if not references and not translations_only:
+        scripts = [name for name in SCRIPTS if script[name]]
+        for category, (scopes, columns_by_script) in CATEGORIES.items():
+            if scope not in scopes:
+                continue
+            columns = []
+            for name in scripts:
+                columns += [column for column in columns_by_script.get(name, ()) if column not in columns]
+            if columns:
+                categories[category] = tuple(columns)
+
+    return QueryPlan(query, tokens, script, stripped, search_type, references, translations_only, categories)
+
+
+def plan_query(query, scope='all', search_type='auto'):
+    """The (memoized) QueryPlan for a search."""
+    normalized = ' '.join((query or '').split())
+    return _plan(normalized, (scope or 'all').lower(), search_type or 'auto')
@@ -0,0 +1,120 @@
+"""
+Keyset pagination for search_api.
+
+Every search source (a table, or one NT footnote table) is read in a fixed
+sort order and paged with a seek, `WHERE (sort key) > (last key)`, instead of
+OFFSET, so a deep page reads no more rows than page 1. Sources are named
+'<category>:<table>'. The last key of each source with rows left travels in
+an opaque, signed continuation token, together with the page number and the
+first page's counts. search_api returns one token for the whole search
+(`next_cursor`) and one per category (`cursors`).
+
+Counts are approximate-first: page 1 counts matches up to SEARCH_COUNT_LIMIT
+and reports anything above it as the limit (the category is then listed in
+`approximate_counts`). Later pages reuse those counts and run no COUNT query.
+"""
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+
+SALT = 'search.cursor'
+
+
+def count_limit():
+    return getattr(settings, 'SEARCH_COUNT_LIMIT', 1000)
+
+
+def seek(columns, after):
+    """SQL condition continuing after the key `after` in `columns` order, and its params."""
+    if after is None:
+        return 'TRUE', []
+    return f"({', '.join(columns)}) > ({', '.join(['%s'] * len(columns))})", list(after)
+
+
+def seek_q(fields, after):
+    """seek() for a queryset ordered by `fields`."""
+    if after is None:
+        return Q()
+    condition = Q()
+    for position, field in enumerate(fields):
+        equal = {earlier: value for earlier, value in zip(fields[:position], after)}
+        condition |= Q(**equal, **{f'{field}__gt': after[position]})
+    return condition
+
+
+def capped_count_sql(table, where):
+    """COUNT(*) of the matches that stops after count_limit() + 1 rows; pass that as the last param."""
+    return f'SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {where} LIMIT %s) capped'
+
+
+class SearchCursor:
+    """Where a search continues: the last key per source, the page number and the carried counts."""
+
+    def __init__(self, query, scope, page=1, positions=None, counts=None, approximate=()):
+        self.query = query
+        self.scope = scope
+        self.page = page
+        # None: first request, every source starts at the beginning
+        self.positions = positions
+        self.counts = dict(counts or {})
+        self.approximate = set(approximate)
+        self.next_positions = {}
+
+    @classmethod
+    def load(cls, token, query, scope):
+        try:
+            state = signing.loads(token, salt=SALT)
+        except signing.BadSignature:
+            raise ValueError('Invalid cursor')
+        if state.get('q') != query or state.get('s') != scope:
+            raise ValueError('Cursor belongs to a different search')
+        return cls(query, scope, state['n'], state['p'], state['c'], state['a'])
+
+    @property
+    def fresh(self):
+        return self.positions is None
+
+    def runs(self, source):
+        """True if source has rows left for this page."""
+        return self.fresh or source in self.positions
+
+    def after(self, source):
+        """Last key read from source, or None to start at the beginning."""
+        return None if self.fresh else self.positions.get(source)
+
+    def page_rows(self, source, rows, limit, key):
+        """Trim rows fetched with LIMIT limit + 1 to the page and note where source continues."""
+        rows = list(rows or [])
+        if len(rows) > limit:
+            rows = rows[:limit]
+            self.next_positions[source] = list(key(rows[-1]))
+        return rows
+
+    def count(self, category, found):
+        """Add a capped count (see capped_count_sql) to the category's first-page count."""
+        if found > count_limit():
+            found = count_limit()
+            self.approximate.add(category)
+        self.counts[category] = self.counts.get(category, 0) + found
+
+    @property
+    def has_more(self):
+        return bool(self.next_positions)
+
+    def token(self, category=None):
+        """Continuation token for the next page, of one category or of all; None when done."""
+        positions = {
+            source: key for source, key in self.next_positions.items()
+            if category is None or source.startswith(f'{category}:')
+        }
+        if not positions:
+            return None
+        return signing.dumps({
+            'q': self.query,
+            's': self.scope,
+            'n': self.page + 1,
+            'p': positions,
+            'c': self.counts,
+            'a': sorted(self.approximate),
+        }, salt=SALT, compress=True)
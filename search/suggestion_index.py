@@ -0,0 +1,459 @@
+"""
+In-memory prefix index for search_suggestions (/api/suggest/).
+
+The index is built once per process (warmed from SearchConfig.ready, or on
+the first request) and answers each keystroke without touching the
+database. It holds:
+- the 66 book names, which double as their SEO slugs, plus every alias and
+  abbreviation in book_abbreviations ('1Samuel', 'Samuel_1', '1Sa'...) and the
+  storehouse titles
+- Hebrew lemmas from the Strong's dictionary and Greek lemmas from
+  strongs_greek, keyed by lemma, transliteration and Strong's number and
+  weighted by their frequency in the text
+- popular past queries from search_queries_daily: record_search() counts the
+  searches of search_api that found something and the distinct visitors who
+  ran them, and only queries from POPULAR_MIN_VISITORS different visitors are
+  suggested, so one client cannot publish a query by repeating it
+
+Keys are folded (lowercase, accents/niqqud stripped, final letters folded,
+'_'/'-' as spaces) and kept in one sorted array; lookup() bisects to the
+prefix range. Top suggestions for prefixes of up to SHORT_PREFIX characters
+are precomputed, so the widest ranges are a dict hit. Books come first, then
+popular queries, then lexicon words. The index is rebuilt in the background
+every SEARCH_SUGGEST_REFRESH_SECONDS to pick up new popular queries.
+
+Searches are counted off the request path: record_search() only adds to an
+in-memory buffer, which one thread per process writes every
+SEARCH_SUGGEST_FLUSH_INTERVAL seconds (like search.gemini_usage).
+"""
+
+import atexit
+import bisect
+import hashlib
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Sum
+
+from search.concordance import normalize_strongs
+from search.seo_utils import book_to_slug
+from translate.translator import book_abbreviations
+
+logger = logging.getLogger(__name__)
+
+BOOK_NAMES = (
+    'Genesis', 'Exodus', 'Leviticus', 'Numbers', 'Deuteronomy',
+    'Joshua', 'Judges', 'Ruth', '1 Samuel', '2 Samuel', '1 Kings', '2 Kings',
+    '1 Chronicles', '2 Chronicles', 'Ezra', 'Nehemiah', 'Esther', 'Job',
+    'Psalms', 'Proverbs', 'Ecclesiastes', 'Song of Solomon', 'Isaiah',
+    'Jeremiah', 'Lamentations', 'Ezekiel', 'Daniel', 'Hosea', 'Joel',
+    'Amos', 'Obadiah', 'Jonah', 'Micah', 'Nahum', 'Habakkuk', 'Zephaniah',
+    'Haggai', 'Zechariah', 'Malachi', 'Matthew', 'Mark', 'Luke', 'John',
+    'Acts', 'Romans', '1 Corinthians', '2 Corinthians', 'Galatians',
+    'Ephesians', 'Philippians', 'Colossians', '1 Thessalonians',
+    '2 Thessalonians', '1 Timothy', '2 Timothy', 'Titus', 'Philemon',
+    'Hebrews', 'James', '1 Peter', '2 Peter', '1 John', '2 John', '3 John',
+    'Jude', 'Revelation',
+)
+
+# Apocryphal / Storehouse books
+STOREHOUSE_BOOKS = (
+    ('Joseph and Aseneth', '/aseneth/?chapter=1'),
+    ('Gospel of Judas', '/judas/'),
+)
+
+KIND_ORDER = {'book': 0, 'query': 1, 'lexeme': 2}
+SHORT_PREFIX = 3
+TOP = 10
+POPULAR_MIN_VISITORS = 3
+POPULAR_LIMIT = 5000
+QUERY_MAX_LENGTH = 100
+# Queries that look like links or addresses are never published as suggestions
+UNPUBLISHABLE = ('http', 'www.', '@', '.com', '.net', '.org')
+
+FOLD = str.maketrans({
+    'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ', 'ς': 'σ', '_': ' ', '-': ' ',
+})
+
+
+def refresh_seconds():
+    return getattr(settings, 'SEARCH_SUGGEST_REFRESH_SECONDS', 3600)
+
+
+def popular_days():
+    return getattr(settings, 'SEARCH_SUGGEST_POPULAR_DAYS', 30)
+
+
+def flush_interval():
+    return getattr(settings, 'SEARCH_SUGGEST_FLUSH_INTERVAL', 30)
+
+
+def fold(text):
+    """Lookup form of a key or query: lowercase, no accents or niqqud, final letters folded."""
+    decomposed = unicodedata.normalize('NFD', text or '')
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.lower().translate(FOLD).split())
+
+
+def _word_suffixes(name):
+    # 'Song of Solomon' is also found as 'of solomon' and 'solomon'
+    words = fold(name).split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class SuggestionIndex:
+    """Sorted prefix array over folded keys; each key points at one suggestion."""
+
+    def __init__(self, entries):
+        # entries: (keys, kind, weight, suggestion dict)
+        self._suggestions = []
+        rank = []
+        pairs = set()
+        for keys, kind, weight, suggestion in entries:
+            index = len(self._suggestions)
+            self._suggestions.append(suggestion)
+            rank.append((KIND_ORDER[kind], -weight, suggestion['text'].lower()))
+            pairs.update((key, index) for key in keys if key)
+        self._rank = rank
+        self._keys = sorted(pairs)
+
+        # Widest prefix ranges, ranked once: exact key matches first, then by rank
+        short = {}
+        for key, index in self._keys:
+            for n in range(1, min(len(key), SHORT_PREFIX) + 1):
+                prefix = key[:n]
+                best = short.setdefault(prefix, {})
+                order = (key != prefix, rank[index])
+                if index not in best or order < best[index]:
+                    best[index] = order
+        self._short = {
+            prefix: [index for index, _ in sorted(best.items(), key=lambda item: item[1])[:TOP]]
+            for prefix, best in short.items()
+        }
+
+    def __len__(self):
+        return len(self._suggestions)
+
+    def lookup(self, query, limit=TOP):
+        prefix = fold(query)
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX:
+            indexes = self._short.get(prefix, [])[:limit]
+        else:
+            best = {}
+            position = bisect.bisect_left(self._keys, (prefix, -1))
+            while position < len(self._keys) and self._keys[position][0].startswith(prefix):
+                key, index = self._keys[position]
+                order = (key != prefix, self._rank[index])
+                if index not in best or order < best[index]:
+                    best[index] = order
+                position += 1
+            indexes = [index for index, _ in sorted(best.items(), key=lambda item: item[1])[:limit]]
+        return [dict(self._suggestions[index]) for index in indexes]
+
+
+def _book_entries():
+    names = {book_to_slug(name): name for name in BOOK_NAMES}
+    keys = {name: set() for name in BOOK_NAMES}
+    for name in BOOK_NAMES:
+        keys[name] |= _word_suffixes(name)
+        keys[name].add(fold(name).replace(' ', ''))  # '1samuel'
+    for alias, abbrev in book_abbreviations.items():
+        name = names.get(book_to_slug(alias))
+        if name:
+            keys[name].update((fold(alias), fold(abbrev)))
+
+    entries = []
+    for position, name in enumerate(BOOK_NAMES):
+        entries.append((keys[name], 'book', len(BOOK_NAMES) - position, {
+            'type': 'book',
+            'text': name,
+            'url': f'/{book_to_slug(name)}/1/',
+        }))
+    for position, (title, url) in enumerate(STOREHOUSE_BOOKS):
+        entries.append((_word_suffixes(title), 'book', -position, {'type': 'book', 'text': title, 'url': url}))
+    return entries
+
+
+def _table_exists(cursor, table):
+    if connection.vendor != 'postgresql':
+        return False
+    cursor.execute('SELECT to_regclass(%s)', [table])
+    return cursor.fetchone()[0] is not None
+
+
+def _lexeme(language, strongs, lemma, translit, weight):
+    text = f'{lemma} ({translit})' if translit and translit != lemma else lemma
+    keys = {fold(lemma), fold(translit), fold(strongs)}
+    return (keys, 'lexeme', weight, {
+        'type': 'lexeme',
+        'text': text,
+        'language': language,
+        'lemma': lemma,
+        'translit': translit or '',
+        'strongs': strongs,
+        'url': '/search/results/?' + urlencode({'q': lemma, 'scope': language}),
+    })
+
+
+def _lexeme_entries():
+    entries = []
+    with connection.cursor() as cursor:
+        frequency = {}
+        if _table_exists(cursor, 'concordance_entries'):
+            cursor.execute("SELECT strongs, count(*) FROM concordance_entries WHERE testament = 'OT' GROUP BY strongs")
+            frequency = dict(cursor.fetchall())
+
+        if _table_exists(cursor, 'old_testament.strongs_hebrew_dictionary'):
+            cursor.execute(
+                """
+                SELECT strong_number, lemma, xlit FROM old_testament.strongs_hebrew_dictionary
+                WHERE lemma <> ''
+                """
+            )
+            for strongs, lemma, translit in cursor.fetchall():
+                number = normalize_strongs(strongs)
+                weight = frequency.get(number[0], 0) if number else 0
+                entries.append(_lexeme('hebrew', strongs, lemma, translit, weight))
+
+        if _table_exists(cursor, 'rbt_greek.strongs_greek'):
+            # One lemma per Strong's number: its most frequent form
+            cursor.execute(
+                """
+                SELECT strongs, lemma, translit, count(*) AS uses
+                FROM rbt_greek.strongs_greek
+                WHERE strongs <> '' AND lemma <> ''
+                GROUP BY strongs, lemma, translit
+                ORDER BY strongs, uses DESC, lemma
+                """
+            )
+            greek = {}
+            for strongs, lemma, translit, uses in cursor.fetchall():
+                if strongs in greek:
+                    greek[strongs][3] += uses
+                else:
+                    greek[strongs] = [strongs, lemma, translit, uses]
+            for strongs, lemma, translit, uses in greek.values():
+                entries.append(_lexeme('greek', strongs, lemma, translit, uses))
+    return entries
+
+
+def _query_entries():
+    from search.models import SearchQueryDaily
+
+    since = date.today() - timedelta(days=popular_days())
+    # A visitor who searches on several days counts once per day
+    rows = (
+        SearchQueryDaily.objects.filter(date__gte=since)
+        .values('query').annotate(total=Sum('visitors'))
+        .filter(total__gte=POPULAR_MIN_VISITORS)
+        .order_by('-total')[:POPULAR_LIMIT]
+    )
+    return [
+        ({fold(row['query'])}, 'query', row['total'], {
+            'type': 'query',
+            'text': row['query'],
+            'url': '/search/results/?' + urlencode({'q': row['query']}),
+        })
+        for row in rows
+    ]
+
+
+def build_index():
+    """A fresh SuggestionIndex; sources that cannot be read are left out (books always work)."""
+    started = time.monotonic()
+    entries = _book_entries()
+    for source in (_lexeme_entries, _query_entries):
+        try:
+            entries.extend(source())
+        except Exception as e:
+            logger.warning('Suggestion index: %s skipped: %s', source.__name__, e)
+    index = SuggestionIndex(entries)
+    logger.info('Suggestion index built: %s suggestions in %.2fs', len(index), time.monotonic() - started)
+    return index
+
+
+_state = {'index': None, 'built_at': 0.0, 'refreshing': False}
+_lock = threading.Lock()
+
+
+def _rebuild():
+    try:
+        index = build_index()
+        with _lock:
+            _state['index'], _state['built_at'] = index, time.monotonic()
+    finally:
+        with _lock:
+            _state['refreshing'] = False
+
+
+def _rebuild_in_background():
+    def run():
+        try:
+            _rebuild()
+        except Exception:
+            logger.exception('Suggestion index rebuild failed')
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name='suggestion-index', daemon=True).start()
+
+
+def get_index():
+    """The process-wide index: built on first use, refreshed in the background when stale."""
+    with _lock:
+        index = _state['index']
+        stale = index is not None and time.monotonic() - _state['built_at'] > refresh_seconds()
+        start_refresh = stale and not _state['refreshing']
+        if start_refresh:
+            _state['refreshing'] = True
+    if index is None:
+        with _lock:
+            if _state['index'] is None:
+                _state['index'], _state['built_at'] = build_index(), time.monotonic()
+            return _state['index']
+    if start_refresh:
+        _rebuild_in_background()
+    return index
+
+
+def warm_in_background():
+    """Build the index off the request path at startup."""
+    with _lock:
+        if _state['index'] is not None or _state['refreshing']:
+            return
+        _state['refreshing'] = True
+    _rebuild_in_background()
+
+
+class SearchCounter:
+    """Buffered search and visitor counts for search_queries_daily, written by one thread per process."""
+
+    def __init__(self):
+        self.max_buffer = getattr(settings, 'SEARCH_SUGGEST_MAX_BUFFER', 5000)
+        self._searches = Counter()  # (day, query) -> searches
+        self._visitors = set()      # (day, query, visitor); bounded by max_buffer
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.stats = {'recorded': 0, 'dropped': 0, 'written': 0}
+
+    def record(self, query, visitor):
+        """Buffer one search; never touches the database. Returns False if it was dropped."""
+        self._ensure_flusher()
+        key = (date.today(), query)
+        with self._lock:
+            if len(self._visitors) >= self.max_buffer:
+                self.stats['dropped'] += 1
+                return False
+            self._searches[key] += 1
+            self._visitors.add(key + (visitor,))
+            self.stats['recorded'] += 1
+        return True
+
+    def _ensure_flusher(self):
+        # Started lazily and restarted in forked gunicorn workers (see visitor_ingest).
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='search-query-counter', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(flush_interval())
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Search query count flush failed')
+
+    def flush(self):
+        """Add buffered counts to search_queries_daily; a visitor is counted once per (day, query)."""
+        with self._lock:
+            searches, self._searches = self._searches, Counter()
+            visitors, self._visitors = self._visitors, set()
+        if not searches:
+            return 0
+        try:
+            close_old_connections()
+            new_visitors = Counter()
+            pairs = sorted(visitors)
+            with transaction.atomic(), connection.cursor() as cursor:
+                for start in range(0, len(pairs), 500):
+                    chunk = pairs[start:start + 500]
+                    cursor.execute(
+                        'INSERT INTO search_query_visitors (date, query, visitor) VALUES '
+                        + ', '.join(['(%s, %s, %s)'] * len(chunk))
+                        + ' ON CONFLICT (date, query, visitor) DO NOTHING RETURNING date, query',
+                        [value for pair in chunk for value in pair],
+                    )
+                    new_visitors.update(tuple(row) for row in cursor.fetchall())
+                cursor.executemany(
+                    """
+                    INSERT INTO search_queries_daily (date, query, searches, visitors) VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (date, query) DO UPDATE SET
+                        searches = search_queries_daily.searches + EXCLUDED.searches,
+                        visitors = search_queries_daily.visitors + EXCLUDED.visitors
+                    """,
+                    [(day, query, n, new_visitors[(day, query)]) for (day, query), n in searches.items()],
+                )
+                # Only today's pairs are needed to recognise repeat visitors
+                cursor.execute('DELETE FROM search_query_visitors WHERE date < %s', [date.today()])
+            self.stats['written'] += len(searches)
+        except Exception as e:
+            logger.error(f"Error saving search query counts ({len(searches)} queries): {e}")
+            return 0
+        finally:
+            close_old_connections()
+        return len(searches)
+
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def get_search_counter():
+    """Get or create the per-process search counter."""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = SearchCounter()
+    return _counter
+
+
+def visitor_key(client_ip):
+    """Keyed hash of the client IP for today; the raw IP is never stored."""
+    secret = settings.SECRET_KEY.encode()[:64]
+    message = f'{date.today().isoformat()}:{client_ip or ""}'.encode()
+    return hashlib.blake2b(message, key=secret, digest_size=16).hexdigest()
+
+
+def record_search(query, client_ip):
+    """Count one successful search of `query` by the client for today's popular queries."""
+    text = ' '.join((query or '').lower().split())[:QUERY_MAX_LENGTH]
+    if len(text) < 2 or any(marker in text for marker in UNPUBLISHABLE):
+        return
+    get_search_counter().record(text, visitor_key(client_ip))
+
+
+@atexit.register
+def _flush_on_exit():
+    if _counter is not None and _counter._searches:
+        try:
+            _counter.flush()
+        except Exception:
+            pass
@@ -1,3 +1,746 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import time
+import unicodedata
+from datetime import date, datetime
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from hebrewtool.llm_gateway import Gateway, LLMUnavailable, QuotaExhausted
+from hebrewtool.middleware import classify_user_agent
+from search import concordance, consonantal_search, dashboard_snapshots, find_replace, northflank_history
+from search.gemini_usage import UsageWriter, key_summary, rebuild_usage_rollups
+from search.models import (
+    ChapterProgress, ChapterVerseFirstSave, ConcordanceEntry, GeminiTargetUsage, GeminiUsageLog, Genesis, NorthflankStatsPoint,
+    ReplacementBatch, TranslationUpdates, VerseTranslation, VisitorCountryDaily, VisitorGeoDaily, VisitorLocation,
+)
+from search.query_plan import plan_query
+from search.search_cursor import SearchCursor, seek, seek_q
+from search.suggestion_index import SuggestionIndex, _book_entries, _lexeme, fold
+from search.translation_store import upsert_verse_texts
+from search.update_stats import bucket_series
+from search.utils import apply_interlinear
+from search.views import visitor_locations_api
+from search.views.chapter_handlers import handle_genesis_chapter, handle_nt_chapter, handle_ot_chapter
+from search.visitor_ingest import GeoIPResolver, VisitorIngest
+from search.visitor_rollups import rebuild_rollups, record_visits
+from translate.views import _safe_save_update
+
+
+class ChapterHandlerTranslationTests(TestCase):
+    """Non-English chapter pages with a translated book name (chapter=0, verse=0 row)."""
+
+    language = 'es'
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def add_book_name(self, book, name):
+        VerseTranslation.objects.create(
+            book=book, chapter=0, verse=0, language_code=self.language,
+            verse_text=name, status='completed',
+        )
+
+    def test_genesis_uses_translated_book_name(self):
+        self.add_book_name('Genesis', 'Génesis')
+        row = Genesis.objects.create(
+            chapter=1, verse=1, html='<p>In a head</p>', text='', hebrew='', rbt_reader='In the beginning',
+        )
+        results = {'rbt': [row], 'cached_hit': False, 'chapter_list': [1]}
+        response = handle_genesis_chapter(self.request, 'Genesis', 1, results, self.language, 'Genesis')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Génesis')
+
+    def test_ot_uses_translated_book_name(self):
+        self.add_book_name('Exodus', 'Éxodo')
+        results = {
+            'chapter_reader': [],
+            'html': {'1': ('These are the names', '<p>These are the names</p>')},
+            'chapter_list': [1],
+            'cached_hit': False,
+            'commentary': None,
+        }
+        response = handle_ot_chapter(self.request, 'Exodus', 1, results, self.language, 'Exodus')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Éxodo')
+
+    def test_nt_uses_translated_book_name(self):
+        self.add_book_name('Mark', 'Marcos')
+        results = {
+            'chapter_reader': [('Mark', 1, 1, '<p>The beginning of the good news</p>')],
+            'html': [],
+            'chapter_list': [1],
+            'cached_hit': False,
+            'commentary': None,
+        }
+        response = handle_nt_chapter(self.request, 'Mark', 1, results, self.language, 'Mark')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Marcos')
+
+
+class UpdateStatisticsSeriesTests(SimpleTestCase):
+    """Hourly buckets folded into the statistics page series."""
+
+    def test_bucket_series_folds_hours_into_weeks_and_months(self):
+        hourly = [(datetime(2026, 9, 30, 23), 2), (datetime(2026, 10, 1, 8), 3), (datetime(2026, 10, 1, 9), 1)]
+        daily, weekly, monthly, hour_of_day = bucket_series(hourly)
+        self.assertEqual(daily[date(2026, 10, 1)], 4)
+        self.assertEqual(dict(weekly), {date(2026, 9, 28): 6})
+        self.assertEqual(monthly[date(2026, 9, 1)], 2)
+        self.assertEqual(monthly[date(2026, 10, 1)], 4)
+        self.assertEqual(hour_of_day[8], 3)
+
+
+class VisitorIngestTests(TransactionTestCase):
+    """Offline geolocation and batched visitor inserts (search/visitor_ingest.py).
+
+    TransactionTestCase because flush() calls close_old_connections().
+    """
+
+    def setUp(self):
+        handle, self.geoip_path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as geoip:
+            geoip.write('start_ip,end_ip,country,city,latitude,longitude\n')
+            geoip.write('1.2.3.0,1.2.3.255,Israel,Jerusalem,31.77,35.21\n')
+            geoip.write('5.6.7.0,5.6.7.255,China,Beijing,39.9,116.4\n')
+        self.addCleanup(os.remove, self.geoip_path)
+
+    def test_csv_resolver(self):
+        resolver = GeoIPResolver(self.geoip_path)
+        with self.assertLogs('search.visitor_ingest', 'INFO'):
+            self.assertEqual(resolver.lookup('1.2.3.4')['city'], 'Jerusalem')
+        self.assertIsNone(resolver.lookup('1.2.4.1'))
+        self.assertIsNone(resolver.lookup('10.0.0.1'))
+        self.assertIsNone(resolver.lookup('not-an-ip'))
+
+    def test_visits_batched_without_ip_and_bot_networks_flagged(self):
+        with self.settings(VISITOR_GEOIP_DB=self.geoip_path):
+            ingest = VisitorIngest()
+        with self.assertLogs('search.visitor_ingest', 'INFO'):
+            ingest._handle('1.2.3.4', 'Mozilla/5.0', '/Genesis/1/', False)
+        ingest._handle('5.6.7.8', 'Mozilla/5.0', '/Genesis/1/', False)
+        ingest._handle('9.9.9.9', 'Mozilla/5.0', '/Genesis/1/', False)
+        self.assertEqual(VisitorLocation.objects.count(), 0)
+        self.assertEqual((ingest.stats['skipped_bot_network'], ingest.stats['unresolved']), (1, 1))
+        self.assertTrue(cache.get('geoip_5.6.7.8')['is_bot'])
+
+        self.assertEqual(ingest.flush(), 1)
+        visit = VisitorLocation.objects.get()
+        self.assertEqual((visit.country, visit.ip_address), ('Israel', None))
+        self.assertEqual(VisitorCountryDaily.objects.get().visits, 1)
+
+
+class VisitorRollupTests(TestCase):
+    """Heatmap rollups kept current per batch and rebuilt from raw rows (search/visitor_rollups.py)."""
+
+    def setUp(self):
+        rows = [
+            VisitorLocation(path='/', country='Israel', latitude=31.771, longitude=35.217),
+            VisitorLocation(path='/', country='Israel', latitude=31.779, longitude=35.211),
+            VisitorLocation(path='/', country='Peru', latitude=-12.04, longitude=-77.03),
+            VisitorLocation(path='/', country='China', latitude=39.9, longitude=116.4),
+            VisitorLocation(path='/', country='Peru', latitude=-12.04, longitude=-77.03, is_bot=True),
+        ]
+        VisitorLocation.objects.bulk_create(rows)
+        record_visits(rows)
+
+    def snapshot(self):
+        return (
+            sorted(VisitorGeoDaily.objects.values_list('date', 'lat_cell', 'lon_cell', 'visits')),
+            sorted(VisitorCountryDaily.objects.values_list('date', 'country', 'visits')),
+        )
+
+    def test_record_visits_buckets_by_cell_and_country(self):
+        self.assertEqual(
+            sorted(VisitorGeoDaily.objects.values_list('lat_cell', 'lon_cell', 'visits')),
+            [(-121, -771, 1), (317, 352, 2)],
+        )
+        self.assertEqual(
+            dict(VisitorCountryDaily.objects.values_list('country', 'visits')), {'Israel': 2, 'Peru': 1},
+        )
+
+    def test_rebuild_matches_incremental_counts(self):
+        incremental = self.snapshot()
+        VisitorGeoDaily.objects.update(visits=99)
+        self.assertEqual(rebuild_rollups(date.today()), (2, 2))
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_api_reads_rollups(self):
+        response = visitor_locations_api(RequestFactory().get('/visitor_locations/'))
+        data = json.loads(response.content)
+        self.assertEqual(sorted(count for _, _, count in data['locations']), [1, 2])
+        self.assertEqual(data['top_countries'][0], {'country': 'Israel', 'count': 2})
+
+
+class GeminiUsageRollupTests(TransactionTestCase):
+    """Buffered usage rows and the dashboard rollups (search/gemini_usage.py).
+
+    TransactionTestCase because flush() calls close_old_connections(), which
+    drops a connection held inside TestCase's transaction.
+    """
+
+    def setUp(self):
+        writer = UsageWriter()
+        writer._pending = [
+            GeminiUsageLog(api_key_abbrev='AIza..1', request_type='chapter', language_code='es', book='Gen', chapter=1),
+            GeminiUsageLog(api_key_abbrev='AIza..1', request_type='chapter', language_code='es', book='Gen', chapter=1),
+            GeminiUsageLog(api_key_abbrev='AIza..1', request_type='chapter', language_code='es', status_code=429),
+            GeminiUsageLog(api_key_abbrev='AIza..2', request_type='footnote', language_code='fr', status_code=500),
+        ]
+        self.assertEqual(writer.flush(), 4)
+
+    def targets(self):
+        return sorted(GeminiTargetUsage.objects.values_list('book', 'chapter', 'language_code', 'requests'))
+
+    def test_flush_writes_rows_and_rollups(self):
+        self.assertEqual(GeminiUsageLog.objects.count(), 4)
+        summary = {row['api_key_abbrev']: row for row in key_summary(1)}
+        self.assertEqual(
+            (summary['AIza..1']['success_count'], summary['AIza..1']['rate_limit_count']), (2, 1),
+        )
+        self.assertEqual(summary['AIza..2']['error_count'], 1)
+        self.assertEqual(self.targets(), [('Gen', 1, 'es', 2)])
+
+    def test_rebuild_matches_incremental_counts(self):
+        incremental = (key_summary(1), self.targets())
+        GeminiTargetUsage.objects.update(requests=99)
+        self.assertEqual(rebuild_usage_rollups(), (2, 1))
+        self.assertEqual((key_summary(1), self.targets()), incremental)
+
+
+async def collect_test_snapshot(label):
+    """Collect function for SnapshotTests, registered as the 'test' source."""
+    if label == 'down':
+        raise RuntimeError('upstream down')
+    SnapshotTests.collected.append(label)
+    return {'label': label}
+
+
+@override_settings(DASHBOARD_COLLECTOR_ENABLED=False, DASHBOARD_REFRESH_TEST=60)
+@mock.patch.dict(dashboard_snapshots.SOURCES, {'test': ('search.tests.collect_test_snapshot', 'DASHBOARD_REFRESH_TEST', 60)})
+class SnapshotTests(TestCase):
+    """Stale-while-revalidate dashboard snapshots (search/dashboard_snapshots.py)."""
+
+    def setUp(self):
+        SnapshotTests.collected = []
+
+    def store(self, label, age):
+        cache.set(dashboard_snapshots.snapshot_key('test', label), {'data': {'label': 'old'}, 'fetched_at': time.time() - age})
+
+    async def test_cold_start_collects_once(self):
+        with self.assertLogs('search.dashboard_snapshots', 'INFO'):
+            first = await dashboard_snapshots.get_snapshot('test', 'a')
+        second = await dashboard_snapshots.get_snapshot('test', 'a')
+        self.assertEqual(first['data'], {'label': 'a'})
+        self.assertEqual(second, first)
+        self.assertEqual(self.collected, ['a'])
+
+    async def test_fresh_snapshot_served_without_collecting(self):
+        await sync_to_async(self.store)('a', 10)
+        envelope = await dashboard_snapshots.get_snapshot('test', 'a')
+        self.assertEqual(envelope['data'], {'label': 'old'})
+        self.assertEqual(self.collected, [])
+
+    async def test_stale_snapshot_revalidated_and_kept_on_failure(self):
+        await sync_to_async(self.store)('a', 120)
+        await sync_to_async(self.store)('down', 120)
+        with self.assertLogs('search.dashboard_snapshots', 'INFO'):
+            self.assertEqual((await dashboard_snapshots.get_snapshot('test', 'a'))['data'], {'label': 'a'})
+        with self.assertLogs('search.dashboard_snapshots', 'WARNING'):
+            envelope = await dashboard_snapshots.get_snapshot('test', 'down')
+        self.assertEqual(envelope['data'], {'label': 'old'})
+
+    async def test_refresh_is_single_flight(self):
+        key = dashboard_snapshots.snapshot_key('test', 'a')
+        await cache.aadd(f'{key}:lock', 1)
+        self.assertIsNone(await dashboard_snapshots.refresh('test', 'a'))
+        self.assertEqual(self.collected, [])
+
+
+class NorthflankHistoryTests(TestCase):
+    """Northflank uptime points, downsampling and retention (search/northflank_history.py)."""
+
+    now = 20 * 86400  # a bucket boundary
+
+    def append(self, ts, running):
+        northflank_history.append_point('proj', {'running_services': running, 'paused_addons': 1}, ts=ts)
+
+    def test_query_returns_window_oldest_first(self):
+        self.append(self.now - 120, 4)
+        self.append(self.now - 60, 5)
+        self.append(self.now, 6)
+        points = northflank_history.query_points('proj', self.now - 90)
+        self.assertEqual([point['running_services'] for point in points], [5, 6])
+        self.assertEqual(points[-1]['timestamp'], '1970-01-21T00:00:00Z')
+        self.assertEqual((points[-1]['paused_services'], points[-1]['paused_addons']), (0, 1))
+
+    def test_old_points_downsampled_then_pruned(self):
+        hour_start = self.now - 30 * 3600
+        self.append(self.now - 8 * 86400, 9)
+        self.append(hour_start + 60, 2)
+        self.append(hour_start + 600, 3)
+        self.append(self.now, 6)
+        rows = NorthflankStatsPoint.objects.order_by('ts').values_list('ts', 'resolution', 'running_services')
+        self.assertEqual(list(rows), [(hour_start, 3600, 2.5), (self.now, 0, 6.0)])
+        self.assertEqual(northflank_history.query_points('proj', hour_start)[0]['running_services'], 2.5)
+
+
+class VerseTranslationStoreTests(TestCase):
+    """One verse_translations row per verse or footnote (search/translation_store.py)."""
+
+    def test_upsert_updates_verse_rows_in_place(self):
+        VerseTranslation.objects.create(
+            book='Ruth', chapter=1, verse=1, language_code='es', footnote_id='1-1-a', footnote_text='nota',
+        )
+        self.assertEqual(upsert_verse_texts('Ruth', 1, 'es', {1: 'uno', 2: 'dos'}, status='ai_generated'), 2)
+        upsert_verse_texts('Ruth', 1, 'es', {1: 'Uno'})
+        verses = VerseTranslation.objects.filter(footnote_id__isnull=True).order_by('verse')
+        self.assertEqual(list(verses.values_list('verse', 'verse_text', 'status')), [
+            (1, 'Uno', 'completed'), (2, 'dos', 'ai_generated'),
+        ])
+        self.assertEqual(VerseTranslation.objects.get(footnote_id='1-1-a').footnote_text, 'nota')
+
+    def test_constraints_reject_duplicate_rows(self):
+        VerseTranslation.objects.create(book='Ruth', chapter=1, verse=1, language_code='es', verse_text='uno')
+        VerseTranslation.objects.create(book='Ruth', chapter=1, verse=1, language_code='fr', verse_text='un')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            VerseTranslation.objects.create(book='Ruth', chapter=1, verse=1, language_code='es', verse_text='otro')
+
+        VerseTranslation.objects.create(book='Ruth', chapter=1, verse=1, language_code='es', footnote_id='1-1-a')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            VerseTranslation.objects.create(book='Ruth', chapter=1, verse=0, language_code='es', footnote_id='1-1-a')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'find-and-replace runs POSIX regexes in Postgres')
+class FindReplaceTests(TestCase):
+    """Paged matching, journalled replacement and undo (search/find_replace.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE SCHEMA IF NOT EXISTS new_testament')
+            cursor.execute('CREATE TABLE new_testament.nt (verseid INTEGER PRIMARY KEY, rbt TEXT)')
+            cursor.execute(
+                "INSERT INTO new_testament.nt VALUES (1, 'the light'), (2, 'darkness'), (3, 'light of men'), (4, 'a light')"
+            )
+
+    def texts(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT verseid, rbt FROM new_testament.nt ORDER BY verseid')
+            return dict(cursor.fetchall())
+
+    def test_find_pages_in_key_order(self):
+        first = find_replace.find_page('nt', 'light', ['verseid', 'rbt'], limit=2)
+        self.assertEqual(first, ([(1, 'the light'), (3, 'light of men')], 3))
+        second = find_replace.find_page('nt', 'light', ['verseid', 'rbt'], after=str(first.next_after), limit=2)
+        self.assertEqual(second, ([(4, 'a light')], None))
+
+    def test_apply_and_undo_skip_rows_edited_since(self):
+        batch = find_replace.start_batch('editor', 'light -> Light')
+        changes = {1: 'the Light', 3: 'Light of men', 4: 'a light'}
+        self.assertEqual(find_replace.apply_changes(batch, 'nt', changes), 2)
+        self.assertEqual(ReplacementBatch.objects.get(pk=batch.pk).row_count, 2)
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE new_testament.nt SET rbt = 'Light of all men' WHERE verseid = 3")
+
+        self.assertEqual(find_replace.undo_batch(batch), (1, 1))
+        self.assertEqual(self.texts(), {1: 'the light', 2: 'darkness', 3: 'Light of all men', 4: 'a light'})
+        self.assertIsNotNone(ReplacementBatch.objects.get(pk=batch.pk).undone_at)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'the interlinear apply uses Postgres temp tables and COPY')
+class ApplyInterlinearTests(TestCase):
+    """Set-based interlinear mapping over rbt_greek.strongs_greek (search/utils.py)."""
+
+    mapping = {'G2316': 'God', 'θεός': 'deity', 'G3056': None}
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE SCHEMA IF NOT EXISTS rbt_greek')
+            cursor.execute('CREATE TABLE rbt_greek.strongs_greek (id INTEGER, strongs TEXT, lemma TEXT, english TEXT)')
+            cursor.execute(
+                """
+                INSERT INTO rbt_greek.strongs_greek VALUES
+                    (1, 'G2316', 'θεός', 'god'), (2, 'G9999', 'θεός', 'x'),
+                    (3, 'G3056', NULL, 'word'), (4, 'G2316', NULL, 'God'), (5, 'G1', 'ἄλφα', 'alpha')
+                """
+            )
+
+    def english(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id, english FROM rbt_greek.strongs_greek ORDER BY id')
+            return dict(cursor.fetchall())
+
+    def test_dry_run_reports_first_matching_key(self):
+        result = apply_interlinear(self.mapping, dry_run=True)
+        self.assertEqual(result['per_key'], {'G2316': 1, 'G3056': 1, 'θεός': 1})
+        self.assertEqual(result['total_candidates'], 3)
+        self.assertIn(('G2316', 'θεός', 'god', 'God'), result['samples'])
+        self.assertEqual(self.english()[1], 'god')
+
+    def test_commit_applies_and_backs_up(self):
+        with tempfile.TemporaryDirectory() as backup_dir:
+            result = apply_interlinear(self.mapping, dry_run=False, backup_dir=backup_dir)
+            with open(result['backup_file'], encoding='utf-8') as backup:
+                self.assertEqual(len(backup.read().splitlines()), 4)
+        self.assertEqual(result['applied'], 3)
+        self.assertEqual(self.english(), {1: 'God', 2: 'deity', 3: None, 4: 'God', 5: 'alpha'})
+
+
+class ConcordanceTests(TestCase):
+    """Strong's-number normalization and concordance lookups (search/concordance.py)."""
+
+    elohim = unicodedata.normalize('NFC', 'אֱלֹהִים')
+
+    @classmethod
+    def setUpTestData(cls):
+        def entry(strongs, book, chapter, verse, morph='', variant='', lemma='', testament='OT'):
+            return ConcordanceEntry(
+                strongs=strongs, variant=variant, lemma=lemma, testament=testament, book=book, chapter=chapter,
+                verse=verse, word=1, source_id=0, morph=morph, english='',
+            )
+
+        ConcordanceEntry.objects.bulk_create([
+            entry('H430', 'Gen', 1, 1, 'Ncmpa', lemma=cls.elohim),
+            entry('H5921', 'Gen', 1, 2, 'R', variant='a'),
+            entry('H430', 'Gen', 1, 2, 'Ncmpc', lemma=cls.elohim),
+            entry('H430', 'Exo', 3, 4, 'Ncmpa', lemma=cls.elohim),
+            entry('G2316', 'Joh', 1, 1, 'N-NSM', lemma='θεός', testament='NT'),
+        ])
+
+    def test_normalize_strongs(self):
+        self.assertEqual(concordance.normalize_strongs('H0430'), ('H430', ''))
+        self.assertEqual(concordance.normalize_strongs('h430=אֱלֹהִים'), ('H430', ''))
+        self.assertEqual(concordance.normalize_strongs('H5921a'), ('H5921', 'a'))
+        self.assertIsNone(concordance.normalize_strongs('Hello'))
+        self.assertEqual(concordance.parse_strongs('H9003/H7225'), [[('H9003', '')], [('H7225', '')]])
+
+    def test_lookup_pages_in_canonical_order(self):
+        first = concordance.lookup(strongs='H0430', limit=2)
+        self.assertEqual([row['ref'] for row in first['results']], ['Gen.1.1', 'Gen.1.2'])
+        self.assertEqual(first['count'], 3)
+        self.assertEqual(first['books'], [{'book': 'Gen', 'count': 2}, {'book': 'Exo', 'count': 1}])
+
+        second = concordance.lookup(strongs='H430', limit=2, cursor=first['next_cursor'])
+        self.assertEqual([row['ref'] for row in second['results']], ['Exo.3.4'])
+        self.assertIsNone(second['books'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_lookup_filters(self):
+        self.assertEqual(concordance.lookup(strongs='H430', morph='Ncmpc')['count'], 1)
+        self.assertEqual(concordance.lookup(strongs='H430', testament='nt')['count'], 0)
+        self.assertEqual(concordance.lookup(strongs='H5921a')['results'][0]['strongs'], 'H5921a')
+        self.assertEqual(concordance.lookup(lemma=unicodedata.normalize('NFD', self.elohim))['count'], 3)
+        with self.assertRaises(ValueError):
+            concordance.lookup(strongs='430')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'chapter counts read the new_testament schema')
+class ChapterProgressTests(TestCase):
+    """Editor saves keep chapter_progress current (search/chapter_progress.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE SCHEMA IF NOT EXISTS new_testament')
+            cursor.execute('CREATE TABLE IF NOT EXISTS new_testament.nt (book TEXT, chapter INTEGER, verse INTEGER, rbt TEXT)')
+            cursor.execute(
+                "INSERT INTO new_testament.nt (book, chapter, verse, rbt) VALUES ('Jud', 1, 1, 'Judah'), ('Jud', 1, 2, 'Mercy')"
+            )
+
+    def save(self, reference, when):
+        _safe_save_update(TranslationUpdates(date=when, version='rbt', reference=reference, update_text='x'))
+
+    def test_save_records_first_save_and_completion(self):
+        self.save('Jud.1.1', datetime(2026, 10, 1, 9))
+        progress = ChapterProgress.objects.get(book='Jud', chapter=1)
+        self.assertEqual((progress.testament, progress.total_verses, progress.filled_verses), ('NT', 2, 2))
+        self.assertEqual(progress.audited_verses, 1)
+        self.assertEqual(progress.completed_at, datetime(2026, 10, 1, 9))
+
+        self.save('Jud.1.2', datetime(2026, 10, 2, 9))
+        self.save('Jud.1.1', datetime(2026, 10, 3, 9))
+        progress.refresh_from_db()
+        self.assertEqual(progress.audited_verses, 2)
+        self.assertEqual(progress.completed_at, datetime(2026, 10, 2, 9))
+        first_saves = ChapterVerseFirstSave.objects.filter(book='Jud', chapter=1).order_by('verse')
+        self.assertEqual(
+            list(first_saves.values_list('verse', 'first_saved')),
+            [(1, datetime(2026, 10, 1, 9)), (2, datetime(2026, 10, 2, 9))],
+        )
+
+
+class SearchCursorTests(TestCase):
+    """Keyset continuation tokens for search_api (search/search_cursor.py)."""
+
+    def test_seek_condition(self):
+        self.assertEqual(seek(('chapter', 'verse'), None), ('TRUE', []))
+        self.assertEqual(seek(('chapter', 'verse'), [2, 7]), ('(chapter, verse) > (%s, %s)', [2, 7]))
+
+    def test_seek_q_continues_after_key(self):
+        for chapter, verse in ((1, 1), (1, 2), (1, 3), (2, 1)):
+            Genesis.objects.create(chapter=chapter, verse=verse, html='', text='', hebrew='', rbt_reader='')
+        rows = Genesis.objects.filter(seek_q(('chapter', 'verse'), [1, 2])).order_by('chapter', 'verse')
+        self.assertEqual(list(rows.values_list('chapter', 'verse')), [(1, 3), (2, 1)])
+        self.assertEqual(Genesis.objects.filter(seek_q(('chapter', 'verse'), None)).count(), 4)
+
+    def test_token_round_trip(self):
+        cursor = SearchCursor('light', 'all')
+        page = cursor.page_rows('genesis:genesis', [(1, 1), (1, 2), (1, 3)], 2, key=lambda row: row)
+        cursor.page_rows('nt_verses:nt', [(5, 1)], 2, key=lambda row: row)
+        cursor.count('genesis', 3)
+        self.assertEqual(page, [(1, 1), (1, 2)])
+        self.assertTrue(cursor.has_more)
+        self.assertIsNone(cursor.token('nt_verses'))
+
+        loaded = SearchCursor.load(cursor.token(), 'light', 'all')
+        self.assertEqual(loaded.page, 2)
+        self.assertFalse(loaded.fresh)
+        self.assertTrue(loaded.runs('genesis:genesis'))
+        self.assertFalse(loaded.runs('nt_verses:nt'))
+        self.assertEqual(loaded.after('genesis:genesis'), [1, 2])
+        self.assertEqual(loaded.counts, {'genesis': 3})
+
+    def test_token_rejects_other_search_and_tampering(self):
+        cursor = SearchCursor('light', 'all')
+        cursor.page_rows('genesis:genesis', [(1,), (2,)], 1, key=lambda row: row)
+        token = cursor.token()
+        with self.assertRaises(ValueError):
+            SearchCursor.load(token, 'darkness', 'all')
+        with self.assertRaises(ValueError):
+            SearchCursor.load(token, 'light', 'nt')
+        with self.assertRaises(ValueError):
+            SearchCursor.load(token[:-2] + 'xx', 'light', 'all')
+
+    @override_settings(SEARCH_COUNT_LIMIT=10)
+    def test_count_is_capped(self):
+        cursor = SearchCursor('light', 'all')
+        cursor.count('genesis', 11)
+        cursor.count('ot_verses', 4)
+        self.assertEqual(cursor.counts, {'genesis': 10, 'ot_verses': 4})
+        self.assertEqual(cursor.approximate, {'genesis'})
+
+
+class QueryPlanTests(SimpleTestCase):
+    """Categories and columns search_api runs for a query (search/query_plan.py)."""
+
+    def test_latin_query_skips_hebrew_columns(self):
+        plan = plan_query('  living   soul ')
+        self.assertEqual(plan.query, 'living soul')
+        self.assertEqual(plan.search_type, 'keyword')
+        self.assertEqual(plan.columns('genesis'), ('html', 'rbt_reader'))
+        self.assertEqual(plan.columns('hebrewdata'), ('Eng',))
+        self.assertEqual(plan.columns('nt_verses'), ('rbt',))
+        self.assertFalse(plan.runs('ot_consonantal'))
+        self.assertTrue(plan.runs('footnotes'))
+
+    def test_hebrew_query_skips_english_columns(self):
+        plan = plan_query('בָּרָא')
+        self.assertEqual(plan.columns('hebrewdata'), ('combined_heb', 'combined_heb_niqqud'))
+        self.assertEqual(plan.columns('genesis'), ('hebrew',))
+        for category in ('ot_verses', 'nt_verses', 'nt_greek', 'aseneth', 'judas_prose'):
+            self.assertFalse(plan.runs(category), category)
+        # Consonantal columns match the vowel-stripped query
+        self.assertEqual(plan.where('hebrewdata'), (
+            'combined_heb ILIKE %s OR combined_heb_niqqud ILIKE %s', ['%ברא%', '%בָּרָא%'],
+        ))
+
+    def test_greek_query_and_scope(self):
+        plan = plan_query('λόγος', scope='NT')
+        self.assertEqual(set(plan.categories), {'nt_verses', 'nt_greek'})
+        self.assertEqual(plan.columns('nt_verses'), ('verseText',))
+        self.assertEqual(plan.columns('nt_greek'), ('lemma',))
+
+    def test_reference_answers_query(self):
+        plan = plan_query('John 3:16')
+        self.assertEqual(plan.search_type, 'reference')
+        self.assertEqual(plan.references[0]['display'], 'John 3:16')
+        self.assertEqual(plan.categories, {})
+        self.assertEqual(plan_query('John 3:16', search_type='keyword').references, ())
+
+    def test_non_ascii_latin_searches_translations_only(self):
+        plan = plan_query('Génesis')
+        self.assertTrue(plan.translations_only)
+        self.assertEqual(plan.categories, {})
+
+
+class SuggestionIndexTests(SimpleTestCase):
+    """Prefix lookups of /api/suggest/ (search/suggestion_index.py)."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        query = ({fold('genealogy of jesus')}, 'query', 5, {'type': 'query', 'text': 'genealogy of jesus', 'url': '/q'})
+        cls.index = SuggestionIndex(_book_entries() + [
+            query,
+            _lexeme('hebrew', 'H430', 'אֱלֹהִים', 'elohim', 2600),
+            _lexeme('hebrew', 'H433', 'אֱלוֹהַּ', 'eloah', 57),
+        ])
+
+    def texts(self, query, limit=10):
+        return [suggestion['text'] for suggestion in self.index.lookup(query, limit)]
+
+    def test_fold(self):
+        self.assertEqual(fold('  Song_of-Solomon '), 'song of solomon')
+        self.assertEqual(fold('אֱלֹהִים'), 'אלהימ')
+
+    def test_books_come_before_queries(self):
+        self.assertEqual(self.texts('gen')[:2], ['Genesis', 'genealogy of jesus'])
+        self.assertEqual(self.texts('genea'), ['genealogy of jesus'])
+
+    def test_aliases_and_word_suffixes(self):
+        self.assertIn('1 Samuel', self.texts('1sam'))
+        self.assertIn('Song of Solomon', self.texts('solomon'))
+
+    def test_lexemes_by_lemma_translit_and_number(self):
+        self.assertEqual(self.texts('אל'), ['אֱלֹהִים (elohim)', 'אֱלוֹהַּ (eloah)'])
+        self.assertEqual(self.texts('אלה'), ['אֱלֹהִים (elohim)'])
+        self.assertEqual(self.texts('eloa'), ['אֱלוֹהַּ (eloah)'])
+        self.assertEqual(self.texts('h430'), ['אֱלֹהִים (elohim)'])
+
+    def test_limit_and_empty(self):
+        self.assertEqual(len(self.texts('j', limit=2)), 2)
+        self.assertEqual(self.texts('  '), [])
+        self.assertEqual(self.texts('zzzz'), [])
+
+
+class ConsonantalSearchTests(SimpleTestCase):
+    """Normalization and verse scoring of the consonantal Hebrew search (search/consonantal_search.py)."""
+
+    VERSE = 'וַיֹּאמֶר אֱלֹהִים יְהִי אוֹר וַיְהִי־אוֹר'
+
+    def score(self, term, prefixes=False, suffixes=False, term2=None, within=None):
+        text = consonantal_search.normalize(self.VERSE)[0]
+        pattern2 = consonantal_search.compile_term(term2) if term2 else None
+        return consonantal_search._score_verse(
+            text, consonantal_search.compile_term(term, prefixes, suffixes), pattern2, within,
+        )
+
+    def test_normalize_strips_marks_and_folds_finals(self):
+        text, index = consonantal_search.normalize(self.VERSE)
+        self.assertEqual(text, 'ויאמר אלהימ יהי אור ויהי אור')
+        self.assertEqual(len(index), len(text))
+        self.assertEqual(self.VERSE[index[text.index('א', 1)]], 'א')
+        self.assertEqual(consonantal_search.normalize('בְּ/רֵאשִׁית,  ')[0], 'בראשית')
+
+    def test_whole_word_outranks_affixed_and_inner_matches(self):
+        # 10 x best match quality + number of matches
+        self.assertEqual(self.score('אור')[0], 32)
+        self.assertEqual(self.score('יהי', prefixes=True)[0], 32)
+        self.assertEqual(self.score('אמר', prefixes=True), None)
+        self.assertEqual(self.score('אמר')[0], 11)
+
+    def test_second_term_within_words(self):
+        self.assertIsNone(self.score('ויאמר', term2='ויהי', within=2))
+        # Two words apart: 100 x (within - distance + 1) on top of the first term's score
+        score, spans, spans2 = self.score('אלהימ', term2='אור', within=2)
+        self.assertEqual(score, 100 + 31)
+        self.assertEqual(len(spans2), 2)
+
+    def test_highlight_wraps_original_text(self):
+        text = consonantal_search.normalize(self.VERSE)[0]
+        start = text.index('אור')
+        html = consonantal_search.highlight(self.VERSE, [(start, start + 3)])
+        self.assertIn('<span class="search-highlight">אוֹר</span>', html)
+
+
+class UserAgentClassifierTests(SimpleTestCase):
+    """classify_user_agent, shared by the bot-filter, rate-limit and visitor middleware."""
+
+    CHROME = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36'
+
+    def test_browser(self):
+        self.assertEqual(tuple(classify_user_agent(self.CHROME)), (False, False, False))
+
+    def test_allowed_crawler(self):
+        verdict = classify_user_agent('Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)')
+        self.assertTrue(verdict.allowed_bot)
+        self.assertTrue(verdict.bot)
+
+    def test_blocked_clients(self):
+        for agent in ('python-requests/2.31', 'curl/8.0', 'Scrapy/2.11', 'HeadlessChrome'):
+            self.assertTrue(classify_user_agent(agent).blocked, agent)
+        self.assertFalse(classify_user_agent('python-requests/2.31').allowed_bot)
+
+    def test_suspicious_browsers_count_as_bots(self):
+        self.assertTrue(classify_user_agent('').bot)
+        self.assertTrue(classify_user_agent(self.CHROME.replace('Chrome/126.0', 'Chrome/79.0')).bot)
+        self.assertTrue(classify_user_agent(self.CHROME.replace('Windows NT 10.0', 'Windows NT 6.1')).bot)
+        self.assertFalse(classify_user_agent(self.CHROME).blocked)
+
+
+class QuotaError(Exception):
+    code = 429
+
+
+class LLMGatewayTests(SimpleTestCase):
+    """Key scheduling and failover of the Gemini gateway (hebrewtool/llm_gateway.py)."""
+
+    def gateway(self, keys=('key-aaaa', 'key-bbbb'), **options):
+        return Gateway(list(keys), backend='stub', acquire_timeout=0.05, **options)
+
+    def test_spreads_calls_over_least_loaded_keys(self):
+        gateway = self.gateway()
+        first = gateway._acquire(set())
+        second = gateway._acquire(set())
+        self.assertNotEqual(first.key, second.key)
+        gateway._release(first, 'ok')
+        gateway._release(second, 'ok')
+        self.assertEqual(gateway.in_flight, 0)
+
+    def test_fails_over_on_quota_and_parks_key(self):
+        gateway = self.gateway()
+        used = []
+
+        def fn(client):
+            used.append(client)
+            if len(used) == 1:
+                raise QuotaError('429 RESOURCE_EXHAUSTED')
+            return 'ok'
+
+        with self.assertLogs('hebrewtool.llm_gateway', 'WARNING'):
+            self.assertEqual(gateway.call(fn), 'ok')
+        self.assertEqual(len(used), 2)
+        states = {state['key']: state for state in gateway.snapshot()}
+        self.assertEqual(sorted(state['state'] for state in states.values()), ['closed', 'open'])
+
+    def test_quota_on_every_key_raises(self):
+        gateway = self.gateway()
+
+        def fn(client):
+            raise QuotaError('quota exceeded')
+
+        with self.assertLogs('hebrewtool.llm_gateway', 'WARNING'), self.assertRaises(QuotaExhausted):
+            gateway.call(fn)
+        with self.assertRaises(QuotaExhausted):
+            gateway.call(lambda client: 'ok')
+
+    def test_other_errors_are_raised_and_open_after_threshold(self):
+        gateway = self.gateway(keys=('key-aaaa',), failure_threshold=2)
+
+        def fn(client):
+            raise ValueError('bad request')
+
+        with self.assertRaises(ValueError):
+            gateway.call(fn)
+        with self.assertLogs('hebrewtool.llm_gateway', 'WARNING'), self.assertRaises(ValueError):
+            gateway.call(fn)
+        self.assertEqual(gateway.snapshot()[0]['state'], 'open')
+
+    def test_concurrency_cap(self):
+        gateway = self.gateway(keys=('key-aaaa',), per_key_concurrency=1)
+        state = gateway._acquire(set())
+        with self.assertRaises(LLMUnavailable):
+            gateway._acquire(set())
+        gateway._release(state, 'ok')
+        self.assertIsNotNone(gateway._acquire(set()))
+
+    def test_no_keys(self):
+        with self.assertRaises(LLMUnavailable):
+            self.gateway(keys=()).call(lambda client: 'ok')
@@ -0,0 +1,62 @@
+"""
+Translation overlay for non-English chapter pages.
+
+The chapter handlers need the same facts about a chapter's VerseTranslation
+rows: which verses are translated or in progress, the translated text of the
+completed ones, translated footnotes, how many rows failed, and the
+translated book name (stored as chapter=0, verse=0). load_translation_overlay()
+fetches the chapter's rows and the book-name row in one query and indexes
+them in memory, instead of one query per question.
+"""
+
+from django.db.models import Q
+
+from search.models import VerseTranslation
+
+ACTIVE_STATUSES = ('completed', 'processing')
+FAILED_PREFIXES = ('[Translation error', '[Translation parsing error')
+
+
+class TranslationOverlay:
+    """Indexed VerseTranslation rows for one (book, chapter, language)."""
+
+    def __init__(self):
+        self.existing_verses = set()  # verse rows completed or processing
+        self.verses = {}  # verse -> completed verse_text
+        self.footnotes = {}  # footnote_id -> completed footnote_text
+        self.failed_count = 0  # verse rows holding a translation error
+        self.book_name = None  # completed/processing book-name text
+        self.has_book_name = False
+
+    def add_book_name_row(self, status, verse_text):
+        if status in ACTIVE_STATUSES and not self.has_book_name:
+            self.has_book_name = True
+            self.book_name = verse_text or None
+
+    def add_chapter_row(self, verse, footnote_id, status, verse_text, footnote_text):
+        if footnote_id is None:
+            if status in ACTIVE_STATUSES:
+                self.existing_verses.add(verse)
+            if status == 'completed' and verse_text:
+                self.verses[verse] = verse_text
+            if verse_text and verse_text.startswith(FAILED_PREFIXES):
+                self.failed_count += 1
+        elif status == 'completed' and footnote_id and footnote_text:
+            self.footnotes[footnote_id] = footnote_text
+
+
+def load_translation_overlay(book, chapter, language):
+    """All translation rows of a chapter plus its book-name row, in one query."""
+    overlay = TranslationOverlay()
+    rows = (
+        VerseTranslation.objects.filter(language_code=language, book=book)
+        .filter(Q(chapter=chapter) | Q(chapter=0, verse=0, footnote_id__isnull=True))
+        .order_by('id')
+        .values_list('chapter', 'verse', 'footnote_id', 'status', 'verse_text', 'footnote_text')
+    )
+    for row_chapter, verse, footnote_id, status, verse_text, footnote_text in rows:
+        if row_chapter == chapter:
+            overlay.add_chapter_row(verse, footnote_id, status, verse_text, footnote_text)
+        if row_chapter == 0 and verse == 0 and footnote_id is None:
+            overlay.add_book_name_row(status, verse_text)
+    return overlay
@@ -0,0 +1,108 @@
+"""
+Write-side helpers for verse_translations.
+
+Two partial unique constraints (0018 migration) give every translation one
+row:
+- verse rows (footnote_id IS NULL): (book, chapter, verse, language_code)
+- footnote rows: (language_code, footnote_id, book, chapter); verse is only
+  informational for footnotes and not part of the key
+
+update_or_create() calls must look rows up by these keys. Verse rows can
+also be written in one statement with upsert_verse_texts() (INSERT ... ON
+CONFLICT against verse_translation_verse_uniq). dedupe_verse_translations()
+collapses duplicates left from before the constraints (the migration runs it;
+`manage.py dedupe_verse_translations` reports or repeats it).
+"""
+
+from datetime import datetime
+from itertools import groupby
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, Case, Q, Value, When
+
+from search.translation_overlay import FAILED_PREFIXES
+
+DEFAULT_GENERATED_BY = 'gemini-3-flash-preview'
+
+# Which duplicate to keep: usable text first, then the most reviewed status, then the newest row
+STATUS_RANK = {'published': 5, 'human_reviewed': 4, 'completed': 3, 'ai_generated': 2, 'processing': 1}
+
+VERSE_KEY = ('book', 'chapter', 'verse', 'language_code')
+FOOTNOTE_KEY = ('language_code', 'footnote_id', 'book', 'chapter')
+
+
+def upsert_verse_texts(book, chapter, language_code, texts, status='completed', generated_by=DEFAULT_GENERATED_BY):
+    """Insert or update verse rows ({verse: text}) for one chapter in a single statement."""
+    if not texts:
+        return 0
+    now = datetime.now()
+    params = []
+    for verse, text in texts.items():
+        params += [book, chapter, verse, language_code, text, status, generated_by, now]
+    values = ', '.join(['(%s, %s, %s, %s, %s, NULL, %s, %s, %s)'] * len(texts))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO verse_translations
+                (book, chapter, verse, language_code, verse_text, footnote_id, status, generated_by, created_at)
+            VALUES {values}
+            ON CONFLICT (book, chapter, verse, language_code) WHERE footnote_id IS NULL DO UPDATE SET
+                verse_text = EXCLUDED.verse_text,
+                status = EXCLUDED.status,
+                generated_by = EXCLUDED.generated_by
+            """,
+            params,
+        )
+    return len(texts)
+
+
+def _usable_text(text_field):
+    usable = Q(**{f'{text_field}__isnull': False}) & ~Q(**{text_field: ''})
+    for prefix in FAILED_PREFIXES:
+        usable &= ~Q(**{f'{text_field}__startswith': prefix})
+    return Case(When(usable, then=Value(True)), default=Value(False), output_field=BooleanField())
+
+
+def _duplicate_ids(model, key_fields, condition, text_field):
+    """Ids of every row but the best one per key, from one ordered scan."""
+    rows = (
+        model.objects.filter(condition)
+        .annotate(usable=_usable_text(text_field))
+        .order_by(*key_fields)
+        .values_list(*key_fields, 'id', 'status', 'usable')
+        .iterator(chunk_size=5000)
+    )
+    width = len(key_fields)
+    for _, group in groupby(rows, key=lambda row: row[:width]):
+        group = list(group)
+        if len(group) < 2:
+            continue
+        keep = max(group, key=lambda row: (row[width + 2], STATUS_RANK.get(row[width + 1], 0), row[width]))
+        for row in group:
+            if row is not keep:
+                yield row[width]
+
+
+def dedupe_verse_translations(model=None, dry_run=False):
+    """
+    Delete duplicate verse and footnote rows, keeping one per constraint key.
+
+    The model class can be passed in so the migration can use the historical
+    model. Returns (verse_rows_removed, footnote_rows_removed).
+    """
+    if model is None:
+        from search.models import VerseTranslation
+        model = VerseTranslation
+
+    removed = []
+    for key_fields, condition, text_field in (
+        (VERSE_KEY, Q(footnote_id__isnull=True), 'verse_text'),
+        (FOOTNOTE_KEY, Q(footnote_id__isnull=False), 'footnote_text'),
+    ):
+        doomed = list(_duplicate_ids(model, key_fields, condition, text_field))
+        if not dry_run:
+            with transaction.atomic():
+                for start in range(0, len(doomed), 1000):
+                    model.objects.filter(id__in=doomed[start:start + 1000]).delete()
+        removed.append(len(doomed))
+    return tuple(removed)
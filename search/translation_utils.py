@@ -1,8 +1,14 @@
 """Utilities for multi-lingual verse translations using Gemini API"""
 
+import logging
 import os
-from google import genai
-from .models import VerseTranslation, GeminiUsageLog
+
+from hebrewtool.llm_gateway import QuotaExhausted, get_gateway
+from .gemini_usage import record_usage
+from .models import VerseTranslation
+from .translation_store import upsert_verse_texts
+
+logger = logging.getLogger(__name__)
 
 # Comma-separated list of API keys from environment variable
 # Format: GEMINI_API_KEYS="key1,key2,key3,..."
@@ -10,14 +16,14 @@ GEMINI_API_KEYS_STR = os.getenv('GEMINI_API_KEYS', '')
 GEMINI_API_KEYS = [k.strip() for k in GEMINI_API_KEYS_STR.split(',') if k.strip()]
 ENABLE_VERBOSE_DEBUG = os.getenv('ENABLE_VERBOSE_DEBUG', 'False') == 'True'
 
-# Debug: Print what we loaded (only first few chars of each key for security)
+# Debug: log what we loaded (only first few chars of each key for security)
 if ENABLE_VERBOSE_DEBUG:
-    print(f"[ENV DEBUG] GEMINI_API_KEYS_STR length: {len(GEMINI_API_KEYS_STR)}")
-    print(f"[ENV DEBUG] Number of API keys loaded: {len(GEMINI_API_KEYS)}")
+    logger.debug('GEMINI_API_KEYS_STR length: %s', len(GEMINI_API_KEYS_STR))
+    logger.debug('Number of API keys loaded: %s', len(GEMINI_API_KEYS))
     if GEMINI_API_KEYS:
-        print(f"[ENV DEBUG] First key starts with: {GEMINI_API_KEYS[0][:10]}...")
+        logger.debug('First key starts with: %s...', GEMINI_API_KEYS[0][:10])
     else:
-        print(f"[ENV DEBUG] WARNING: No API keys found!")
+        logger.warning('No API keys found in GEMINI_API_KEYS')
 
 SUPPORTED_LANGUAGES = {
     'es': 'Español',
@@ -105,9 +111,10 @@ def translate_chapter_batch(verses_dict, target_language_code, chapter=None):
     Returns:
         Dict of {verse_num: translated_text}
     """
-    print(f"[TRANSLATION DEBUG] batch starting for {len(verses_dict)} verses. Target: {target_language_code}")
-    if not GEMINI_API_KEYS:
-        print("[TRANSLATION DEBUG] No API key configured")
+    logger.info('Verse batch starting for %s verses. Target: %s', len(verses_dict), target_language_code)
+    gateway = get_gateway()
+    if not gateway.keys:
+        logger.error('No Gemini API key configured')
         return {v: "[Translation unavailable - API key not configured]" for v in verses_dict}
     
     language_name = SUPPORTED_LANGUAGES.get(target_language_code, target_language_code)
@@ -132,30 +139,24 @@ Examples:
 
 Return ONLY the translated phrase, no explanation or extra text."""
         
-        # Try API keys for book name
-        for api_key in GEMINI_API_KEYS:
-            try:
-                print(f"[TRANSLATION DEBUG] Translating book name: {book_name}")
-                client = genai.Client(api_key=api_key)
-                response = client.models.generate_content(
+        # The gateway fails over to the next healthy key on quota errors
+        logger.debug('Translating book name: %s', book_name)
+        try:
+            response = gateway.call(
+                lambda client: client.models.generate_content(
                     model='models/gemini-3-flash-preview',
                     contents=book_prompt
-                )
-                translated_book = (response.text or '').strip() # type: ignore
-                results[0] = translated_book
-                print(f"[TRANSLATION DEBUG] Book name translated: {translated_book}")
-                _log_gemini_usage(api_key, 'book_name', target_language_code, book=book_name)
-                break  # Success, exit key loop
-            except Exception as e:
-                error_str = str(e).lower()
-                status_code = 429 if 'quota' in error_str or 'rate limit' in error_str or 'resource exhausted' in error_str else 500
-                _log_gemini_usage(api_key, 'book_name', target_language_code, book=book_name, status_code=status_code, error_message=str(e))
-                if 'quota' in error_str or 'rate limit' in error_str or 'resource exhausted' in error_str:
-                    print(f"[TRANSLATION DEBUG] Book name API key exhausted, trying next...")
-                    continue
-                else:
-                    results[0] = f"[Translation error: {str(e)}]"
-                    break
+                ),
+                purpose='book_name',
+                on_attempt=_usage_logger('book_name', target_language_code, book=book_name),
+            )
+            translated_book = (response.text or '').strip() # type: ignore
+            results[0] = translated_book
+            logger.debug('Book name translated: %s', translated_book)
+        except QuotaExhausted:
+            logger.warning('Book name: all API keys exhausted')
+        except Exception as e:
+            results[0] = f"[Translation error: {str(e)}]"
     
     # If no verses, return book name only
     if not verse_dict_only:
@@ -218,7 +219,7 @@ Return ONLY the translated verses with all HTML tags and <<<VERSE_N>>> markers p
         verse_results = {}
         verse_pattern = r'<<<VERSE_(\d+)>>>\s*(.*?)(?=<<<VERSE_\d+>>>|$)'
         matches = re.findall(verse_pattern, translated_text, re.DOTALL)
-        print(f"[TRANSLATION DEBUG] Regex found {len(matches)} verse segments")
+        logger.debug('Regex found %s verse segments', len(matches))
         for verse_num_str, verse_text in matches:
             verse_num = int(verse_num_str)
             verse_results[verse_num] = verse_text.strip()
@@ -231,59 +232,47 @@ Return ONLY the translated verses with all HTML tags and <<<VERSE_N>>> markers p
         )
         return (response.text or '').strip()  # type: ignore
 
-    # Try each API key in sequence until one works
-    api_keys = GEMINI_API_KEYS
-    last_error = None
-    
-    for api_key in api_keys:
-        try:
-            print(f"[TRANSLATION DEBUG] Calling Gemini API with key ending in ...{api_key[-4:] if api_key else 'None'}")
-            client = genai.Client(api_key=api_key)
-            translated_text = _call_model(client, 'models/gemini-3-flash-preview', prompt)
-            print(f"[TRANSLATION DEBUG] API Response received. Length: {len(translated_text)}")
-            _log_gemini_usage(api_key, 'chapter', target_language_code, book=book_name, chapter=chapter)
-            # print(f"[TRANSLATION DEBUG] Response preview: {translated_text[:100]}...")
-            
+    def _translate(client):
+        translated_text = _call_model(client, 'models/gemini-3-flash-preview', prompt)
+        logger.debug('API response received. Length: %s', len(translated_text))
+        verse_results = _parse_verse_results(translated_text) if translated_text else {}
+
+        # Fallback: retry with gemini-2.5-flash if parsing failed or empty
+        if not verse_results:
+            logger.info('Primary model parsing failed or empty. Retrying with gemini-2.5-flash...')
+            translated_text = _call_model(client, 'models/gemini-2.5-flash', prompt)
+            logger.debug('Fallback response received. Length: %s', len(translated_text))
             verse_results = _parse_verse_results(translated_text) if translated_text else {}
+        return translated_text, verse_results
 
-            # Fallback: retry with gemini-2.5-flash if parsing failed or empty
-            if not verse_results:
-                print(f"[TRANSLATION DEBUG] Primary model parsing failed or empty. Retrying with gemini-2.5-flash...")
-                translated_text = _call_model(client, 'models/gemini-2.5-flash', prompt)
-                print(f"[TRANSLATION DEBUG] Fallback response received. Length: {len(translated_text)}")
-                verse_results = _parse_verse_results(translated_text) if translated_text else {}
-
-            if not verse_results:
-                print(f"[TRANSLATION DEBUG] ERROR: Verse parsing failed after fallback!")
-                if translated_text:
-                    print(f"[TRANSLATION DEBUG] First 500 chars of response: {translated_text[:500]}")
-                # Merge with book name result if we have it
-                if results:
-                    return {**results, **{v: f"[Translation parsing error]" for v in verse_dict_only}}
-                return {v: f"[Translation parsing error]" for v in verses_dict}
-            
-            print(f"[TRANSLATION DEBUG] Verse batch completed successfully! {len(verse_results)} verses translated")
-            # Merge book name results with verse results
-            return {**results, **verse_results}
-            
-        except Exception as e:
-            error_str = str(e).lower()
-            last_error = e
-            status_code = 429 if 'quota' in error_str or 'rate limit' in error_str or 'resource exhausted' in error_str else 500
-            _log_gemini_usage(api_key, 'chapter', target_language_code, book=book_name, chapter=chapter, status_code=status_code, error_message=str(e))
-            # Check for quota/rate limit errors - if so, try next key
-            if 'quota' in error_str or 'rate limit' in error_str or 'resource exhausted' in error_str:
-                print(f"[TRANSLATION DEBUG] API key exhausted, trying next key...")
-                continue
-            else:
-                # Non-quota error, fail immediately
-                # Merge with book name result if we have it
-                error_dict = {v: f"[Translation error: {str(e)}]" for v in verse_dict_only}
-                return {**results, **error_dict}
-    
-    # All keys exhausted
-    print(f"[TRANSLATION DEBUG] All API keys exhausted")
-    return {'__quota_exceeded__': True}
+    try:
+        translated_text, verse_results = gateway.call(
+            _translate,
+            purpose='chapter',
+            on_attempt=_usage_logger('chapter', target_language_code, book=book_name, chapter=chapter),
+        )
+    except QuotaExhausted:
+        # All keys exhausted
+        logger.warning('Verse batch: all API keys exhausted')
+        return {'__quota_exceeded__': True}
+    except Exception as e:
+        # Non-quota error, fail immediately
+        # Merge with book name result if we have it
+        error_dict = {v: f"[Translation error: {str(e)}]" for v in verse_dict_only}
+        return {**results, **error_dict}
+
+    if not verse_results:
+        logger.error('Verse parsing failed after fallback')
+        if translated_text:
+            logger.debug('First 500 chars of response: %s', translated_text[:500])
+        # Merge with book name result if we have it
+        if results:
+            return {**results, **{v: f"[Translation parsing error]" for v in verse_dict_only}}
+        return {v: f"[Translation parsing error]" for v in verses_dict}
+
+    logger.info('Verse batch completed: %s verses translated', len(verse_results))
+    # Merge book name results with verse results
+    return {**results, **verse_results}
 
 
 def translate_footnotes_batch(footnotes_dict, target_language_code):
@@ -296,8 +285,9 @@ def translate_footnotes_batch(footnotes_dict, target_language_code):
     Returns:
         Dict of {footnote_id: translated_footnote_html}
     """
-    print(f"[TRANSLATION DEBUG] Footnote batch starting for {len(footnotes_dict)} footnotes. Target: {target_language_code}")
-    if not GEMINI_API_KEYS:
+    logger.info('Footnote batch starting for %s footnotes. Target: %s', len(footnotes_dict), target_language_code)
+    gateway = get_gateway()
+    if not gateway.keys:
         return {f_id: "[Translation unavailable - API key not configured]" for f_id in footnotes_dict}
     
     if not footnotes_dict:
@@ -338,92 +328,80 @@ Footnotes:
 Return the translated footnotes with <<<FOOTNOTE_X>>> markers and ALL HTML preserved exactly.
 """
     
-    # Try each API key in sequence until one works
-    api_keys = GEMINI_API_KEYS
-    last_error = None
-    
-    for key_idx, api_key in enumerate(api_keys):
-        try:
-            print(f"[TRANSLATION DEBUG] Footnotes: Trying API key {key_idx + 1}/{len(api_keys)} (ending ...{api_key[-4:] if api_key else 'None'})")
-            client = genai.Client(api_key=api_key)
+    def _parse_footnotes(translated_text):
+        # Split by the marker pattern to get individual footnotes
+        # Pattern: <<<FOOTNOTE_XXXXX>>> followed by content
+        import re
+        result = {}
+        parts = re.split(r'<<<FOOTNOTE_([^>]+)>>>', translated_text)
+
+        # parts will be: [preamble, id1, content1, id2, content2, ...]
+        # So we iterate pairs starting at index 1
+        if len(parts) > 1:
+            for i in range(1, len(parts) - 1, 2):
+                footnote_id = parts[i].strip()
+                footnote_content = parts[i + 1].strip() if i + 1 < len(parts) else ''
+                if footnote_id and footnote_content:
+                    result[footnote_id] = footnote_content
+        return result
+
+    def _translate(client):
+        response = client.models.generate_content(
+            model='models/gemini-3-flash-preview',
+            contents=prompt
+        )
+        translated_text = (response.text or '').strip() # type: ignore
+        logger.debug('Footnotes API response received. Length: %s', len(translated_text))
+        result = _parse_footnotes(translated_text)
+        logger.debug('Parsed %s footnotes from response (split method)', len(result))
+
+        # Debug: if we got fewer than expected, log what we found
+        if len(result) < len(footnotes_dict):
+            logger.warning('Expected %s footnotes, got %s', len(footnotes_dict), len(result))
+            logger.debug('Found IDs: %s...', list(result.keys())[:10])
+
+        # Fallback: retry with gemini-2.5-flash if parsing failed or empty
+        if not result:
+            logger.info('Footnotes parsing failed or empty. Retrying with gemini-2.5-flash...')
             response = client.models.generate_content(
-                model='models/gemini-3-flash-preview',
+                model='models/gemini-2.5-flash',
                 contents=prompt
             )
             translated_text = (response.text or '').strip() # type: ignore
-            print(f"[TRANSLATION DEBUG] Footnotes API response received. Length: {len(translated_text)}")
-            
-            # Parse back into footnote dictionary
-            import re
-            result = {}
-            
-            # Split by the marker pattern to get individual footnotes
-            # Pattern: <<<FOOTNOTE_XXXXX>>> followed by content
-            parts = re.split(r'<<<FOOTNOTE_([^>]+)>>>', translated_text)
-            
-            # parts will be: [preamble, id1, content1, id2, content2, ...]
-            # So we iterate pairs starting at index 1
-            if len(parts) > 1:
-                for i in range(1, len(parts) - 1, 2):
-                    footnote_id = parts[i].strip()
-                    footnote_content = parts[i + 1].strip() if i + 1 < len(parts) else ''
-                    if footnote_id and footnote_content:
-                        result[footnote_id] = footnote_content
-            
-            print(f"[TRANSLATION DEBUG] Parsed {len(result)} footnotes from response (split method)")
-            
-            # Debug: if we got fewer than expected, log what we found
-            if len(result) < len(footnotes_dict):
-                print(f"[TRANSLATION DEBUG] WARNING: Expected {len(footnotes_dict)} footnotes, got {len(result)}")
-                print(f"[TRANSLATION DEBUG] Found IDs: {list(result.keys())[:10]}...")
-            
-            # Fallback: retry with gemini-2.5-flash if parsing failed or empty
-            if not result:
-                print(f"[TRANSLATION DEBUG] Footnotes parsing failed or empty. Retrying with gemini-2.5-flash...")
-                response = client.models.generate_content(
-                    model='models/gemini-2.5-flash',
-                    contents=prompt
-                )
-                translated_text = (response.text or '').strip() # type: ignore
-                print(f"[TRANSLATION DEBUG] Footnotes fallback response length: {len(translated_text)}")
-                parts = re.split(r'<<<FOOTNOTE_([^>]+)>>>', translated_text)
-                if len(parts) > 1:
-                    for i in range(1, len(parts) - 1, 2):
-                        footnote_id = parts[i].strip()
-                        footnote_content = parts[i + 1].strip() if i + 1 < len(parts) else ''
-                        if footnote_id and footnote_content:
-                            result[footnote_id] = footnote_content
-
-            # Fallback: if parsing failed, return error
-            if not result:
-                print(f"[TRANSLATION DEBUG] ERROR: Parsing failed, no footnotes extracted!")
-                print(f"[TRANSLATION DEBUG] Response length: {len(translated_text)} chars")
-                print(f"[TRANSLATION DEBUG] First 500 chars: {translated_text[:500]}")
-                return {f_id: f"[Translation parsing error]" for f_id in footnotes_dict}
-            
-            print(f"[TRANSLATION DEBUG] Footnote batch completed successfully! {len(result)} footnotes translated")
-            return result
-            
-        except Exception as e:
-            error_str = str(e).lower()
-            last_error = e
-            # Check for quota/rate limit errors - if so, try next key
-            if 'quota' in error_str or 'rate limit' in error_str or 'resource exhausted' in error_str:
-                print(f"[TRANSLATION DEBUG] API key {key_idx + 1}/{len(api_keys)} exhausted, trying next key...")
-                continue
-            else:
-                # Non-quota error, fail immediately
-                print(f"[TRANSLATION DEBUG] Non-quota error: {str(e)}")
-                return {f_id: f"[Translation error: {str(e)}]" for f_id in footnotes_dict}
-    
-    # All keys exhausted
-    print(f"[TRANSLATION DEBUG] All {len(api_keys)} API keys exhausted")
-    return {'__quota_exceeded__': True}
+            logger.debug('Footnotes fallback response length: %s', len(translated_text))
+            result = _parse_footnotes(translated_text)
+        return translated_text, result
+
+    try:
+        translated_text, result = gateway.call(
+            _translate,
+            purpose='footnotes',
+            on_attempt=_usage_logger('footnotes', target_language_code),
+        )
+    except QuotaExhausted:
+        # All keys exhausted
+        logger.warning('Footnote batch: all %s API keys exhausted', len(gateway.keys))
+        return {'__quota_exceeded__': True}
+    except Exception as e:
+        # Non-quota error, fail immediately
+        logger.error('Footnote batch non-quota error: %s', e)
+        return {f_id: f"[Translation error: {str(e)}]" for f_id in footnotes_dict}
+
+    # Fallback: if parsing failed, return error
+    if not result:
+        logger.error('Footnote parsing failed, no footnotes extracted')
+        logger.debug('Response length: %s chars', len(translated_text))
+        logger.debug('First 500 chars: %s', translated_text[:500])
+        return {f_id: f"[Translation parsing error]" for f_id in footnotes_dict}
+
+    logger.info('Footnote batch completed: %s footnotes translated', len(result))
+    return result
 
 
 def translate_verse_text(english_text, target_language_code):
     """Translate verse text to target language using Gemini API"""
-    if not GEMINI_API_KEYS:
+    gateway = get_gateway()
+    if not gateway.keys:
         return f"[Translation unavailable - API key not configured]"
     
     language_name = SUPPORTED_LANGUAGES.get(target_language_code, target_language_code)
@@ -445,10 +423,12 @@ English text:
 Return only the translated text with HTML tags preserved."""
     
     try:
-        client = genai.Client(api_key=GEMINI_API_KEYS[0])
-        response = client.models.generate_content(
-            model='models/gemini-3-flash-preview',
-            contents=prompt
+        response = gateway.call(
+            lambda client: client.models.generate_content(
+                model='models/gemini-3-flash-preview',
+                contents=prompt
+            ),
+            purpose='verse',
         )
         return (response.text or '').strip() # type: ignore
     except Exception as e:
@@ -457,7 +437,8 @@ Return only the translated text with HTML tags preserved."""
 
 def translate_footnote_text(english_footnote, target_language_code):
     """Translate footnote text to target language using Gemini API"""
-    if not GEMINI_API_KEYS:
+    gateway = get_gateway()
+    if not gateway.keys:
         return f"[Translation unavailable - API key not configured]"
     
     language_name = SUPPORTED_LANGUAGES.get(target_language_code, target_language_code)
@@ -479,10 +460,12 @@ English footnote:
 Return only the translated text with HTML tags preserved."""
     
     try:
-        client = genai.Client(api_key=GEMINI_API_KEYS[0])
-        response = client.models.generate_content(
-            model='models/gemini-3-flash-preview',
-            contents=prompt
+        response = gateway.call(
+            lambda client: client.models.generate_content(
+                model='models/gemini-3-flash-preview',
+                contents=prompt
+            ),
+            purpose='footnote',
         )
         return (response.text or '').strip() # type: ignore
     except Exception as e:
@@ -509,15 +492,8 @@ def get_or_create_verse_translation(book, chapter, verse, language_code, english
     # Generate new translation
     translated_text = translate_verse_text(english_text, language_code)
     
-    # Save to database
-    VerseTranslation.objects.create(
-        book=book,
-        chapter=chapter,
-        verse=verse,
-        language_code=language_code,
-        verse_text=translated_text,
-        status='ai_generated'
-    )
+    # Save to database (one row per verse, see search/translation_store.py)
+    upsert_verse_texts(book, chapter, language_code, {verse: translated_text}, status='ai_generated')
     
     return translated_text
 
@@ -555,31 +531,34 @@ def get_or_create_footnote_translation(footnote_id, language_code, english_footn
     # Generate new translation
     translated_text = translate_footnote_text(english_footnote, language_code)
     
-    # Save to database
-    VerseTranslation.objects.create(
+    # Save to database (one row per footnote, see search/translation_store.py)
+    VerseTranslation.objects.update_or_create(
         book=book,
         chapter=chapter,
-        verse=verse,
         language_code=language_code,
         footnote_id=footnote_id,
-        footnote_text=translated_text,
-        status='ai_generated'
+        defaults={'verse': verse, 'footnote_text': translated_text, 'status': 'ai_generated'},
     )
     
     return translated_text
 
+def _usage_logger(request_type, language_code, book=None, chapter=None):
+    """Gateway on_attempt callback recording every attempt (including failovers) in GeminiUsageLog."""
+    def log(api_key, status_code, error, duration):
+        _log_gemini_usage(api_key, request_type, language_code, book=book, chapter=chapter,
+                          status_code=status_code, error_message=error)
+    return log
+
+
 def _log_gemini_usage(api_key, request_type, language_code, book=None, chapter=None, status_code=200, error_message=None):
-    try:
-        from .models import GeminiUsageLog
-        abbrev = f"...{api_key[-4:]}" if api_key else "None"
-        GeminiUsageLog.objects.create(
-            api_key_abbrev=abbrev,
-            request_type=request_type,
-            language_code=language_code,
-            book=book,
-            chapter=chapter,
-            status_code=status_code,
-            error_message=str(error_message)[:200] if error_message else None
-        )
-    except Exception as e:
-        print(f"[TRANSLATION LOG ERROR] {e}")
+    abbrev = f"...{api_key[-4:]}" if api_key else "None"
+    # Buffered; written in batches by search/gemini_usage.py off the request thread.
+    record_usage(
+        api_key_abbrev=abbrev,
+        request_type=request_type,
+        language_code=language_code,
+        book=book,
+        chapter=chapter,
+        status_code=status_code,
+        error_message=str(error_message)[:200] if error_message else None
+    )
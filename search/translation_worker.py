@@ -10,11 +10,13 @@ This module handles translation jobs in a background thread, ensuring:
 
 import threading
 import logging
-import traceback
+import time
 from datetime import datetime
 from django.utils import timezone
 from django.db import transaction, close_old_connections
 
+from hebrewtool import metrics
+
 logger = logging.getLogger(__name__)
 
 # Global worker thread reference
@@ -39,7 +41,6 @@ class TranslationWorker:
         with _worker_lock:
             if _worker_thread is not None and _worker_thread.is_alive():
                 logger.info("Worker already running")
-                print("[WORKER] Worker already running")
                 return
             
             self.running = True
@@ -47,7 +48,6 @@ class TranslationWorker:
             _worker_thread = threading.Thread(target=self._run, daemon=True)
             _worker_thread.start()
             logger.info("Translation worker started")
-            print("[WORKER] Translation worker thread started")
     
     def stop(self):
         """Stop the worker thread gracefully"""
@@ -59,7 +59,7 @@ class TranslationWorker:
         """Main worker loop"""
         from search.models import TranslationJob
         
-        print("[WORKER] Worker loop starting...")
+        logger.info('[WORKER] Worker loop starting...')
         
         while not self._stop_event.is_set():
             try:
@@ -70,24 +70,32 @@ class TranslationWorker:
                 job = self._claim_job()
                 
                 if job:
-                    print(f"[WORKER] Processing job: {job.job_id}")
                     logger.info(f"Processing job: {job.job_id}")
+                    started = time.perf_counter()
                     self._process_job(job)
-                    print(f"[WORKER] Finished job: {job.job_id}")
+                    self._record_job_metrics(job, time.perf_counter() - started)
+                    logger.info('[WORKER] Finished job: %s', job.job_id)
                 else:
                     # No jobs, wait a bit before checking again
                     self._stop_event.wait(timeout=2.0)
                     
             except Exception as e:
-                print(f"[WORKER] Error: {e}")
-                logger.error(f"Worker error: {e}")
-                traceback.print_exc()
+                logger.exception(f"Worker error: {e}")
                 # Wait before retrying
                 self._stop_event.wait(timeout=5.0)
         
-        print("[WORKER] Worker loop stopped")
         logger.info("Translation worker stopped")
     
+    def _record_job_metrics(self, job, duration):
+        """Count a finished job and its translated items in hebrewtool.metrics."""
+        try:
+            job.refresh_from_db(fields=['status', 'translated_verses', 'translated_footnotes'])
+            metrics.translation_jobs.inc(status=job.status)
+            metrics.translation_verses.inc((job.translated_verses or 0) + (job.translated_footnotes or 0))
+            metrics.translation_job_seconds.observe(duration)
+        except Exception as e:
+            logger.warning(f"Could not record metrics for job {job.job_id}: {e}")
+    
     def _claim_job(self):
         """
         Atomically claim a pending or orphaned processing job.
@@ -111,7 +119,7 @@ class TranslationWorker:
                     job.status = 'processing'
                     job.started_at = timezone.now()
                     job.save()
-                    print(f"[WORKER] Claimed pending job: {job.job_id}")
+                    logger.info('[WORKER] Claimed pending job: %s', job.job_id)
                     return job
                 
                 # Check for orphaned processing jobs (started more than 5 min ago)
@@ -122,7 +130,7 @@ class TranslationWorker:
                 ).order_by('started_at').first()
                 
                 if orphaned_job:
-                    print(f"[WORKER] Resuming orphaned job: {orphaned_job.job_id}")
+                    logger.info('[WORKER] Resuming orphaned job: %s', orphaned_job.job_id)
                     # Reset the start time but keep the progress
                     orphaned_job.started_at = timezone.now()
                     orphaned_job.save()
@@ -130,7 +138,6 @@ class TranslationWorker:
                     
         except Exception as e:
             logger.error(f"Error claiming job: {e}")
-            print(f"[WORKER] Error claiming job: {e}")
         
         return None
     
@@ -148,7 +155,6 @@ class TranslationWorker:
             chapter_num = job.chapter
             language = job.language_code
             
-            print(f"[WORKER] Starting translation: {book} ch{chapter_num} to {language}")
             logger.info(f"Starting translation: {book} ch{chapter_num} to {language}")
             
             # Special handling for Joseph and Aseneth (storehouse)
@@ -237,21 +243,20 @@ class TranslationWorker:
             job.total_footnotes = len(footnotes_to_translate)
             job.save()
             
-            print(f"[WORKER] {book} ch{chapter_num}: {len(verses_to_translate)} verses, {len(footnotes_to_translate)} footnotes to translate")
             logger.info(f"Job {job.job_id}: {len(verses_to_translate)} verses, {len(footnotes_to_translate)} footnotes")
             
             # Translate verses in batches
             if verses_to_translate:
                 self._translate_verses(job, verses_to_translate, book, chapter_num, language)
             else:
-                print(f"[WORKER] No verses to translate")
+                logger.info('[WORKER] No verses to translate')
             
             # Translate footnotes in batches
             if footnotes_to_translate:
-                print(f"[WORKER] Starting footnote translation for {len(footnotes_to_translate)} footnotes")
+                logger.info('[WORKER] Starting footnote translation for %s footnotes', len(footnotes_to_translate))
                 self._translate_footnotes(job, footnotes_to_translate, book, chapter_num, language)
             else:
-                print(f"[WORKER] No footnotes to translate")
+                logger.info('[WORKER] No footnotes to translate')
             
             # Mark job complete
             job.status = 'completed'
@@ -261,8 +266,7 @@ class TranslationWorker:
             logger.info(f"Job {job.job_id} completed successfully")
             
         except Exception as e:
-            logger.error(f"Job {job.job_id} failed: {e}")
-            traceback.print_exc()
+            logger.exception(f"Job {job.job_id} failed: {e}")
             
             job.status = 'failed'
             job.error_message = str(e)
@@ -283,7 +287,7 @@ class TranslationWorker:
         ).exists()
 
         if existing:
-            print(f"[WORKER] Gospel of Judas codex {chapter_num} already translated to {language}")
+            logger.info('[WORKER] Gospel of Judas codex %s already translated to %s', chapter_num, language)
             return verses_to_translate, {}
 
         try:
@@ -300,9 +304,7 @@ class TranslationWorker:
                         # Store prose as verse=1 (verse=0 is reserved for book name)
                         verses_to_translate[1] = row[0]
         except Exception as e:
-            print(f"[WORKER] Error extracting Gospel of Judas content: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('[WORKER] Error extracting Gospel of Judas content: %s', e)
 
         return verses_to_translate, {}
 
@@ -319,7 +321,7 @@ class TranslationWorker:
             status='completed',
         ).exists()
         if existing:
-            print(f"[WORKER] Judas commentary already translated to {language}")
+            logger.info('[WORKER] Judas commentary already translated to %s', language)
             return
 
         try:
@@ -346,9 +348,9 @@ class TranslationWorker:
                             'generated_by': 'gemini-3-flash-preview',
                         }
                     )
-            print(f"[WORKER] Judas commentary translated to {language}")
+            logger.info('[WORKER] Judas commentary translated to %s', language)
         except Exception as e:
-            print(f"[WORKER] Error translating Judas commentary: {e}")
+            logger.warning('[WORKER] Error translating Judas commentary: %s', e)
 
     def _translate_judas_heading(self, language):
         """Translate the heading phrase 'Gospel of Confessor' (chapter=0, verse=3) per language."""
@@ -362,7 +364,7 @@ class TranslationWorker:
             status='completed',
         ).exists()
         if existing:
-            print(f"[WORKER] Judas heading already translated to {language}")
+            logger.info('[WORKER] Judas heading already translated to %s', language)
             return
 
         heading_text = "Gospel of Confessor"
@@ -378,7 +380,7 @@ class TranslationWorker:
                         'generated_by': 'gemini-3-flash-preview',
                     }
                 )
-        print(f"[WORKER] Judas heading translated to {language}")
+        logger.info('[WORKER] Judas heading translated to %s', language)
 
     def _extract_storehouse_content(self, book, chapter_num, language):
         """Extract translatable content from Joseph and Aseneth (storehouse)"""
@@ -417,9 +419,7 @@ class TranslationWorker:
                             if verse_num > 0 and verse_num not in existing_verses:
                                 verses_to_translate[verse_num] = english_text
         except Exception as e:
-            print(f"[WORKER] Error extracting storehouse content: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('[WORKER] Error extracting storehouse content: %s', e)
         
         return verses_to_translate, footnotes_to_translate
     
@@ -525,7 +525,7 @@ class TranslationWorker:
         chapter_rows = results.get('chapter_reader', [])
         book_abbrev = book_abbreviations.get(book, book)
         
-        print(f"[WORKER NT] Extracting content for {book} (abbrev: {book_abbrev}) ch{chapter_num}")
+        logger.debug('[WORKER NT] Extracting content for %s (abbrev: %s) ch%s', book, book_abbrev, chapter_num)
         
         # Get existing translations
         existing_verses = set(VerseTranslation.objects.filter(
@@ -538,7 +538,7 @@ class TranslationWorker:
             status='completed'
         ).exclude(footnote_id__isnull=True).values_list('footnote_id', flat=True))
         
-        print(f"[WORKER NT] Existing: {len(existing_verses)} verses, {len(existing_footnotes)} footnotes")
+        logger.debug('[WORKER NT] Existing: %s verses, %s footnotes', len(existing_verses), len(existing_footnotes))
         
         for row in chapter_rows:
             bk, ch_num, vrs, html_verse = row
@@ -551,7 +551,7 @@ class TranslationWorker:
             if html_verse:
                 sup_texts = re.findall(r'<sup>(.*?)</sup>', html_verse)
                 if sup_texts:
-                    print(f"[WORKER NT] Verse {verse_num} has {len(sup_texts)} footnote refs: {sup_texts}")
+                    logger.debug('[WORKER NT] Verse %s has %s footnote refs: %s', verse_num, len(sup_texts), sup_texts)
                 for sup_text in sup_texts:
                     full_id = f"{book}-{sup_text}"
                     if full_id not in existing_footnotes:
@@ -564,7 +564,7 @@ class TranslationWorker:
                             table_name = f"{abbrev_lower}_footnotes"
                         # Footnote IDs in DB use abbreviation format (e.g., '1Jo-1')
                         db_footnote_id = f"{book_abbrev}-{sup_text}"
-                        print(f"[WORKER NT] Querying {table_name} for footnote_id={db_footnote_id}")
+                        logger.debug('[WORKER NT] Querying %s for footnote_id=%s', table_name, db_footnote_id)
                         try:
                             result = execute_query(
                                 f"SELECT footnote_html FROM new_testament.{table_name} WHERE footnote_id = %s",
@@ -572,18 +572,19 @@ class TranslationWorker:
                             )
                             if result and result[0]:
                                 footnotes_to_translate[full_id] = result[0]
-                                print(f"[WORKER NT] Found footnote {full_id}")
+                                logger.debug('[WORKER NT] Found footnote %s', full_id)
                             else:
-                                print(f"[WORKER NT] No result for footnote {sup_text}")
+                                logger.debug('[WORKER NT] No result for footnote %s', sup_text)
                         except Exception as e:
-                            print(f"[WORKER NT] Error querying footnote {sup_text}: {e}")
+                            logger.warning('[WORKER NT] Error querying footnote %s: %s', sup_text, e)
         
-        print(f"[WORKER NT] Extracted {len(verses_to_translate)} verses, {len(footnotes_to_translate)} footnotes to translate")
+        logger.debug('[WORKER NT] Extracted %s verses, %s footnotes to translate', len(verses_to_translate), len(footnotes_to_translate))
         return verses_to_translate, footnotes_to_translate
     
     def _translate_book_name(self, book, language):
         """Translate book name and save as verse=0, chapter=0"""
         from search.models import VerseTranslation
+        from search.translation_store import upsert_verse_texts
         from search.translation_utils import translate_chapter_batch, SUPPORTED_LANGUAGES
         from search.rbt_titles import rbt_books
         import re
@@ -595,7 +596,7 @@ class TranslationWorker:
         ).first()
         
         if existing:
-            print(f"[WORKER] Book name '{book}' already translated to {language}")
+            logger.info("[WORKER] Book name '%s' already translated to %s", book, language)
             return
         
         # Get English book name (with space between number and letters)
@@ -606,7 +607,7 @@ class TranslationWorker:
         }
         english_name = _display_overrides.get(display_book) or rbt_books.get(display_book, display_book)
         
-        print(f"[WORKER] Translating book name '{english_name}' ({book}) to {language}")
+        logger.info("[WORKER] Translating book name '%s' (%s) to %s", english_name, book, language)
         
         try:
             # Use batch translation with verse=0 to trigger book name translation logic
@@ -616,25 +617,17 @@ class TranslationWorker:
             
             # Check if translation was successful (not an error message)
             if translated_name and not translated_name.startswith('[Translation'):
-                # Save translation
-                VerseTranslation.objects.create(
-                    book=book,
-                    chapter=0,
-                    verse=0,
-                    language_code=language,
-                    verse_text=translated_name,
-                    status='completed'
-                )
-                print(f"[WORKER] Book name translated: '{english_name}' -> '{translated_name}'")
+                # Save translation (replaces a 'processing' placeholder row)
+                upsert_verse_texts(book, 0, language, {0: translated_name})
+                logger.info("[WORKER] Book name translated: '%s' -> '%s'", english_name, translated_name)
             else:
-                print(f"[WORKER] Failed to translate book name: {translated_name}")
+                logger.warning('[WORKER] Failed to translate book name: %s', translated_name)
         except Exception as e:
-            print(f"[WORKER] Error translating book name: {e}")
             logger.error(f"Error translating book name {book} to {language}: {e}")
     
     def _translate_verses(self, job, verses_to_translate, book, chapter_num, language):
         """Translate verses and save incrementally"""
-        from search.models import VerseTranslation
+        from search.translation_store import upsert_verse_texts
         from search.translation_utils import translate_chapter_batch, SUPPORTED_LANGUAGES
         
         if not verses_to_translate:
@@ -648,27 +641,15 @@ class TranslationWorker:
             batch = dict(verse_items[i:i + batch_size])
             
             try:
-                print(f"[WORKER] Translating {book} {chapter_num} verses batch {i//batch_size + 1}/{(len(verse_items)-1)//batch_size + 1}")
+                logger.info('[WORKER] Translating %s %s verses batch %s/%s', book, chapter_num, i//batch_size + 1, (len(verse_items)-1)//batch_size + 1)
                 translated = translate_chapter_batch(batch, language, chapter=chapter_num)
                 
-                # Save each translation
-                for verse_num, translated_text in translated.items():
-                    VerseTranslation.objects.update_or_create(
-                        book=book,
-                        chapter=chapter_num,
-                        verse=verse_num,
-                        language_code=language,
-                        footnote_id=None,
-                        defaults={
-                            'verse_text': translated_text,
-                            'status': 'completed',
-                            'generated_by': 'gemini-3-flash-preview'
-                        }
-                    )
-                    
-                    # Update progress
-                    job.translated_verses += 1
-                    job.save()
+                # Save the batch in one upsert
+                upsert_verse_texts(book, chapter_num, language, translated)
+                
+                # Update progress
+                job.translated_verses += len(translated)
+                job.save()
                     
             except Exception as e:
                 logger.error(f"Error translating verses batch: {e}")
@@ -690,22 +671,23 @@ class TranslationWorker:
             batch = dict(footnote_items[i:i + batch_size])
             
             try:
-                print(f"[WORKER] Translating {book} {chapter_num} footnotes batch {i//batch_size + 1}/{(len(footnote_items)-1)//batch_size + 1}")
+                logger.info('[WORKER] Translating %s %s footnotes batch %s/%s', book, chapter_num, i//batch_size + 1, (len(footnote_items)-1)//batch_size + 1)
                 translated = translate_footnotes_batch(batch, language)
                 
                 # Save each translation
                 for footnote_id, translated_text in translated.items():
+                    defaults = {
+                        'footnote_text': translated_text,
+                        'status': 'completed',
+                        'generated_by': 'gemini-3-flash-preview'
+                    }
                     VerseTranslation.objects.update_or_create(
                         book=book,
                         chapter=chapter_num,
-                        verse=0,  # Footnotes stored with verse=0
                         language_code=language,
                         footnote_id=footnote_id,
-                        defaults={
-                            'footnote_text': translated_text,
-                            'status': 'completed',
-                            'generated_by': 'gemini-3-flash-preview'
-                        }
+                        defaults=defaults,
+                        create_defaults={**defaults, 'verse': 0},  # new footnote rows get verse=0
                     )
                     
                     # Update progress
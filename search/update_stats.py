@@ -0,0 +1,158 @@
+"""
+Incremental rollups of TranslationUpdates for update_statistics_api.
+
+Every editor save goes through translate.views._safe_save_update, which calls
+record_translation_update() to bump two counters:
+- update_stats_hourly: updates per clock hour. Daily, weekly and monthly
+  series and the hour-of-day / weekday patterns are all sums of these.
+- update_stats_reference_daily: updates per (day, reference). Top references,
+  unique references and OT footnote references come from here.
+
+rebuild_update_stats() recomputes both tables from translation_updates
+(used by the 0013 migration and `manage.py rebuild_update_stats`).
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate, TruncHour
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_MAX_LENGTH = 255
+
+
+def _hour_start(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def record_translation_update(instance):
+    """Add one saved TranslationUpdates row to the rollups."""
+    if instance.date is None:
+        return
+    reference = (instance.reference or '')[:REFERENCE_MAX_LENGTH]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO update_stats_hourly (hour, updates) VALUES (%s, 1)
+            ON CONFLICT (hour) DO UPDATE SET updates = update_stats_hourly.updates + 1
+            """,
+            [_hour_start(instance.date)],
+        )
+        cursor.execute(
+            """
+            INSERT INTO update_stats_reference_daily (date, reference, updates) VALUES (%s, %s, 1)
+            ON CONFLICT (date, reference)
+            DO UPDATE SET updates = update_stats_reference_daily.updates + 1
+            """,
+            [instance.date.date(), reference],
+        )
+
+
+def rebuild_update_stats(translation_updates=None, hourly_model=None, reference_model=None):
+    """
+    Recompute both rollup tables from translation_updates.
+
+    Model classes can be passed in so migrations can use historical models.
+    Returns (hourly_rows, reference_rows).
+    """
+    if translation_updates is None:
+        from search.models import TranslationUpdates, UpdateStatsHourly, UpdateStatsReferenceDaily
+        translation_updates, hourly_model, reference_model = (
+            TranslationUpdates, UpdateStatsHourly, UpdateStatsReferenceDaily
+        )
+
+    hourly = [
+        hourly_model(hour=row['hour'], updates=row['n'])
+        for row in translation_updates.objects.annotate(hour=TruncHour('date'))
+        .values('hour').annotate(n=Count('date')).order_by()
+    ]
+
+    # Aggregate in Python after truncating, so long references that share a
+    # 255-char prefix land in the same row instead of violating the constraint.
+    per_reference = defaultdict(int)
+    for row in (
+        translation_updates.objects.annotate(day=TruncDate('date'))
+        .values('day', 'reference').annotate(n=Count('date')).order_by().iterator(chunk_size=5000)
+    ):
+        per_reference[(row['day'], (row['reference'] or '')[:REFERENCE_MAX_LENGTH])] += row['n']
+    references = [
+        reference_model(date=day, reference=reference, updates=n)
+        for (day, reference), n in per_reference.items()
+    ]
+
+    with transaction.atomic():
+        hourly_model.objects.all().delete()
+        reference_model.objects.all().delete()
+        hourly_model.objects.bulk_create(hourly, batch_size=1000)
+        reference_model.objects.bulk_create(references, batch_size=1000)
+    return len(hourly), len(references)
+
+
+def hourly_counts(start, end):
+    """[(hour_start, count), ...] for buckets overlapping [start, end], oldest first."""
+    from search.models import UpdateStatsHourly
+
+    return list(
+        UpdateStatsHourly.objects.filter(hour__gte=_hour_start(start), hour__lte=end)
+        .order_by('hour').values_list('hour', 'updates')
+    )
+
+
+def reference_counts(start, end):
+    """Queryset of per-day reference counters with dates in [start, end]."""
+    from search.models import UpdateStatsReferenceDaily
+
+    return UpdateStatsReferenceDaily.objects.filter(date__gte=start.date(), date__lte=end.date())
+
+
+def top_references(start, end, limit=100):
+    return list(
+        reference_counts(start, end)
+        .exclude(reference__exact='')
+        .exclude(reference='[]')
+        .values('reference')
+        .annotate(count=Sum('updates'))
+        .order_by('-count')[:limit]
+    )
+
+
+def weekday_pattern(end, weeks=4):
+    """Updates per weekday name over the last `weeks` weeks."""
+    stats = defaultdict(int)
+    for hour, count in hourly_counts(end - timedelta(weeks=weeks), end):
+        stats[hour.strftime('%A')] += count
+    return [
+        {'day': day, 'count': stats[day]}
+        for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    ]
+
+
+def bucket_series(hourly):
+    """Fold hourly buckets into daily/weekly/monthly dicts and an hour-of-day counter."""
+    daily = defaultdict(int)
+    weekly = defaultdict(int)
+    monthly = defaultdict(int)
+    hour_of_day = defaultdict(int)
+    for hour, count in hourly:
+        day = hour.date()
+        daily[day] += count
+        weekly[day - timedelta(days=day.weekday())] += count
+        monthly[day.replace(day=1)] += count
+        hour_of_day[hour.hour] += count
+    return daily, weekly, monthly, hour_of_day
+
+
+def range_start(days_param, end_date):
+    """Mirror update_statistics_api's ?days= parsing; returns (start_date, days_back)."""
+    if days_param == 'all':
+        start_date = datetime(2024, 1, 1)
+        return start_date, (end_date - start_date).days
+    try:
+        days_back = max(0, int(days_param))
+    except (ValueError, TypeError):
+        days_back = 30
+    return end_date - timedelta(days=days_back), days_back
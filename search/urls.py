@@ -1,7 +1,7 @@
 from django.urls import path
 
 from . import views
-from translate import views as translate_views
+from hebrewtool.lazy_imports import lazy_view
 
 urlpatterns = [
     path('', views.search, name='search'),
@@ -32,7 +32,7 @@ urlpatterns = [
     path('translation/retry-failed/', views.retry_failed_translations, name='retry_failed_translations'),
 
     # Aeon Bot API endpoints
-    path('gemini/dashboard/', translate_views.gemini_dashboard_view, name='gemini_dashboard'),
+    path('gemini/dashboard/', lazy_view('translate.llm_views.gemini_dashboard_view'), name='gemini_dashboard'),
     path('aeon/status/', views.aeon_status, name='aeon_status'),
     path('aeon/dashboard/', views.aeon_dashboard, name='aeon_dashboard'),
     path('aeon/dashboard/view/', views.aeon_dashboard_page, name='aeon_dashboard_page'),
@@ -1,6 +1,5 @@
 import json
 import os
-import csv
 import time
 from django.conf import settings
 from django.db import connection, transaction
@@ -35,11 +34,56 @@ def load_mapping_from_db_or_file(file_path: str | None = None):
     raise RuntimeError('No interlinear mapping found in DB (InterlinearConfig).')
 
 
+def _load_interlinear_changes(cur, mapping: dict):
+    """Stage the mapping and the rows it changes in temp tables (dropped on commit).
+
+    interlinear_mapping holds the mapping in dict order; the first key equal to a
+    row's strongs or lemma wins. interlinear_changes holds every row whose english
+    would change (row_ctid, cond, strongs, lemma, old_english, new_english).
+    """
+    cur.execute(
+        "CREATE TEMP TABLE interlinear_mapping (ord integer, cond text, replacement text) ON COMMIT DROP"
+    )
+    rows = [(ord_, str(cond), None if replacement is None else str(replacement))
+            for ord_, (cond, replacement) in enumerate(mapping.items())]
+    cur.execute(
+        "INSERT INTO interlinear_mapping (ord, cond, replacement) VALUES " + ', '.join(['(%s, %s, %s)'] * len(rows)),
+        [value for row in rows for value in row],
+    )
+    cur.execute("ANALYZE interlinear_mapping")
+
+    # Two equi-joins (hash joins) instead of one OR join; DISTINCT ON keeps the first key
+    cur.execute(
+        """
+        CREATE TEMP TABLE interlinear_changes ON COMMIT DROP AS
+        WITH matches AS (
+            SELECT g.ctid AS row_ctid, m.ord, m.cond, m.replacement
+            FROM rbt_greek.strongs_greek g JOIN interlinear_mapping m ON m.cond = g.strongs
+            UNION ALL
+            SELECT g.ctid, m.ord, m.cond, m.replacement
+            FROM rbt_greek.strongs_greek g JOIN interlinear_mapping m ON m.cond = g.lemma
+        ),
+        first_match AS (
+            SELECT DISTINCT ON (row_ctid) row_ctid, cond, replacement
+            FROM matches ORDER BY row_ctid, ord
+        )
+        SELECT f.row_ctid, f.cond, g.strongs, g.lemma, g.english AS old_english, f.replacement AS new_english
+        FROM first_match f JOIN rbt_greek.strongs_greek g ON g.ctid = f.row_ctid
+        WHERE g.english IS DISTINCT FROM f.replacement
+        """
+    )
+
+
 def apply_interlinear(mapping: dict, dry_run: bool = True, limit: int = 20, backup_dir: str | None = None, clear_mapping_on_commit: bool = False, user: str | None = None):
     """Apply mapping to rbt_greek.strongs_greek.
 
+    Set-based: the mapping is loaded into a temp table and the changed rows are
+    computed with one join; a commit backs them up with one COPY ... TO and
+    applies them with one UPDATE ... FROM.
+
     Returns a dict:
       { 'total_candidates': int,
+        'per_key': { mapping key: rows it changes },
         'samples': [ (strongs, lemma, old, new), ... ],
         'applied': int (0 if dry_run),
         'backup_file': path or None,
@@ -48,60 +92,50 @@ def apply_interlinear(mapping: dict, dry_run: bool = True, limit: int = 20, back
     if not isinstance(mapping, dict):
         raise ValueError('mapping must be a dict')
 
-    def replace_func(strongs, lemma, english):
-        for cond, replacement in mapping.items():
-            try:
-                cond_s = str(cond)
-            except Exception:
-                cond_s = cond
-            if strongs == cond_s or (lemma is not None and lemma == cond_s):
-                return replacement
-        return english
-
-    cur = connection.cursor()
-    cur.execute("SELECT strongs, lemma, english FROM rbt_greek.strongs_greek")
-    rows = cur.fetchall()
-
-    candidates = []
-    apply_rows = []
-    total = 0
-    for strongs, lemma, english in rows:
-        new_english = replace_func(strongs, lemma, english)
-        if new_english != english:
-            total += 1
-            if len(candidates) < limit:
-                candidates.append((strongs, lemma, english, new_english))
-            apply_rows.append((strongs, lemma, english, new_english))
-
-    result = {'total_candidates': total, 'samples': candidates, 'applied': 0, 'backup_file': None, 'cleared': False}
-
-    if dry_run:
+    result = {'total_candidates': 0, 'per_key': {}, 'samples': [], 'applied': 0, 'backup_file': None, 'cleared': False}
+    if not mapping:
         return result
 
-    # Prepare backup
-    if backup_dir is None:
-        backup_dir = os.path.join(settings.BASE_DIR, 'reports')
-    os.makedirs(backup_dir, exist_ok=True)
-    ts = int(time.time())
-    backup_file = os.path.join(backup_dir, f'interlinear_backup_{ts}.csv')
-
-    with open(backup_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(['strongs', 'lemma', 'old_english', 'new_english'])
-        for row in apply_rows:
-            writer.writerow(row)
-
-    # Apply changes in a transaction
-    applied = 0
-    with transaction.atomic():
-        for strongs, lemma, old_english, new_english in apply_rows:
-            cur.execute(
-                "UPDATE rbt_greek.strongs_greek SET english = %s WHERE strongs = %s AND lemma = %s",
-                (new_english, strongs, lemma)
+    if not dry_run:
+        if backup_dir is None:
+            backup_dir = os.path.join(settings.BASE_DIR, 'reports')
+        os.makedirs(backup_dir, exist_ok=True)
+        backup_file = os.path.join(backup_dir, f'interlinear_backup_{int(time.time())}.csv')
+
+    with transaction.atomic(), connection.cursor() as cur:
+        if not dry_run:
+            # Writers wait until the apply commits; readers are not blocked. Also keeps
+            # the staged ctids valid until the UPDATE.
+            cur.execute("LOCK TABLE rbt_greek.strongs_greek IN SHARE ROW EXCLUSIVE MODE")
+        _load_interlinear_changes(cur, mapping)
+
+        cur.execute("SELECT cond, count(*) FROM interlinear_changes GROUP BY cond ORDER BY count(*) DESC, cond")
+        result['per_key'] = dict(cur.fetchall())
+        result['total_candidates'] = sum(result['per_key'].values())
+        cur.execute(
+            "SELECT strongs, lemma, old_english, new_english FROM interlinear_changes LIMIT %s",
+            [limit],
+        )
+        result['samples'] = [tuple(row) for row in cur.fetchall()]
+
+        if dry_run or not result['total_candidates']:
+            return result
+
+        with open(backup_file, 'w', newline='', encoding='utf-8') as csvfile:
+            cur.copy_expert(
+                "COPY (SELECT strongs, lemma, old_english, new_english FROM interlinear_changes) "
+                "TO STDOUT WITH (FORMAT csv, HEADER)",
+                csvfile,
             )
-            applied += 1
 
-    result['applied'] = applied
+        cur.execute(
+            """
+            UPDATE rbt_greek.strongs_greek g SET english = c.new_english
+            FROM interlinear_changes c WHERE g.ctid = c.row_ctid
+            """
+        )
+        result['applied'] = cur.rowcount
+
     result['backup_file'] = backup_file
 
     # Optionally clear the preferred mapping in InterlinearConfig
@@ -7,10 +7,9 @@ the appropriate template.
 """
 
 from django.shortcuts import render
-from django.db.models import Q
 import re
 
-from search.models import Genesis, VerseTranslation
+from search.models import Genesis
 from search.views.footnote_views import get_footnote, build_notes_html
 from translate.translator import (
     book_abbreviations,
@@ -21,6 +20,7 @@ from translate.translator import (
 from search.rbt_titles import rbt_books
 from search.seo_utils import generate_chapter_schema
 from search.translation_utils import SUPPORTED_LANGUAGES
+from search.translation_overlay import load_translation_overlay
 from search.db_utils import execute_query, get_db_connection
 from hebrewtool.debug_utils import set_debug_context, should_emit_debug
 
@@ -51,43 +51,21 @@ def handle_genesis_chapter(request, book, chapter_num, results, language, source
     
     if language != 'en':
         # Check which verses need translation
-        existing_translations = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status__in=['completed', 'processing'],
-            footnote_id__isnull=True
-        ).values_list('verse', flat=True)
+        overlay = load_translation_overlay(book, chapter_num, language)
+        existing_translations = overlay.existing_verses
         
         for result in rbt:
             if int(result.verse) not in existing_translations:
                 verses_to_translate[int(result.verse)] = True
         
         # Check if book name needs translation
-        book_name_translation = VerseTranslation.objects.filter(
-            book=book,
-            chapter=0,
-            verse=0,
-            language_code=language,
-            status__in=['completed', 'processing'],
-            footnote_id__isnull=True
-        ).first()
+        book_name_translation = overlay.book_name
         
-        if not book_name_translation:
+        if not overlay.has_book_name:
             verses_to_translate[0] = True
         
         # Get existing translations
-        translated_verses = {}
-        translations_qs = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status='completed',
-            footnote_id__isnull=True
-        )
-        for trans in translations_qs:
-            if trans.verse_text:
-                translated_verses[trans.verse] = trans.verse_text
+        translated_verses = overlay.verses
 
     hebrew_literal = ""
     paraphrase = ""
@@ -150,15 +128,8 @@ def handle_genesis_chapter(request, book, chapter_num, results, language, source
     # Handle footnote translations
     translated_footnotes = {}
     if language != 'en':
-        # Get translated footnotes from database
-        for trans in VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status='completed'
-        ).exclude(footnote_text__isnull=True).exclude(footnote_text=''):
-            if trans.footnote_id:
-                translated_footnotes[trans.footnote_id] = trans.footnote_text
+        # Translated footnotes from the overlay
+        translated_footnotes = overlay.footnotes
         
         if footnotes_collection:
             existing_footnote_ids = set(translated_footnotes.keys())
@@ -195,8 +166,8 @@ def handle_genesis_chapter(request, book, chapter_num, results, language, source
     display_book = rbt_books.get(book, book)
     
     # Apply translated book name if available
-    if language != 'en' and book_name_translation and book_name_translation.verse_text:
-        display_book = book_name_translation.verse_text
+    if language != 'en' and book_name_translation:
+        display_book = book_name_translation
 
     standard_book = re.sub(r'(\d+)([a-zA-Z]+)', r'\1 \2', book)
     meta_title = f"{standard_book} {chapter_num} Hebrew Interlinear | Gospel of the Queen"
@@ -221,13 +192,7 @@ def handle_genesis_chapter(request, book, chapter_num, results, language, source
             if should_emit_debug(book=book, chapter=chapter_num):
                 print(f"[SEARCH VIEW DEBUG Genesis] All translations exist, needs_translation=False")
 
-        failed_q = Q(verse_text__startswith='[Translation error') | Q(verse_text__startswith='[Translation parsing error')
-        failed_translation_count = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            footnote_id__isnull=True
-        ).filter(failed_q).count()
+        failed_translation_count = overlay.failed_count
         has_failed_translations = failed_translation_count > 0
 
     if language != 'en' and language not in SUPPORTED_LANGUAGES:
@@ -288,13 +253,8 @@ def handle_nt_chapter(request, book, chapter_num, results, language, source_book
     
     if language != 'en':
         # Check which verses need translation (completed OR processing)
-        existing_translations = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status__in=['completed', 'processing'],
-            footnote_id__isnull=True
-        ).values_list('verse', flat=True)
+        overlay = load_translation_overlay(book, chapter_num, language)
+        existing_translations = overlay.existing_verses
         
         verses_to_translate = {}
         for row in chapter_rows:
@@ -303,30 +263,13 @@ def handle_nt_chapter(request, book, chapter_num, results, language, source_book
                 verses_to_translate[int(vrs)] = True
         
         # Check if book name needs translation (stored with verse=0)
-        book_name_translation = VerseTranslation.objects.filter(
-            book=book,
-            chapter=0,
-            verse=0,
-            language_code=language,
-            status__in=['completed', 'processing'],
-            footnote_id__isnull=True
-        ).first()
+        book_name_translation = overlay.book_name
         
-        if not book_name_translation:
+        if not overlay.has_book_name:
             verses_to_translate[0] = True  # Indicate book name needs translation
 
         # Collect all translated verses (existing only, new ones fetched via API)
-        translated_verses = {}
-        translations_qs = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status='completed',
-            footnote_id__isnull=True
-        )
-        for trans in translations_qs:
-            if trans.verse_text:
-                translated_verses[trans.verse] = trans.verse_text
+        translated_verses = overlay.verses
         
         # Apply translations to chapter_rows
         updated_rows = []
@@ -403,15 +346,7 @@ def handle_nt_chapter(request, book, chapter_num, results, language, source_book
     
     # Handle footnote translations
     if language != 'en' and footnotes_collection:
-        existing_footnote_ids = set()
-        for trans in VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status='completed'
-        ).exclude(footnote_text__isnull=True).exclude(footnote_text=''):
-            if trans.footnote_id:
-                existing_footnote_ids.add(trans.footnote_id)
+        existing_footnote_ids = set(overlay.footnotes)
         
         footnotes_to_translate = {}
         for footnote_key, footnote_data in footnotes_collection.items():
@@ -420,15 +355,7 @@ def handle_nt_chapter(request, book, chapter_num, results, language, source_book
                 footnotes_to_translate[footnote_key] = True
 
         # Apply translated footnotes (existing ones only)
-        translated_footnotes = {}
-        for trans in VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status='completed'
-        ).exclude(footnote_text__isnull=True).exclude(footnote_text=''):
-            if trans.footnote_id:
-                translated_footnotes[trans.footnote_id] = trans.footnote_text
+        translated_footnotes = overlay.footnotes
         
         for footnote_id, footnote_data in footnotes_collection.items():
             full_id = f"{book}-{footnote_id}"
@@ -455,8 +382,8 @@ def handle_nt_chapter(request, book, chapter_num, results, language, source_book
     display_book = rbt_books.get(standard_book, standard_book)
     
     # Apply translated book name if available for page display only
-    if language != 'en' and book_name_translation and book_name_translation.verse_text:
-        display_book = book_name_translation.verse_text
+    if language != 'en' and book_name_translation:
+        display_book = book_name_translation
         
     meta_title = f"{standard_book} {chapter_num} Greek Interlinear | Gospel of the Queen"
     meta_description = f"Read {standard_book} {chapter_num} in the original Greek with interlinear translation, Strong's lexicon, and complete morphological parsing/Logeion links."
@@ -485,13 +412,7 @@ def handle_nt_chapter(request, book, chapter_num, results, language, source_book
             if should_emit_debug(book=book, chapter=chapter_num):
                 print(f"[SEARCH VIEW DEBUG] All translations exist, needs_translation=False")
 
-        failed_q = Q(verse_text__startswith='[Translation error') | Q(verse_text__startswith='[Translation parsing error')
-        failed_translation_count = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            footnote_id__isnull=True
-        ).filter(failed_q).count()
+        failed_translation_count = overlay.failed_count
         has_failed_translations = failed_translation_count > 0
 
     if language != 'en' and language not in SUPPORTED_LANGUAGES:
@@ -555,13 +476,8 @@ def handle_ot_chapter(request, book, chapter_num, results, language, source_book
     
     if language != 'en':
         # Check which verses need translation
-        existing_translations = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status__in=['completed', 'processing'],
-            footnote_id__isnull=True
-        ).values_list('verse', flat=True)
+        overlay = load_translation_overlay(book, chapter_num, language)
+        existing_translations = overlay.existing_verses
         
         # Build verse_data from html_rows (one entry per verse)
         verse_data = []
@@ -576,30 +492,13 @@ def handle_ot_chapter(request, book, chapter_num, results, language, source_book
                 verses_to_translate[verse_num_int] = True
         
         # Check if book name needs translation
-        book_name_translation = VerseTranslation.objects.filter(
-            book=book,
-            chapter=0,
-            verse=0,
-            language_code=language,
-            status__in=['completed', 'processing'],
-            footnote_id__isnull=True
-        ).first()
+        book_name_translation = overlay.book_name
         
-        if not book_name_translation:
+        if not overlay.has_book_name:
             verses_to_translate[0] = True
         
         # Get existing translations
-        translated_verses = {}
-        translations_qs = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status='completed',
-            footnote_id__isnull=True
-        )
-        for trans in translations_qs:
-            if trans.verse_text:
-                translated_verses[trans.verse] = trans.verse_text
+        translated_verses = overlay.verses
         
         # Apply translations to verses
         updated_verse_data = []
@@ -653,15 +552,7 @@ def handle_ot_chapter(request, book, chapter_num, results, language, source_book
 
     # Handle footnote translations
     if language != 'en' and footnotes_collection:
-        existing_footnote_ids = set()
-        for trans in VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status='completed'
-        ).exclude(footnote_text__isnull=True).exclude(footnote_text=''):
-            if trans.footnote_id:
-                existing_footnote_ids.add(trans.footnote_id)
+        existing_footnote_ids = set(overlay.footnotes)
         
         for footnote_key, footnote_data in footnotes_collection.items():
             full_footnote_id = f"{book}-{footnote_key}"
@@ -669,15 +560,7 @@ def handle_ot_chapter(request, book, chapter_num, results, language, source_book
                 footnotes_to_translate[footnote_key] = True
         
         # Apply translated footnotes
-        translated_footnotes = {}
-        for trans in VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            status='completed'
-        ).exclude(footnote_text__isnull=True).exclude(footnote_text=''):
-            if trans.footnote_id:
-                translated_footnotes[trans.footnote_id] = trans.footnote_text
+        translated_footnotes = overlay.footnotes
         
         for footnote_id, footnote_data in footnotes_collection.items():
             full_id = f"{book}-{footnote_id}"
@@ -719,8 +602,8 @@ def handle_ot_chapter(request, book, chapter_num, results, language, source_book
     display_book = rbt_books.get(standard_book, standard_book)
     
     # Apply translated book name if available for page display only
-    if language != 'en' and book_name_translation and book_name_translation.verse_text:
-        display_book = book_name_translation.verse_text
+    if language != 'en' and book_name_translation:
+        display_book = book_name_translation
     
     meta_title = f"{standard_book} {chapter_num} Hebrew Interlinear | Gospel of the Queen"
     meta_description = f"Read {standard_book} {chapter_num} in the original Hebrew with interlinear translation, BDB, Fuerst & Strong's lexicons, and complete morphological parsing."
@@ -748,13 +631,7 @@ def handle_ot_chapter(request, book, chapter_num, results, language, source_book
             if should_emit_debug(book=book, chapter=chapter_num):
                 print(f"[SEARCH VIEW DEBUG OT] All translations exist, needs_translation=False")
 
-        failed_q = Q(verse_text__startswith='[Translation error') | Q(verse_text__startswith='[Translation parsing error')
-        failed_translation_count = VerseTranslation.objects.filter(
-            book=book,
-            chapter=chapter_num,
-            language_code=language,
-            footnote_id__isnull=True
-        ).filter(failed_q).count()
+        failed_translation_count = overlay.failed_count
         has_failed_translations = failed_translation_count > 0
 
     if language != 'en' and language not in SUPPORTED_LANGUAGES:
@@ -8,6 +8,7 @@ all Bible books (Genesis, OT, NT) and handles chapter/verse rendering.
 import re
 import os
 import json
+import logging
 import calendar
 from datetime import datetime, timedelta
 from collections import OrderedDict
@@ -16,6 +17,7 @@ from urllib.parse import urlencode
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect
 from django.core.cache import cache
+from django.db import connection
 from django.db.models import Q, Max, Min
 from django.views.decorators.csrf import csrf_exempt
 from dateutil.relativedelta import relativedelta
@@ -24,6 +26,7 @@ from pythonbible.errors import InvalidBookError, InvalidChapterError, InvalidVer
 from bs4 import BeautifulSoup
 
 from search.models import Genesis, GenesisFootnotes, EngLXX, LITV, TranslationUpdates, VerseTranslation
+from search.chapter_progress import recently_completed_chapters
 from search.db_utils import get_db_connection, execute_query, table_has_column
 from search.views.footnote_views import get_footnote, build_notes_html
 from search.translation_utils import SUPPORTED_LANGUAGES
@@ -37,6 +40,8 @@ from search.seo_utils import _get_verse_url
 from search.seo_utils import book_to_slug
 from search.rbt_titles import rbt_books
 
+logger = logging.getLogger(__name__)
+
 # Cache version for interlinear data
 INTERLINEAR_CACHE_VERSION = 'v3'
 
@@ -67,35 +72,6 @@ def update_count(request):
         return response
 
 
-def _parse_ref_to_chapter(ref_str):
-    """Parse a reference string to (book_abbreviation, chapter_number) or None."""
-    ref_str = re.sub(r'\s*-\s*\S+$', '', ref_str.strip())
-    # Dot format: 'Job.1.21', '1Ki.18.16', 'Act.16.3'
-    dot_match = re.match(r'^([A-Za-z0-9]+)\.(\d+)\.', ref_str)
-    if dot_match:
-        return dot_match.group(1), int(dot_match.group(2))
-    # Space:colon format: 'Acts 16:3', '1 John 1:5', 'Genesis 10:22'
-    space_match = re.match(r'^(.+?)\s+(\d+):', ref_str)
-    if space_match:
-        book_name = space_match.group(1).strip()
-        chapter = int(space_match.group(2))
-        abbrev = book_abbreviations.get(book_name, book_name)
-        return abbrev, chapter
-    return None
-
-
-def _parse_ref_verse_num(ref_str):
-    """Extract the verse number from a reference string, or None."""
-    ref_str = re.sub(r'\s*-\s*\S+$', '', ref_str.strip())
-    dot_match = re.match(r'^[A-Za-z0-9]+\.\d+\.(\d+)', ref_str)
-    if dot_match:
-        return int(dot_match.group(1))
-    space_match = re.match(r'^.+?\s+\d+:(\d+)', ref_str)
-    if space_match:
-        return int(space_match.group(1))
-    return None
-
-
 def _get_recently_completed_chapters(days=365, limit=5):
     """Return the most recently completed chapters across OT and NT.
 
@@ -108,6 +84,9 @@ def _get_recently_completed_chapters(days=365, limit=5):
           AND at least 50% of verses have an audit record
     - OT: same criteria, but audit coverage threshold is 30% due to the []
           bulk-edit bug that caused some OT refs to be lost
+
+    Reads the chapter_progress table, which the editor keeps current on every
+    save (search/chapter_progress.py).
     """
     abbrev_to_name = {}
     for name, abbrev in book_abbreviations.items():
@@ -116,123 +95,20 @@ def _get_recently_completed_chapters(days=365, limit=5):
 
     cutoff = datetime.now() - timedelta(days=days)
 
-    def _naive(dt):
-        """Strip timezone so naive/aware comparisons don't raise."""
-        if hasattr(dt, 'tzinfo') and dt.tzinfo is not None:
-            return dt.replace(tzinfo=None)
-        return dt
-
     try:
-        # -- Batch-fetch ALL entries (for first-save dating) --
-        all_entries = list(
-            TranslationUpdates.objects
-            .exclude(reference='[]')
-            .values_list('reference', 'date')
-        )
-        # Build per-chapter per-verse first-save dates
-        verse_first_save = {}   # (abbrev, chapter) -> {verse_num: earliest_date}
-        for ref_str, dt in all_entries:
-            parsed = _parse_ref_to_chapter(ref_str)
-            if not parsed:
-                continue
-            v = _parse_ref_verse_num(ref_str)
-            if v is None:
-                continue
-            key = parsed
-            if key not in verse_first_save:
-                verse_first_save[key] = {}
-            if v not in verse_first_save[key] or dt < verse_first_save[key][v]:
-                verse_first_save[key][v] = dt
-
-        def _completion_dt(first_saves, total):
-            """Return the datetime when a chapter was effectively completed.
-
-            Chapters are worked sequentially, so the completion date is the
-            first-save date of the highest-numbered verse that has an audit
-            record.  Using max(values()) would be wrong because a later spot-
-            edit to an early verse (e.g. Acts 21:7 on Apr 8 when the chapter
-            was really done Mar 23) would incorrectly push the date forward.
-            """
-            if not first_saves:
-                return None
-            highest_verse = max(first_saves.keys())
-            return first_saves[highest_verse]
-
         recently_completed = []
-
-        # -- NT completed chapters --
-        nt_rows = execute_query(
-            """SELECT book, chapter, COUNT(*) AS total,
-                      COUNT(CASE WHEN rbt IS NOT NULL AND TRIM(rbt) != '' THEN 1 END) AS filled
-               FROM new_testament.nt GROUP BY book, chapter""",
-            fetch='all',
-        )
-        for book_abbrev, chapter, total, filled in (nt_rows or []):
-            if total == 0 or filled < total:
-                continue
-            chapter = int(chapter)
-            first_saves = verse_first_save.get((book_abbrev, chapter), {})
-            if not first_saves:
-                continue
-            # Completion date = first-save of highest-numbered verse in chapter
-            completion_dt = _completion_dt(first_saves, total)
-            if _naive(completion_dt) < cutoff:
-                continue  # Completed too long ago; skip
-            # Require at least 50% of verses to have an audit record so we
-            # don't surface chapters that only have a handful of spot-edits
-            if len(first_saves) < total * 0.50:
-                continue
-            display_name = abbrev_to_name.get(book_abbrev, book_abbrev)
+        for progress in recently_completed_chapters(cutoff, limit):
+            display_name = abbrev_to_name.get(progress.book, progress.book)
             recently_completed.append({
                 'book': display_name,
-                'chapter': chapter,
-                'total_verses': total,
-                'last_updated': _naive(completion_dt).date(),
-                '_sort_dt': _naive(completion_dt),
-                'testament': 'NT',
-                'url': f'?book={display_name.replace(" ", "_")}&chapter={chapter}&verse=1',
+                'chapter': progress.chapter,
+                'total_verses': progress.total_verses,
+                'last_updated': progress.completed_at.date(),
+                '_sort_dt': progress.completed_at,
+                'testament': progress.testament,
+                'url': f'?book={display_name.replace(" ", "_")}&chapter={progress.chapter}&verse=1',
             })
-
-        # -- OT completed chapters --
-        ot_rows = execute_query(
-            """SELECT book, chapter, COUNT(*) AS total,
-                      COUNT(CASE WHEN html IS NOT NULL AND TRIM(html) != '' THEN 1 END) AS filled
-               FROM old_testament.ot GROUP BY book, chapter""",
-            fetch='all',
-        )
-        for book_abbrev, chapter, total, filled in (ot_rows or []):
-            if total == 0 or filled < total:
-                continue
-            chapter = int(chapter)
-            first_saves = verse_first_save.get((book_abbrev, chapter), {})
-            if not first_saves:
-                continue
-            completion_dt = _completion_dt(first_saves, total)
-            if _naive(completion_dt) < cutoff:
-                continue
-            # Lower audit-coverage threshold for OT due to [] bulk-edit data loss
-            if len(first_saves) < total * 0.30:
-                continue
-            display_name = abbrev_to_name.get(book_abbrev, book_abbrev)
-            recently_completed.append({
-                'book': display_name,
-                'chapter': chapter,
-                'total_verses': total,
-                'last_updated': _naive(completion_dt).date(),
-                '_sort_dt': _naive(completion_dt),
-                'testament': 'OT',
-                'url': f'?book={display_name.replace(" ", "_")}&chapter={chapter}&verse=1',
-            })
-
-        def _sort_key(x):
-            dt = x['_sort_dt']
-            # Strip timezone if present so comparison is always naive
-            if hasattr(dt, 'tzinfo') and dt.tzinfo is not None:
-                dt = dt.replace(tzinfo=None)
-            return dt
-
-        recently_completed.sort(key=_sort_key, reverse=True)
-        return recently_completed[:limit]
+        return recently_completed
 
     except Exception as e:
         import logging
@@ -515,10 +391,9 @@ def get_results(book, chapter_num, verse_num=None, language='en'):
     book = book.strip()
     sanitized_book = book.replace(':', '_').replace(' ', '')
     cache_key_base = f'{sanitized_book}_{chapter_num}_{verse_num}_{language}_{INTERLINEAR_CACHE_VERSION}'
-    print(f"[CACHE] Looking for key: {cache_key_base}")
     try:
         from search.db_utils import safe_cache_get
-        cached_data = safe_cache_get(cache_key_base)
+        cached_data = safe_cache_get(cache_key_base, family='get_results')
     except Exception:
         try:
             cached_data = cache.get(cache_key_base)
@@ -529,7 +404,8 @@ def get_results(book, chapter_num, verse_num=None, language='en'):
             except Exception:
                 pass
             cached_data = None
-    print(f"[CACHE] Cache hit: {bool(cached_data)}")
+    logger.info('[CACHE] get_results key=%s hit=%s', cache_key_base, bool(cached_data),
+                extra={'category': 'cache'})
 
     if not cached_data:
 
@@ -581,7 +457,7 @@ def get_results(book, chapter_num, verse_num=None, language='en'):
         if verse_num is not None:
             ## FETCH COMPLETED RBT VERSE IF AVAILABLE ##
             if book == 'Genesis':
-                print("[QUERY] Fetching Genesis RBT verse")
+                logger.debug('[QUERY] Fetching Genesis RBT verse')
                 rbt_book_model_map = {
                     'Genesis': Genesis,
                 }
@@ -1020,7 +896,7 @@ def get_results(book, chapter_num, verse_num=None, language='en'):
 
                         linear_english += f'{english} '
                     except Exception as e:
-                        print(f"[ERROR] Exception on row {i}: {e}, row data: {row}")
+                        logger.warning('[ERROR] Exception on row %s: %s, row data: %s', i, e, row)
 
                 if rbt_html is not None:
                     footnote_references = re.findall(r'\?footnote=(\d+-\d+-\d+[a-zA-Z]?)', rbt_html)
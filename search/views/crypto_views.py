@@ -2,19 +2,16 @@
 Coinbase Advanced Trade API integration for displaying donation wallet balances.
 Uses CDP JWT (ES256) authentication — private key stays server-side only.
 """
+import asyncio
 import secrets
 import time
 
-import jwt
-import requests
-from cryptography.hazmat.primitives.serialization import load_pem_private_key
 from django.conf import settings
-from django.core.cache import cache
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
 
-_CACHE_KEY = "coinbase_balances_v1"
-_CACHE_TTL = 300   # 5 minutes
+from search.dashboard_snapshots import get_snapshot
+
 _API_HOST = "api.coinbase.com"
 _ACCOUNTS_PATH = "/api/v3/brokerage/accounts"
 _BEST_BID_ASK_PATH = "/api/v3/brokerage/best_bid_ask"
@@ -23,6 +20,10 @@ _PRODUCT_IDS = ["BTC-USD", "ETH-USD"]
 
 
 def _build_jwt(method: str, path: str) -> str:
+    # jwt/cryptography are only needed when the balances snapshot is refreshed.
+    import jwt
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
     raw_key = settings.COINBASE_API_PRIVATE_KEY.replace("\\n", "\n")
     private_key = load_pem_private_key(raw_key.encode(), password=None)
     key_name = settings.COINBASE_API_KEY_NAME
@@ -41,58 +42,64 @@ def _build_jwt(method: str, path: str) -> str:
     )
 
 
-@require_GET
-def crypto_balances(request):
-    """Return BTC and ETH balances from the Coinbase account (cached 5 min)."""
-    cached = cache.get(_CACHE_KEY)
-    if cached is not None:
-        return JsonResponse(cached)
+async def _coinbase_get(path, query=""):
+    # httpx is only needed when the balances snapshot is refreshed.
+    from hebrewtool import http_client
 
-    try:
-        token = _build_jwt("GET", _ACCOUNTS_PATH)
-        resp = requests.get(
-            f"https://{_API_HOST}{_ACCOUNTS_PATH}",
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=8,
-        )
-        resp.raise_for_status()
-        accounts = resp.json().get("accounts", [])
-        balances = {}
-        for acc in accounts:
-            currency = acc.get("currency", "")
-            if currency in _CURRENCIES:
-                val = acc.get("available_balance", {}).get("value", "0")
-                balances[currency] = val
-
-        # Fetch mid-market prices for USD conversion
-        product_ids_param = "&".join(f"product_ids={p}" for p in _PRODUCT_IDS)
-        price_token = _build_jwt("GET", _BEST_BID_ASK_PATH)
-        price_resp = requests.get(
-            f"https://{_API_HOST}{_BEST_BID_ASK_PATH}?{product_ids_param}",
-            headers={"Authorization": f"Bearer {price_token}"},
-            timeout=8,
-        )
-        prices = {}  # e.g. {"BTC": 85000.0, "ETH": 2000.0}
-        if price_resp.ok:
-            for entry in price_resp.json().get("pricebooks", []):
-                pid = entry.get("product_id", "")  # e.g. "BTC-USD"
-                currency = pid.split("-")[0]
-                try:
-                    bid = float(entry["bids"][0]["price"])
-                    ask = float(entry["asks"][0]["price"])
-                    prices[currency] = (bid + ask) / 2
-                except (KeyError, IndexError, ValueError):
-                    pass
-
-        total_usd = 0.0
-        for currency, amount_str in balances.items():
+    token = _build_jwt("GET", path)
+    return await http_client.get(
+        f"https://{_API_HOST}{path}{'?' + query if query else ''}",
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=8,
+    )
+
+
+async def fetch_usd_prices():
+    """Mid-market USD prices for BTC/ETH, e.g. {"BTC": 85000.0, "ETH": 2000.0}; {} if Coinbase refuses."""
+    product_ids_param = "&".join(f"product_ids={p}" for p in _PRODUCT_IDS)
+    price_resp = await _coinbase_get(_BEST_BID_ASK_PATH, product_ids_param)
+    prices = {}
+    if price_resp.is_success:
+        for entry in price_resp.json().get("pricebooks", []):
+            pid = entry.get("product_id", "")  # e.g. "BTC-USD"
+            currency = pid.split("-")[0]
             try:
-                total_usd += float(amount_str) * prices.get(currency, 0.0)
-            except (ValueError, TypeError):
+                bid = float(entry["bids"][0]["price"])
+                ask = float(entry["asks"][0]["price"])
+                prices[currency] = (bid + ask) / 2
+            except (KeyError, IndexError, ValueError):
                 pass
+    return prices
 
-        result = {**balances, "prices": prices, "total_usd": round(total_usd, 2)}
-        cache.set(_CACHE_KEY, result, _CACHE_TTL)
-        return JsonResponse(result)
+
+async def collect_crypto_balances():
+    """Balances, mid-market prices and USD total from Coinbase (the crypto_balances snapshot)."""
+    # Balances and prices are independent; fetch both at once.
+    resp, prices = await asyncio.gather(_coinbase_get(_ACCOUNTS_PATH), fetch_usd_prices())
+    resp.raise_for_status()
+    accounts = resp.json().get("accounts", [])
+    balances = {}
+    for acc in accounts:
+        currency = acc.get("currency", "")
+        if currency in _CURRENCIES:
+            val = acc.get("available_balance", {}).get("value", "0")
+            balances[currency] = val
+
+    total_usd = 0.0
+    for currency, amount_str in balances.items():
+        try:
+            total_usd += float(amount_str) * prices.get(currency, 0.0)
+        except (ValueError, TypeError):
+            pass
+
+    return {**balances, "prices": prices, "total_usd": round(total_usd, 2)}
+
+
+@require_GET
+async def crypto_balances(request):
+    """Return BTC and ETH balances from the Coinbase account (snapshot refreshed in the background)."""
+    try:
+        snapshot = await get_snapshot("crypto_balances")
     except Exception as exc:
         return JsonResponse({"error": str(exc)}, status=502)
+    return JsonResponse(snapshot["data"])
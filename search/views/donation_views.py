@@ -1,21 +1,20 @@
 """
 Last-30-day donation totals from PayPal + crypto blockchains.
-Aggregates PayPal Transaction Search API, mempool.space (BTC), and Etherscan (ETH).
+Aggregates PayPal Transaction Search API, mempool.space (BTC), and Etherscan (ETH),
+queried concurrently through the shared client in hebrewtool/http_client.py.
 """
+import asyncio
 import logging
 import time
 from datetime import datetime, timedelta, timezone
 
-import requests
 from django.conf import settings
-from django.core.cache import cache
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
 
-logger = logging.getLogger(__name__)
+from search.dashboard_snapshots import get_snapshot, peek
 
-_CACHE_KEY = "donation_totals_v2"
-_CACHE_TTL = 3600  # 1 hour
+logger = logging.getLogger(__name__)
 
 _BTC_ADDRESS = "3QDFmrY14HoQbnDNk5GBey4NQUg9ZLpggc"
 _ETH_ADDRESS = "0x8DA15DC1f2b01BD6D270cEA4bf99A78c3DE0C50F"
@@ -25,9 +24,11 @@ _ETH_ADDRESS = "0x8DA15DC1f2b01BD6D270cEA4bf99A78c3DE0C50F"
 # PayPal
 # ---------------------------------------------------------------------------
 
-def _paypal_access_token():
+async def _paypal_access_token():
     """Get a PayPal OAuth2 access token using client credentials."""
-    resp = requests.post(
+    from hebrewtool import http_client
+
+    resp = await http_client.post(
         "https://api-m.paypal.com/v1/oauth2/token",
         auth=(settings.PAYPAL_CLIENT_ID, settings.PAYPAL_CLIENT_SECRET),
         data={"grant_type": "client_credentials"},
@@ -38,19 +39,19 @@ def _paypal_access_token():
     return resp.json()["access_token"]
 
 
-def _paypal_donations_last_30_days():
+async def _paypal_donations_last_30_days():
     """Sum of completed PayPal donations in the last 30 days (USD)."""
+    from hebrewtool import http_client
+
     if not settings.PAYPAL_CLIENT_ID or not settings.PAYPAL_CLIENT_SECRET:
         return 0.0
 
-    token = _paypal_access_token()
+    token = await _paypal_access_token()
     now = datetime.now(timezone.utc)
     start = now - timedelta(days=30)
 
-    total = 0.0
-    page = 1
-    while True:
-        resp = requests.get(
+    async def fetch_page(page):
+        resp = await http_client.get(
             "https://api-m.paypal.com/v1/reporting/transactions",
             params={
                 "start_date": start.strftime("%Y-%m-%dT%H:%M:%S+0000"),
@@ -67,8 +68,17 @@ def _paypal_donations_last_30_days():
             timeout=15,
         )
         resp.raise_for_status()
-        data = resp.json()
+        return resp.json()
+
+    # The first page says how many there are; the rest are fetched together.
+    first = await fetch_page(1)
+    pages = [first]
+    total_pages = first.get("total_pages", 1)
+    if total_pages > 1:
+        pages += await asyncio.gather(*(fetch_page(page) for page in range(2, total_pages + 1)))
 
+    total = 0.0
+    for data in pages:
         for txn in data.get("transaction_details", []):
             info = txn.get("transaction_info", {})
             amount = info.get("transaction_amount", {})
@@ -79,10 +89,6 @@ def _paypal_donations_last_30_days():
             except (ValueError, TypeError):
                 pass
 
-        if page >= data.get("total_pages", 1):
-            break
-        page += 1
-
     return round(total, 2)
 
 
@@ -90,16 +96,18 @@ def _paypal_donations_last_30_days():
 # BTC via mempool.space
 # ---------------------------------------------------------------------------
 
-def _btc_donations_last_30_days():
+async def _btc_donations_last_30_days():
     """Incoming BTC to the donation address in the last 30 days."""
+    from hebrewtool import http_client
+
     cutoff = time.time() - (30 * 86400)
     total_sats = 0
 
-    resp = requests.get(
+    resp = await http_client.get(
         f"https://mempool.space/api/address/{_BTC_ADDRESS}/txs",
         timeout=10,
     )
-    if not resp.ok:
+    if not resp.is_success:
         return 0.0
 
     txs = resp.json()
@@ -129,12 +137,14 @@ def _btc_donations_last_30_days():
 # ETH via Etherscan (public, no key required for light usage)
 # ---------------------------------------------------------------------------
 
-def _eth_donations_last_30_days():
+async def _eth_donations_last_30_days():
     """Incoming ETH to the donation address in the last 30 days."""
+    from hebrewtool import http_client
+
     cutoff = int(time.time()) - (30 * 86400)
     total_wei = 0
 
-    resp = requests.get(
+    resp = await http_client.get(
         "https://api.etherscan.io/api",
         params={
             "module": "account",
@@ -146,7 +156,7 @@ def _eth_donations_last_30_days():
         },
         timeout=10,
     )
-    if not resp.ok:
+    if not resp.is_success:
         return 0.0
 
     data = resp.json()
@@ -172,12 +182,15 @@ def _eth_donations_last_30_days():
 # Combined endpoint
 # ---------------------------------------------------------------------------
 
-@require_GET
-def donation_totals(request):
-    """Return last-30-day donation totals from PayPal + crypto (cached 1 hour)."""
-    cached = cache.get(_CACHE_KEY)
-    if cached is not None:
-        return JsonResponse(cached)
+async def _no_prices():
+    return {}
+
+
+async def collect_donation_totals():
+    """Last-30-day totals from PayPal + crypto in USD (the donation_totals snapshot)."""
+    import httpx
+
+    from .crypto_views import fetch_usd_prices
 
     result = {
         "paypal_usd": 0.0,
@@ -188,74 +201,63 @@ def donation_totals(request):
         "total_usd": 0.0,
     }
 
+    # Convert crypto to USD using Coinbase prices (reuse the balances snapshot if there is one)
+    prices = {}
+    balances = await peek("crypto_balances")
+    if balances:
+        prices = balances["data"].get("prices", {})
+
+    # All sources are independent: query them concurrently.
+    paypal, btc, eth, fetched_prices = await asyncio.gather(
+        _paypal_donations_last_30_days(),
+        _btc_donations_last_30_days(),
+        _eth_donations_last_30_days(),
+        _no_prices() if prices else fetch_usd_prices(),
+        return_exceptions=True,
+    )
+
     # PayPal
-    try:
-        result["paypal_usd"] = _paypal_donations_last_30_days()
-    except requests.exceptions.HTTPError as exc:
-        if exc.response is not None and exc.response.status_code == 403:
-            logger.warning(
-                "PayPal Transaction Search returned 403 – enable the "
-                "'Transaction Search' permission in the PayPal Developer Dashboard."
-            )
-        else:
-            logger.exception("Failed to fetch PayPal donations")
-    except Exception:
-        logger.exception("Failed to fetch PayPal donations")
+    if isinstance(paypal, httpx.HTTPStatusError) and paypal.response.status_code == 403:
+        logger.warning(
+            "PayPal Transaction Search returned 403 – enable the "
+            "'Transaction Search' permission in the PayPal Developer Dashboard."
+        )
+    elif isinstance(paypal, Exception):
+        logger.error("Failed to fetch PayPal donations", exc_info=paypal)
+    else:
+        result["paypal_usd"] = paypal
 
     # BTC
-    try:
-        result["btc"] = _btc_donations_last_30_days()
-    except Exception:
-        logger.exception("Failed to fetch BTC donations")
+    if isinstance(btc, Exception):
+        logger.error("Failed to fetch BTC donations", exc_info=btc)
+    else:
+        result["btc"] = btc
 
     # ETH
-    try:
-        result["eth"] = _eth_donations_last_30_days()
-    except Exception:
-        logger.exception("Failed to fetch ETH donations")
+    if isinstance(eth, Exception):
+        logger.error("Failed to fetch ETH donations", exc_info=eth)
+    else:
+        result["eth"] = eth
 
-    # Convert crypto to USD using Coinbase prices (reuse cached prices if available)
-    prices = {}
-    prices_cache = cache.get("coinbase_balances_v1")
-    if prices_cache:
-        prices = prices_cache.get("prices", {})
-
-    if not prices:
-        try:
-            from .crypto_views import (
-                _API_HOST,
-                _BEST_BID_ASK_PATH,
-                _PRODUCT_IDS,
-                _build_jwt,
-            )
-
-            product_ids_param = "&".join(
-                f"product_ids={p}" for p in _PRODUCT_IDS
-            )
-            price_token = _build_jwt("GET", _BEST_BID_ASK_PATH)
-            price_resp = requests.get(
-                f"https://{_API_HOST}{_BEST_BID_ASK_PATH}?{product_ids_param}",
-                headers={"Authorization": f"Bearer {price_token}"},
-                timeout=8,
-            )
-            if price_resp.ok:
-                for entry in price_resp.json().get("pricebooks", []):
-                    pid = entry.get("product_id", "")
-                    currency = pid.split("-")[0]
-                    try:
-                        bid = float(entry["bids"][0]["price"])
-                        ask = float(entry["asks"][0]["price"])
-                        prices[currency] = (bid + ask) / 2
-                    except (KeyError, IndexError, ValueError):
-                        pass
-        except Exception:
-            logger.exception("Failed to fetch crypto prices for donation totals")
+    if isinstance(fetched_prices, Exception):
+        logger.error("Failed to fetch crypto prices for donation totals", exc_info=fetched_prices)
+    elif not prices:
+        prices = fetched_prices
 
     result["btc_usd"] = round(result["btc"] * prices.get("BTC", 0), 2)
     result["eth_usd"] = round(result["eth"] * prices.get("ETH", 0), 2)
     result["total_usd"] = round(
         result["paypal_usd"] + result["btc_usd"] + result["eth_usd"], 2
     )
+    return result
 
-    cache.set(_CACHE_KEY, result, _CACHE_TTL)
-    return JsonResponse(result)
+
+@require_GET
+async def donation_totals(request):
+    """Return last-30-day donation totals from PayPal + crypto (snapshot refreshed in the background)."""
+    try:
+        snapshot = await get_snapshot("donation_totals")
+    except Exception as exc:
+        logger.warning("Donation totals unavailable: %s", exc)
+        return JsonResponse({"error": str(exc)}, status=503)
+    return JsonResponse(snapshot["data"])
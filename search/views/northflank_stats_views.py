@@ -10,36 +10,33 @@ Requires env var:
 
 Optional env vars:
     NORTHFLANK_PROJECT_ID         – default project (default: rbt-project)
-    NORTHFLANK_STATS_CACHE_TTL    – cache seconds (default: 300)
-    NORTHFLANK_STATS_HISTORY_HOURS – history window (default: 24)
+    NORTHFLANK_STATS_CACHE_TTL    – snapshot refresh interval in seconds (default: 300)
+    NORTHFLANK_STATS_HISTORY_HOURS – full-resolution history window (default: 24)
+    NORTHFLANK_STATS_DOWNSAMPLE_SECONDS – bucket for older history (default: 3600)
+    NORTHFLANK_STATS_RETENTION_HOURS – total history kept (default: 168)
     NORTHFLANK_STATS_TOKEN        – optional viewer auth token
 """
 
+import asyncio
 import json
 import logging
 import os
-import ssl
+import time
 import traceback
-import urllib.request
-import urllib.error
-from datetime import datetime, timedelta
+from datetime import datetime
 
-try:
-    import certifi
-    _SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
-except ImportError:
-    _SSL_CONTEXT = ssl.create_default_context()
-
-from django.core.cache import cache
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
 
+from search.dashboard_snapshots import SnapshotUnavailable, get_snapshot, snapshot_age
+from search.northflank_history import append_point, query_points
+
 logger = logging.getLogger(__name__)
 
 NF_API_BASE = "https://api.northflank.com/v1"
 DEFAULT_PROJECT_ID = os.getenv("NORTHFLANK_PROJECT_ID", "rbt-project")
 DEFAULT_CACHE_TTL_SECONDS = int(os.getenv("NORTHFLANK_STATS_CACHE_TTL", "300"))
-DEFAULT_HISTORY_RETENTION_HOURS = int(os.getenv("NORTHFLANK_STATS_HISTORY_HOURS", "24"))
 
 
 # ---------------------------------------------------------------------------
@@ -81,36 +78,35 @@ def _get_nf_token():
     return ""
 
 
-def _nf_api_get(path, token):
+async def _nf_api_get(path, token):
     """
     GET a Northflank REST API endpoint.
 
     Returns {"ok": True, "data": <parsed JSON>} on success,
     or {"ok": False, "error": "…"} on failure.
     """
+    from hebrewtool import http_client
+
     url = f"{NF_API_BASE}{path}"
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
     }
 
-    req = urllib.request.Request(url, headers=headers, method="GET")
     try:
-        with urllib.request.urlopen(req, timeout=20, context=_SSL_CONTEXT) as resp:
-            body = resp.read().decode("utf-8")
-            data = json.loads(body)
-            return {"ok": True, "data": data}
-    except urllib.error.HTTPError as exc:
-        body = ""
-        try:
-            body = exc.read().decode("utf-8", errors="replace")[:500]
-        except Exception:
-            pass
-        logger.warning("Northflank API %s → HTTP %s: %s", path, exc.code, body)
-        return {"ok": False, "error": f"HTTP {exc.code}: {body}"}
+        resp = await http_client.get(url, headers=headers, timeout=20)
     except Exception as exc:
         logger.warning("Northflank API %s → %s", path, exc)
         return {"ok": False, "error": str(exc)}
+    if not resp.is_success:
+        body = resp.text[:500]
+        logger.warning("Northflank API %s → HTTP %s: %s", path, resp.status_code, body)
+        return {"ok": False, "error": f"HTTP {resp.status_code}: {body}"}
+    try:
+        return {"ok": True, "data": resp.json()}
+    except ValueError as exc:
+        logger.warning("Northflank API %s → %s", path, exc)
+        return {"ok": False, "error": str(exc)}
 
 
 def _normalize_status(value):
@@ -320,68 +316,142 @@ def _parse_addons(api_response):
 
 
 # ---------------------------------------------------------------------------
-# History helpers
+# Main API view
 # ---------------------------------------------------------------------------
 
-def _append_history_point(project_id, snapshot, retention_hours):
-    history_key = f"northflank_stats_history_{project_id}"
-    existing = cache.get(history_key, [])
-
-    if not isinstance(existing, list):
-        existing = []
-
-    existing.append(snapshot)
+async def collect_northflank_stats(project_id):
+    """
+    Query the Northflank API and build the stats payload for one project (the
+    northflank_stats snapshot). Appends a point to the uptime history in
+    search.northflank_history; the view reads its lookback window from there.
+    """
+    nf_token = _get_nf_token()
+    if not nf_token:
+        raise SnapshotUnavailable(
+            "NORTHFLANK_API_TOKEN not configured. "
+            "Set the env var to a Northflank Bearer token."
+        )
 
-    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
-    filtered = []
-    for point in existing:
-        timestamp = point.get("timestamp")
-        if not timestamp:
-            continue
-        try:
-            point_dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            point_dt = point_dt.replace(tzinfo=None)
-        except Exception:
-            continue
-        if point_dt >= cutoff:
-            filtered.append(point)
-
-    filtered = filtered[-2000:]
-    cache.set(history_key, filtered, timeout=retention_hours * 3600)
-    return filtered
-
-
-def _extract_lookback_history(history, lookback_hours):
-    if not history:
-        return []
-    cutoff = datetime.utcnow() - timedelta(hours=lookback_hours)
-    result = []
-    for point in history:
-        timestamp = point.get("timestamp")
-        if not timestamp:
-            continue
-        try:
-            point_dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            point_dt = point_dt.replace(tzinfo=None)
-        except Exception:
-            continue
-        if point_dt >= cutoff:
-            result.append(point)
-    return result
+    warnings = []
+
+    services_result, addons_result = await asyncio.gather(
+        _nf_api_get(f"/projects/{project_id}/services", nf_token),
+        _nf_api_get(f"/projects/{project_id}/addons", nf_token),
+    )
+
+    if not services_result["ok"]:
+        warnings.append(f"Services unavailable: {services_result.get('error')}")
+    if not addons_result["ok"]:
+        warnings.append(f"Addons unavailable: {addons_result.get('error')}")
+
+    # Enrich each service with detail endpoint data (has deployment, billing, etc.)
+    if services_result["ok"]:
+        raw_services = _get_nested(services_result.get("data", {}), "data", "services", default=[])
+        raw_services = raw_services if isinstance(raw_services, list) else []
+
+        async def _detail(svc):
+            svc_id = svc.get("id")
+            if not svc_id:
+                return svc
+            detail = await _nf_api_get(
+                f"/projects/{project_id}/services/{svc_id}", nf_token
+            )
+            return detail["data"].get("data", svc) if detail["ok"] else svc
+
+        # One detail request per service, all in flight at once.
+        enriched = list(await asyncio.gather(*(_detail(svc) for svc in raw_services)))
+        # Re-wrap in the expected structure
+        services_result["data"] = {"data": {"services": enriched}}
+
+    parsed_services = _parse_services(
+        services_result.get("data", {}) if services_result["ok"] else {}
+    )
+    parsed_addons = _parse_addons(
+        addons_result.get("data", {}) if addons_result["ok"] else {}
+    )
+
+    running_services = parsed_services["counts"]["status"].get("running", 0)
+    paused_services = parsed_services["counts"]["status"].get("paused", 0)
+    running_addons = parsed_addons["counts"]["status"].get("running", 0)
+    paused_addons = parsed_addons["counts"]["status"].get("paused", 0)
+
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    await sync_to_async(append_point)(
+        project_id,
+        {
+            "running_services": running_services,
+            "paused_services": paused_services,
+            "running_addons": running_addons,
+            "paused_addons": paused_addons,
+        },
+    )
 
+    return {
+        "meta": {
+            "generated_at": timestamp,
+            "project_id": project_id,
+            "source": "northflank-rest-api",
+            "cache_ttl_seconds": DEFAULT_CACHE_TTL_SECONDS,
+        },
+        "summary": {
+            "services_total": parsed_services["counts"]["total"],
+            "addons_total": parsed_addons["counts"]["total"],
+            "running_services": running_services,
+            "paused_services": paused_services,
+            "running_addons": running_addons,
+            "paused_addons": paused_addons,
+            "uptime_ratio": round(
+                (running_services + running_addons)
+                / max(
+                    parsed_services["counts"]["total"]
+                    + parsed_addons["counts"]["total"],
+                    1,
+                ),
+                4,
+            ),
+        },
+        "capability": {
+            "service_types": parsed_services["counts"]["types"],
+            "addon_types": parsed_addons["counts"]["types"],
+            "reach_regions": parsed_services["counts"]["regions"],
+        },
+        "compute": {
+            "capacity_totals": parsed_services["capacity"],
+            "services": parsed_services["items"],
+        },
+        "chart_data": {
+            "service_status_pie": [
+                {"label": k, "value": v}
+                for k, v in parsed_services["counts"]["status"].items()
+            ],
+            "addon_status_pie": [
+                {"label": k, "value": v}
+                for k, v in parsed_addons["counts"]["status"].items()
+            ],
+            "service_types_bar": [
+                {"label": k, "value": v}
+                for k, v in parsed_services["counts"]["types"].items()
+            ],
+            "reach_regions_bar": [
+                {"label": k, "value": v}
+                for k, v in parsed_services["counts"]["regions"].items()
+            ],
+        },
+        "warnings": warnings,
+    }
 
-# ---------------------------------------------------------------------------
-# Main API view
-# ---------------------------------------------------------------------------
 
 @require_GET
-def northflank_stats_api(request):
+async def northflank_stats_api(request):
     """
     Return Northflank operational stats as chart-ready JSON.
 
+    Served from a snapshot that search.dashboard_snapshots refreshes in the
+    background, so the request does not wait on Northflank.
+
     Query params:
     - project_id: Northflank project ID (default from env or rbt-project)
-    - refresh: 1 to bypass cache
+    - refresh: 1 to refresh the snapshot before answering
     - lookback_hours: history points to return (default 24, max 168)
 
     Optional security:
@@ -408,140 +478,23 @@ def northflank_stats_api(request):
             lookback_hours = 24
         lookback_hours = max(1, min(lookback_hours, 168))
 
-        cache_key = f"northflank_stats_snapshot_{project_id}"
-
-        if not refresh:
-            cached = cache.get(cache_key)
-            if cached:
-                return _json_response(cached)
-
-        # ---- Northflank REST API calls ----
-        nf_token = _get_nf_token()
-        if not nf_token:
-            return _json_response(
-                {"error": "NORTHFLANK_API_TOKEN not configured. "
-                          "Set the env var to a Northflank Bearer token."},
-                status=500,
-            )
-
-        warnings = []
-
-        services_result = _nf_api_get(
-            f"/projects/{project_id}/services", nf_token
-        )
-        addons_result = _nf_api_get(
-            f"/projects/{project_id}/addons", nf_token
-        )
-
-        if not services_result["ok"]:
-            warnings.append(f"Services unavailable: {services_result.get('error')}")
-        if not addons_result["ok"]:
-            warnings.append(f"Addons unavailable: {addons_result.get('error')}")
-
-        # Enrich each service with detail endpoint data (has deployment, billing, etc.)
-        if services_result["ok"]:
-            raw_services = _get_nested(services_result.get("data", {}), "data", "services", default=[])
-            enriched = []
-            for svc in (raw_services if isinstance(raw_services, list) else []):
-                svc_id = svc.get("id")
-                if svc_id:
-                    detail = _nf_api_get(
-                        f"/projects/{project_id}/services/{svc_id}", nf_token
-                    )
-                    if detail["ok"]:
-                        enriched.append(detail["data"].get("data", svc))
-                    else:
-                        enriched.append(svc)
-                else:
-                    enriched.append(svc)
-            # Re-wrap in the expected structure
-            services_result["data"] = {"data": {"services": enriched}}
-
-        parsed_services = _parse_services(
-            services_result.get("data", {}) if services_result["ok"] else {}
-        )
-        parsed_addons = _parse_addons(
-            addons_result.get("data", {}) if addons_result["ok"] else {}
-        )
-
-        running_services = parsed_services["counts"]["status"].get("running", 0)
-        paused_services = parsed_services["counts"]["status"].get("paused", 0)
-        running_addons = parsed_addons["counts"]["status"].get("running", 0)
-        paused_addons = parsed_addons["counts"]["status"].get("paused", 0)
-
-        timestamp = datetime.utcnow().isoformat() + "Z"
-        history_point = {
-            "timestamp": timestamp,
-            "running_services": running_services,
-            "paused_services": paused_services,
-            "running_addons": running_addons,
-            "paused_addons": paused_addons,
+        try:
+            snapshot = await get_snapshot("northflank_stats", project_id, force=refresh)
+        except SnapshotUnavailable as exc:
+            return _json_response({"error": str(exc)}, status=500)
+
+        data = snapshot["data"]
+        chart_data = {
+            **data["chart_data"],
+            "uptime_downtime_timeseries": await sync_to_async(query_points)(
+                project_id, time.time() - lookback_hours * 3600
+            ),
         }
-
-        history = _append_history_point(
-            project_id=project_id,
-            snapshot=history_point,
-            retention_hours=DEFAULT_HISTORY_RETENTION_HOURS,
-        )
-        history_for_window = _extract_lookback_history(history, lookback_hours)
-
         response_data = {
-            "meta": {
-                "generated_at": timestamp,
-                "project_id": project_id,
-                "source": "northflank-rest-api",
-                "cache_ttl_seconds": DEFAULT_CACHE_TTL_SECONDS,
-                "lookback_hours": lookback_hours,
-            },
-            "summary": {
-                "services_total": parsed_services["counts"]["total"],
-                "addons_total": parsed_addons["counts"]["total"],
-                "running_services": running_services,
-                "paused_services": paused_services,
-                "running_addons": running_addons,
-                "paused_addons": paused_addons,
-                "uptime_ratio": round(
-                    (running_services + running_addons)
-                    / max(
-                        parsed_services["counts"]["total"]
-                        + parsed_addons["counts"]["total"],
-                        1,
-                    ),
-                    4,
-                ),
-            },
-            "capability": {
-                "service_types": parsed_services["counts"]["types"],
-                "addon_types": parsed_addons["counts"]["types"],
-                "reach_regions": parsed_services["counts"]["regions"],
-            },
-            "compute": {
-                "capacity_totals": parsed_services["capacity"],
-                "services": parsed_services["items"],
-            },
-            "chart_data": {
-                "service_status_pie": [
-                    {"label": k, "value": v}
-                    for k, v in parsed_services["counts"]["status"].items()
-                ],
-                "addon_status_pie": [
-                    {"label": k, "value": v}
-                    for k, v in parsed_addons["counts"]["status"].items()
-                ],
-                "service_types_bar": [
-                    {"label": k, "value": v}
-                    for k, v in parsed_services["counts"]["types"].items()
-                ],
-                "reach_regions_bar": [
-                    {"label": k, "value": v}
-                    for k, v in parsed_services["counts"]["regions"].items()
-                ],
-                "uptime_downtime_timeseries": history_for_window,
-            },
-            "warnings": warnings,
+            **data,
+            "meta": {**data["meta"], "lookback_hours": lookback_hours, "snapshot_age_seconds": snapshot_age(snapshot)},
+            "chart_data": chart_data,
         }
-
-        cache.set(cache_key, response_data, timeout=DEFAULT_CACHE_TTL_SECONDS)
         return _json_response(response_data)
 
     except Exception as exc:
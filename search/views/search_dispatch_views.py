@@ -8,6 +8,7 @@ Handles routing for different types of Bible content requests:
 - Chapter display (Genesis, OT, NT)
 """
 
+import logging
 import re
 from urllib.parse import urlencode
 
@@ -35,6 +36,8 @@ from search.rbt_titles import rbt_books
 from search.translation_utils import SUPPORTED_LANGUAGES
 from search.db_utils import execute_query
 
+logger = logging.getLogger(__name__)
+
 
 def search(request):
     """
@@ -174,19 +177,21 @@ def handle_single_verse(request, book, chapter_num, verse_num, language):
     """
     ip = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR', 'unknown'))
     ua = request.META.get('HTTP_USER_AGENT', '')[:200]
-    print(
-        f"[REQUEST] verse book={book} chapter={chapter_num} verse={verse_num} "
-        f"lang={language} path={request.get_full_path()} ip={ip} ua={ua}"
+    logger.info(
+        '[REQUEST] verse book=%s chapter=%s verse=%s lang=%s path=%s ip=%s ua=%s',
+        book, chapter_num, verse_num, language, request.get_full_path(), ip, ua,
+        extra={'category': 'request'},
     )
     try:
         # Normalize book display (e.g., '3John' -> '3 John') while keeping lookup compatible
         book = normalize_book_name(book) or book
         results = get_results(book, chapter_num, verse_num, language)
         # Log cache status for observability
-        try:
-            print(f"[CACHE] verse book={book} chapter={chapter_num} verse={verse_num} cached={results.get('cached_hit', False)}")
-        except Exception:
-            pass
+        logger.info(
+            '[CACHE] verse book=%s chapter=%s verse=%s cached=%s',
+            book, chapter_num, verse_num, results.get('cached_hit', False),
+            extra={'category': 'cache'},
+        )
         
         # Validate verse exists - need either Greek (NT) or verse text (OT)
         has_nt_data = results.get('rbt_greek')
@@ -284,9 +289,10 @@ def handle_single_chapter(request, book, chapter_num, language):
     Routes to appropriate chapter handler based on book type.
     Includes translation support and footnote collection.
     """
-    print(
-        f"[REQUEST] chapter book={book} chapter={chapter_num} "
-        f"lang={language} path={request.get_full_path()}"
+    logger.info(
+        '[REQUEST] chapter book=%s chapter=%s lang=%s path=%s',
+        book, chapter_num, language, request.get_full_path(),
+        extra={'category': 'request'},
     )
     from search.views.chapter_handlers import (
         handle_genesis_chapter,
@@ -299,10 +305,11 @@ def handle_single_chapter(request, book, chapter_num, language):
         # Normalize book display (e.g., '3John' -> '3 John') for consistent rendering
         book = normalize_book_name(book) or book
         results = get_results(book, chapter_num, None, language)
-        try:
-            print(f"[CACHE] chapter book={book} chapter={chapter_num} cached={results.get('cached_hit', False)}")
-        except Exception:
-            pass
+        logger.info(
+            '[CACHE] chapter book=%s chapter=%s cached=%s',
+            book, chapter_num, results.get('cached_hit', False),
+            extra={'category': 'cache'},
+        )
         
         # Route to appropriate handler based on book type
         if book == 'Genesis':
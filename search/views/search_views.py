@@ -17,16 +17,44 @@ from django.shortcuts import redirect, render
 from django.views.decorators.http import require_GET
 from django.db.models import Q
 import pythonbible as bible
+from hebrewtool.middleware import get_client_ip
 
 from search.models import Genesis, GenesisFootnotes, VerseTranslation
 from search.db_utils import execute_query, get_db_connection
-from search.views.utils import detect_script, strip_hebrew_vowels, highlight_match
+from search.views.utils import highlight_match
 from translate.translator import book_abbreviations, convert_book_name
 from search.seo_utils import _get_verse_url
 from search.seo_utils import book_to_slug
+from search.suggestion_index import get_index as get_suggestion_index, record_search
+from search.query_plan import plan_query
+from search.search_cursor import SearchCursor, capped_count_sql, count_limit, seek, seek_q
 
 logger = logging.getLogger(__name__)
 
+# A letter followed by a number: worth trying as a reference in search_suggestions
+REFERENCE_HINT = re.compile(r'[^\W\d_].*\d')
+
+
+def _record_popular(request, query, page, total):
+    """Count a first-page search that found something toward the popular-query suggestions."""
+    if page != 1 or not total:
+        return
+    try:
+        record_search(query, get_client_ip(request))
+    except Exception as e:
+        logger.debug('Could not record search query: %s', e)
+
+
+def _paging_fields(paging, categories):
+    """Continuation tokens and count flags of a search_api response."""
+    cursors = {category: paging.token(category) for category in categories}
+    return {
+        'has_more': paging.has_more,
+        'next_cursor': paging.token(),
+        'cursors': {category: token for category, token in cursors.items() if token},
+        'approximate_counts': sorted(paging.approximate),
+    }
+
 
 def search_results_page(request):
     """
@@ -37,6 +65,7 @@ def search_results_page(request):
     - q: Search query
     - scope: 'all', 'ot', 'nt', 'hebrew', 'greek', 'footnotes'
     - page: Page number for pagination
+    - cursor: Continuation token of the page (next_cursor from search_api)
     """
     query = request.GET.get('q', '').strip()
     scope = request.GET.get('scope', 'all').lower()
@@ -46,11 +75,15 @@ def search_results_page(request):
     if not query:
         return redirect('/search/')
     
+    # The page links straight to a reference the query names
+    plan = plan_query(query, scope, 'auto')
     context = {
         'query': query,
         'scope': scope,
         'search_type': search_type,
         'page': page,
+        'cursor': request.GET.get('cursor', ''),
+        'reference': plan.references[0] if plan.references else None,
     }
     return render(request, 'search_results_full.html', context)
 
@@ -68,23 +101,24 @@ def search_api(request):
     - scope: 'all', 'ot', 'nt', 'hebrew', 'greek', 'footnotes' (default: 'all')
     - type: 'keyword', 'reference', 'exact' (default: auto-detect)
     - limit: Max results per category (default: 20, max: 100)
-    - page: Page number for pagination (default: 1)
+    - cursor: Continuation token from a previous response (next_cursor, or one of cursors)
+    - page: Page number for pagination without a cursor (default: 1)
     
     Returns JSON with:
     - results: Dict with arrays for each category (ot_verses, nt_verses, etc.)
-    - counts: Total count per category
+    - counts: Total count per category, capped at SEARCH_COUNT_LIMIT (see approximate_counts)
     - total: Overall result count
+    - next_cursor / cursors: Tokens for the next page of all / of each category, or null at the end
     - script_detected: Which scripts found in query (hebrew/greek/latin)
     """
     query = request.GET.get('q', '').strip()
     scope = request.GET.get('scope', 'all').lower()
     requested_type = request.GET.get('type', 'auto')
-    search_type = requested_type
     language = request.GET.get('lang', '').strip().lower()
     translations_only = request.GET.get('translations_only') == '1' or scope == 'translations'
     limit = min(int(request.GET.get('limit', 20)), 100)
     page = max(int(request.GET.get('page', 1)), 1)
-    offset = (page - 1) * limit
+    cursor_token = request.GET.get('cursor', '').strip()
     
     if not query or len(query) < 2:
         return JsonResponse({
@@ -93,26 +127,24 @@ def search_api(request):
             'total': 0
         })
     
-    # Detect script type
-    script = detect_script(query)
-    has_non_ascii = bool(re.search(r'[^\x00-\x7F]', query))
-    if has_non_ascii and not script['hebrew'] and not script['greek'] and scope == 'all':
+    # Script, references and the categories worth searching (search/query_plan.py)
+    plan = plan_query(query, scope, requested_type)
+    query = plan.query
+    script = plan.script
+    search_type = plan.search_type
+    if plan.translations_only:
         translations_only = True
-    
-    # Cache parsed references to avoid duplicate parsing
-    parsed_refs = None
 
-    # Auto-detect search type
-    if search_type == 'auto':
-        # Check if it looks like a reference
-        try:
-            parsed_refs = bible.get_references(query)
-            if parsed_refs:
-                search_type = 'reference'
-            else:
-                search_type = 'keyword'
-        except:
-            search_type = 'keyword'
+    # Keyset paging (search/search_cursor.py); a bare page number still pages with OFFSET
+    try:
+        if cursor_token:
+            paging = SearchCursor.load(cursor_token, query, scope)
+        else:
+            paging = SearchCursor(query, scope, page)
+    except ValueError as e:
+        return JsonResponse({'error': str(e), 'results': {}, 'total': 0}, status=400)
+    page = paging.page
+    offset = 0 if cursor_token else (page - 1) * limit
     
     results = {
         'ot_verses': [],
@@ -141,8 +173,18 @@ def search_api(request):
         if language and language != 'en':
             qs = qs.filter(language_code=language)
 
-        counts['translations'] = qs.count()
-        rows = qs.order_by('book', 'chapter', 'verse')[offset:offset + limit]
+        source = 'translations:verse_translations'
+        order = ('book', 'chapter', 'verse', 'id')
+        rows = []
+        if paging.runs(source):
+            if paging.fresh:
+                paging.count('translations', qs[:count_limit() + 1].count())
+            rows = paging.page_rows(
+                source,
+                qs.filter(seek_q(order, paging.after(source))).order_by(*order)[offset:offset + limit + 1],
+                limit, lambda row: (row.book, row.chapter, row.verse, row.id)
+            )
+        counts.update(paging.counts)
         for row in rows:
             lang_code = row.language_code or language or 'en'
             results['translations'].append({
@@ -155,6 +197,7 @@ def search_api(request):
                 'url': _get_verse_url(lang_code, row.book, row.chapter, row.verse)
             })
 
+        _record_popular(request, query, page, counts['translations'])
         return JsonResponse({
             'query': query,
             'scope': 'translations',
@@ -167,44 +210,18 @@ def search_api(request):
             'limit': limit,
             'lang': language or None,
             'translations_only': True,
-            'has_more': counts['translations'] > len(results['translations'])
+            **_paging_fields(paging, ['translations']),
         })
     
-    # Reference search
-    if search_type == 'reference':
-        try:
-            # Use cached refs if available (from auto-detection), otherwise parse
-            refs = parsed_refs if parsed_refs is not None else bible.get_references(query)
-            if refs:
-                ref = refs[0]
-                book_name = ref.book.name
-                
-                # Normalize book name
-                if book_name == 'SONG_OF_SONGS':
-                    book_name = 'Song of Solomon'
-                elif book_name.endswith('_1'):
-                    book_name = '1 ' + book_name[:-2].capitalize()
-                elif book_name.endswith('_2'):
-                    book_name = '2 ' + book_name[:-2].capitalize()
-                else:
-                    book_name = book_name.replace('_', ' ').title()
-                
-                results['references'].append({
-                    'type': 'reference',
-                    'book': book_name,
-                    'chapter': ref.start_chapter,
-                    'verse': ref.start_verse,
-                    'url': _get_verse_url(lang_code if 'lang_code' in locals() else 'en', book_name, ref.start_chapter, ref.start_verse) if ref.start_verse else f'/{book_to_slug(book_name)}/{ref.start_chapter}/',
-                    'display': f'{book_name} {ref.start_chapter}' + 
-                              (f':{ref.start_verse}' if ref.start_verse else '')
-                })
-                counts['references'] = 1
-        except Exception as e:
-            pass  # Not a valid reference, continue with keyword search
+    # Reference search (parsed by the plan)
+    if search_type == 'reference' and plan.references:
+        results['references'].append(dict(plan.references[0]))
+        counts['references'] = 1
 
     # If the caller explicitly requested reference mode, avoid expensive keyword searches
     if requested_type == 'reference':
         total_results = counts['references']
+        _record_popular(request, query, page, total_results)
         return JsonResponse({
             'query': query,
             'scope': scope,
@@ -224,23 +241,32 @@ def search_api(request):
     if translations_only:
         return search_translations_only()
 
-    # Keyword search
+    # Keyword search: only the categories and columns the plan kept for this script
     if search_type == 'keyword' or not results['references']:
         
         # Prepare query variations
-        query_stripped = strip_hebrew_vowels(query) if script['hebrew'] else query
+        query_stripped = plan.stripped
         
         # =================================================================
         # SEARCH OLD TESTAMENT VERSES (old_testament.ot)
         # =================================================================
-        if scope in ['all', 'ot', 'english']:
+        if plan.runs('genesis') or plan.runs('ot_verses'):
             try:
                 # Search in Genesis (Django ORM) - html=Hebrew Literal, rbt_reader=Paraphrase
-                genesis_results = Genesis.objects.filter(
-                    Q(html__icontains=query) | 
-                    Q(rbt_reader__icontains=query) |
-                    Q(hebrew__icontains=query)
-                )[:limit]
+                genesis_match = Q()
+                for column in plan.columns('genesis'):
+                    genesis_match |= Q(**{f'{column}__icontains': query})
+                genesis_source = 'ot_verses:genesis'
+                genesis_results = []
+                if genesis_match and paging.runs(genesis_source):
+                    genesis_qs = Genesis.objects.filter(genesis_match)
+                    if paging.fresh:
+                        paging.count('ot_verses', genesis_qs[:count_limit() + 1].count())
+                    genesis_results = paging.page_rows(
+                        genesis_source,
+                        genesis_qs.filter(seek_q(('id',), paging.after(genesis_source))).order_by('id')[offset:offset + limit + 1],
+                        limit, lambda row: (row.id,)
+                    )
                 
                 for result in genesis_results:
                     # Determine which field matched and set version accordingly
@@ -269,17 +295,30 @@ def search_api(request):
                     })
                 
                 # Search in old_testament.ot
-                ot_rows = execute_query(
-                    """
-                    SELECT book, chapter, verse, html, literal 
-                    FROM old_testament.ot 
-                    WHERE html ILIKE %s OR literal ILIKE %s
-                    ORDER BY book, chapter, verse
-                    LIMIT %s OFFSET %s
-                    """,
-                    (f'%{query}%', f'%{query}%', limit, offset),
-                    fetch='all'
-                )
+                ot_where, ot_params = plan.where('ot_verses')
+                ot_source = 'ot_verses:old_testament.ot'
+                ot_rows = []
+                if ot_where and paging.runs(ot_source):
+                    ot_seek, ot_after = seek(('book', 'chapter', 'verse', 'id'), paging.after(ot_source))
+                    ot_rows = execute_query(
+                        f"""
+                        SELECT book, chapter, verse, html, literal, id
+                        FROM old_testament.ot 
+                        WHERE ({ot_where}) AND {ot_seek}
+                        ORDER BY book, chapter, verse, id
+                        LIMIT %s OFFSET %s
+                        """,
+                        (*ot_params, *ot_after, limit + 1, offset),
+                        fetch='all'
+                    )
+                    ot_rows = paging.page_rows(ot_source, ot_rows, limit, lambda row: (row[0], row[1], row[2], row[5]))
+                    if paging.fresh:
+                        count_result = execute_query(
+                            capped_count_sql('old_testament.ot', ot_where),
+                            (*ot_params, count_limit() + 1),
+                            fetch='one'
+                        )
+                        paging.count('ot_verses', count_result[0] if count_result else 0)
                 
                 for row in ot_rows or []:
                     # Convert book abbreviation to full name, fallback to abbreviation if not found
@@ -312,36 +351,39 @@ def search_api(request):
                         'url': _get_verse_url('en', book_name, row[1], row[2])
                     })
                 
-                # Get count
-                count_result = execute_query(
-                    "SELECT COUNT(*) FROM old_testament.ot WHERE html ILIKE %s OR literal ILIKE %s",
-                    (f'%{query}%', f'%{query}%'),
-                    fetch='one'
-                )
-                counts['ot_verses'] = (count_result[0] if count_result else 0) + len(genesis_results)
-                
             except Exception as e:
-                print(f"OT verse search error: {e}")
+                logger.warning('OT verse search error: %s', e)
         
         # =================================================================
         # SEARCH HEBREW DATA (old_testament.hebrewdata)
         # =================================================================
-        if scope in ['all', 'ot', 'hebrew'] and (script['hebrew'] or script['latin']):
+        if plan.runs('hebrewdata'):
             try:
-                # Search Hebrew with and without vowels
-                hebrew_rows = execute_query(
-                    """
-                    SELECT id, Ref, Eng, combined_heb, combined_heb_niqqud, morphology, Strongs
-                    FROM old_testament.hebrewdata 
-                    WHERE combined_heb ILIKE %s 
-                       OR combined_heb_niqqud ILIKE %s 
-                       OR Eng ILIKE %s
-                    ORDER BY Ref
-                    LIMIT %s OFFSET %s
-                    """,
-                    (f'%{query_stripped}%', f'%{query}%', f'%{query}%', limit, offset),
-                    fetch='all'
-                )
+                # Hebrew queries match with and without vowels, Latin ones the English gloss
+                hebrew_where, hebrew_params = plan.where('hebrewdata')
+                hebrew_source = 'ot_hebrew:old_testament.hebrewdata'
+                hebrew_rows = []
+                if paging.runs(hebrew_source):
+                    hebrew_seek, hebrew_after = seek(('Ref', 'id'), paging.after(hebrew_source))
+                    hebrew_rows = execute_query(
+                        f"""
+                        SELECT id, Ref, Eng, combined_heb, combined_heb_niqqud, morphology, Strongs
+                        FROM old_testament.hebrewdata 
+                        WHERE ({hebrew_where}) AND {hebrew_seek}
+                        ORDER BY Ref, id
+                        LIMIT %s OFFSET %s
+                        """,
+                        (*hebrew_params, *hebrew_after, limit + 1, offset),
+                        fetch='all'
+                    )
+                    hebrew_rows = paging.page_rows(hebrew_source, hebrew_rows, limit, lambda row: (row[1], row[0]))
+                    if paging.fresh:
+                        count_result = execute_query(
+                            capped_count_sql('old_testament.hebrewdata', hebrew_where),
+                            (*hebrew_params, count_limit() + 1),
+                            fetch='one'
+                        )
+                        paging.count('ot_hebrew', count_result[0] if count_result else 0)
                 
                 for row in hebrew_rows or []:
                     ref_parts = (row[1] or '').split('.')
@@ -369,37 +411,38 @@ def search_api(request):
                         'url': _get_verse_url('en', book_name, chapter, verse) if book_name else None
                     })
                 
-                count_result = execute_query(
-                    """SELECT COUNT(*) FROM old_testament.hebrewdata 
-                       WHERE combined_heb ILIKE %s OR combined_heb_niqqud ILIKE %s OR Eng ILIKE %s""",
-                    (f'%{query_stripped}%', f'%{query}%', f'%{query}%'),
-                    fetch='one'
-                )
-                counts['ot_hebrew'] = count_result[0] if count_result else 0
-                
             except Exception as e:
-                print(f"Hebrew search error: {e}")
+                logger.warning('Hebrew search error: %s', e)
         
         # =================================================================
         # SEARCH OLD TESTAMENT CONSONANTAL (old_testament.ot_consonantal)
         # =================================================================
-        if scope in ['all', 'ot', 'hebrew'] and script['hebrew']:
+        consonantal_source = 'ot_hebrew:old_testament.ot_consonantal'
+        if plan.runs('ot_consonantal') and paging.runs(consonantal_source):
             try:
+                consonantal_where, consonantal_params = plan.where('ot_consonantal')
+                consonantal_seek, consonantal_after = seek(('ref',), paging.after(consonantal_source))
                 with get_db_connection() as conn:
                     cursor = conn.cursor()
                     cursor.execute("BEGIN")
                     cursor.execute("SET LOCAL search_path TO old_testament")
                     cursor.execute(
-                        """
+                        f"""
                         SELECT ref, hebrew 
                         FROM ot_consonantal 
-                        WHERE hebrew ILIKE %s
+                        WHERE ({consonantal_where}) AND {consonantal_seek}
                         ORDER BY ref
                         LIMIT %s OFFSET %s
                         """,
-                        (f'%{query_stripped}%', limit, offset)
+                        (*consonantal_params, *consonantal_after, limit + 1, offset)
                     )
-                    consonantal_rows = cursor.fetchall()
+                    consonantal_rows = paging.page_rows(consonantal_source, cursor.fetchall(), limit, lambda row: (row[0],))
+                    if paging.fresh:
+                        cursor.execute(
+                            capped_count_sql('ot_consonantal', consonantal_where),
+                            (*consonantal_params, count_limit() + 1)
+                        )
+                        paging.count('ot_hebrew', cursor.fetchone()[0])
                 
                 for row in consonantal_rows or []:
                     # Parse ref like "Gen.1.1" into parts
@@ -422,24 +465,28 @@ def search_api(request):
                     })
                     
             except Exception as e:
-                print(f"Consonantal search error: {e}")
+                logger.warning('Consonantal search error: %s', e)
         
         # =================================================================
         # SEARCH NEW TESTAMENT VERSES
         # =================================================================
-        if scope in ['all', 'nt', 'english']:
+        nt_source = 'nt_verses:new_testament.nt'
+        if plan.runs('nt_verses') and paging.runs(nt_source):
             try:
+                nt_where, nt_params = plan.where('nt_verses')
+                nt_seek, nt_after = seek(('book', 'chapter', 'startVerse', 'nt_id'), paging.after(nt_source))
                 nt_rows = execute_query(
-                    """
-                    SELECT book, chapter, startVerse, rbt, verseText
+                    f"""
+                    SELECT book, chapter, startVerse, rbt, verseText, nt_id
                     FROM new_testament.nt 
-                    WHERE rbt ILIKE %s OR verseText ILIKE %s
-                    ORDER BY book, chapter, startVerse
+                    WHERE ({nt_where}) AND {nt_seek}
+                    ORDER BY book, chapter, startVerse, nt_id
                     LIMIT %s OFFSET %s
                     """,
-                    (f'%{query}%', f'%{query}%', limit, offset),
+                    (*nt_params, *nt_after, limit + 1, offset),
                     fetch='all'
                 )
+                nt_rows = paging.page_rows(nt_source, nt_rows, limit, lambda row: (row[0], row[1], row[2], row[5]))
                 
                 for row in nt_rows or []:
                     book_abbrev = row[0] if row[0] else ''
@@ -458,32 +505,37 @@ def search_api(request):
                         'url': _get_verse_url('en', book_name, row[1], row[2])
                     })
                 
-                count_result = execute_query(
-                    "SELECT COUNT(*) FROM new_testament.nt WHERE rbt ILIKE %s OR verseText ILIKE %s",
-                    (f'%{query}%', f'%{query}%'),
-                    fetch='one'
-                )
-                counts['nt_verses'] = count_result[0] if count_result else 0
+                if paging.fresh:
+                    count_result = execute_query(
+                        capped_count_sql('new_testament.nt', nt_where),
+                        (*nt_params, count_limit() + 1),
+                        fetch='one'
+                    )
+                    paging.count('nt_verses', count_result[0] if count_result else 0)
                 
             except Exception as e:
-                print(f"NT verse search error: {e}")
+                logger.warning('NT verse search error: %s', e)
         
         # =================================================================
         # SEARCH NEW TESTAMENT GREEK (rbt_greek.strongs_greek)
         # =================================================================
-        if scope in ['all', 'nt', 'greek'] and (script['greek'] or script['latin']):
+        greek_source = 'nt_greek:rbt_greek.strongs_greek'
+        if plan.runs('nt_greek') and paging.runs(greek_source):
             try:
+                greek_where, greek_params = plan.where('nt_greek')
+                greek_seek, greek_after = seek(('verse', 'id'), paging.after(greek_source))
                 greek_rows = execute_query(
-                    """
-                    SELECT verse, strongs, translit, lemma, english, morph, morph_desc
+                    f"""
+                    SELECT verse, strongs, translit, lemma, english, morph, morph_desc, id
                     FROM rbt_greek.strongs_greek 
-                    WHERE lemma ILIKE %s OR english ILIKE %s
-                    ORDER BY verse
+                    WHERE ({greek_where}) AND {greek_seek}
+                    ORDER BY verse, id
                     LIMIT %s OFFSET %s
                     """,
-                    (f'%{query}%', f'%{query}%', limit, offset),
+                    (*greek_params, *greek_after, limit + 1, offset),
                     fetch='all'
                 )
+                greek_rows = paging.page_rows(greek_source, greek_rows, limit, lambda row: (row[0], row[7]))
                 
                 for row in greek_rows or []:
                     # Parse reference like "Mat.1.1-01" into parts
@@ -510,25 +562,34 @@ def search_api(request):
                         'url': _get_verse_url('en', book_name, chapter_num, verse_part)
                     })
                 
-                count_result = execute_query(
-                    "SELECT COUNT(*) FROM rbt_greek.strongs_greek WHERE lemma ILIKE %s OR english ILIKE %s",
-                    (f'%{query}%', f'%{query}%'),
-                    fetch='one'
-                )
-                counts['nt_greek'] = count_result[0] if count_result else 0
+                if paging.fresh:
+                    count_result = execute_query(
+                        capped_count_sql('rbt_greek.strongs_greek', greek_where),
+                        (*greek_params, count_limit() + 1),
+                        fetch='one'
+                    )
+                    paging.count('nt_greek', count_result[0] if count_result else 0)
                 
             except Exception as e:
-                print(f"Greek search error: {e}")
+                logger.warning('Greek search error: %s', e)
         
         # =================================================================
         # SEARCH FOOTNOTES
         # =================================================================
-        if scope in ['all', 'footnotes']:
+        if plan.runs('footnotes'):
             try:
                 # Search Genesis footnotes (Django ORM)
-                genesis_footnotes = GenesisFootnotes.objects.filter(
-                    footnote_html__icontains=query
-                )[:limit]
+                genesis_fn_source = 'footnotes:genesis_footnotes'
+                genesis_footnotes = []
+                if paging.runs(genesis_fn_source):
+                    genesis_footnotes = paging.page_rows(
+                        genesis_fn_source,
+                        GenesisFootnotes.objects.filter(
+                            seek_q(('id',), paging.after(genesis_fn_source)),
+                            footnote_html__icontains=query
+                        ).order_by('id')[offset:offset + limit + 1],
+                        limit, lambda row: (row.id,)
+                    )
                 
                 for fn in genesis_footnotes:
                     parts = fn.footnote_id.split('-') if fn.footnote_id else []
@@ -546,17 +607,23 @@ def search_api(request):
                     })
                 
                 # Search OT hebrewdata footnotes
-                ot_footnotes = execute_query(
-                    """
-                    SELECT Ref, footnote 
-                    FROM old_testament.hebrewdata 
-                    WHERE footnote ILIKE %s AND footnote IS NOT NULL AND footnote != ''
-                    ORDER BY Ref
-                    LIMIT %s OFFSET %s
-                    """,
-                    (f'%{query}%', limit, offset),
-                    fetch='all'
-                )
+                ot_fn_source = 'footnotes:old_testament.hebrewdata'
+                ot_footnotes = []
+                if paging.runs(ot_fn_source):
+                    ot_fn_seek, ot_fn_after = seek(('Ref', 'id'), paging.after(ot_fn_source))
+                    ot_footnotes = execute_query(
+                        f"""
+                        SELECT Ref, footnote, id
+                        FROM old_testament.hebrewdata 
+                        WHERE footnote ILIKE %s AND footnote IS NOT NULL AND footnote != ''
+                          AND {ot_fn_seek}
+                        ORDER BY Ref, id
+                        LIMIT %s OFFSET %s
+                        """,
+                        (f'%{query}%', *ot_fn_after, limit + 1, offset),
+                        fetch='all'
+                    )
+                    ot_footnotes = paging.page_rows(ot_fn_source, ot_footnotes, limit, lambda row: (row[0], row[2]))
                 
                 for row in ot_footnotes or []:
                     ref_parts = (row[0] or '').split('.')
@@ -614,9 +681,15 @@ def search_api(request):
                     fetch='all'
                 )
                 
+                # Each table gives up to a fifth of the page, paged on its own by footnote_id
+                nt_fn_limit = max(limit // 5, 1)
                 for table_row in footnote_tables or []:
                     table_name = table_row[0]
                     book_code = table_name.replace('_footnotes', '').replace('table_', '')
+                    nt_fn_source = f'footnotes:new_testament.{table_name}'
+                    if not paging.runs(nt_fn_source):
+                        continue
+                    nt_fn_seek, nt_fn_after = seek(('footnote_id',), paging.after(nt_fn_source))
                     
                     # Check if vrs column exists in this table
                     has_vrs = False
@@ -641,10 +714,11 @@ def search_api(request):
                             f"""
                             SELECT footnote_id, footnote_html, vrs 
                             FROM new_testament.{table_name} 
-                            WHERE footnote_html ILIKE %s
-                            LIMIT %s
+                            WHERE footnote_html ILIKE %s AND {nt_fn_seek}
+                            ORDER BY footnote_id
+                            LIMIT %s OFFSET %s
                             """,
-                            (f'%{query}%', limit // 5),
+                            (f'%{query}%', *nt_fn_after, nt_fn_limit + 1, offset // 5),
                             fetch='all'
                         )
                     else:
@@ -652,12 +726,14 @@ def search_api(request):
                             f"""
                             SELECT footnote_id, footnote_html 
                             FROM new_testament.{table_name} 
-                            WHERE footnote_html ILIKE %s
-                            LIMIT %s
+                            WHERE footnote_html ILIKE %s AND {nt_fn_seek}
+                            ORDER BY footnote_id
+                            LIMIT %s OFFSET %s
                             """,
-                            (f'%{query}%', limit // 5),
+                            (f'%{query}%', *nt_fn_after, nt_fn_limit + 1, offset // 5),
                             fetch='all'
                         )
+                    nt_fn_rows = paging.page_rows(nt_fn_source, nt_fn_rows, nt_fn_limit, lambda row: (row[0],))
                     
                     for fn_row in nt_fn_rows or []:
                         footnote_id = fn_row[0] or ''
@@ -745,31 +821,32 @@ def search_api(request):
                                 'url': url
                             })
                 
-                counts['footnotes'] = len(results['footnotes'])
-                
             except Exception as e:
-                print(f"Footnote search error: {e}")
+                logger.warning('Footnote search error: %s', e)
 
         # =================================================================
         # SEARCH JOSEPH AND ASENETH (joseph_aseneth.aseneth)
         # =================================================================
-        if scope in ['all', 'storehouse']:
+        aseneth_source = 'storehouse:joseph_aseneth.aseneth'
+        if plan.runs('aseneth') and paging.runs(aseneth_source):
             try:
+                aseneth_where, aseneth_params = plan.where('aseneth')
+                aseneth_seek, aseneth_after = seek(('chapter', 'verse'), paging.after(aseneth_source))
                 with get_db_connection() as conn:
                     with conn.cursor() as cursor:
                         cursor.execute("BEGIN")
                         cursor.execute("SET LOCAL search_path TO joseph_aseneth")
                         cursor.execute(
-                            """
+                            f"""
                             SELECT chapter, verse, english, greek
                             FROM aseneth
-                            WHERE english ILIKE %s OR greek ILIKE %s
+                            WHERE ({aseneth_where}) AND {aseneth_seek}
                             ORDER BY chapter, verse
                             LIMIT %s OFFSET %s
                             """,
-                            (f'%{query}%', f'%{query}%', limit, offset)
+                            (*aseneth_params, *aseneth_after, limit + 1, offset)
                         )
-                        as_rows = cursor.fetchall()
+                        as_rows = paging.page_rows(aseneth_source, cursor.fetchall(), limit, lambda row: (row[0], row[1]))
 
                         for row in as_rows or []:
                             chapter = str(row[0]) if row[0] is not None else ''
@@ -792,38 +869,46 @@ def search_api(request):
                                 'url': f'/aseneth/?chapter={chapter}'
                             })
 
-                        cursor.execute(
-                            "SELECT COUNT(*) FROM aseneth WHERE english ILIKE %s OR greek ILIKE %s",
-                            (f'%{query}%', f'%{query}%')
-                        )
-                        cnt = cursor.fetchone()
-                        counts['storehouse'] = cnt[0] if cnt else 0
+                        if paging.fresh:
+                            cursor.execute(
+                                capped_count_sql('aseneth', aseneth_where),
+                                (*aseneth_params, count_limit() + 1)
+                            )
+                            paging.count('storehouse', cursor.fetchone()[0])
 
             except Exception as e:
-                print(f"Storehouse search error (Aseneth): {e}")
+                logger.warning('Storehouse search error (Aseneth): %s', e)
 
         # =================================================================
         # SEARCH GOSPEL OF JUDAS (gospel_of_judas.judas_prose + judas_interlinear)
         # =================================================================
-        if scope in ['all', 'storehouse']:
+        if plan.runs('judas_prose') or plan.runs('judas_interlinear'):
             try:
+                prose_source = 'storehouse:gospel_of_judas.judas_prose'
+                il_source = 'storehouse:gospel_of_judas.judas_interlinear'
+                prose_where, prose_params = plan.where('judas_prose')
+                il_where, il_params = plan.where('judas_interlinear')
+                prose_seek, prose_after = seek(('codex', 'id'), paging.after(prose_source))
+                il_seek, il_after = seek(('codex', 'line_num', 'id'), paging.after(il_source))
                 with get_db_connection() as conn:
                     with conn.cursor() as cursor:
                         cursor.execute("BEGIN")
                         cursor.execute("SET LOCAL search_path TO gospel_of_judas")
 
                         # Search prose content
-                        cursor.execute(
-                            """
-                            SELECT codex, scene_title, content
-                            FROM judas_prose
-                            WHERE content ILIKE %s OR scene_title ILIKE %s
-                            ORDER BY codex
-                            LIMIT %s OFFSET %s
-                            """,
-                            (f'%{query}%', f'%{query}%', limit, offset)
-                        )
-                        prose_rows = cursor.fetchall()
+                        prose_rows = []
+                        if prose_where and paging.runs(prose_source):
+                            cursor.execute(
+                                f"""
+                                SELECT codex, scene_title, content, id
+                                FROM judas_prose
+                                WHERE ({prose_where}) AND {prose_seek}
+                                ORDER BY codex, id
+                                LIMIT %s OFFSET %s
+                                """,
+                                (*prose_params, *prose_after, limit + 1, offset)
+                            )
+                            prose_rows = paging.page_rows(prose_source, cursor.fetchall(), limit, lambda row: (row[0], row[3]))
 
                         for row in prose_rows or []:
                             codex = str(row[0]) if row[0] is not None else ''
@@ -844,18 +929,19 @@ def search_api(request):
                             })
 
                         # Search interlinear (english, greek, coptic, notes)
-                        cursor.execute(
-                            """
-                            SELECT codex, line_num, coptic, greek, english, notes
-                            FROM judas_interlinear
-                            WHERE english ILIKE %s OR greek ILIKE %s
-                               OR coptic ILIKE %s OR notes ILIKE %s
-                            ORDER BY codex, line_num
-                            LIMIT %s OFFSET %s
-                            """,
-                            (f'%{query}%', f'%{query}%', f'%{query}%', f'%{query}%', limit, offset)
-                        )
-                        il_rows = cursor.fetchall()
+                        il_rows = []
+                        if il_where and paging.runs(il_source):
+                            cursor.execute(
+                                f"""
+                                SELECT codex, line_num, coptic, greek, english, notes, id
+                                FROM judas_interlinear
+                                WHERE ({il_where}) AND {il_seek}
+                                ORDER BY codex, line_num, id
+                                LIMIT %s OFFSET %s
+                                """,
+                                (*il_params, *il_after, limit + 1, offset)
+                            )
+                            il_rows = paging.page_rows(il_source, cursor.fetchall(), limit, lambda row: (row[0], row[1], row[6]))
 
                         for row in il_rows or []:
                             codex = str(row[0]) if row[0] is not None else ''
@@ -888,25 +974,15 @@ def search_api(request):
                             })
 
                         # Count totals for Gospel of Judas
-                        cursor.execute(
-                            "SELECT COUNT(*) FROM judas_prose WHERE content ILIKE %s OR scene_title ILIKE %s",
-                            (f'%{query}%', f'%{query}%')
-                        )
-                        cnt_prose = cursor.fetchone()
-
-                        cursor.execute(
-                            """SELECT COUNT(*) FROM judas_interlinear
-                               WHERE english ILIKE %s OR greek ILIKE %s
-                                  OR coptic ILIKE %s OR notes ILIKE %s""",
-                            (f'%{query}%', f'%{query}%', f'%{query}%', f'%{query}%')
-                        )
-                        cnt_il = cursor.fetchone()
-
-                        judas_total = (cnt_prose[0] if cnt_prose else 0) + (cnt_il[0] if cnt_il else 0)
-                        counts['storehouse'] = counts.get('storehouse', 0) + judas_total
+                        if paging.fresh and prose_where:
+                            cursor.execute(capped_count_sql('judas_prose', prose_where), (*prose_params, count_limit() + 1))
+                            paging.count('storehouse', cursor.fetchone()[0])
+                        if paging.fresh and il_where:
+                            cursor.execute(capped_count_sql('judas_interlinear', il_where), (*il_params, count_limit() + 1))
+                            paging.count('storehouse', cursor.fetchone()[0])
 
             except Exception as e:
-                print(f"Storehouse search error (Gospel of Judas): {e}")
+                logger.warning('Storehouse search error (Gospel of Judas): %s', e)
     
     # Deduplicate verse results to avoid duplicate entries (e.g., same reference from multiple sources)
     def dedupe_by_ref(items):
@@ -937,11 +1013,13 @@ def search_api(request):
     results['footnotes'] = dedupe_by_ref(results.get('footnotes', []))
     results['storehouse'] = dedupe_by_ref(results.get('storehouse', []))
 
-    # Recompute counts after deduplication
-    counts['ot_verses'] = len(results['ot_verses'])
-    counts['nt_verses'] = len(results['nt_verses'])
-    counts['footnotes'] = len(results['footnotes'])
-    counts['storehouse'] = len(results['storehouse'])
+    # Footnotes are spread over many tables and not counted: page 1 reports what it
+    # found (approximate if there is more); every other count comes from the first page
+    if paging.fresh and results['footnotes']:
+        paging.count('footnotes', len(results['footnotes']))
+        if paging.token('footnotes'):
+            paging.approximate.add('footnotes')
+    counts.update(paging.counts)
 
     # Calculate totals
     total_results = sum(counts.values())
@@ -963,6 +1041,7 @@ def search_api(request):
         except Exception:
             logger.exception('Failed to log missing book names')
 
+    _record_popular(request, query, page, total_results)
     return JsonResponse({
         'query': query,
         'scope': scope,
@@ -975,7 +1054,7 @@ def search_api(request):
         'limit': limit,
         'lang': language or None,
         'translations_only': translations_only,
-        'has_more': any(counts[k] > len(results[k]) for k in counts)
+        **_paging_fields(paging, ['ot_verses', 'ot_hebrew', 'nt_verses', 'nt_greek', 'footnotes', 'storehouse']),
     })
 
 
@@ -986,7 +1065,7 @@ def search_suggestions(request):
     
     Returns:
     - Reference suggestions (if query looks like a book/chapter)
-    - Book name suggestions (matching query prefix)
+    - Book, popular query and Hebrew/Greek lemma suggestions (matching query prefix)
     """
     query = request.GET.get('q', '').strip()
     
@@ -995,63 +1074,29 @@ def search_suggestions(request):
     
     suggestions = []
     
-    # Check for reference match
-    try:
-        refs = bible.get_references(query)
-        if refs:
-            ref = refs[0]
-            book_name = ref.book.name.replace('_', ' ').title()
-            if ref.book.name == 'SONG_OF_SONGS':
-                book_name = 'Song of Solomon'
-            
-            display = f'{book_name} {ref.start_chapter}'
-            if ref.start_verse:
-                display += f':{ref.start_verse}'
-            
-            suggestions.append({
-                'type': 'reference',
-                'text': display,
-                'url': _get_verse_url(lang_code if 'lang_code' in locals() else 'en', book_name, ref.start_chapter, ref.start_verse) if ref.start_verse else f'/{book_to_slug(book_name)}/{ref.start_chapter}/'
-            })
-    except:
-        pass
-    
-    # Book name suggestions
-    book_names = [
-        'Genesis', 'Exodus', 'Leviticus', 'Numbers', 'Deuteronomy',
-        'Joshua', 'Judges', 'Ruth', '1 Samuel', '2 Samuel', '1 Kings', '2 Kings',
-        '1 Chronicles', '2 Chronicles', 'Ezra', 'Nehemiah', 'Esther', 'Job',
-        'Psalms', 'Proverbs', 'Ecclesiastes', 'Song of Solomon', 'Isaiah',
-        'Jeremiah', 'Lamentations', 'Ezekiel', 'Daniel', 'Hosea', 'Joel',
-        'Amos', 'Obadiah', 'Jonah', 'Micah', 'Nahum', 'Habakkuk', 'Zephaniah',
-        'Haggai', 'Zechariah', 'Malachi', 'Matthew', 'Mark', 'Luke', 'John',
-        'Acts', 'Romans', '1 Corinthians', '2 Corinthians', 'Galatians',
-        'Ephesians', 'Philippians', 'Colossians', '1 Thessalonians',
-        '2 Thessalonians', '1 Timothy', '2 Timothy', 'Titus', 'Philemon',
-        'Hebrews', 'James', '1 Peter', '2 Peter', '1 John', '2 John', '3 John',
-        'Jude', 'Revelation'
-    ]
-
-    # Apocryphal / Storehouse book suggestions
-    storehouse_books = [
-        ('Joseph and Aseneth', '/aseneth/?chapter=1'),
-        ('Gospel of Judas', '/judas/'),
-    ]
+    # Check for reference match ("gen 1", "1 sam 3:2"); bare book names come from the index
+    if REFERENCE_HINT.search(query):
+        try:
+            refs = bible.get_references(query)
+            if refs:
+                ref = refs[0]
+                book_name = ref.book.name.replace('_', ' ').title()
+                if ref.book.name == 'SONG_OF_SONGS':
+                    book_name = 'Song of Solomon'
+                
+                display = f'{book_name} {ref.start_chapter}'
+                if ref.start_verse:
+                    display += f':{ref.start_verse}'
+                
+                suggestions.append({
+                    'type': 'reference',
+                    'text': display,
+                    'url': _get_verse_url('en', book_name, ref.start_chapter, ref.start_verse) if ref.start_verse else f'/{book_to_slug(book_name)}/{ref.start_chapter}/'
+                })
+        except:
+            pass
     
-    for book in book_names:
-        if book.lower().startswith(query.lower()):
-            suggestions.append({
-                'type': 'book',
-                'text': book,
-                'url': f'/{book_to_slug(book)}/1/'
-            })
-
-    for sbook, surl in storehouse_books:
-        if sbook.lower().startswith(query.lower()) or query.lower() in sbook.lower():
-            suggestions.append({
-                'type': 'book',
-                'text': sbook,
-                'url': surl
-            })
+    # Books, storehouse titles, popular queries and lexicon words (search/suggestion_index.py)
+    suggestions.extend(get_suggestion_index().lookup(query, 10 - len(suggestions)))
     
     return JsonResponse({'suggestions': suggestions[:10]})
@@ -4,7 +4,6 @@ Statistics and analytics views for translation updates and usage tracking.
 
 import re
 import traceback
-from collections import defaultdict
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 
@@ -12,12 +11,19 @@ from django.http import JsonResponse
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.db.models import Count
-from django.db.models.functions import TruncDate, TruncWeek, TruncMonth, TruncHour
+from django.db.models import Sum
 from dateutil.relativedelta import relativedelta
 
 from search.models import TranslationUpdates, GenesisFootnotes
-from search.db_utils import execute_query
+from search.db_utils import execute_query, safe_cache_get, safe_cache_set
+from search.update_stats import (
+    bucket_series,
+    hourly_counts,
+    range_start,
+    reference_counts,
+    top_references as top_references_for_range,
+    weekday_pattern as update_weekday_pattern,
+)
 from translate.translator import convert_book_name
 
 
@@ -53,6 +59,37 @@ def update_statistics_view(request):
     return render(request, 'statistics.html')
 
 
+FOOTNOTE_TOTALS_CACHE_KEY = 'update_stats_footnote_totals'
+FOOTNOTE_TOTALS_CACHE_TIMEOUT = 60 * 10
+
+
+def _count_footnote_totals():
+    """Count Genesis and NT footnote rows (one query per NT footnote table)."""
+    # Get all footnote tables
+    footnote_tables = execute_query("""
+        SELECT table_name 
+        FROM information_schema.tables 
+        WHERE table_schema = 'new_testament' 
+        AND table_name LIKE '%_footnotes'
+    """, fetch='all')
+
+    nt_footnote_count = 0
+
+    for table_row in footnote_tables:
+        table_name = table_row[0]
+        count_result = execute_query(
+            f"SELECT COUNT(*) FROM new_testament.{table_name} WHERE footnote_id IS NOT NULL",
+            fetch='one'
+        )
+        if count_result:
+            nt_footnote_count += count_result[0]
+
+    return {
+        'genesis': GenesisFootnotes.objects.filter(footnote_id__isnull=False).count(),
+        'nt': nt_footnote_count,
+    }
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def update_statistics_api(request):
@@ -72,58 +109,24 @@ def update_statistics_api(request):
     try:
         days_param = request.GET.get('days', '30')
         end_date = datetime.now()
+        start_date, days_back = range_start(days_param, end_date)
 
-        # Handle "all" case for days parameter
-        if days_param == 'all':
-            start_date = datetime(2024, 1, 1)
-            days_back = (end_date - start_date).days
-        else:
-            try:
-                days_back = max(0, int(days_param))
-                start_date = end_date - timedelta(days=days_back)
-            except (ValueError, TypeError):
-                days_back = 30
-                start_date = end_date - timedelta(days=30)
-
-        # Base queryset filtered by date range
-        base_queryset = TranslationUpdates.objects.filter(
-            date__gte=start_date,
-            date__lte=end_date
-        )
+        # All series are sums over the precomputed hourly buckets (search/update_stats.py)
+        hourly = hourly_counts(start_date, end_date)
+        daily_data, weekly_data, monthly_data, hour_counts = bucket_series(hourly)
 
         # 1. Daily updates
-        daily_updates = list(
-            base_queryset
-            .annotate(day=TruncDate('date'))
-            .values('day')
-            .annotate(count=Count('date'))
-            .order_by('day')
-        )
-
-        daily_data = {}
-        for item in daily_updates:
-            daily_data[item['day'].strftime('%Y-%m-%d')] = item['count']
-
         complete_daily_data = []
         current_date = start_date.date()
         while current_date <= end_date.date():
-            date_str = current_date.strftime('%Y-%m-%d')
             complete_daily_data.append({
-                'date': date_str,
-                'count': daily_data.get(date_str, 0)
+                'date': current_date.strftime('%Y-%m-%d'),
+                'count': daily_data.get(current_date, 0)
             })
             current_date += timedelta(days=1)
 
         # 2. Top 100 references
-        top_references = list(
-            base_queryset
-            .exclude(reference__isnull=True)
-            .exclude(reference__exact='')
-            .exclude(reference='[]')
-            .values('reference')
-            .annotate(count=Count('date'))
-            .order_by('-count')[:100]
-        )
+        top_references = top_references_for_range(start_date, end_date)
 
         # Generate links for each reference (Format A only)
         base_url = "https://rbtproject.up.railway.app"
@@ -146,60 +149,21 @@ def update_statistics_api(request):
                 item['link'] = None
 
         # 3. Weekly aggregation
-        weekly_updates = list(
-            base_queryset
-            .annotate(week=TruncWeek('date'))
-            .values('week')
-            .annotate(count=Count('date'))
-            .order_by('week')
-        )
+        weekly_updates = [{'week': week, 'count': weekly_data[week]} for week in sorted(weekly_data)]
 
         # 4. Monthly aggregation
-        monthly_updates = list(
-            base_queryset
-            .annotate(month=TruncMonth('date'))
-            .values('month')
-            .annotate(count=Count('date'))
-            .order_by('month')
-        )
+        monthly_updates = [{'month': month, 'count': monthly_data[month]} for month in sorted(monthly_data)]
 
         # 5. Hourly pattern
-        hourly_updates = (
-            base_queryset
-            .annotate(hour=TruncHour('date'))
-            .values('hour')
-            .annotate(count=Count('date'))
-            .order_by('hour')
-        )
-
-        hourly_pattern = []
-        hour_counts = defaultdict(int)
-        for item in hourly_updates:
-            hour_counts[item['hour'].hour] += item['count']
-
-        for hour in range(24):
-            hourly_pattern.append({'hour': hour, 'count': hour_counts.get(hour, 0)})
+        hourly_pattern = [{'hour': hour, 'count': hour_counts.get(hour, 0)} for hour in range(24)]
 
         # 6. Weekday pattern (last 4 weeks)
-        four_weeks_ago = end_date - timedelta(weeks=4)
-        weekday_stats = defaultdict(int)
-        weekday_data = TranslationUpdates.objects.filter(
-            date__gte=four_weeks_ago,
-            date__lte=end_date
-        ).values('date')
-
-        for item in weekday_data:
-            weekday = item['date'].strftime('%A')
-            weekday_stats[weekday] += 1
-
-        weekday_pattern = [
-            {'day': day, 'count': weekday_stats[day]}
-            for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        ]
+        weekday_pattern = update_weekday_pattern(end_date)
 
         # 7. Summary statistics
-        total_updates = base_queryset.count()
-        unique_references = base_queryset.values('reference').distinct().count()
+        references_in_range = reference_counts(start_date, end_date)
+        total_updates = sum(count for _, count in hourly)
+        unique_references = references_in_range.values('reference').distinct().count()
         avg_daily = total_updates / max(days_back, 1)
 
         TOTAL_BIBLE_VERSES = 31102
@@ -211,31 +175,20 @@ def update_statistics_api(request):
         # 9. Count unique OT references (pattern: e.g., '2-16-86')
         ot_footnote_pattern = re.compile(r'^\d+-\d+-\d+$')
         ot_footnote_references = set()
-        for ref in base_queryset.exclude(reference__isnull=True).exclude(reference__exact='').values_list('reference', flat=True):
+        for ref in references_in_range.exclude(reference__exact='').values_list('reference', flat=True).distinct():
             if ot_footnote_pattern.match(ref.strip()):
                 ot_footnote_references.add(ref.strip())
         ot_footnote_count = len(ot_footnote_references)
+
+        # Footnote table totals change slowly; cache them instead of counting every table per call
+        footnote_totals = safe_cache_get(FOOTNOTE_TOTALS_CACHE_KEY)
+        if footnote_totals is None:
+            footnote_totals = _count_footnote_totals()
+            safe_cache_set(FOOTNOTE_TOTALS_CACHE_KEY, footnote_totals, FOOTNOTE_TOTALS_CACHE_TIMEOUT)
+
         # add the Genesis footnote count
-        ot_footnote_count = ot_footnote_count + GenesisFootnotes.objects.filter(footnote_id__isnull=False).count()
-
-        # Get all footnote tables
-        footnote_tables = execute_query("""
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'new_testament' 
-            AND table_name LIKE '%_footnotes'
-        """, fetch='all')
-
-        nt_footnote_count = 0
-
-        for table_row in footnote_tables:
-            table_name = table_row[0]
-            count_result = execute_query(
-                f"SELECT COUNT(*) FROM new_testament.{table_name} WHERE footnote_id IS NOT NULL",
-                fetch='one'
-            )
-            if count_result:
-                nt_footnote_count += count_result[0]
+        ot_footnote_count = ot_footnote_count + footnote_totals['genesis']
+        nt_footnote_count = footnote_totals['nt']
 
         return JsonResponse({
             'summary': {
@@ -285,35 +238,31 @@ def update_statistics_api(request):
 def visitor_locations_api(request):
     """
     API endpoint for fetching visitor locations for the heatmap.
+
+    Reads the daily rollups (visitor_geo_daily / visitor_country_daily), so the
+    cost depends on the number of grid cells, not on raw traffic volume.
     """
     try:
-        from search.models import VisitorLocation
-        
+        from search.models import VisitorGeoDaily, VisitorCountryDaily
+
         # Get locations from the last 30 days
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        
-        # Filter out extreme bot anomalies that skew analytics
-        excluded_countries = ['Vietnam', 'China', 'Singapore', 'Bangladesh', 'Hong Kong', 'Russia']
-
-        locations = VisitorLocation.objects.filter(
-            timestamp__gte=thirty_days_ago,
-            is_bot=False,
-            latitude__isnull=False,
-            longitude__isnull=False
-        ).exclude(country__in=excluded_countries).values('latitude', 'longitude').annotate(count=Count('id'))
-        
+        since = (datetime.now() - timedelta(days=30)).date()
+
+        # Bot-network countries are excluded when the rollups are written
+        locations = VisitorGeoDaily.objects.filter(
+            date__gte=since
+        ).values('latitude', 'longitude').annotate(count=Sum('visits'))
+
         data = [
             [loc['latitude'], loc['longitude'], loc['count']]
             for loc in locations
         ]
-        
+
         # Get top countries
-        top_countries = list(VisitorLocation.objects.filter(
-            timestamp__gte=thirty_days_ago,
-            is_bot=False,
-            country__isnull=False
-        ).exclude(country__in=excluded_countries).values('country').annotate(count=Count('id')).order_by('-count')[:10])
-        
+        top_countries = list(VisitorCountryDaily.objects.filter(
+            date__gte=since
+        ).values('country').annotate(count=Sum('visits')).order_by('-count')[:10])
+
         return JsonResponse({
             'locations': data,
             'top_countries': top_countries
@@ -245,9 +245,9 @@ def _translate_nt_chapter(book, chapter_num, language, results):
                     v_obj = int(footnotes_collection[found_sup].get('verse', 0))
                 
                 VerseTranslation.objects.update_or_create(
-                    book=book, chapter=c_obj, verse=v_obj,
+                    book=book, chapter=c_obj,
                     language_code=language, footnote_id=f_id,
-                    defaults={'status': 'processing', 'footnote_text': ''}
+                    defaults={'verse': v_obj, 'status': 'processing', 'footnote_text': ''}
                 )
             
             translated_footnotes = translate_footnotes_batch(footnotes_to_translate, language)
@@ -273,9 +273,9 @@ def _translate_nt_chapter(book, chapter_num, language, results):
                     v_obj = int(footnotes_collection[found_sup].get('verse', 0))
                 
                 VerseTranslation.objects.update_or_create(
-                    book=book, chapter=c_obj, verse=v_obj,
+                    book=book, chapter=c_obj,
                     language_code=language, footnote_id=f_id,
-                    defaults={'footnote_text': f_text, 'status': 'completed', 'generated_by': 'gemini-3-flash-preview'}
+                    defaults={'verse': v_obj, 'footnote_text': f_text, 'status': 'completed', 'generated_by': 'gemini-3-flash-preview'}
                 )
                 translation_stats['footnotes'] += 1
     
@@ -435,10 +435,9 @@ def _translate_ot_chapter(book, chapter_num, language, results):
                 VerseTranslation.objects.update_or_create(
                     book=book,
                     chapter=data.get('chapter', chapter_num),
-                    verse=data.get('verse', 0),
                     language_code=language,
                     footnote_id=f_id,
-                    defaults={'status': 'processing', 'footnote_text': ''}
+                    defaults={'verse': data.get('verse', 0), 'status': 'processing', 'footnote_text': ''}
                 )
             
             translated_footnotes = translate_footnotes_batch(footnotes_to_translate, language)
@@ -454,10 +453,9 @@ def _translate_ot_chapter(book, chapter_num, language, results):
                 VerseTranslation.objects.update_or_create(
                     book=book,
                     chapter=data.get('chapter', chapter_num),
-                    verse=data.get('verse', 0),
                     language_code=language,
                     footnote_id=f_id,
-                    defaults={'footnote_text': f_text, 'status': 'completed', 'generated_by': 'gemini-3-flash-preview'}
+                    defaults={'verse': data.get('verse', 0), 'footnote_text': f_text, 'status': 'completed', 'generated_by': 'gemini-3-flash-preview'}
                 )
                 translation_stats['footnotes'] += 1
     
@@ -0,0 +1,379 @@
+"""
+Visitor ingest pipeline for the heatmap analytics.
+
+VisitorTrackingMiddleware used to start a thread per request, call ip-api.com
+and insert one VisitorLocation row. Instead, requests now only do a
+non-blocking put onto a bounded in-process queue. A single consumer thread per
+worker process:
+1. Resolves the IP against a local GeoIP database (MaxMind .mmdb or a CSV of
+   IP ranges), memoised in an LRU
+2. Falls back to ip-api.com only when no local database is configured, and
+   then only within a fixed per-minute budget
+3. Writes rows with bulk_create once a batch fills up or the flush interval
+   passes, adding them to the daily heatmap rollups (search.visitor_rollups)
+   in the same transaction
+
+When the queue is full, visits are dropped and counted rather than blocking
+the request.
+"""
+
+import atexit
+import bisect
+import csv
+import ipaddress
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from search.visitor_rollups import EXCLUDED_COUNTRIES, record_visits
+
+logger = logging.getLogger(__name__)
+
+# Countries whose traffic is overwhelmingly scraping networks; treated like
+# proxy/hosting ranges (not stored, throttled harder by RateLimitMiddleware).
+BOT_NETWORK_COUNTRIES = set(EXCLUDED_COUNTRIES)
+
+GEOIP_CACHE_TTL = 60 * 60 * 24
+
+
+class GeoIPResolver:
+    """
+    Offline IP -> location lookups.
+
+    Supports a MaxMind GeoLite2/GeoIP2 City database (read with
+    ``maxminddb``) or a CSV file with rows of
+    ``start_ip,end_ip,country,city,latitude,longitude`` (IPv4 or IPv6, an
+    optional header row is skipped). Results are cached in an LRU.
+    """
+
+    def __init__(self, path, cache_size=20000):
+        self.path = path or ''
+        self._reader = None
+        self._ranges = {4: ([], []), 6: ([], [])}  # version -> (starts, rows)
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup_uncached)
+
+    @property
+    def available(self):
+        self._ensure_loaded()
+        return self._reader is not None or any(starts for starts, _ in self._ranges.values())
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                if not self.path:
+                    pass
+                elif not os.path.exists(self.path):
+                    logger.warning('GeoIP database not found at %s; visitor geolocation disabled', self.path)
+                elif self.path.endswith('.mmdb'):
+                    self._load_mmdb()
+                else:
+                    self._load_csv()
+            except Exception:
+                logger.exception('Failed to load GeoIP database from %s', self.path)
+            self._loaded = True
+
+    def _load_mmdb(self):
+        try:
+            import maxminddb
+        except ImportError:
+            logger.warning('maxminddb is not installed; cannot read %s', self.path)
+            return
+        self._reader = maxminddb.open_database(self.path)
+        logger.info('Loaded GeoIP MMDB %s', self.path)
+
+    def _load_csv(self):
+        rows = {4: [], 6: []}
+        with open(self.path, newline='', encoding='utf-8') as handle:
+            for record in csv.reader(handle):
+                if len(record) < 6:
+                    continue
+                try:
+                    start = ipaddress.ip_address(record[0].strip())
+                    end = ipaddress.ip_address(record[1].strip())
+                    lat = float(record[4]) if record[4] else None
+                    lon = float(record[5]) if record[5] else None
+                except ValueError:
+                    continue  # header or malformed row
+                rows[start.version].append((int(start), int(end), record[2] or None, record[3] or None, lat, lon))
+        for version, entries in rows.items():
+            entries.sort(key=lambda entry: entry[0])
+            self._ranges[version] = ([entry[0] for entry in entries], entries)
+        logger.info('Loaded GeoIP CSV %s (%d IPv4 / %d IPv6 ranges)', self.path, len(rows[4]), len(rows[6]))
+
+    def _lookup_uncached(self, ip):
+        self._ensure_loaded()
+        try:
+            address = ipaddress.ip_address(ip)
+        except (TypeError, ValueError):
+            return None
+        if address.is_private or address.is_loopback:
+            return None
+
+        if self._reader is not None:
+            record = self._reader.get(ip)
+            if not record:
+                return None
+            location = record.get('location') or {}
+            return {
+                'country': ((record.get('country') or {}).get('names') or {}).get('en'),
+                'city': ((record.get('city') or {}).get('names') or {}).get('en'),
+                'latitude': location.get('latitude'),
+                'longitude': location.get('longitude'),
+            }
+
+        starts, entries = self._ranges[address.version]
+        index = bisect.bisect_right(starts, int(address)) - 1
+        if index < 0:
+            return None
+        start, end, country, city, lat, lon = entries[index]
+        if int(address) > end:
+            return None
+        return {'country': country, 'city': city, 'latitude': lat, 'longitude': lon}
+
+
+class RemoteGeoFallback:
+    """ip-api.com lookups, capped at a fixed number of calls per minute."""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self._window_start = 0.0
+        self._calls = 0
+
+    def lookup(self, ip):
+        if self.per_minute <= 0:
+            return None
+        now = time.monotonic()
+        if now - self._window_start >= 60:
+            self._window_start = now
+            self._calls = 0
+        if self._calls >= self.per_minute:
+            return None
+        self._calls += 1
+
+        import requests
+        try:
+            res = requests.get(f'http://ip-api.com/json/{ip}?fields=status,country,city,lat,lon,proxy,hosting', timeout=5)
+            if res.status_code != 200:
+                return None
+            data = res.json()
+            if data.get('status') != 'success':
+                return None
+            return {
+                'country': data.get('country'),
+                'city': data.get('city'),
+                'latitude': data.get('lat'),
+                'longitude': data.get('lon'),
+                'is_hosting': bool(data.get('proxy', False) or data.get('hosting', False)),
+            }
+        except Exception as e:
+            logger.error(f"Error fetching geoip for {ip}: {e}")
+            return None
+
+
+class VisitorIngest:
+    """Bounded queue + single consumer thread that batches VisitorLocation inserts."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=getattr(settings, 'VISITOR_QUEUE_MAXSIZE', 5000))
+        self.batch_size = getattr(settings, 'VISITOR_BATCH_SIZE', 200)
+        self.flush_interval = getattr(settings, 'VISITOR_FLUSH_INTERVAL', 10)
+        self.resolver = GeoIPResolver(
+            getattr(settings, 'VISITOR_GEOIP_DB', ''),
+            cache_size=getattr(settings, 'VISITOR_GEOIP_CACHE_SIZE', 20000),
+        )
+        self.remote = RemoteGeoFallback(getattr(settings, 'VISITOR_GEOIP_REMOTE_PER_MINUTE', 40))
+        self._remote_cache = {}
+        self._flagged_at = {}  # ip -> when its bot verdict was last cached
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # Guards _pending; held by the consumer thread and by the exit flush
+        self._pending_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'dropped': 0, 'written': 0, 'skipped_bot_network': 0, 'unresolved': 0}
+
+    def enqueue(self, ip, user_agent, path, mock=False):
+        """Hand a visit to the consumer without blocking; returns False if it was dropped."""
+        self._ensure_consumer()
+        try:
+            self.queue.put_nowait((ip, user_agent, path, mock))
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+        self.stats['enqueued'] += 1
+        return True
+
+    def _ensure_consumer(self):
+        # Gunicorn forks workers after import, so the thread is started lazily
+        # (and restarted if we find ourselves in a new process).
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='visitor-ingest', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            timeout = max(0.1, self.flush_interval - (time.monotonic() - self._last_flush))
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is not None:
+                try:
+                    self._handle(*item)
+                except Exception:
+                    logger.exception('Visitor ingest failed to process visit')
+            if len(self._pending) >= self.batch_size or (
+                self._pending and time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self.flush()
+            elif not self._pending:
+                self._last_flush = time.monotonic()
+
+    def _resolve(self, ip):
+        if self.resolver.available:
+            geo = self.resolver.lookup(ip)
+            if geo is not None:
+                geo = dict(geo, is_bot=geo.get('country') in BOT_NETWORK_COUNTRIES)
+            return geo
+
+        if ip in self._remote_cache:
+            return self._remote_cache[ip]
+        geo = self.remote.lookup(ip)
+        if geo is None:
+            return None
+        geo['is_bot'] = geo.pop('is_hosting', False) or geo.get('country') in BOT_NETWORK_COUNTRIES
+        if len(self._remote_cache) >= getattr(settings, 'VISITOR_GEOIP_CACHE_SIZE', 20000):
+            self._remote_cache.clear()
+        self._remote_cache[ip] = geo
+        return geo
+
+    def _handle(self, ip, user_agent, path, mock):
+        from search.models import VisitorLocation
+
+        if mock:
+            geo = {
+                'country': 'Localhost',
+                'city': 'Local City',
+                # Random coordinates for testing the heatmap
+                'latitude': random.uniform(-90, 90),
+                'longitude': random.uniform(-180, 180),
+                'is_bot': False,
+            }
+        else:
+            geo = self._resolve(ip)
+
+        if not geo:
+            self.stats['unresolved'] += 1
+            return
+
+        if geo.get('is_bot'):
+            # Skip storing proxy/hosting/bot-country visits; cache the verdict so
+            # RateLimitMiddleware can throttle repeat traffic.
+            self.stats['skipped_bot_network'] += 1
+            self._flag_bot(ip, geo)
+            return
+
+        visit = VisitorLocation(
+            ip_address=None,  # Privacy: don't store raw IP
+            user_agent=user_agent,
+            path=path[:255],
+            country=geo.get('country'),
+            city=geo.get('city'),
+            latitude=geo.get('latitude'),
+            longitude=geo.get('longitude'),
+            is_bot=False,
+        )
+        with self._pending_lock:
+            self._pending.append(visit)
+
+    def _flag_bot(self, ip, geo):
+        # Re-cache the verdict once half its TTL has passed, so it stays set for
+        # as long as the IP keeps visiting without a cache write per visit.
+        now = time.monotonic()
+        if now - self._flagged_at.get(ip, -GEOIP_CACHE_TTL) < GEOIP_CACHE_TTL / 2:
+            return
+        if len(self._flagged_at) >= getattr(settings, 'VISITOR_GEOIP_CACHE_SIZE', 20000):
+            self._flagged_at.clear()
+        self._flagged_at[ip] = now
+        try:
+            from django.core.cache import cache
+            cache.set(f'geoip_{ip}', geo, GEOIP_CACHE_TTL)
+        except Exception:
+            logger.exception('Failed to cache bot-network verdict for %s', ip)
+
+    def flush(self):
+        """Write pending rows in one bulk_create."""
+        with self._pending_lock:
+            return self._flush_locked()
+
+    def _flush_locked(self):
+        from search.models import VisitorLocation
+
+        batch, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        if not batch:
+            return 0
+        try:
+            close_old_connections()
+            # Raw rows and their heatmap rollup counts commit together, so a
+            # concurrent `manage.py rollup_visitors` rebuild sees both or neither.
+            with transaction.atomic():
+                VisitorLocation.objects.bulk_create(batch, batch_size=self.batch_size)
+                record_visits(batch)
+            self.stats['written'] += len(batch)
+        except Exception as e:
+            logger.error(f"Error saving visitor batch ({len(batch)} rows): {e}")
+            return 0
+        finally:
+            close_old_connections()
+        return len(batch)
+
+
+_ingest = None
+_ingest_lock = threading.Lock()
+
+
+def get_visitor_ingest():
+    """Get or create the per-process ingest instance."""
+    global _ingest
+    if _ingest is None:
+        with _ingest_lock:
+            if _ingest is None:
+                _ingest = VisitorIngest()
+    return _ingest
+
+
+def enqueue_visit(ip, user_agent, path, mock=False):
+    """Queue a visit for geolocation and batched storage (never blocks)."""
+    return get_visitor_ingest().enqueue(ip, user_agent, path, mock=mock)
+
+
+@atexit.register
+def _flush_on_exit():
+    # Best effort: drain whatever is already resolved when the worker recycles.
+    # flush() waits for a batch the consumer thread is writing right now.
+    if _ingest is not None and _ingest._pending:
+        try:
+            _ingest.flush()
+        except Exception:
+            pass
@@ -0,0 +1,140 @@
+"""
+Daily rollups of VisitorLocation for the heatmap API.
+
+visitor_locations_api used to aggregate 30 days of raw rows on every call.
+Visits are now also counted into two small tables:
+- visitor_geo_daily: date x grid cell (VISITOR_GRID_DEGREES wide)
+- visitor_country_daily: date x country
+
+The ingest consumer (search.visitor_ingest) increments them in the same
+transaction as each batch insert, and `manage.py rollup_visitors` rebuilds
+days from the raw rows and prunes raw rows past the retention window.
+"""
+
+import logging
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# Same exclusions the heatmap has always applied (bot-network countries).
+EXCLUDED_COUNTRIES = ('Vietnam', 'China', 'Singapore', 'Bangladesh', 'Hong Kong', 'Russia')
+
+
+def grid_size():
+    return float(getattr(settings, 'VISITOR_GRID_DEGREES', 0.1))
+
+
+def grid_cell(latitude, longitude, size=None):
+    """Return (lat_cell, lon_cell, centre_lat, centre_lon) for a coordinate."""
+    size = size or grid_size()
+    lat_cell = math.floor(latitude / size)
+    lon_cell = math.floor(longitude / size)
+    return lat_cell, lon_cell, round((lat_cell + 0.5) * size, 4), round((lon_cell + 0.5) * size, 4)
+
+
+def _count_visits(visits):
+    """Bucket (timestamp, country, latitude, longitude) tuples into geo and country counters."""
+    size = grid_size()
+    geo_counts = Counter()
+    country_counts = Counter()
+    for timestamp, country, latitude, longitude in visits:
+        if country in EXCLUDED_COUNTRIES:
+            continue
+        day = timestamp.date() if isinstance(timestamp, datetime) else timestamp
+        if latitude is not None and longitude is not None:
+            geo_counts[(day,) + grid_cell(latitude, longitude, size)] += 1
+        if country:
+            country_counts[(day, country)] += 1
+    return geo_counts, country_counts
+
+
+def _upsert(cursor, geo_counts, country_counts):
+    if geo_counts:
+        cursor.executemany(
+            """
+            INSERT INTO visitor_geo_daily (date, lat_cell, lon_cell, latitude, longitude, visits)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (date, lat_cell, lon_cell)
+            DO UPDATE SET visits = visitor_geo_daily.visits + EXCLUDED.visits
+            """,
+            [key + (count,) for key, count in geo_counts.items()],
+        )
+    if country_counts:
+        cursor.executemany(
+            """
+            INSERT INTO visitor_country_daily (date, country, visits)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (date, country)
+            DO UPDATE SET visits = visitor_country_daily.visits + EXCLUDED.visits
+            """,
+            [key + (count,) for key, count in country_counts.items()],
+        )
+
+
+def _lock_rollups():
+    """Block rollup writers until the current transaction ends (PostgreSQL only)."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('LOCK TABLE visitor_geo_daily, visitor_country_daily IN EXCLUSIVE MODE')
+
+
+def record_visits(rows):
+    """Add freshly inserted VisitorLocation objects to the daily rollups."""
+    geo_counts, country_counts = _count_visits(
+        (row.timestamp, row.country, row.latitude, row.longitude)
+        for row in rows
+        if not row.is_bot and row.timestamp is not None
+    )
+    if not geo_counts and not country_counts:
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        _upsert(cursor, geo_counts, country_counts)
+
+
+def rebuild_rollups(since, until=None, VisitorLocation=None, VisitorGeoDaily=None, VisitorCountryDaily=None):
+    """
+    Recompute rollup rows for dates in [since, until] from raw VisitorLocation rows.
+
+    Model classes can be passed in so migrations can use historical models.
+    Returns (geo_rows, country_rows) written.
+    """
+    if VisitorLocation is None:
+        from search.models import VisitorLocation, VisitorGeoDaily, VisitorCountryDaily
+
+    until = until or datetime.now().date()
+    start = datetime.combine(since, datetime.min.time())
+    end = datetime.combine(until + timedelta(days=1), datetime.min.time())
+
+    with transaction.atomic():
+        # The ingest thread inserts raw rows and increments the rollups in one
+        # transaction. Holding this lock from before the raw read until commit
+        # means every batch is either counted here or added on top afterwards,
+        # never both or neither.
+        _lock_rollups()
+        visits = VisitorLocation.objects.filter(
+            timestamp__gte=start,
+            timestamp__lt=end,
+            is_bot=False,
+        ).values_list('timestamp', 'country', 'latitude', 'longitude').iterator(chunk_size=5000)
+        geo_counts, country_counts = _count_visits(visits)
+
+        VisitorGeoDaily.objects.filter(date__gte=since, date__lte=until).delete()
+        VisitorCountryDaily.objects.filter(date__gte=since, date__lte=until).delete()
+        with connection.cursor() as cursor:
+            _upsert(cursor, geo_counts, country_counts)
+    return len(geo_counts), len(country_counts)
+
+
+def prune_raw_visits(retention_days):
+    """Delete raw VisitorLocation rows older than retention_days (rollups are kept)."""
+    from search.models import VisitorLocation
+
+    cutoff = datetime.combine(datetime.now().date() - timedelta(days=retention_days), datetime.min.time())
+    deleted, _ = VisitorLocation.objects.filter(timestamp__lt=cutoff).delete()
+    return deleted
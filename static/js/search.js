@@ -325,7 +325,7 @@
         
         let html = `
             <div class="results-meta">
-                <span><strong>${total}</strong> results found</span>
+                <span><strong>${total}${(data.approximate_counts || []).length ? '+' : ''}</strong> results found</span>
                 <span style="font-size: 11px; color: #999;">
                     ${data.script_detected && data.script_detected.hebrew ? '🔤 Hebrew' : ''}
                     ${data.script_detected && data.script_detected.greek ? '🔤 Greek' : ''}
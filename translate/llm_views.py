@@ -0,0 +1,750 @@
+"""
+LLM-backed editor endpoints (Gemini / ChatGPT suggestions and usage dashboard).
+
+Split out of translate.views so the google-genai and openai SDKs are only
+imported when one of these endpoints is first hit, not on every worker boot.
+URLconfs reference these views through hebrewtool.lazy_imports.lazy_view.
+"""
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render
+from django.views.decorators.http import require_POST
+
+from bs4 import BeautifulSoup
+import httpx
+from google import genai
+from google.genai import types
+
+from hebrewtool.llm_gateway import get_gateway
+from hebrewtool.streaming import ThreadedStreamingHttpResponse
+from translate.views import (
+    DEFAULT_GEMINI_MODEL,
+    DEFAULT_GREEK_GEMINI_PROMPT,
+    DEFAULT_HEBREW_GEMINI_PROMPT,
+    MODEL_NAME_PATTERN,
+    _apply_gemini_preferences,
+    apply_gender_colors_to_html,
+    get_context,
+)
+
+logger = logging.getLogger(__name__)
+
+CHATGPT_KEY = os.getenv('CHATGPT_KEY')
+
+_openai_client = None
+
+
+def get_ipv4_transport():
+    """Force HTTPX to bind over IPv4 exclusively to bypass DNS resolution stalls."""
+    return httpx.HTTPTransport(local_address="0.0.0.0")
+
+
+def get_gemini_client():
+    """Return the pooled Gemini client of the healthiest key (None if no key is configured or all are parked).
+
+    Prefer get_gateway().call(), which also fails over and respects the concurrency limits.
+    """
+    return get_gateway().best_client()
+
+
+def get_openai_client():
+    """Return the shared OpenAI client, creating it on first use (None if no key is configured)."""
+    global _openai_client
+    if _openai_client is None and CHATGPT_KEY:
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=CHATGPT_KEY)
+    return _openai_client
+
+
+def _resolve_prompt_text(custom_text: str | None, default_text: str) -> str:
+    if custom_text:
+        stripped = custom_text.strip()
+        if stripped:
+            return stripped
+    return default_text
+
+
+def _resolve_model_name(model_name: str | None) -> str:
+    candidate = (model_name or '').strip()
+    if not candidate:
+        return DEFAULT_GEMINI_MODEL
+    if not MODEL_NAME_PATTERN.match(candidate):
+        raise ValueError('Model name may only include letters, numbers, dashes, periods, plus, and underscores.')
+    return candidate
+
+
+def _strip_html_text(value: str | None) -> str:
+    if not value:
+        return ''
+    try:
+        return BeautifulSoup(value, 'html.parser').get_text(' ', strip=True)
+    except Exception:
+        return value
+
+
+def _request_gemini_response(prompt: str, model_name: str | None = None, api_key: str | None = None, instructions: str | None = None) -> str:
+    try:
+        model_to_use = _resolve_model_name(model_name)
+    except ValueError as exc:
+        return f"Error: {exc}"
+
+    # If an API key is provided for this request, validate and use a temporary client;
+    # otherwise the shared gateway picks a pooled key
+    use_client = None
+    gateway = get_gateway()
+    if api_key:
+        # Lightweight validation (no spaces, reasonable length)
+        if not isinstance(api_key, str) or ' ' in api_key or len(api_key) < 10 or len(api_key) > 1024:
+            return 'Error: Invalid API key format.'
+        # Do not log the API key
+        try:
+            use_client = genai.Client(api_key=api_key, http_options={'client_args': {'transport': get_ipv4_transport()}})
+        except Exception:
+            logger.exception('Failed to initialize Gemini client with provided API key')
+            return 'Error: Provided API key is invalid or client initialization failed.'
+    elif not gateway.keys:
+        logger.error('Gemini API key is not configured (GEMINI_API_KEY / GEMINI_API_KEYS missing)')
+        return 'Error: Gemini API key is not configured.'
+
+    try:
+        logger.debug('Requesting Gemini API with model=%s', model_to_use)
+        import concurrent.futures
+        # Execute the API call in a thread with a timeout to avoid long hangs
+        def _call_api(client):
+            config_kwargs = {}
+            if instructions:
+                config_kwargs['config'] = types.GenerateContentConfig(system_instruction=instructions)
+            return client.models.generate_content(model=model_to_use, contents=prompt, **config_kwargs)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                if use_client is not None:
+                    future = executor.submit(_call_api, use_client)
+                else:
+                    future = executor.submit(gateway.call, _call_api, 'editor')
+                response = future.result(timeout=30)
+        except concurrent.futures.TimeoutError:
+            logger.exception('Gemini API request timed out after 30s')
+            return 'Error: Gemini API request timed out.'
+        except Exception as api_exc:
+            logger.exception('Gemini API call failed: %s', api_exc)
+            return f"Error: Gemini API call failed: {api_exc}"
+
+        logger.debug('Received response from Gemini API: type=%s', type(response))
+
+        # Extract text portions robustly: response.text preferred, then candidates.content.parts
+        def _extract_text(resp):
+            # 1) direct .text attribute
+            text_val = None
+            if hasattr(resp, 'text') and resp.text:
+                text_val = resp.text
+            # 2) try dict-like access
+            if not text_val and isinstance(resp, dict):
+                text_val = resp.get('text')
+
+            if text_val:
+                return str(text_val).strip()
+
+            # 3) candidates -> content -> parts
+            parts_texts = []
+            non_text_types = set()
+
+            candidates = None
+            # object-style
+            if hasattr(resp, 'candidates'):
+                candidates = getattr(resp, 'candidates')
+            # dict-style fallback
+            if not candidates and isinstance(resp, dict):
+                candidates = resp.get('candidates')
+
+            if candidates:
+                for cand in candidates:
+                    content = None
+                    if hasattr(cand, 'content'):
+                        content = getattr(cand, 'content')
+                    elif isinstance(cand, dict):
+                        content = cand.get('content')
+
+                    parts = None
+                    if content is not None:
+                        if hasattr(content, 'parts'):
+                            parts = getattr(content, 'parts')
+                        elif isinstance(content, dict):
+                            parts = content.get('parts')
+
+                    if parts:
+                        for part in parts:
+                            # part may be object or dict
+                            p_type = None
+                            p_text = None
+                            if isinstance(part, dict):
+                                p_type = part.get('type')
+                                p_text = part.get('text') or part.get('content')
+                            else:
+                                p_type = getattr(part, 'type', None)
+                                p_text = getattr(part, 'text', None) or getattr(part, 'content', None)
+
+                            if p_text:
+                                parts_texts.append(str(p_text))
+                            else:
+                                if p_type:
+                                    non_text_types.add(p_type)
+                                else:
+                                    # unknown non-text part
+                                    non_text_types.add('unknown')
+
+                    # fallback to candidate.text
+                    if not parts and hasattr(cand, 'text') and getattr(cand, 'text'):
+                        parts_texts.append(str(getattr(cand, 'text')))
+                    elif not parts and isinstance(cand, dict) and cand.get('text'):
+                        parts_texts.append(str(cand.get('text')))
+
+            # If we have non-text parts and also some text parts, warn
+            if non_text_types and parts_texts:
+                logger.warning("there are non-text parts in the response: %s, returning concatenated text result from text parts. Check the full candidates.content.parts accessor to get the full model response.", list(non_text_types))
+
+            if parts_texts:
+                return '\n'.join(parts_texts).strip()
+
+            # last resort: string representation
+            try:
+                return str(resp).strip()
+            except Exception:
+                return ''
+
+        content = _extract_text(response)
+
+        if not content:
+            return "Error: Empty response from Gemini API"
+
+        return content.replace('```html', '').replace('```', '').strip()
+
+    except AttributeError as exc:
+        return f"Error: API client not properly configured: {exc}"
+    except Exception as exc:  # pragma: no cover - relies on external API
+        message = str(exc)
+        if 'not found' in message.lower() or '404' in message:
+            return f"Error: Model '{model_to_use}' is unavailable."
+        return f"Error: Gemini API failed: {exc}"
+
+
+def _stream_gemini_response(prompt: str, model_name: str | None = None, api_key: str | None = None, instructions: str | None = None):
+    """Generator that yields raw text chunks from Gemini's streaming API."""
+    try:
+        model_to_use = _resolve_model_name(model_name)
+    except ValueError as exc:
+        yield f'Error: {exc}'
+        return
+
+    use_client = None
+    gateway = get_gateway()
+    if api_key:
+        if not isinstance(api_key, str) or ' ' in api_key or len(api_key) < 10 or len(api_key) > 1024:
+            yield 'Error: Invalid API key format.'
+            return
+        try:
+            use_client = genai.Client(api_key=api_key, http_options={'client_args': {'transport': get_ipv4_transport()}})
+        except Exception:
+            logger.exception('Failed to initialise Gemini client with provided API key (streaming)')
+            yield 'Error: Provided API key is invalid or client initialisation failed.'
+            return
+    elif not gateway.keys:
+        yield 'Error: Gemini API key is not configured.'
+        return
+
+    try:
+        yield " " * 1024
+        
+        config_kwargs = {}
+        if instructions:
+            config_kwargs['config'] = types.GenerateContentConfig(system_instruction=instructions)
+
+        def _stream(client):
+            return client.models.generate_content_stream(model=model_to_use, contents=prompt, **config_kwargs)
+
+        chunks = _stream(use_client) if use_client is not None else gateway.stream(_stream, 'editor_stream')
+        for chunk in chunks:
+            if hasattr(chunk, 'text') and chunk.text:
+                yield chunk.text
+    except Exception as exc:
+        logger.exception('Gemini streaming API call failed: %s', exc)
+        yield f'\nError: {exc}'
+
+
+def gemini_translate(entries, prompt_instructions: str | None = None, model_name: str | None = None, api_key: str | None = None):
+    """Translate Greek entries into a formatted English sentence via Gemini."""
+    if not isinstance(entries, list) or not entries:
+        return "Error: Invalid entries data"
+
+    greek_words: list[str] = []
+    english_words: list[str] = []
+    morphology_data: list[str] = []
+
+    for entry in entries:
+        required_fields = ['lemma', 'english', 'morph_description']
+        if not all(field in entry for field in required_fields):
+            return f"Error: Missing required fields in entry: {entry}"
+
+        greek_words.append(entry['lemma'])
+        english_words.append(entry['english'])
+        morphology_data.append(f"{entry['morph_description']} ({entry.get('morph', 'Unknown')})")
+
+    greek_text = ' '.join(greek_words)
+    interlinear_english = ' '.join(english_words)
+    morphology_info = ' | '.join(morphology_data)
+
+    instructions = _resolve_prompt_text(prompt_instructions, DEFAULT_GREEK_GEMINI_PROMPT)
+    # Provide an explicit per-word mapping so morphology is aligned with each lemma
+    mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
+    prompt = (
+        "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
+        + "\n".join(mapping_lines) + "\n\n"
+        f"GREEK TEXT: {greek_text}\n"
+        f"ENGLISH WORDS: {interlinear_english}\n"
+        f"MORPHOLOGY: {morphology_info}\n"
+    )
+
+    response = _request_gemini_response(prompt, model_name, api_key, instructions=instructions)
+    if response.startswith('Error:'):
+        return response
+    return apply_gender_colors_to_html(response, entries)
+
+
+
+def gemini_translate_hebrew(
+    hebrew_text: str | None,
+    linear_english: str | None,
+    prompt_instructions: str | None = None,
+    model_name: str | None = None,
+    api_key: str | None = None,
+) -> str:
+    """Translate Hebrew content using Gemini with editable prompt instructions."""
+    if not hebrew_text and not linear_english:
+        return "Error: Missing Hebrew data for this verse"
+
+    instructions = _resolve_prompt_text(prompt_instructions, DEFAULT_HEBREW_GEMINI_PROMPT)
+    hebrew_plain = _strip_html_text(hebrew_text)
+    english_plain = (linear_english or '').strip() or 'Not provided'
+
+    prompt = (
+        f"HEBREW TEXT: {hebrew_plain}\n"
+        f"LINEAR ENGLISH: {english_plain}\n"
+    )
+
+    return _request_gemini_response(prompt, model_name, api_key, instructions=instructions)
+
+
+def _save_gemini_prefs(request, model_name: str, prompt_override: str | None, translation_type: str) -> None:
+    """Persist Gemini model and prompt preference to the session."""
+    session = getattr(request, 'session', None)
+    if session is None:
+        return
+    if prompt_override:
+        session[f'gemini_prompt_{translation_type}'] = prompt_override
+    session['gemini_model'] = model_name
+    session.modified = True
+
+
+def _request_chatgpt_response(prompt: str, model_name: str | None = None, api_key: str | None = None, instructions: str | None = None) -> str:
+    """Helper to request a response from ChatGPT completions API."""
+    # Default to gpt-4o for best results
+    model_to_use = model_name or "gpt-4o"
+    
+    use_client = get_openai_client()
+    if api_key:
+        if not isinstance(api_key, str) or ' ' in api_key or len(api_key) < 10 or len(api_key) > 1024:
+            return 'Error: Invalid API key format.'
+        try:
+            from openai import OpenAI
+            use_client = OpenAI(api_key=api_key)
+        except Exception:
+            logger.exception('Failed to initialize OpenAI client with provided API key')
+            return 'Error: Provided API key is invalid or client initialization failed.'
+    
+    if not use_client:
+        logger.error('ChatGPT API key is not configured (CHATGPT_KEY missing)')
+        return "Error: ChatGPT API key is not configured."
+    
+    try:
+        messages = []
+        if instructions:
+            messages.append({"role": "system", "content": instructions})
+        messages.append({"role": "user", "content": prompt})
+        
+        response = use_client.chat.completions.create(
+            model=model_to_use,
+            messages=messages,
+            timeout=30
+        )
+        content = response.choices[0].message.content
+        return content.replace('```html', '').replace('```', '').strip()
+    except Exception as exc:
+        logger.exception('ChatGPT API call failed: %s', exc)
+        return f"Error: ChatGPT API call failed: {exc}"
+
+
+def chatgpt_translate(entries, prompt_instructions: str | None = None, model_name: str | None = None, api_key: str | None = None):
+    """Translate Greek entries into a formatted English sentence via ChatGPT."""
+    if not isinstance(entries, list) or not entries:
+        return "Error: Invalid entries data"
+
+    greek_words: list[str] = []
+    english_words: list[str] = []
+    morphology_data: list[str] = []
+
+    for entry in entries:
+        required_fields = ['lemma', 'english', 'morph_description']
+        if not all(field in entry for field in required_fields):
+            return f"Error: Missing required fields in entry: {entry}"
+
+        greek_words.append(entry['lemma'])
+        english_words.append(entry['english'])
+        morphology_data.append(f"{entry['morph_description']} ({entry.get('morph', 'Unknown')})")
+
+    greek_text = ' '.join(greek_words)
+    interlinear_english = ' '.join(english_words)
+    morphology_info = ' | '.join(morphology_data)
+
+    instructions = _resolve_prompt_text(prompt_instructions, DEFAULT_GREEK_GEMINI_PROMPT)
+    mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
+    prompt = (
+        "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
+        + "\n".join(mapping_lines) + "\n\n"
+        f"GREEK TEXT: {greek_text}\n"
+        f"ENGLISH WORDS: {interlinear_english}\n"
+        f"MORPHOLOGY: {morphology_info}\n"
+    )
+
+    response = _request_chatgpt_response(prompt, model_name, api_key, instructions=instructions)
+    if response.startswith('Error:'):
+        return response
+    return apply_gender_colors_to_html(response, entries)
+
+
+def chatgpt_translate_hebrew(
+    hebrew_text: str | None,
+    linear_english: str | None,
+    prompt_instructions: str | None = None,
+    model_name: str | None = None,
+    api_key: str | None = None,
+) -> str:
+    """Translate Hebrew content using ChatGPT with editable prompt instructions."""
+    if not hebrew_text and not linear_english:
+        return "Error: Missing Hebrew data for this verse"
+
+    instructions = _resolve_prompt_text(prompt_instructions, DEFAULT_HEBREW_GEMINI_PROMPT)
+    hebrew_plain = _strip_html_text(hebrew_text)
+    english_plain = (linear_english or '').strip() or 'Not provided'
+
+    prompt = (
+        f"HEBREW TEXT: {hebrew_plain}\n"
+        f"LINEAR ENGLISH: {english_plain}\n"
+    )
+
+    return _request_chatgpt_response(prompt, model_name, api_key, instructions=instructions)
+
+
+@require_POST
+def request_chatgpt_translation(request):
+    """Serve ChatGPT suggestions on-demand for both Greek and Hebrew verses."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required. Please log in.'}, status=401)
+    
+    try:
+        payload = json.loads(request.body.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
+
+    translation_type = payload.get('translation_type')
+    book = payload.get('book')
+    chapter = payload.get('chapter')
+    verse = payload.get('verse')
+    prompt_override = payload.get('prompt')
+    model_override = payload.get('model')
+    api_key = payload.get('api_key')
+    assemble_only = payload.get('assemble_only')
+
+    if not all([translation_type, book, chapter, verse]):
+        return JsonResponse({'error': 'Missing required parameters.'}, status=400)
+
+    try:
+        context = get_context(book, chapter, verse)
+        
+        if translation_type == 'greek':
+            entries = context.get('entries') or []
+            if not entries:
+                return JsonResponse({'error': 'Interlinear entries unavailable for this verse.'}, status=404)
+            
+            if assemble_only:
+                instructions = _resolve_prompt_text(prompt_override, DEFAULT_GREEK_GEMINI_PROMPT)
+                mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
+                greek_words = ' '.join([e.get('lemma', '') for e in entries])
+                interlinear_english = ' '.join([e.get('english', '') for e in entries])
+                morphology = ' | '.join([f"{e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries])
+                assembled = (
+                    f"{instructions}\n\n"
+                    "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
+                    + "\n".join(mapping_lines) + "\n\n"
+                    f"GREEK TEXT: {greek_words}\n"
+                    f"ENGLISH WORDS: {interlinear_english}\n"
+                    f"MORPHOLOGY: {morphology}\n"
+                )
+                return JsonResponse({
+                    'assembled': assembled,
+                    'model': model_override or 'gpt-4o',
+                    'meta': {'book': book, 'chapter': chapter, 'verse': verse}
+                })
+
+            suggestion = chatgpt_translate(entries, prompt_override, model_override, api_key)
+        elif translation_type == 'hebrew':
+            hebrew_text = context.get('hebrew')
+            linear_english = context.get('linear_english')
+            
+            if assemble_only:
+                instructions = _resolve_prompt_text(prompt_override, DEFAULT_HEBREW_GEMINI_PROMPT)
+                hebrew_plain = _strip_html_text(hebrew_text)
+                english_plain = (linear_english or '').strip() or 'Not provided'
+                assembled = (
+                    f"{instructions}\n\n"
+                    f"HEBREW TEXT: {hebrew_plain}\n"
+                    f"LINEAR ENGLISH: {english_plain}\n"
+                )
+                return JsonResponse({
+                    'assembled': assembled,
+                    'model': model_override or 'gpt-4o',
+                    'meta': {'book': book, 'chapter': chapter, 'verse': verse}
+                })
+
+            suggestion = chatgpt_translate_hebrew(hebrew_text, linear_english, prompt_override, model_override, api_key)
+        
+        if suggestion and suggestion.startswith('Error:'):
+            return JsonResponse({'error': suggestion}, status=502)
+            
+        return JsonResponse({'suggestion': suggestion})
+    except Exception as exc:
+        logger.exception('Unhandled exception in request_chatgpt_translation: %s', exc)
+        return JsonResponse({'error': f'Internal server error: {exc}'}, status=500)
+
+
+@require_POST
+def request_gemini_translation(request):
+    """Serve Gemini suggestions on-demand for both Greek and Hebrew verses."""
+    # Check authentication for AJAX - return JSON error instead of redirect
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required. Please log in.'}, status=401)
+    
+    try:
+        payload = json.loads(request.body.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
+
+    translation_type = payload.get('translation_type')
+    book = payload.get('book')
+    chapter = payload.get('chapter')
+    verse = payload.get('verse')
+    prompt_override = payload.get('prompt')
+    model_override = payload.get('model')
+    api_key = payload.get('api_key')  # optional one-time API key for this request (not stored)
+
+    # Validate api_key format early (short check)
+    if api_key:
+        if not isinstance(api_key, str) or ' ' in api_key or len(api_key) < 10 or len(api_key) > 1024:
+            return JsonResponse({'error': 'Invalid API key format.'}, status=400)
+
+    try:
+        resolved_model = _resolve_model_name(model_override)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    if not all([translation_type, book, chapter, verse]):
+        return JsonResponse({'error': 'Missing required parameters.'}, status=400)
+
+    try:
+        # Wrap the main processing in a top-level try/except so any unexpected errors
+        # return a JSON-friendly response instead of an HTML error page (which
+        # causes JSON.parse errors client-side).
+        try:
+            context = _apply_gemini_preferences(request, get_context(book, chapter, verse))
+        except Exception as exc:  # pragma: no cover - safety net for DB errors
+            return JsonResponse({'error': f'Unable to load verse context: {exc}'}, status=500)
+
+        assemble_only = payload.get('assemble_only')
+        use_stream = bool(payload.get('stream')) and not assemble_only
+
+        if translation_type == 'greek':
+            entries = context.get('entries') or []
+            if not entries:
+                return JsonResponse({'error': 'Interlinear entries unavailable for this verse.'}, status=404)
+
+            # If caller only wants the assembled prompt (no external API call), return it
+            if assemble_only:
+                instructions = _resolve_prompt_text(prompt_override, DEFAULT_GREEK_GEMINI_PROMPT)
+                # Build a per-word mapping so the LLM can align morphology to each lemma
+                mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
+                greek_words = ' '.join([e.get('lemma', '') for e in entries])
+                interlinear_english = ' '.join([e.get('english', '') for e in entries])
+                morphology = ' | '.join([f"{e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries])
+                assembled = (
+                    f"{instructions}\n\n"
+                    "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
+                    + "\n".join(mapping_lines) + "\n\n"
+                    f"GREEK TEXT: {greek_words}\n"
+                    f"ENGLISH WORDS: {interlinear_english}\n"
+                    f"MORPHOLOGY: {morphology}\n"
+                )
+                return JsonResponse({
+                    'assembled': assembled,
+                    'model': resolved_model,
+                    'meta': {'book': book, 'chapter': chapter, 'verse': verse}
+                })
+
+            if use_stream:
+                instructions = _resolve_prompt_text(prompt_override, DEFAULT_GREEK_GEMINI_PROMPT)
+                mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
+                greek_words = ' '.join([e.get('lemma', '') for e in entries])
+                interlinear_english = ' '.join([e.get('english', '') for e in entries])
+                morphology = ' | '.join([f"{e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries])
+                stream_prompt = (
+                    "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
+                    + "\n".join(mapping_lines) + "\n\n"
+                    f"GREEK TEXT: {greek_words}\n"
+                    f"ENGLISH WORDS: {interlinear_english}\n"
+                    f"MORPHOLOGY: {morphology}\n"
+                )
+                _save_gemini_prefs(request, resolved_model, prompt_override, translation_type)
+                
+                response = ThreadedStreamingHttpResponse(
+                    _stream_gemini_response(stream_prompt, resolved_model, api_key, instructions=instructions), 
+                    content_type='text/plain; charset=utf-8'
+                )
+                response['X-Accel-Buffering'] = 'no'
+                response['Cache-Control'] = 'no-cache'
+                return response
+
+            suggestion = gemini_translate(entries, prompt_override, resolved_model, api_key)
+        elif translation_type == 'hebrew':
+            hebrew_text = context.get('hebrew')
+            linear_english = context.get('linear_english')
+
+            if assemble_only:
+                instructions = _resolve_prompt_text(prompt_override, DEFAULT_HEBREW_GEMINI_PROMPT)
+                hebrew_plain = _strip_html_text(hebrew_text)
+                english_plain = (linear_english or '').strip() or 'Not provided'
+                assembled = (
+                    f"{instructions}\n\n"
+                    f"HEBREW TEXT: {hebrew_plain}\n"
+                    f"LINEAR ENGLISH: {english_plain}\n"
+                )
+                return JsonResponse({
+                    'assembled': assembled,
+                    'model': resolved_model,
+                    'meta': {'book': book, 'chapter': chapter, 'verse': verse}
+                })
+
+            if use_stream:
+                instructions = _resolve_prompt_text(prompt_override, DEFAULT_HEBREW_GEMINI_PROMPT)
+                hebrew_plain = _strip_html_text(hebrew_text)
+                english_plain = (linear_english or '').strip() or 'Not provided'
+                stream_prompt = (
+                    f"HEBREW TEXT: {hebrew_plain}\n"
+                    f"LINEAR ENGLISH: {english_plain}\n"
+                )
+                _save_gemini_prefs(request, resolved_model, prompt_override, translation_type)
+                
+                response = ThreadedStreamingHttpResponse(
+                    _stream_gemini_response(stream_prompt, resolved_model, api_key, instructions=instructions), 
+                    content_type='text/plain; charset=utf-8'
+                )
+                response['X-Accel-Buffering'] = 'no'
+                response['Cache-Control'] = 'no-cache'
+                return response
+
+            suggestion = gemini_translate_hebrew(hebrew_text, linear_english, prompt_override, resolved_model, api_key)
+            if suggestion and suggestion.startswith('Error:'):
+                return JsonResponse({'error': suggestion}, status=502)
+
+        _save_gemini_prefs(request, resolved_model, prompt_override, translation_type)
+        return JsonResponse({'suggestion': suggestion})
+    except Exception as exc:  # pragma: no cover - catch-all to ensure JSON response
+        import traceback
+        tb = traceback.format_exc()
+        logger.exception('Unhandled exception in request_gemini_translation: %s', exc)
+        # Include the traceback in the JSON response in debug mode only
+        if settings.DEBUG:
+            return JsonResponse({'error': 'Internal server error', 'detail': str(exc), 'traceback': tb}, status=500)
+        return JsonResponse({'error': 'Internal server error'}, status=500)
+
+
+@require_POST
+def save_gemini_preferences(request):
+    # Check authentication for AJAX - return JSON error instead of redirect
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required. Please log in.'}, status=401)
+    
+    try:
+        payload = json.loads(request.body.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
+
+    translation_type = payload.get('translation_type')
+    if translation_type not in ('greek', 'hebrew'):
+        return JsonResponse({'error': 'Invalid translation type.'}, status=400)
+
+    prompt_text = payload.get('prompt')
+    model_name = payload.get('model')
+
+    try:
+        resolved_model = _resolve_model_name(model_name)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    session = getattr(request, 'session', None)
+    if session is None:
+        return JsonResponse({'error': 'Session storage is unavailable.'}, status=500)
+
+    pref_key = f'gemini_prompt_{translation_type}'
+    if prompt_text:
+        session[pref_key] = prompt_text
+    else:
+        session.pop(pref_key, None)
+
+    session['gemini_model'] = resolved_model
+    session.modified = True
+
+    return JsonResponse({
+        'status': 'saved',
+        'model': resolved_model,
+        'prompt_key': pref_key,
+    })
+
+
+@login_required(login_url='/accounts/login/')
+def gemini_dashboard_view(request):
+    if not request.user.is_superuser:
+        return HttpResponse("Unauthorized", status=403)
+        
+    from django.conf import settings
+    from django.db.models import F
+    from search.gemini_usage import key_summary
+    from search.models import GeminiTargetUsage, GeminiUsageLog
+
+    # 50 recent requests (rows reach the table within GEMINI_USAGE_FLUSH_INTERVAL)
+    logs = GeminiUsageLog.objects.all().order_by('-timestamp')[:50]
+
+    # Per-key and per-target counters come from the rollup tables kept by search/gemini_usage.py
+    days = settings.GEMINI_DASHBOARD_DAYS
+    key_stats = key_summary(days)
+    target_stats = GeminiTargetUsage.objects.order_by('-requests')\
+        .values('book', 'chapter', 'language_code', count=F('requests'))
+
+    return render(request, 'gemini_dashboard.html', {
+        'logs': logs,
+        'key_stats': key_stats,
+        'target_stats': target_stats,
+        'days': days,
+    })
@@ -2,6 +2,8 @@ from django.urls import path
 from django.contrib.auth import views as auth_views
 from django.urls import include
 
+from hebrewtool.lazy_imports import lazy_async_view, lazy_view
+
 from . import views
 
 urlpatterns = [
@@ -15,9 +17,9 @@ urlpatterns = [
     path('find_replace_genesis/', views.find_replace_genesis, name='find_replace'),
     path('find_and_replace_nt/', views.find_and_replace_nt, name='find_and_replace_nt'),
     path('find_and_replace_ot/', views.find_and_replace_ot, name='find_and_replace_ot'),
-    path('gemini/translate/', views.request_gemini_translation, name='gemini_translate_api'),
-    path('chatgpt/translate/', views.request_chatgpt_translation, name='chatgpt_translate_api'),
-    path('gemini/preferences/', views.save_gemini_preferences, name='gemini_save_preferences'),
+    path('gemini/translate/', lazy_view('translate.llm_views.request_gemini_translation'), name='gemini_translate_api'),
+    path('chatgpt/translate/', lazy_view('translate.llm_views.request_chatgpt_translation'), name='chatgpt_translate_api'),
+    path('gemini/preferences/', lazy_view('translate.llm_views.save_gemini_preferences'), name='gemini_save_preferences'),
     path('undo_replacements/', views.undo_replacements_view, name='undo_replacements'),
     path('search_footnotes/', views.search_footnotes, name='search_footnotes'),
     path('edit_footnote/', views.edit_footnote, name='edit_footnote'),
@@ -25,15 +27,16 @@ urlpatterns = [
     path('edit_nt_chapter/', views.edit_nt_chapter, name='edit_nt_chapter'),
     path('accounts/', include('django.contrib.auth.urls')),
     path('chapter_editor/', views.chapter_editor, name='chapter_editor'),
-    path('api/add-manual-lexicon-mapping/', views.add_manual_lexicon_mapping, name='add_manual_lexicon_mapping'),
-    path('api/get-lexicon-strongs/', views.get_lexicon_strongs, name='get_lexicon_strongs'),
-    path('api/update-lexicon-entry/', views.update_lexicon_entry, name='update_lexicon_entry'),
-    path('api/search-lexicon/', views.get_lexicon_search_results, name='search_lexicon'),
-    path('api/search-consonantal/', views.search_consonantal, name='search_consonantal'),
-    path('api/update-interlinear-word/', views.update_interlinear_word, name='update_interlinear_word'),
-    path('api/scrape-lexicon/', views.scrape_lexicon, name='scrape_lexicon'),
-    path('api/chat-lexicon/', views.chat_with_lexicon, name='chat_lexicon'),
-    path('proxy/biblehub/', views.biblehub_proxy, name='biblehub_proxy'),
+    path('api/add-manual-lexicon-mapping/', lazy_view('translate.lexicon_views.add_manual_lexicon_mapping'), name='add_manual_lexicon_mapping'),
+    path('api/get-lexicon-strongs/', lazy_view('translate.lexicon_views.get_lexicon_strongs'), name='get_lexicon_strongs'),
+    path('api/update-lexicon-entry/', lazy_view('translate.lexicon_views.update_lexicon_entry'), name='update_lexicon_entry'),
+    path('api/search-lexicon/', lazy_view('translate.lexicon_views.get_lexicon_search_results'), name='search_lexicon'),
+    path('api/search-consonantal/', lazy_view('translate.lexicon_views.search_consonantal'), name='search_consonantal'),
+    path('api/concordance/', lazy_view('translate.lexicon_views.concordance_lookup'), name='concordance'),
+    path('api/update-interlinear-word/', lazy_view('translate.lexicon_views.update_interlinear_word'), name='update_interlinear_word'),
+    path('api/scrape-lexicon/', lazy_async_view('translate.lexicon_views.scrape_lexicon'), name='scrape_lexicon'),
+    path('api/chat-lexicon/', lazy_view('translate.lexicon_views.chat_with_lexicon'), name='chat_lexicon'),
+    path('proxy/biblehub/', lazy_async_view('translate.lexicon_views.biblehub_proxy'), name='biblehub_proxy'),
     path('', views.translate, name='translate'),
 
 ]
\ No newline at end of file
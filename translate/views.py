@@ -1,14 +1,17 @@
 import logging
 import uuid
 
-from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from search.models import Genesis, GenesisFootnotes, EngLXX, LITV, TranslationUpdates
+from search.models import Genesis, GenesisFootnotes, EngLXX, LITV, TranslationUpdates, ReplacementBatch
+from search.find_replace import apply_changes, find_page, start_batch, undo_batch
+from search import concordance
+from search.update_stats import record_translation_update
+from search.chapter_progress import record_chapter_progress
 from django.db.models import Q
 from django.utils.html import escape
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.clickjacking import xframe_options_exempt
 from django.core.cache import cache
 import subprocess
 from django.middleware.csrf import get_token
@@ -18,27 +21,14 @@ from search.views import get_results, INTERLINEAR_CACHE_VERSION, get_footnote
 from translate.translator import *
 import pythonbible as bible
 from datetime import datetime
-from bs4 import BeautifulSoup, NavigableString
 import os
 import csv
 import json
-import time
-from google import genai
-from openai import OpenAI
-#import google.generativeai as genai
 from .db_utils import get_db_connection, get_aseneth_connection, get_judas_connection, execute_query, table_has_column
 import psycopg2
-import requests
 from urllib.parse import quote, unquote
-from django.views.decorators.http import require_POST
-from django.conf import settings
 from django.db import connection, transaction
-import httpx
-from google.genai import types
-
-def get_ipv4_transport():
-    """Force HTTPX to bind over IPv4 exclusively to bypass DNS resolution stalls."""
-    return httpx.HTTPTransport(local_address="0.0.0.0")
+from hebrewtool.streaming import ThreadedStreamingHttpResponse
 
 def _seo_to_edit_url(seo_url: str) -> str:
     """Convert absolute SEO semantic URLs back into relative query strings for edit mode links."""
@@ -62,12 +52,6 @@ def _seo_to_edit_url(seo_url: str) -> str:
         pass
     return seo_url
 
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-client = genai.Client(api_key=GEMINI_API_KEY, http_options={'client_args': {'transport': get_ipv4_transport()}})
-
-CHATGPT_KEY = os.getenv('CHATGPT_KEY')
-openai_client = OpenAI(api_key=CHATGPT_KEY) if CHATGPT_KEY else None
-
 DEFAULT_GEMINI_MODEL = os.getenv('GEMINI_MODEL_NAME', 'gemini-3-flash-preview')
 MODEL_NAME_PATTERN = re.compile(r'^[\w\-.:+]+$')
 
@@ -214,7 +198,11 @@ def _invalidate_reader_cache(book: str | None, chapter: str | int | None, verse:
 
 
 def _safe_save_update(instance: 'TranslationUpdates') -> None:
-    """Attempt to save a TranslationUpdates instance and log on failure without raising."""
+    """Attempt to save a TranslationUpdates instance and log on failure without raising.
+
+    Successful saves are also counted into the /statistics/ rollups and the
+    chapter progress tracker.
+    """
     try:
         instance.save()
     except Exception as exc:  # pragma: no cover - defensive logging
@@ -222,6 +210,23 @@ def _safe_save_update(instance: 'TranslationUpdates') -> None:
             logger.exception('Failed to save TranslationUpdates instance: %s', exc)
         except Exception:
             print(f"Failed to save TranslationUpdates: {exc}")
+        return
+    try:
+        record_translation_update(instance)
+    except Exception as exc:  # pragma: no cover - stats must never break an edit
+        logger.exception('Failed to update statistics rollups: %s', exc)
+    try:
+        record_chapter_progress(instance)
+    except Exception as exc:  # pragma: no cover - progress tracking must never break an edit
+        logger.exception('Failed to update chapter progress: %s', exc)
+
+
+def _refresh_concordance(hebrewdata_ids) -> None:
+    """Copy edited hebrewdata glosses and morphology into the concordance without raising."""
+    try:
+        concordance.refresh_hebrew_words(hebrewdata_ids)
+    except Exception as exc:  # pragma: no cover - the concordance must never break an edit
+        logger.warning('Could not refresh concordance: %s', exc)
 
 
 def _record_judas_update(version: str, reference: str, update_text: str) -> None:
@@ -437,660 +442,6 @@ def generate_html_table(csv_data):
         
 
 
-def _resolve_prompt_text(custom_text: str | None, default_text: str) -> str:
-    if custom_text:
-        stripped = custom_text.strip()
-        if stripped:
-            return stripped
-    return default_text
-
-
-def _resolve_model_name(model_name: str | None) -> str:
-    candidate = (model_name or '').strip()
-    if not candidate:
-        return DEFAULT_GEMINI_MODEL
-    if not MODEL_NAME_PATTERN.match(candidate):
-        raise ValueError('Model name may only include letters, numbers, dashes, periods, plus, and underscores.')
-    return candidate
-
-
-def _strip_html_text(value: str | None) -> str:
-    if not value:
-        return ''
-    try:
-        return BeautifulSoup(value, 'html.parser').get_text(' ', strip=True)
-    except Exception:
-        return value
-
-
-def _request_gemini_response(prompt: str, model_name: str | None = None, api_key: str | None = None, instructions: str | None = None) -> str:
-    try:
-        model_to_use = _resolve_model_name(model_name)
-    except ValueError as exc:
-        return f"Error: {exc}"
-
-    # If an API key is provided for this request, validate and use a temporary client
-    use_client = None
-    if api_key:
-        # Lightweight validation (no spaces, reasonable length)
-        if not isinstance(api_key, str) or ' ' in api_key or len(api_key) < 10 or len(api_key) > 1024:
-            return 'Error: Invalid API key format.'
-        # Do not log the API key
-        try:
-            use_client = genai.Client(api_key=api_key, http_options={'client_args': {'transport': get_ipv4_transport()}})
-        except Exception as exc:
-            logger.exception('Failed to initialize Gemini client with provided API key')
-            return 'Error: Provided API key is invalid or client initialization failed.'
-    else:
-        if not GEMINI_API_KEY:
-            logger.error('Gemini API key is not configured (GEMINI_API_KEY missing)')
-            return 'Error: Gemini API key is not configured.'
-        use_client = client
-
-    try:
-        logger.debug('Requesting Gemini API with model=%s', model_to_use)
-        import concurrent.futures
-        # Execute the API call in a thread with a timeout to avoid long hangs
-        def _call_api():
-            config_kwargs = {}
-            if instructions:
-                config_kwargs['config'] = types.GenerateContentConfig(system_instruction=instructions)
-            return use_client.models.generate_content(model=model_to_use, contents=prompt, **config_kwargs)
-
-        try:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(_call_api)
-                response = future.result(timeout=30)
-        except concurrent.futures.TimeoutError:
-            logger.exception('Gemini API request timed out after 30s')
-            return 'Error: Gemini API request timed out.'
-        except Exception as api_exc:
-            logger.exception('Gemini API call failed: %s', api_exc)
-            return f"Error: Gemini API call failed: {api_exc}"
-
-        logger.debug('Received response from Gemini API: type=%s', type(response))
-
-        # Extract text portions robustly: response.text preferred, then candidates.content.parts
-        def _extract_text(resp):
-            # 1) direct .text attribute
-            text_val = None
-            if hasattr(resp, 'text') and resp.text:
-                text_val = resp.text
-            # 2) try dict-like access
-            if not text_val and isinstance(resp, dict):
-                text_val = resp.get('text')
-
-            if text_val:
-                return str(text_val).strip()
-
-            # 3) candidates -> content -> parts
-            parts_texts = []
-            non_text_types = set()
-
-            candidates = None
-            # object-style
-            if hasattr(resp, 'candidates'):
-                candidates = getattr(resp, 'candidates')
-            # dict-style fallback
-            if not candidates and isinstance(resp, dict):
-                candidates = resp.get('candidates')
-
-            if candidates:
-                for cand in candidates:
-                    content = None
-                    if hasattr(cand, 'content'):
-                        content = getattr(cand, 'content')
-                    elif isinstance(cand, dict):
-                        content = cand.get('content')
-
-                    parts = None
-                    if content is not None:
-                        if hasattr(content, 'parts'):
-                            parts = getattr(content, 'parts')
-                        elif isinstance(content, dict):
-                            parts = content.get('parts')
-
-                    if parts:
-                        for part in parts:
-                            # part may be object or dict
-                            p_type = None
-                            p_text = None
-                            if isinstance(part, dict):
-                                p_type = part.get('type')
-                                p_text = part.get('text') or part.get('content')
-                            else:
-                                p_type = getattr(part, 'type', None)
-                                p_text = getattr(part, 'text', None) or getattr(part, 'content', None)
-
-                            if p_text:
-                                parts_texts.append(str(p_text))
-                            else:
-                                if p_type:
-                                    non_text_types.add(p_type)
-                                else:
-                                    # unknown non-text part
-                                    non_text_types.add('unknown')
-
-                    # fallback to candidate.text
-                    if not parts and hasattr(cand, 'text') and getattr(cand, 'text'):
-                        parts_texts.append(str(getattr(cand, 'text')))
-                    elif not parts and isinstance(cand, dict) and cand.get('text'):
-                        parts_texts.append(str(cand.get('text')))
-
-            # If we have non-text parts and also some text parts, warn
-            if non_text_types and parts_texts:
-                logger.warning(f"there are non-text parts in the response: %s, returning concatenated text result from text parts. Check the full candidates.content.parts accessor to get the full model response.", list(non_text_types))
-
-            if parts_texts:
-                return '\n'.join(parts_texts).strip()
-
-            # last resort: string representation
-            try:
-                return str(resp).strip()
-            except Exception:
-                return ''
-
-        content = _extract_text(response)
-
-        if not content:
-            return "Error: Empty response from Gemini API"
-
-        return content.replace('```html', '').replace('```', '').strip()
-
-    except AttributeError as exc:
-        return f"Error: API client not properly configured: {exc}"
-    except Exception as exc:  # pragma: no cover - relies on external API
-        message = str(exc)
-        if 'not found' in message.lower() or '404' in message:
-            return f"Error: Model '{model_to_use}' is unavailable."
-        return f"Error: Gemini API failed: {exc}"
-
-
-def _stream_gemini_response(prompt: str, model_name: str | None = None, api_key: str | None = None, instructions: str | None = None):
-    """Generator that yields raw text chunks from Gemini's streaming API."""
-    try:
-        model_to_use = _resolve_model_name(model_name)
-    except ValueError as exc:
-        yield f'Error: {exc}'
-        return
-
-    use_client = None
-    if api_key:
-        if not isinstance(api_key, str) or ' ' in api_key or len(api_key) < 10 or len(api_key) > 1024:
-            yield 'Error: Invalid API key format.'
-            return
-        try:
-            use_client = genai.Client(api_key=api_key, http_options={'client_args': {'transport': get_ipv4_transport()}})
-        except Exception:
-            logger.exception('Failed to initialise Gemini client with provided API key (streaming)')
-            yield 'Error: Provided API key is invalid or client initialisation failed.'
-            return
-    else:
-        if not GEMINI_API_KEY:
-            yield 'Error: Gemini API key is not configured.'
-            return
-        use_client = client
-
-    try:
-        yield " " * 1024
-        
-        config_kwargs = {}
-        if instructions:
-            config_kwargs['config'] = types.GenerateContentConfig(system_instruction=instructions)
-
-        for chunk in use_client.models.generate_content_stream(model=model_to_use, contents=prompt, **config_kwargs):
-            if hasattr(chunk, 'text') and chunk.text:
-                yield chunk.text
-    except Exception as exc:
-        logger.exception('Gemini streaming API call failed: %s', exc)
-        yield f'\nError: {exc}'
-
-
-def gemini_translate(entries, prompt_instructions: str | None = None, model_name: str | None = None, api_key: str | None = None):
-    """Translate Greek entries into a formatted English sentence via Gemini."""
-    if not isinstance(entries, list) or not entries:
-        return "Error: Invalid entries data"
-
-    greek_words: list[str] = []
-    english_words: list[str] = []
-    morphology_data: list[str] = []
-
-    for entry in entries:
-        required_fields = ['lemma', 'english', 'morph_description']
-        if not all(field in entry for field in required_fields):
-            return f"Error: Missing required fields in entry: {entry}"
-
-        greek_words.append(entry['lemma'])
-        english_words.append(entry['english'])
-        morphology_data.append(f"{entry['morph_description']} ({entry.get('morph', 'Unknown')})")
-
-    greek_text = ' '.join(greek_words)
-    interlinear_english = ' '.join(english_words)
-    morphology_info = ' | '.join(morphology_data)
-
-    instructions = _resolve_prompt_text(prompt_instructions, DEFAULT_GREEK_GEMINI_PROMPT)
-    # Provide an explicit per-word mapping so morphology is aligned with each lemma
-    mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
-    prompt = (
-        "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
-        + "\n".join(mapping_lines) + "\n\n"
-        f"GREEK TEXT: {greek_text}\n"
-        f"ENGLISH WORDS: {interlinear_english}\n"
-        f"MORPHOLOGY: {morphology_info}\n"
-    )
-
-    response = _request_gemini_response(prompt, model_name, api_key, instructions=instructions)
-    if response.startswith('Error:'):
-        return response
-    return apply_gender_colors_to_html(response, entries)
-
-
-
-def gemini_translate_hebrew(
-    hebrew_text: str | None,
-    linear_english: str | None,
-    prompt_instructions: str | None = None,
-    model_name: str | None = None,
-    api_key: str | None = None,
-) -> str:
-    """Translate Hebrew content using Gemini with editable prompt instructions."""
-    if not hebrew_text and not linear_english:
-        return "Error: Missing Hebrew data for this verse"
-
-    instructions = _resolve_prompt_text(prompt_instructions, DEFAULT_HEBREW_GEMINI_PROMPT)
-    hebrew_plain = _strip_html_text(hebrew_text)
-    english_plain = (linear_english or '').strip() or 'Not provided'
-
-    prompt = (
-        f"HEBREW TEXT: {hebrew_plain}\n"
-        f"LINEAR ENGLISH: {english_plain}\n"
-    )
-
-    return _request_gemini_response(prompt, model_name, api_key, instructions=instructions)
-
-
-def _save_gemini_prefs(request, model_name: str, prompt_override: str | None, translation_type: str) -> None:
-    """Persist Gemini model and prompt preference to the session."""
-    session = getattr(request, 'session', None)
-    if session is None:
-        return
-    if prompt_override:
-        session[f'gemini_prompt_{translation_type}'] = prompt_override
-    session['gemini_model'] = model_name
-    session.modified = True
-
-
-def _request_chatgpt_response(prompt: str, model_name: str | None = None, api_key: str | None = None, instructions: str | None = None) -> str:
-    """Helper to request a response from ChatGPT completions API."""
-    # Default to gpt-4o for best results
-    model_to_use = model_name or "gpt-4o"
-    
-    use_client = openai_client
-    if api_key:
-        if not isinstance(api_key, str) or ' ' in api_key or len(api_key) < 10 or len(api_key) > 1024:
-            return 'Error: Invalid API key format.'
-        try:
-            from openai import OpenAI
-            use_client = OpenAI(api_key=api_key)
-        except Exception as exc:
-            logger.exception('Failed to initialize OpenAI client with provided API key')
-            return 'Error: Provided API key is invalid or client initialization failed.'
-    
-    if not use_client:
-        logger.error('ChatGPT API key is not configured (CHATGPT_KEY missing)')
-        return "Error: ChatGPT API key is not configured."
-    
-    try:
-        messages = []
-        if instructions:
-            messages.append({"role": "system", "content": instructions})
-        messages.append({"role": "user", "content": prompt})
-        
-        response = use_client.chat.completions.create(
-            model=model_to_use,
-            messages=messages,
-            timeout=30
-        )
-        content = response.choices[0].message.content
-        return content.replace('```html', '').replace('```', '').strip()
-    except Exception as exc:
-        logger.exception('ChatGPT API call failed: %s', exc)
-        return f"Error: ChatGPT API call failed: {exc}"
-
-
-def chatgpt_translate(entries, prompt_instructions: str | None = None, model_name: str | None = None, api_key: str | None = None):
-    """Translate Greek entries into a formatted English sentence via ChatGPT."""
-    if not isinstance(entries, list) or not entries:
-        return "Error: Invalid entries data"
-
-    greek_words: list[str] = []
-    english_words: list[str] = []
-    morphology_data: list[str] = []
-
-    for entry in entries:
-        required_fields = ['lemma', 'english', 'morph_description']
-        if not all(field in entry for field in required_fields):
-            return f"Error: Missing required fields in entry: {entry}"
-
-        greek_words.append(entry['lemma'])
-        english_words.append(entry['english'])
-        morphology_data.append(f"{entry['morph_description']} ({entry.get('morph', 'Unknown')})")
-
-    greek_text = ' '.join(greek_words)
-    interlinear_english = ' '.join(english_words)
-    morphology_info = ' | '.join(morphology_data)
-
-    instructions = _resolve_prompt_text(prompt_instructions, DEFAULT_GREEK_GEMINI_PROMPT)
-    mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
-    prompt = (
-        "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
-        + "\n".join(mapping_lines) + "\n\n"
-        f"GREEK TEXT: {greek_text}\n"
-        f"ENGLISH WORDS: {interlinear_english}\n"
-        f"MORPHOLOGY: {morphology_info}\n"
-    )
-
-    response = _request_chatgpt_response(prompt, model_name, api_key, instructions=instructions)
-    if response.startswith('Error:'):
-        return response
-    return apply_gender_colors_to_html(response, entries)
-
-
-def chatgpt_translate_hebrew(
-    hebrew_text: str | None,
-    linear_english: str | None,
-    prompt_instructions: str | None = None,
-    model_name: str | None = None,
-    api_key: str | None = None,
-) -> str:
-    """Translate Hebrew content using ChatGPT with editable prompt instructions."""
-    if not hebrew_text and not linear_english:
-        return "Error: Missing Hebrew data for this verse"
-
-    instructions = _resolve_prompt_text(prompt_instructions, DEFAULT_HEBREW_GEMINI_PROMPT)
-    hebrew_plain = _strip_html_text(hebrew_text)
-    english_plain = (linear_english or '').strip() or 'Not provided'
-
-    prompt = (
-        f"HEBREW TEXT: {hebrew_plain}\n"
-        f"LINEAR ENGLISH: {english_plain}\n"
-    )
-
-    return _request_chatgpt_response(prompt, model_name, api_key, instructions=instructions)
-
-
-@require_POST
-def request_chatgpt_translation(request):
-    """Serve ChatGPT suggestions on-demand for both Greek and Hebrew verses."""
-    if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Authentication required. Please log in.'}, status=401)
-    
-    try:
-        payload = json.loads(request.body.decode('utf-8'))
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
-
-    translation_type = payload.get('translation_type')
-    book = payload.get('book')
-    chapter = payload.get('chapter')
-    verse = payload.get('verse')
-    prompt_override = payload.get('prompt')
-    model_override = payload.get('model')
-    api_key = payload.get('api_key')
-    assemble_only = payload.get('assemble_only')
-
-    if not all([translation_type, book, chapter, verse]):
-        return JsonResponse({'error': 'Missing required parameters.'}, status=400)
-
-    try:
-        context = get_context(book, chapter, verse)
-        
-        if translation_type == 'greek':
-            entries = context.get('entries') or []
-            if not entries:
-                return JsonResponse({'error': 'Interlinear entries unavailable for this verse.'}, status=404)
-            
-            if assemble_only:
-                instructions = _resolve_prompt_text(prompt_override, DEFAULT_GREEK_GEMINI_PROMPT)
-                mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
-                greek_words = ' '.join([e.get('lemma', '') for e in entries])
-                interlinear_english = ' '.join([e.get('english', '') for e in entries])
-                morphology = ' | '.join([f"{e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries])
-                assembled = (
-                    f"{instructions}\n\n"
-                    "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
-                    + "\n".join(mapping_lines) + "\n\n"
-                    f"GREEK TEXT: {greek_words}\n"
-                    f"ENGLISH WORDS: {interlinear_english}\n"
-                    f"MORPHOLOGY: {morphology}\n"
-                )
-                return JsonResponse({
-                    'assembled': assembled,
-                    'model': model_override or 'gpt-4o',
-                    'meta': {'book': book, 'chapter': chapter, 'verse': verse}
-                })
-
-            suggestion = chatgpt_translate(entries, prompt_override, model_override, api_key)
-        elif translation_type == 'hebrew':
-            hebrew_text = context.get('hebrew')
-            linear_english = context.get('linear_english')
-            
-            if assemble_only:
-                instructions = _resolve_prompt_text(prompt_override, DEFAULT_HEBREW_GEMINI_PROMPT)
-                hebrew_plain = _strip_html_text(hebrew_text)
-                english_plain = (linear_english or '').strip() or 'Not provided'
-                assembled = (
-                    f"{instructions}\n\n"
-                    f"HEBREW TEXT: {hebrew_plain}\n"
-                    f"LINEAR ENGLISH: {english_plain}\n"
-                )
-                return JsonResponse({
-                    'assembled': assembled,
-                    'model': model_override or 'gpt-4o',
-                    'meta': {'book': book, 'chapter': chapter, 'verse': verse}
-                })
-
-            suggestion = chatgpt_translate_hebrew(hebrew_text, linear_english, prompt_override, model_override, api_key)
-        
-        if suggestion and suggestion.startswith('Error:'):
-            return JsonResponse({'error': suggestion}, status=502)
-            
-        return JsonResponse({'suggestion': suggestion})
-    except Exception as exc:
-        logger.exception('Unhandled exception in request_chatgpt_translation: %s', exc)
-        return JsonResponse({'error': f'Internal server error: {exc}'}, status=500)
-
-
-@require_POST
-def request_gemini_translation(request):
-    """Serve Gemini suggestions on-demand for both Greek and Hebrew verses."""
-    # Check authentication for AJAX - return JSON error instead of redirect
-    if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Authentication required. Please log in.'}, status=401)
-    
-    try:
-        payload = json.loads(request.body.decode('utf-8'))
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
-
-    translation_type = payload.get('translation_type')
-    book = payload.get('book')
-    chapter = payload.get('chapter')
-    verse = payload.get('verse')
-    prompt_override = payload.get('prompt')
-    model_override = payload.get('model')
-    api_key = payload.get('api_key')  # optional one-time API key for this request (not stored)
-
-    # Validate api_key format early (short check)
-    if api_key:
-        if not isinstance(api_key, str) or ' ' in api_key or len(api_key) < 10 or len(api_key) > 1024:
-            return JsonResponse({'error': 'Invalid API key format.'}, status=400)
-
-    try:
-        resolved_model = _resolve_model_name(model_override)
-    except ValueError as exc:
-        return JsonResponse({'error': str(exc)}, status=400)
-
-    if not all([translation_type, book, chapter, verse]):
-        return JsonResponse({'error': 'Missing required parameters.'}, status=400)
-
-    try:
-        # Wrap the main processing in a top-level try/except so any unexpected errors
-        # return a JSON-friendly response instead of an HTML error page (which
-        # causes JSON.parse errors client-side).
-        try:
-            context = _apply_gemini_preferences(request, get_context(book, chapter, verse))
-        except Exception as exc:  # pragma: no cover - safety net for DB errors
-            return JsonResponse({'error': f'Unable to load verse context: {exc}'}, status=500)
-
-        assemble_only = payload.get('assemble_only')
-        use_stream = bool(payload.get('stream')) and not assemble_only
-
-        if translation_type == 'greek':
-            entries = context.get('entries') or []
-            if not entries:
-                return JsonResponse({'error': 'Interlinear entries unavailable for this verse.'}, status=404)
-
-            # If caller only wants the assembled prompt (no external API call), return it
-            if assemble_only:
-                instructions = _resolve_prompt_text(prompt_override, DEFAULT_GREEK_GEMINI_PROMPT)
-                # Build a per-word mapping so the LLM can align morphology to each lemma
-                mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
-                greek_words = ' '.join([e.get('lemma', '') for e in entries])
-                interlinear_english = ' '.join([e.get('english', '') for e in entries])
-                morphology = ' | '.join([f"{e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries])
-                assembled = (
-                    f"{instructions}\n\n"
-                    "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
-                    + "\n".join(mapping_lines) + "\n\n"
-                    f"GREEK TEXT: {greek_words}\n"
-                    f"ENGLISH WORDS: {interlinear_english}\n"
-                    f"MORPHOLOGY: {morphology}\n"
-                )
-                return JsonResponse({
-                    'assembled': assembled,
-                    'model': resolved_model,
-                    'meta': {'book': book, 'chapter': chapter, 'verse': verse}
-                })
-
-            if use_stream:
-                instructions = _resolve_prompt_text(prompt_override, DEFAULT_GREEK_GEMINI_PROMPT)
-                mapping_lines = [f"{e.get('lemma','')} | {e.get('english','')} | {e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries]
-                greek_words = ' '.join([e.get('lemma', '') for e in entries])
-                interlinear_english = ' '.join([e.get('english', '') for e in entries])
-                morphology = ' | '.join([f"{e.get('morph_description','')} ({e.get('morph','Unknown')})" for e in entries])
-                stream_prompt = (
-                    "MAPPING (one per line: GREEK | ENGLISH | MORPHOLOGY):\n"
-                    + "\n".join(mapping_lines) + "\n\n"
-                    f"GREEK TEXT: {greek_words}\n"
-                    f"ENGLISH WORDS: {interlinear_english}\n"
-                    f"MORPHOLOGY: {morphology}\n"
-                )
-                _save_gemini_prefs(request, resolved_model, prompt_override, translation_type)
-                
-                response = StreamingHttpResponse(
-                    _stream_gemini_response(stream_prompt, resolved_model, api_key, instructions=instructions), 
-                    content_type='text/plain; charset=utf-8'
-                )
-                response['X-Accel-Buffering'] = 'no'
-                response['Cache-Control'] = 'no-cache'
-                return response
-
-            suggestion = gemini_translate(entries, prompt_override, resolved_model, api_key)
-        elif translation_type == 'hebrew':
-            hebrew_text = context.get('hebrew')
-            linear_english = context.get('linear_english')
-
-            if assemble_only:
-                instructions = _resolve_prompt_text(prompt_override, DEFAULT_HEBREW_GEMINI_PROMPT)
-                hebrew_plain = _strip_html_text(hebrew_text)
-                english_plain = (linear_english or '').strip() or 'Not provided'
-                assembled = (
-                    f"{instructions}\n\n"
-                    f"HEBREW TEXT: {hebrew_plain}\n"
-                    f"LINEAR ENGLISH: {english_plain}\n"
-                )
-                return JsonResponse({
-                    'assembled': assembled,
-                    'model': resolved_model,
-                    'meta': {'book': book, 'chapter': chapter, 'verse': verse}
-                })
-
-            if use_stream:
-                instructions = _resolve_prompt_text(prompt_override, DEFAULT_HEBREW_GEMINI_PROMPT)
-                hebrew_plain = _strip_html_text(hebrew_text)
-                english_plain = (linear_english or '').strip() or 'Not provided'
-                stream_prompt = (
-                    f"HEBREW TEXT: {hebrew_plain}\n"
-                    f"LINEAR ENGLISH: {english_plain}\n"
-                )
-                _save_gemini_prefs(request, resolved_model, prompt_override, translation_type)
-                
-                response = StreamingHttpResponse(
-                    _stream_gemini_response(stream_prompt, resolved_model, api_key, instructions=instructions), 
-                    content_type='text/plain; charset=utf-8'
-                )
-                response['X-Accel-Buffering'] = 'no'
-                response['Cache-Control'] = 'no-cache'
-                return response
-
-            suggestion = gemini_translate_hebrew(hebrew_text, linear_english, prompt_override, resolved_model, api_key)
-            if suggestion and suggestion.startswith('Error:'):
-                return JsonResponse({'error': suggestion}, status=502)
-
-        _save_gemini_prefs(request, resolved_model, prompt_override, translation_type)
-        return JsonResponse({'suggestion': suggestion})
-    except Exception as exc:  # pragma: no cover - catch-all to ensure JSON response
-        import traceback
-        tb = traceback.format_exc()
-        logger.exception('Unhandled exception in request_gemini_translation: %s', exc)
-        # Include the traceback in the JSON response in debug mode only
-        if settings.DEBUG:
-            return JsonResponse({'error': 'Internal server error', 'detail': str(exc), 'traceback': tb}, status=500)
-        return JsonResponse({'error': 'Internal server error'}, status=500)
-
-
-@require_POST
-def save_gemini_preferences(request):
-    # Check authentication for AJAX - return JSON error instead of redirect
-    if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Authentication required. Please log in.'}, status=401)
-    
-    try:
-        payload = json.loads(request.body.decode('utf-8'))
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
-
-    translation_type = payload.get('translation_type')
-    if translation_type not in ('greek', 'hebrew'):
-        return JsonResponse({'error': 'Invalid translation type.'}, status=400)
-
-    prompt_text = payload.get('prompt')
-    model_name = payload.get('model')
-
-    try:
-        resolved_model = _resolve_model_name(model_name)
-    except ValueError as exc:
-        return JsonResponse({'error': str(exc)}, status=400)
-
-    session = getattr(request, 'session', None)
-    if session is None:
-        return JsonResponse({'error': 'Session storage is unavailable.'}, status=500)
-
-    pref_key = f'gemini_prompt_{translation_type}'
-    if prompt_text:
-        session[pref_key] = prompt_text
-    else:
-        session.pop(pref_key, None)
-
-    session['gemini_model'] = resolved_model
-    session.modified = True
-
-    return JsonResponse({
-        'status': 'saved',
-        'model': resolved_model,
-        'prompt_key': pref_key,
-    })
 
 # /edit_footnote/
 @login_required
@@ -1198,6 +549,7 @@ def edit_footnote(request):
         chapter_num = request.POST.get('chapter_num')
         verse_num = request.POST.get('verse_num')
 
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(footnote_html, 'html.parser')
 
         # Remove data-start and data-end attributes from all tags
@@ -1355,6 +707,7 @@ def edit(request):
             hebrew_morph_original = request.POST.getlist('hebrew_morph_original')
 
             updated_rows: list[str] = []
+            updated_ids: list[int] = []
             for row in zip(
                 hebrew_ids,
                 hebrew_refs,
@@ -1400,8 +753,11 @@ def edit(request):
                 if row_updates:
                     display_ref = row_ref or f'Row {row_id_int}'
                     updated_rows.append(f'{display_ref}: ' + ', '.join(row_updates))
+                    updated_ids.append(row_id_int)
 
             cache_string = 'No cache keys cleared'
+            if updated_ids:
+                _refresh_concordance(updated_ids)
             if updated_rows:
                 reference_book = _safe_book_name(book)
                 update_instance = TranslationUpdates(
@@ -1728,12 +1084,14 @@ def translate(request):
     def save_unique_to_database(id, column, data):
         query = f"UPDATE old_testament.hebrewdata SET {column} = %s WHERE id = %s;"
         execute_query(query, (data, id))
+        _refresh_concordance([id])
         updates.append(f'Updated {column} for id {id} with "{data}".')
 
     def save_unique_edit_to_database(use_niqqud, heb, column, data, uniq_id):
         if data:
             query = f"UPDATE old_testament.hebrewdata SET Eng = %s WHERE id = %s;"
             updated_count = execute_query(query, (data, uniq_id))
+            _refresh_concordance([uniq_id])
             updates.append(f'Updated column {column} with unique "{data}".')
 
     def save_edit_to_database(use_niqqud, heb, column, data):
@@ -1742,20 +1100,21 @@ def translate(request):
 
         if use_niqqud == 'true':
             niq = 'with'
-            query = f"UPDATE old_testament.hebrewdata SET {column} = %s WHERE combined_heb_niqqud = %s AND uniq = '0';"
-            execute_query(query, (data, heb))
+            query = f"UPDATE old_testament.hebrewdata SET {column} = %s WHERE combined_heb_niqqud = %s AND uniq = '0' RETURNING id;"
+            updated_ids = execute_query(query, (data, heb), fetch='all') or []
             excluded_rows_row = execute_query(
                 "SELECT COUNT(*) FROM old_testament.hebrewdata WHERE uniq = '1' AND combined_heb_niqqud = %s;", (heb,), fetch='one'
             )
             excluded_rows_count = excluded_rows_row[0] if excluded_rows_row else 0
         else:
             niq = 'without'
-            query = f"UPDATE old_testament.hebrewdata SET {column} = %s WHERE combined_heb = %s AND uniq = '0';"
-            execute_query(query, (data, heb))
+            query = f"UPDATE old_testament.hebrewdata SET {column} = %s WHERE combined_heb = %s AND uniq = '0' RETURNING id;"
+            updated_ids = execute_query(query, (data, heb), fetch='all') or []
             excluded_rows_row = execute_query(
                 "SELECT COUNT(*) FROM old_testament.hebrewdata WHERE uniq = '1' AND combined_heb = %s;", (heb,), fetch='one'
             )
             excluded_rows_count = excluded_rows_row[0] if excluded_rows_row else 0
+        _refresh_concordance([row[0] for row in updated_ids])
 
         update_count_row = execute_query(
             "SELECT COUNT(*) FROM old_testament.hebrewdata WHERE "
@@ -2855,6 +2214,7 @@ def search_footnotes(request):
             ref_num = footnote_id_parts[1]
 
             # Parse the HTML content and highlight the matching search term
+            from bs4 import BeautifulSoup, NavigableString
             soup = BeautifulSoup(footnote_html, 'html.parser')
 
             # Function to replace text between tags
@@ -2897,16 +2257,31 @@ def update_hebrew_data(request):
         if english_word_update and strongs_number:
             def stream_updates():
 
-                # Query to find matching entries where Strongs contains the substring
-                rows = execute_query(
-                    """
-                    SELECT id, Ref, Eng, heb6_n, heb5_n, heb4_n, heb3_n, heb2_n, heb1_n, morphology
-                    FROM old_testament.hebrewdata
-                    WHERE Strongs LIKE %s;
-                    """,
-                    (f'%{strongs_number}%',),
-                    fetch='all'
-                )
+                # Words tagged with the number, from the concordance index when it is built
+                word_ids = concordance.source_ids('OT', strongs_number.rstrip('='), variant='')
+                if word_ids is not None:
+                    rows = execute_query(
+                        """
+                        SELECT id, Ref, Eng, heb6_n, heb5_n, heb4_n, heb3_n, heb2_n, heb1_n, morphology
+                        FROM old_testament.hebrewdata
+                        WHERE id = ANY(%s);
+                        """,
+                        (word_ids,),
+                        fetch='all'
+                    ) or []
+                    order = {word_id: index for index, word_id in enumerate(word_ids)}
+                    rows.sort(key=lambda row: order[row[0]])
+                else:
+                    # Query to find matching entries where Strongs contains the substring
+                    rows = execute_query(
+                        """
+                        SELECT id, Ref, Eng, heb6_n, heb5_n, heb4_n, heb3_n, heb2_n, heb1_n, morphology
+                        FROM old_testament.hebrewdata
+                        WHERE Strongs LIKE %s;
+                        """,
+                        (f'%{strongs_number}%',),
+                        fetch='all'
+                    )
 
                 # Iterate over the fetched rows
                 for row in rows:
@@ -2932,11 +2307,14 @@ def update_hebrew_data(request):
                     #print(f"Updated {eng} in {ref} with {translation} from {hebrew_construct} for {strongs_number}.")
 
 
+                # Keep the concordance glosses of the processed words current
+                _refresh_concordance([row[0] for row in rows or []])
+
                 # After all updates are done, yield a completion message
                 yield "<b>Update process completed.</b>".encode('utf-8')
             
             # Return the streaming response
-            return StreamingHttpResponse(stream_updates(), content_type='text/html')
+            return ThreadedStreamingHttpResponse(stream_updates(), content_type='text/html')
         
     return render(request, 'update_hebrew_data.html')
 
@@ -2969,10 +2347,25 @@ def find_replace_genesis(request):
 
     return render(request, 'find_replace.html')
 
+def _undo_link(batch) -> str:
+    return f'<a href="../undo_replacements/?batch={batch.pk}">Undo</a>'
+
+
 @login_required
 def undo_replacements_view(request):
+    """Undo a journalled NT/OT replacement batch, or (no batch) the Genesis footnote replacement."""
 
     if request.method == 'POST':
+        batch_id = request.POST.get('batch_id')
+        if batch_id:
+            batch = ReplacementBatch.objects.filter(pk=batch_id, undone_at__isnull=True).first()
+            if batch is None:
+                messages.error(request, 'That replacement was already undone or no longer exists.')
+            else:
+                restored, skipped = undo_batch(batch)
+                messages.success(request, f'Restored {restored} rows ({skipped} edited since were left unchanged).')
+            return redirect('undo_replacements')
+
         # Revert the changes by reloading the original content
         footnotes = GenesisFootnotes.objects.all()
         for footnote in footnotes:
@@ -2982,7 +2375,8 @@ def undo_replacements_view(request):
         # Redirect back to the find and replace page
         return redirect('find_replace')
 
-    return render(request, 'undo_replacements.html')
+    batches = ReplacementBatch.objects.filter(undone_at__isnull=True)[:50]
+    return render(request, 'undo_replacements.html', {'batches': batches, 'selected_batch': request.GET.get('batch')})
 
 
 @login_required
@@ -3304,34 +2698,29 @@ def find_and_replace_nt(request):
         # Handle approved replacements
         if 'approve_replacements' in request.POST:
             approved_replacements = request.POST.getlist('approve_replacements')
-            successful_replacements = 0
-
-            lemma_sql_regex = None
-            if greek_lemma:
-                lemma_sql_regex = _build_nt_greek_lemma_sql_regex(greek_lemma)
 
+            changes = {}
             for verse_id in approved_replacements:
                 new_text = request.POST.get(f'new_text_{verse_id}')
-                if new_text is None:
-                    continue
+                if new_text is not None:
+                    changes[verse_id] = new_text
 
-                if greek_lemma:
-                    updated_rows = execute_query(
-                        "UPDATE new_testament.nt SET rbt = %s WHERE verseID = %s AND versetext ~ %s;",
-                        (new_text, verse_id, lemma_sql_regex)
-                    )
-                else:
-                    updated_rows = execute_query(
-                        "UPDATE new_testament.nt SET rbt = %s WHERE verseID = %s;",
-                        (new_text, verse_id)
-                    )
+            guard, guard_params = '', ()
+            if greek_lemma:
+                guard, guard_params = 't.versetext ~ %s', (_build_nt_greek_lemma_sql_regex(greek_lemma),)
 
-                successful_replacements += int(updated_rows or 0)
+            # All approved verses are written and journalled in one transaction
+            with transaction.atomic():
+                batch = start_batch(request.user.get_username(), f'NT: "{find_text}" -> "{replace_text}"')
+                successful_replacements = apply_changes(batch, 'nt', changes, guard, guard_params)
+                if not successful_replacements:
+                    batch.delete()
 
             context['edit_result'] = (
                 f'<div class="notice-bar">'
                 f'<p><span class="icon"><i class="fas fa-check-circle"></i></span>'
-                f'{successful_replacements} replacements successfully applied!</p>'
+                f'{successful_replacements} replacements successfully applied! '
+                f'{_undo_link(batch) if successful_replacements else ""}</p>'
                 f'</div>'
             )
             return render(request, 'find_replace.html', context)
@@ -3339,14 +2728,14 @@ def find_and_replace_nt(request):
         # Find text and display for approval
         elif find_text and replace_text:
 
-            query = "SELECT verseID, book, chapter, startVerse, rbt, versetext FROM new_testament.nt WHERE rbt LIKE %s"
-            params: list[str] = [f'%{find_text}%']
+            # Postgres narrows the candidates (a superset of the exact pattern,
+            # which uses lookarounds Postgres lacks); the Python regex below
+            # decides the replacement. One page of candidates per request.
+            where, where_params = '', ()
             if greek_lemma:
-                query += " AND versetext ~ %s"
-                params.append(_build_nt_greek_lemma_sql_regex(greek_lemma))
-            query += ";"
-
-            rows = execute_query(query, tuple(params), fetch='all')
+                where, where_params = 'versetext ~ %s', (_build_nt_greek_lemma_sql_regex(greek_lemma),)
+            sql_pattern = _build_nt_search_pattern(find_text, exact=False, allow_html=allow_html)
+            after = request.POST.get('after') or None
 
             replacements: list[dict[str, str | int]] = []
 
@@ -3358,62 +2747,72 @@ def find_and_replace_nt(request):
             if greek_lemma:
                 lemma_compiled = _build_nt_greek_lemma_highlight_regex(greek_lemma)
 
-            for verse_id, book, chapter, startVerse, old_text, greek_text in rows:
-                if old_text is None:
-                    old_text = ''
+            # Page through candidates until a page yields a match or they run out
+            while True:
+                page = find_page(
+                    'nt', sql_pattern, ['verseID', 'book', 'chapter', 'startVerse', 'rbt', 'versetext'],
+                    after=after, where=where, params=where_params,
+                )
+                after = page.next_after
+                for verse_id, book, chapter, startVerse, old_text, greek_text in page.rows:
+                    if old_text is None:
+                        old_text = ''
 
-                if greek_text is None:
-                    greek_text = ''
+                    if greek_text is None:
+                        greek_text = ''
 
-                # Check if pattern matches in the text
-                if not compiled.search(old_text):
-                    continue
+                    # Check if pattern matches in the text
+                    if not compiled.search(old_text):
+                        continue
 
-                book_name = _safe_book_name(book)
+                    book_name = _safe_book_name(book)
 
-                # Create the new text without replacement (for database)
-                # Use a lambda replacement to ensure literal replacement (no backrefs)
-                new_text_raw = compiled.sub(lambda m: replace_text, old_text)
+                    # Create the new text without replacement (for database)
+                    # Use a lambda replacement to ensure literal replacement (no backrefs)
+                    new_text_raw = compiled.sub(lambda m: replace_text, old_text)
 
-                # Create display version with highlighting
-                def highlight_matches(match):
-                    return f'<span class="highlight-find">{match.group(0)}</span>'
+                    # Create display version with highlighting
+                    def highlight_matches(match):
+                        return f'<span class="highlight-find">{match.group(0)}</span>'
 
-                display_old = compiled.sub(highlight_matches, old_text)
+                    display_old = compiled.sub(highlight_matches, old_text)
 
-                # For the "after" preview, show old text with replace highlighted
-                def highlight_replacement(match):
-                    return f'<span class="highlight-replace">{replace_text}</span>'
+                    # For the "after" preview, show old text with replace highlighted
+                    def highlight_replacement(match):
+                        return f'<span class="highlight-replace">{replace_text}</span>'
 
-                display_new = compiled.sub(highlight_replacement, old_text)
+                    display_new = compiled.sub(highlight_replacement, old_text)
 
-                greek_text_display = ''
-                if lemma_compiled is not None and greek_text:
-                    greek_text_display = lemma_compiled.sub(
-                        lambda m: f'<span class="highlight-find">{m.group(0)}</span>',
-                        greek_text,
-                    )
-                elif greek_lemma:
-                    greek_text_display = greek_text
-
-                verse_link = f'../edit/?book={book_name}&chapter={chapter}&verse={startVerse}'
-
-                # This condition should always be true if we found a match above
-                if new_text_raw != old_text:
-                    replacements.append({
-                        'verse_id': verse_id,
-                        'old_text': display_old,
-                        'new_text': display_new,
-                        'new_text_raw': new_text_raw,
-                        'greek_text': greek_text_display,
-                        'verse_link': verse_link
-                    })
+                    greek_text_display = ''
+                    if lemma_compiled is not None and greek_text:
+                        greek_text_display = lemma_compiled.sub(
+                            lambda m: f'<span class="highlight-find">{m.group(0)}</span>',
+                            greek_text,
+                        )
+                    elif greek_lemma:
+                        greek_text_display = greek_text
+
+                    verse_link = f'../edit/?book={book_name}&chapter={chapter}&verse={startVerse}'
+
+                    # This condition should always be true if we found a match above
+                    if new_text_raw != old_text:
+                        replacements.append({
+                            'verse_id': verse_id,
+                            'old_text': display_old,
+                            'new_text': display_new,
+                            'new_text_raw': new_text_raw,
+                            'greek_text': greek_text_display,
+                            'verse_link': verse_link
+                        })
+                if replacements or after is None:
+                    break
 
             if not replacements:
                 context['edit_result'] = '<div class="notice-bar"><p>No matches found for the given word.</p></div>'
                 return render(request, 'find_replace.html', context)
 
             context['replacements'] = replacements
+            context['next_after'] = after
             return render(request, 'find_replace_review.html', context)
 
     return render(request, 'find_replace.html', context)
@@ -3503,6 +2902,10 @@ def find_and_replace_ot(request):
             }
 
             successful_replacements = 0
+            ot_changes = {}
+            hebrewdata_html_changes = {}
+            footnote_changes = {}
+            touched_refs = []
 
             for record_key in approved_replacements:
                 record_data = replacements_data.get(record_key)
@@ -3532,32 +2935,10 @@ def find_and_replace_ot(request):
                 elif source == 'footnote':
                     if new_footnote is None:
                         continue
-                    record_id_int = int(record_id)
-                    ref_row = execute_query(
-                        "SELECT Ref FROM old_testament.hebrewdata WHERE id = %s;",
-                        (record_id_int,),
-                        fetch='one',
-                    )
-                    updated = execute_query(
-                        "UPDATE old_testament.hebrewdata SET footnote = %s WHERE id = %s;",
-                        (new_footnote, record_id_int),
-                        fetch=None,
-                    )
-                    
-                    # Clear cache for this verse
-                    if ref_row:
-                        verse_ref = ref_row[0]
-                        if verse_ref:
-                            # Parse Gen.1.1-01 format
-                            parts = verse_ref.split('.')
-                            if len(parts) >= 3:
-                                book_code = parts[0]
-                                chapter_value = parts[1]
-                                verse_value = parts[2].split('-')[0]
-                                book_name = convert_book_name(book_code) or book_code
-                                _invalidate_reader_cache(book_name, chapter_value, verse_value)
-                    
-                    successful_replacements += int(updated or 0)
+                    footnote_changes[int(record_id)] = new_footnote
+                    # Gen.1.1-01 -> Gen.1.1, for cache invalidation
+                    if record_data.get('ot_ref'):
+                        touched_refs.append(record_data['ot_ref'].split('-')[0])
                 elif source == 'genesisfootnote':
                     if new_footnote is None:
                         continue
@@ -3578,40 +2959,49 @@ def find_and_replace_ot(request):
                     if new_text is None:
                         continue
                     ot_ref = record_data.get('ot_ref')
-                    record_id_int = int(record_id)
-                    updated_ot = execute_query(
-                        "UPDATE old_testament.ot SET html = %s WHERE id = %s;",
-                        (new_text, record_id_int),
-                        fetch=None,
-                    )
+                    ot_changes[int(record_id)] = new_text
 
                     # Keep hebrew editor/paraphrase in sync (hebrewdata stores per-lexeme rows).
                     # Only update the first word row (-01) to avoid duplicating the verse HTML
                     # across every word-level row (which causes verse repetition in the reader).
                     if ot_ref:
-                        execute_query(
-                            "UPDATE old_testament.hebrewdata SET html = %s WHERE Ref = %s;",
-                            (new_text, f"{ot_ref}-01"),
-                            fetch=None,
-                        )
-                        # Clear html from any other word rows for this verse (in case previously corrupted)
-                        execute_query(
-                            "UPDATE old_testament.hebrewdata SET html = NULL WHERE Ref LIKE %s AND Ref != %s;",
-                            (f"{ot_ref}-%", f"{ot_ref}-01"),
-                            fetch=None,
-                        )
+                        hebrewdata_html_changes[f"{ot_ref}-01"] = new_text
+                        touched_refs.append(ot_ref)
 
-                    # Clear reader/editor cache for this verse so changes show immediately.
-                    if ot_ref:
-                        try:
-                            ref_parts = str(ot_ref).split('.')
-                            if len(ref_parts) >= 3:
-                                book_code, chapter_value, verse_value = ref_parts[0], ref_parts[1], ref_parts[2]
-                                book_name = convert_book_name(book_code) or book_code
-                                _invalidate_reader_cache(book_name, chapter_value, verse_value)
-                        except Exception:
-                            pass
-                    successful_replacements += int(updated_ot or 0)
+            # OT and hebrewdata rows are written and journalled in one transaction
+            batch = None
+            if ot_changes or footnote_changes:
+                with transaction.atomic():
+                    batch = start_batch(request.user.get_username(), f'OT: "{find_text}" -> "{replace_text}"')
+                    changed = apply_changes(batch, 'ot', ot_changes)
+                    apply_changes(batch, 'hebrewdata_html', hebrewdata_html_changes)
+                    changed += apply_changes(batch, 'hebrewdata_footnote', footnote_changes)
+                    if hebrewdata_html_changes:
+                        # Clear html from any other word rows of these verses (in case previously corrupted)
+                        with connection.cursor() as cursor:
+                            cursor.execute(
+                                "UPDATE old_testament.hebrewdata SET html = NULL "
+                                "WHERE html IS NOT NULL AND Ref LIKE ANY(%s) AND Ref <> ALL(%s);",
+                                (
+                                    [f"{ref.removesuffix('-01')}-%" for ref in hebrewdata_html_changes],
+                                    list(hebrewdata_html_changes),
+                                ),
+                            )
+                    if not changed:
+                        batch.delete()
+                        batch = None
+                successful_replacements += changed
+
+            # Clear reader/editor cache for these verses so changes show immediately.
+            for verse_ref in dict.fromkeys(touched_refs):
+                ref_parts = str(verse_ref).split('.')
+                if len(ref_parts) >= 3:
+                    book_code, chapter_value, verse_value = ref_parts[0], ref_parts[1], ref_parts[2]
+                    book_name = convert_book_name(book_code) or book_code
+                    try:
+                        _invalidate_reader_cache(book_name, chapter_value, verse_value)
+                    except Exception:
+                        pass
 
             if replacements_key:
                 # Cache cleanup should never break the request. In some envs the
@@ -3629,7 +3019,8 @@ def find_and_replace_ot(request):
             context['edit_result'] = (
                 f'<div class="notice-bar">'
                 f'<p><span class="icon"><i class="fas fa-check-circle"></i></span>'
-                f'{successful_replacements} replacements successfully applied!</p>'
+                f'{successful_replacements} replacements successfully applied! '
+                f'{_undo_link(batch) if batch else ""}</p>'
                 f'</div>'
             )
 
@@ -3725,155 +3116,157 @@ def find_and_replace_ot(request):
 
             replacements = []
             genesis_replacements = []
-            
+            # Candidates are paged by id; Genesis (ORM) rows come with the first page
+            after = request.POST.get('after') or None
+            first_page = after is None
+
             # If targeting footnotes, query hebrewdata footnote column instead
             if target_footnotes:
-                with get_db_connection() as conn:
-                    with conn.cursor() as cursor:
-                        cursor.execute("BEGIN")
-                        cursor.execute("SET LOCAL search_path TO old_testament")
-                        cursor.execute(
-                            "SELECT id, Ref, footnote FROM old_testament.hebrewdata WHERE footnote IS NOT NULL AND footnote LIKE %s;",
-                            (f'%{find_text}%',)
-                        )
-                        footnote_rows = cursor.fetchall()
-                
-                logger.debug("Hebrewdata footnote candidates returned: %d", len(footnote_rows))
-                logger.debug("Search pattern: %s", search_pattern.pattern if search_pattern else 'None')
-                
-                for row_id, ref, footnote_text in footnote_rows:
-                    if not footnote_text:
-                        continue
+                while True:
+                    page = find_page(
+                        'hebrewdata_footnote', re.escape(find_text), ['id', 'Ref', 'footnote'], after=after,
+                    )
+                    after = page.next_after
+                    logger.debug("Hebrewdata footnote candidates returned: %d", len(page.rows))
+
+                    for row_id, ref, footnote_text in page.rows:
+                        if not footnote_text:
+                            continue
                     
-                    # For footnotes with HTML, use simple string replacement instead of regex
-                    # to avoid issues with escaped characters in patterns
-                    if exact_match:
-                        # For exact match, ensure word boundaries (use regex)
-                        highlighted_old = highlight_html(footnote_text, search_pattern, 'find')
-                        new_footnote_raw, replacements_count = search_pattern.subn(replace_text, footnote_text)
-                    else:
-                        # For non-exact match with HTML content, use simple string replace
-                        replacements_count = footnote_text.count(find_text)
-                        if replacements_count > 0:
-                            new_footnote_raw = footnote_text.replace(find_text, replace_text)
-                            # Highlight using simple string patterns
-                            highlighted_old = footnote_text.replace(find_text, f'<span class="highlight-find">{find_text}</span>')
+                        # For footnotes with HTML, use simple string replacement instead of regex
+                        # to avoid issues with escaped characters in patterns
+                        if exact_match:
+                            # For exact match, ensure word boundaries (use regex)
+                            highlighted_old = highlight_html(footnote_text, search_pattern, 'find')
+                            new_footnote_raw, replacements_count = search_pattern.subn(replace_text, footnote_text)
                         else:
-                            new_footnote_raw = footnote_text
+                            # For non-exact match with HTML content, use simple string replace
+                            replacements_count = footnote_text.count(find_text)
+                            if replacements_count > 0:
+                                new_footnote_raw = footnote_text.replace(find_text, replace_text)
+                                # Highlight using simple string patterns
+                                highlighted_old = footnote_text.replace(find_text, f'<span class="highlight-find">{find_text}</span>')
+                            else:
+                                new_footnote_raw = footnote_text
                     
-                    if replacements_count == 0:
-                        logger.debug("Ref %s: LIKE matched but no replacements found", ref)
-                        logger.debug("Find text: %r", find_text)
-                        logger.debug("Footnote preview: %s", footnote_text[:300])
-                        continue
+                        if replacements_count == 0:
+                            logger.debug("Ref %s: regex matched but no replacements found", ref)
+                            logger.debug("Find text: %r", find_text)
+                            logger.debug("Footnote preview: %s", footnote_text[:300])
+                            continue
                     
-                    if display_replace_pattern and not exact_match:
-                        # For non-exact match, use simple string highlighting
-                        highlighted_new = new_footnote_raw.replace(replace_text, f'<span class="highlight-replace">{replace_text}</span>')
-                    elif display_replace_pattern:
-                        highlighted_new = highlight_html(new_footnote_raw, display_replace_pattern, 'replace')
-                    else:
-                        highlighted_new = new_footnote_raw
+                        if display_replace_pattern and not exact_match:
+                            # For non-exact match, use simple string highlighting
+                            highlighted_new = new_footnote_raw.replace(replace_text, f'<span class="highlight-replace">{replace_text}</span>')
+                        elif display_replace_pattern:
+                            highlighted_new = highlight_html(new_footnote_raw, display_replace_pattern, 'replace')
+                        else:
+                            highlighted_new = new_footnote_raw
                     
-                    # Parse ref to get book/chapter/verse for link
-                    parts = ref.split('.')
-                    if len(parts) >= 3:
-                        book_code = parts[0]
-                        chapter_ref = parts[1]
-                        verse_ref = parts[2].split('-')[0]
-                        book_display = convert_book_name(book_code) or book_code
-
-                        canonical_ref = f'{book_code}.{chapter_ref}.{verse_ref}'
-                        verse_link = f'../translate/?ref={canonical_ref}'
-                        reference_label = f'{canonical_ref} (footnote)'
-                        record_key = f'footnote-{row_id}'
+                        # Parse ref to get book/chapter/verse for link
+                        parts = ref.split('.')
+                        if len(parts) >= 3:
+                            book_code = parts[0]
+                            chapter_ref = parts[1]
+                            verse_ref = parts[2].split('-')[0]
+                            book_display = convert_book_name(book_code) or book_code
+
+                            canonical_ref = f'{book_code}.{chapter_ref}.{verse_ref}'
+                            verse_link = f'../translate/?ref={canonical_ref}'
+                            reference_label = f'{canonical_ref} (footnote)'
+                            record_key = f'footnote-{row_id}'
                         
-                        replacements.append({
-                            'record_key': record_key,
-                            'reference': reference_label,
-                            'old_text_display': highlighted_old,
-                            'new_text_display': highlighted_new,
-                            'old_footnote_raw': footnote_text,
-                            'new_footnote_raw': new_footnote_raw,
-                            'old_text_raw': '',
-                            'new_text_raw': '',
-                            'old_paraphrase_raw': '',
-                            'new_paraphrase_raw': '',
-                            'verse_link': verse_link
-                        })
+                            replacements.append({
+                                'record_key': record_key,
+                                'reference': reference_label,
+                                'old_text_display': highlighted_old,
+                                'new_text_display': highlighted_new,
+                                'old_footnote_raw': footnote_text,
+                                'new_footnote_raw': new_footnote_raw,
+                                'old_text_raw': '',
+                                'new_text_raw': '',
+                                'old_paraphrase_raw': '',
+                                'new_paraphrase_raw': '',
+                                'verse_link': verse_link,
+                                'ot_ref': ref
+                            })
+                    if replacements or after is None:
+                        break
             else:
-                # Original OT table query
-                rows = execute_query(
-                    "SELECT id, Ref, html, book, chapter, verse FROM old_testament.ot WHERE html LIKE %s;",
-                    (f'%{find_text}%',),
-                    fetch='all'
-                )
-
-                logger.debug("OT table candidates returned: %d", len(rows))
-
                 # Pattern to detect standalone filenames (not URLs) - looks for filename.ext preceded by whitespace or quotes
                 file_name_pattern = r'(?:^|[\s"\'])(\w+\.(py|js|json|xml|csv|txt|md|html|css))\b'
 
-                for verse_id, ref, ot_html, book, chapter, verse in rows:
-                    working_html = ot_html or ''
-                    source = 'ot'
-                    record_key = f'ot-{verse_id}'
-                    try:
-                        chapter_ref = int(chapter) if chapter is not None else None
-                    except (TypeError, ValueError):
-                        chapter_ref = None
-                    try:
-                        verse_ref = int(verse) if verse is not None else None
-                    except (TypeError, ValueError):
-                        verse_ref = None
-                    book_display = _safe_book_name(book)
-
-                    if book_display == 'Genesis':
-                        logger.debug(
-                            "Skipping OT row id=%s for Genesis, will use ORM data", verse_id
-                        )
-                        continue
+                while True:
+                    page = find_page(
+                        'ot', re.escape(find_text), ['id', 'Ref', 'html', 'book', 'chapter', 'verse'], after=after,
+                    )
+                    after = page.next_after
+                    logger.debug("OT table candidates returned: %d", len(page.rows))
 
-                    if re.search(file_name_pattern, working_html):
-                        continue
+                    for verse_id, ref, ot_html, book, chapter, verse in page.rows:
+                        working_html = ot_html or ''
+                        source = 'ot'
+                        record_key = f'ot-{verse_id}'
+                        try:
+                            chapter_ref = int(chapter) if chapter is not None else None
+                        except (TypeError, ValueError):
+                            chapter_ref = None
+                        try:
+                            verse_ref = int(verse) if verse is not None else None
+                        except (TypeError, ValueError):
+                            verse_ref = None
+                        book_display = _safe_book_name(book)
+
+                        if book_display == 'Genesis':
+                            logger.debug(
+                                "Skipping OT row id=%s for Genesis, will use ORM data", verse_id
+                            )
+                            continue
 
-                    if not search_pattern.search(working_html):
-                        continue
+                        if re.search(file_name_pattern, working_html):
+                            continue
 
-                    highlighted_old = highlight_html(working_html, search_pattern, 'find')
-                    new_text_raw, replacements_count = search_pattern.subn(replace_text, working_html)
+                        if not search_pattern.search(working_html):
+                            continue
 
-                    if replacements_count == 0:
-                        continue
+                        highlighted_old = highlight_html(working_html, search_pattern, 'find')
+                        new_text_raw, replacements_count = search_pattern.subn(replace_text, working_html)
 
-                    if display_replace_pattern:
-                        highlighted_new = highlight_html(new_text_raw, display_replace_pattern, 'replace')
-                    else:
-                        highlighted_new = new_text_raw
+                        if replacements_count == 0:
+                            continue
 
-                    # Use canonical Ref for linking (handles Ref vs book/chapter/verse mismatches).
-                    verse_link = f'../translate/?ref={ref}' if ref else f'../translate/?book={book}&chapter={chapter_ref}&verse={verse_ref}'
+                        if display_replace_pattern:
+                            highlighted_new = highlight_html(new_text_raw, display_replace_pattern, 'replace')
+                        else:
+                            highlighted_new = new_text_raw
 
-                    reference_label = ref or f'{book_display} {chapter_ref}:{verse_ref}'
+                        # Use canonical Ref for linking (handles Ref vs book/chapter/verse mismatches).
+                        verse_link = f'../translate/?ref={ref}' if ref else f'../translate/?book={book}&chapter={chapter_ref}&verse={verse_ref}'
 
-                    replacements.append({
-                        'record_key': record_key,
-                        'reference': reference_label,
-                        'old_text_display': highlighted_old,
-                        'new_text_display': highlighted_new,
-                        'old_text_raw': working_html,
-                        'new_text_raw': new_text_raw,
-                        'old_paraphrase_raw': '',
-                        'new_paraphrase_raw': '',
-                        'verse_link': verse_link
-                        ,'ot_ref': ref
-                    })
+                        reference_label = ref or f'{book_display} {chapter_ref}:{verse_ref}'
 
-                genesis_rows = list(
-                    Genesis.objects.filter(
-                        Q(html__icontains=find_text) | Q(rbt_reader__icontains=find_text)
-                    ).values('id', 'chapter', 'verse', 'html', 'rbt_reader')
-                )
+                        replacements.append({
+                            'record_key': record_key,
+                            'reference': reference_label,
+                            'old_text_display': highlighted_old,
+                            'new_text_display': highlighted_new,
+                            'old_text_raw': working_html,
+                            'new_text_raw': new_text_raw,
+                            'old_paraphrase_raw': '',
+                            'new_paraphrase_raw': '',
+                            'verse_link': verse_link
+                            ,'ot_ref': ref
+                        })
+                    if replacements or after is None:
+                        break
+
+                genesis_rows = []
+                if first_page:
+                    genesis_rows = list(
+                        Genesis.objects.filter(
+                            Q(html__icontains=find_text) | Q(rbt_reader__icontains=find_text)
+                        ).values('id', 'chapter', 'verse', 'html', 'rbt_reader')
+                    )
                 logger.debug("Genesis candidates returned: %d", len(genesis_rows))
 
                 for row in genesis_rows:
@@ -3994,6 +3387,7 @@ def find_and_replace_ot(request):
             context['replacements'] = replacements
             context['form_type'] = 'ot'
             context['replacements_key'] = review_key
+            context['next_after'] = after
             logger.debug("Prepared %d replacement previews", len(replacements))
 
             return render(request, 'find_replace_review_ot.html', context)
@@ -4528,6 +3922,8 @@ def apply_gender_colors_to_html(html_text: str | None, entries: list[dict] | Non
 
     patterns.sort(key=lambda item: item[2], reverse=True)
 
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(html_text, 'html.parser')
     except Exception:
@@ -5310,1253 +4706,41 @@ def get_judas_codex_view(codex_num):
         }
 
 
-def lexicon_viewer(request, lexicon_type, page):
-    """
-    Enhanced viewer for Fürst and Gesenius lexicon page images.
-    Provides zoom, navigation, and keyboard shortcuts.
-    """
-    from translate.translator import (
-        FUERST_IMAGE_BASE_URL, 
-        GESENIUS_IMAGE_BASE_URL,
-        format_fuerst_page_label,
-        format_gesenius_page_label
-    )
-    
-    # Validate lexicon type
-    if lexicon_type not in ['fuerst', 'gesenius']:
-        return render(request, 'lexicon_viewer.html', {
-            'error_message': 'Invalid lexicon type. Must be "fuerst" or "gesenius".',
-            'lexicon_name': lexicon_type.title(),
-            'page_number': page,
-            'image_url': None,
-            'has_prev': False,
-            'has_next': False,
-            'prev_url': '#',
-            'next_url': '#',
-        })
-    
-    # Determine base URL and lexicon name
-    if lexicon_type == 'fuerst':
-        base_url = FUERST_IMAGE_BASE_URL
-        lexicon_name = 'Fürst'
-    else:
-        base_url = GESENIUS_IMAGE_BASE_URL
-        lexicon_name = 'Gesenius'
-    
-    # Construct image URL
-    image_url = f"{base_url}/{page}" if base_url else None
-    
-    # Extract page number from filename (e.g., "fuerst_lex_0717.jpg" -> 717)
-    # Handle different formats: "0123.png", "fuerst_lex_0717.jpg", "gesenius_lexicon_0507.jpg"
-    import re
-    page_match = re.search(r'(\d+)', page)
-    if not page_match:
-        return render(request, 'lexicon_viewer.html', {
-            'error_message': f'Invalid page format: {page}',
-            'lexicon_name': lexicon_name,
-            'page_number': page,
-            'image_url': None,
-            'has_prev': False,
-            'has_next': False,
-            'prev_url': '#',
-            'next_url': '#',
-        })
-    
-    current_page_num = int(page_match.group(1))
-    
-    # Determine the filename pattern based on the input
-    if page.startswith('fuerst_lex_'):
-        # Fürst format: fuerst_lex_0717.jpg
-        prev_page = f"fuerst_lex_{current_page_num - 1:04d}.jpg"
-        next_page = f"fuerst_lex_{current_page_num + 1:04d}.jpg"
-    elif page.startswith('gesenius_lexicon_'):
-        # Gesenius format: gesenius_lexicon_0507.jpg
-        prev_page = f"gesenius_lexicon_{current_page_num - 1:04d}.jpg"
-        next_page = f"gesenius_lexicon_{current_page_num + 1:04d}.jpg"
-    else:
-        # Simple format: 0123.png
-        file_ext = page.split('.')[-1] if '.' in page else 'png'
-        prev_page = f"{current_page_num - 1:04d}.{file_ext}"
-        next_page = f"{current_page_num + 1:04d}.{file_ext}"
-    
-    prev_url = f"/lexicon/{lexicon_type}/{prev_page}" if current_page_num > 1 else "#"
-    next_url = f"/lexicon/{lexicon_type}/{next_page}"
-    
-    # Format page label for display
-    if lexicon_type == 'fuerst':
-        page_label = format_fuerst_page_label(page)
-    else:
-        page_label = format_gesenius_page_label(page)
-    
-    context = {
-        'lexicon_name': lexicon_name,
-        'lexicon_type': lexicon_type,
-        'page_number': page_label,
-        'page_number_numeric': current_page_num,  # For the input field
-        'page_raw': page,
-        'image_url': image_url,
-        'has_prev': current_page_num > 1,
-        'has_next': True,  # Always allow next (let browser handle 404 if doesn't exist)
-        'prev_url': prev_url,
-        'next_url': next_url,
-    }
-    
-    return render(request, 'lexicon_viewer.html', context)
-
-
-@login_required
-@require_POST
-def add_manual_lexicon_mapping(request):
-    """
-    Add a manual mapping from a Hebrew word to Fürst/Gesenius lexicon entries.
-    Useful for shin/sin distinctions and other cases where Strong's is insufficient.
-    """
-    import json
-    import re
-    
-    try:
-        data = json.loads(request.body)
-        
-        hebrew_word = data.get('hebrew_word', '').strip()
-        strong_number = data.get('strong_number', '').strip()
-        lexicon_type = data.get('lexicon_type', 'both')  # 'fuerst', 'gesenius', or 'both'
-        fuerst_id = data.get('fuerst_id')
-        gesenius_id = data.get('gesenius_id')
-        book = data.get('book')
-        chapter = data.get('chapter')
-        verse = data.get('verse')
-        notes = data.get('notes', '').strip()
-        
-        if not hebrew_word:
-            return JsonResponse({'success': False, 'error': 'Hebrew word is required'}, status=400)
-        
-        if lexicon_type not in ['fuerst', 'gesenius', 'both']:
-            return JsonResponse({'success': False, 'error': 'Invalid lexicon type'}, status=400)
-        
-        # Strip vowel points to get consonantal form
-        vowel_pattern = r'[\u0591-\u05AF\u05B0-\u05BD\u05BF\u05C1-\u05C2\u05C4-\u05C5\u05C7]'
-        hebrew_consonantal = re.sub(vowel_pattern, '', hebrew_word)
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT mapping_id
-                FROM old_testament.manual_lexicon_mappings
-                WHERE hebrew_word = %s
-                  AND (strong_number = %s OR (strong_number IS NULL AND %s IS NULL))
-                  AND lexicon_type = %s
-                  AND book IS NOT DISTINCT FROM %s
-                  AND chapter IS NOT DISTINCT FROM %s
-                  AND verse IS NOT DISTINCT FROM %s
-            """, (
-                hebrew_word,
-                strong_number or None,
-                strong_number or None,
-                lexicon_type,
-                book,
-                chapter,
-                verse,
-            ))
-            found = cursor.fetchone()
-
-            if found:
-                cursor.execute("""
-                    UPDATE old_testament.manual_lexicon_mappings
-                    SET hebrew_consonantal = %s,
-                        fuerst_id = %s,
-                        gesenius_id = %s,
-                        notes = %s,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE mapping_id = %s
-                    RETURNING mapping_id
-                """, (
-                    hebrew_consonantal,
-                    fuerst_id,
-                    gesenius_id,
-                    notes,
-                    found[0],
-                ))
-            else:
-                cursor.execute("""
-                    INSERT INTO old_testament.manual_lexicon_mappings 
-                    (hebrew_word, hebrew_consonantal, strong_number, lexicon_type, 
-                     fuerst_id, gesenius_id, book, chapter, verse, notes, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-                    RETURNING mapping_id
-                """, (
-                    hebrew_word,
-                    hebrew_consonantal,
-                    strong_number or None,
-                    lexicon_type,
-                    fuerst_id,
-                    gesenius_id,
-                    book,
-                    chapter,
-                    verse,
-                    notes,
-                ))
-
-            mapping_id = cursor.fetchone()[0]  # type: ignore
-            conn.commit()
-        
-        return JsonResponse({
-            'success': True,
-            'mapping_id': mapping_id,
-            'message': f'Manual mapping added for {hebrew_word}'
-        })
-        
-    except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
-    except Exception as e:
-        logger.error(f"Error adding manual lexicon mapping: {e}")
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
-
-
-@login_required
-def get_lexicon_strongs(request):
-    """
-    Get current Strong's number mappings for a Fürst or Gesenius lexicon entry.
-    """
-    lexicon_id = request.GET.get('lexicon_id', '').strip()
-    lexicon_type = request.GET.get('lexicon_type', '').strip().lower()
-    
-    if not lexicon_id or lexicon_type not in ['fuerst', 'gesenius']:
-        return JsonResponse({
-            'success': False,
-            'error': 'Invalid lexicon_id or lexicon_type'
-        }, status=400)
-    
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("BEGIN")
-            cursor.execute("SET LOCAL search_path TO old_testament")
-            
-            if lexicon_type == 'fuerst':
-                # Get Strong's numbers for Fürst entry via lexeme_fuerst join
-                cursor.execute(
-                    """
-                    SELECT DISTINCT l.strongs
-                    FROM lexemes l
-                    JOIN lexeme_fuerst lf ON lf.lexeme_id = l.lexeme_id
-                    WHERE lf.fuerst_id = %s
-                    ORDER BY l.strongs
-                    """,
-                    (lexicon_id,)
-                )
-            else:  # gesenius
-                # Get Strong's numbers from strongsNumbers column (comma-separated)
-                cursor.execute(
-                    """
-                    SELECT "strongsNumbers"
-                    FROM gesenius_lexicon
-                    WHERE id = %s
-                    """,
-                    (lexicon_id,)
-                )
-                row = cursor.fetchone()
-                if row and row[0]:
-                    strongs_list = [s.strip() for s in row[0].split(',') if s.strip()]
-                    return JsonResponse({
-                        'success': True,
-                        'strongs_numbers': strongs_list
-                    })
-                else:
-                    return JsonResponse({
-                        'success': True,
-                        'strongs_numbers': []
-                    })
-            
-            rows = cursor.fetchall()
-            strongs_numbers = [row[0] for row in rows if row[0]]
-            
-            return JsonResponse({
-                'success': True,
-                'strongs_numbers': strongs_numbers
-            })
-            
-    except Exception as e:
-        logger.error(f"Error fetching Strong's numbers: {e}")
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
-
-
-@login_required
-def update_lexicon_entry(request):
-    """
-    Update a Fürst or Gesenius lexicon entry.
-    Only allows updating: hebrew_word, hebrew_consonantal, part_of_speech, definition, root, source_page
-    """
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
-    
-    try:
-        data = json.loads(request.body)
-        lexicon_id = data.get('lexicon_id', '').strip()
-        lexicon_type = data.get('lexicon_type', '').strip().lower()
-        
-        if not lexicon_id or lexicon_type not in ['fuerst', 'gesenius']:
-            return JsonResponse({
-                'success': False,
-                'error': 'Invalid lexicon_id or lexicon_type'
-            }, status=400)
-        
-        # Collect updatable fields
-        hebrew_word = data.get('hebrew_word', '').strip()
-        hebrew_consonantal = data.get('hebrew_consonantal', '').strip()
-        part_of_speech = data.get('part_of_speech', '').strip()
-        definition = data.get('definition', '').strip()
-        root = data.get('root', '').strip()
-        source_page = data.get('source_page', '').strip()
-        strongs_numbers_raw = data.get('strongs_numbers', '').strip()
-        
-        # Parse Strong's numbers (comma-separated)
-        strongs_numbers = []
-        if strongs_numbers_raw:
-            strongs_numbers = [s.strip().upper() for s in strongs_numbers_raw.split(',') if s.strip()]
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("BEGIN")
-            cursor.execute("SET LOCAL search_path TO old_testament")
-            
-            if lexicon_type == 'fuerst':
-                # Update fuerst_lexicon table
-                cursor.execute(
-                    """
-                    UPDATE fuerst_lexicon
-                    SET hebrew_word = %s,
-                        hebrew_consonantal = %s,
-                        part_of_speech = %s,
-                        definition = %s,
-                        root = %s,
-                        source_page = %s
-                    WHERE id = %s
-                    """,
-                    (hebrew_word, hebrew_consonantal, part_of_speech,
-                     definition, root, source_page, lexicon_id)
-                )
-                
-                # Update Strong's mappings (always process, even if empty to allow removal)
-                # Delete existing mappings first
-                cursor.execute(
-                    "DELETE FROM lexeme_fuerst WHERE fuerst_id = %s",
-                    (lexicon_id,)
-                )
-                
-                # Add new mappings if provided
-                if strongs_numbers:
-                    for strong_num in strongs_numbers:
-                        # Get or create lexeme for this Strong's number
-                        cursor.execute(
-                            "SELECT lexeme_id FROM lexemes WHERE strongs = %s LIMIT 1",
-                            (strong_num,)
-                        )
-                        lexeme_row = cursor.fetchone()
-                        
-                        if lexeme_row:
-                            lexeme_id = lexeme_row[0]
-                            # Insert mapping
-                            cursor.execute(
-                                """
-                                INSERT INTO lexeme_fuerst (lexeme_id, fuerst_id, confidence, mapping_basis)
-                                VALUES (%s, %s, 'high', 'manual')
-                                ON CONFLICT (lexeme_id, fuerst_id) DO NOTHING
-                                """,
-                                (lexeme_id, lexicon_id)
-                            )
-                        else:
-                            logger.warning(f"Strong's number {strong_num} not found in lexemes table")
-            else:  # gesenius
-                # Update gesenius_lexicon table (note different column names)
-                # Gesenius stores Strong's numbers as comma-separated string in strongsNumbers column
-                strongs_csv = ','.join(strongs_numbers) if strongs_numbers else None
-                
-                cursor.execute(
-                    """
-                    UPDATE gesenius_lexicon
-                    SET "hebrewWord" = %s,
-                        "hebrewConsonantal" = %s,
-                        "partOfSpeech" = %s,
-                        definition = %s,
-                        root = %s,
-                        "sourcePage" = %s,
-                        "strongsNumbers" = %s
-                    WHERE id = %s
-                    """,
-                    (hebrew_word, hebrew_consonantal, part_of_speech,
-                     definition, root, source_page, strongs_csv, lexicon_id)
-                )
-            
-            if cursor.rowcount == 0:
-                return JsonResponse({
-                    'success': False,
-                    'error': f'No {lexicon_type} entry found with ID {lexicon_id}'
-                }, status=404)
-            
-            conn.commit()
-        
-        # Clear the Fürst cache so updated entries appear immediately
-        from translate.translator import clear_fuerst_cache
-        clear_fuerst_cache()
-        
-        logger.info(f"Updated {lexicon_type} lexicon entry {lexicon_id} by user {request.user.username}")
-        return JsonResponse({
-            'success': True,
-            'message': f'{lexicon_type.title()} entry {lexicon_id} updated successfully'
-        })
-        
-    except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
-    except Exception as e:
-        logger.error(f"Error updating lexicon entry: {e}")
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
-
-
-@login_required
-def get_lexicon_search_results(request):
-    """
-    Search Fürst and Gesenius lexicons to find entries for manual mapping.
-    Supports flexible search modes: exact, contains (partial), root, id, strong, and definition.
-    """
-    hebrew_word = request.GET.get('hebrew', '').strip()
-    strong_number = request.GET.get('strong', '').strip()
-    lexicon_type = request.GET.get('lexicon', 'both')  # 'fuerst', 'gesenius', or 'both'
-    match = request.GET.get('match', 'exact')  # 'exact', 'contains', 'root', 'id', 'strong', 'definition'
-    search_term = request.GET.get('search', '').strip()
-
-    if not any([hebrew_word, strong_number, search_term]):
-        return JsonResponse({'error': 'Hebrew word, Strong number, or search term required'}, status=400)
-
-    results = {'fuerst': [], 'gesenius': []}
-
-    import re
-    vowel_pattern = r'[\u0591-\u05AF\u05B0-\u05BD\u05BF\u05C1-\u05C2\u05C4-\u05C5\u05C7]'
-    hebrew_consonantal = re.sub(vowel_pattern, '', hebrew_word) if hebrew_word else ''
-
-    def _like_pattern(val):
-        return f"%{val}%"
-
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # Build Fürst query
-            if lexicon_type in ['fuerst', 'both']:
-                params = []
-                where_clauses = []
-
-                if match == 'exact':
-                    if hebrew_consonantal:
-                        where_clauses.append('hebrew_consonantal = %s')
-                        params.append(hebrew_consonantal)
-                    elif search_term:
-                        # try exact match on consonantal or full field
-                        st_cons = re.sub(vowel_pattern, '', search_term)
-                        where_clauses.append('(hebrew_consonantal = %s OR hebrew_word = %s)')
-                        params.extend([st_cons, search_term])
-
-                elif match == 'contains':
-                    term = search_term or hebrew_consonantal
-                    if term:
-                        where_clauses.append('(hebrew_word ILIKE %s OR hebrew_consonantal ILIKE %s)')
-                        p = _like_pattern(term)
-                        params.extend([p, p])
-
-                elif match == 'root':
-                    if search_term:
-                        where_clauses.append('root ILIKE %s')
-                        params.append(_like_pattern(search_term))
-
-                elif match == 'id':
-                    try:
-                        numeric_id = int(search_term)
-                        where_clauses.append('id = %s')
-                        params.append(numeric_id)
-                    except Exception:
-                        # invalid id, no results
-                        where_clauses.append('false')
-
-                elif match == 'definition':
-                    if search_term:
-                        where_clauses.append('definition ILIKE %s')
-                        params.append(_like_pattern(search_term))
-
-                # strong lookup
-                if match == 'strong' or (strong_number and match == 'exact'):
-                    if strong_number:
-                        where_clauses.append('id IN (SELECT fuerst_id FROM old_testament.lexeme_fuerst WHERE lexeme_id IN (SELECT lexeme_id FROM old_testament.lexemes WHERE strongs = %s))')
-                        params.append(strong_number)
-
-                if not where_clauses:
-                    # fallback to searching consonantal equality if we have it
-                    if hebrew_consonantal:
-                        where_clauses.append('hebrew_consonantal = %s')
-                        params.append(hebrew_consonantal)
-
-                query = f"SELECT id, hebrew_word, hebrew_consonantal, definition, part_of_speech, root, source_page FROM old_testament.fuerst_lexicon WHERE {' OR '.join(where_clauses)} LIMIT 100"
-                cursor.execute(query, tuple(params))
-
-                for row in cursor.fetchall():
-                    results['fuerst'].append({
-                        'id': row[0],
-                        'hebrew_word': row[1],
-                        'hebrew_consonantal': row[2],
-                        'definition': row[3][:200] if row[3] else '',
-                        'part_of_speech': row[4],
-                        'root': row[5],
-                        'source_page': row[6]
-                    })
-
-            # Build Gesenius query
-            if lexicon_type in ['gesenius', 'both']:
-                params = []
-                where_clauses = []
-
-                if match == 'exact':
-                    if hebrew_consonantal:
-                        where_clauses.append('"hebrewConsonantal" = %s')
-                        params.append(hebrew_consonantal)
-                    elif search_term:
-                        st_cons = re.sub(vowel_pattern, '', search_term)
-                        where_clauses.append('("hebrewConsonantal" = %s OR "hebrewWord" = %s)')
-                        params.extend([st_cons, search_term])
-
-                elif match == 'contains':
-                    term = search_term or hebrew_consonantal
-                    if term:
-                        where_clauses.append('("hebrewWord" ILIKE %s OR "hebrewConsonantal" ILIKE %s)')
-                        p = _like_pattern(term)
-                        params.extend([p, p])
-
-                elif match == 'root':
-                    if search_term:
-                        where_clauses.append('root ILIKE %s')
-                        params.append(_like_pattern(search_term))
-
-                elif match == 'id':
-                    try:
-                        numeric_id = int(search_term)
-                        where_clauses.append('id = %s')
-                        params.append(numeric_id)
-                    except Exception:
-                        where_clauses.append('false')
-
-                elif match == 'definition':
-                    if search_term:
-                        where_clauses.append('definition ILIKE %s')
-                        params.append(_like_pattern(search_term))
-
-                if match == 'strong' or (strong_number and match == 'exact'):
-                    if strong_number:
-                        where_clauses.append("%s = ANY(string_to_array(\"strongsNumbers\", ','))")
-                        params.append(strong_number)
-
-                if not where_clauses:
-                    if hebrew_consonantal:
-                        where_clauses.append('"hebrewConsonantal" = %s')
-                        params.append(hebrew_consonantal)
-
-                query = f"SELECT id, \"hebrewWord\", \"hebrewConsonantal\", definition, \"partOfSpeech\", root, \"sourcePage\" FROM old_testament.gesenius_lexicon WHERE {' OR '.join(where_clauses)} LIMIT 100"
-                cursor.execute(query, tuple(params))
-
-                for row in cursor.fetchall():
-                    results['gesenius'].append({
-                        'id': row[0],
-                        'hebrew_word': row[1],
-                        'hebrew_consonantal': row[2],
-                        'definition': row[3][:200] if row[3] else '',
-                        'part_of_speech': row[4],
-                        'root': row[5],
-                        'source_page': row[6]
-                    })
-
-        return JsonResponse(results)
-
-    except Exception as e:
-        logger.error(f"Error searching lexicons: {e}")
-        return JsonResponse({'error': str(e)}, status=500)
-
-
-@login_required
-@require_POST
-def search_consonantal(request):
-    """
-    Search for Hebrew text in the ot_consonantal table (raw consonantal text without niqqud).
-    Returns matching verses with highlighted search terms.
-    """
-    try:
-        data = json.loads(request.body)
-        search_term = data.get('search_term', '').strip()
-        search_term2 = data.get('search_term2', '').strip()
-        
-        if not search_term:
-            return JsonResponse({'error': 'Search term is required'}, status=400)
-        
-        results = []
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("BEGIN")
-            cursor.execute("SET LOCAL search_path TO old_testament")
-            
-            # Search for the term in the hebrew column (case-insensitive with ILIKE)
-            query = """
-                SELECT ref, hebrew
-                FROM ot_consonantal
-                WHERE hebrew ILIKE %s
-                ORDER BY ref
-                LIMIT 500
-            """
-            cursor.execute(query, (f'%{search_term}%',))
-            
-            for row in cursor.fetchall():
-                ref = row[0]  # Format: Book.Chapter.Verse
-                hebrew_text = row[1]
-                
-                # Parse ref into book, chapter, verse
-                ref_parts = ref.split('.')
-                book = ref_parts[0] if len(ref_parts) > 0 else ''
-                chapter = ref_parts[1] if len(ref_parts) > 1 else ''
-                verse = ref_parts[2] if len(ref_parts) > 2 else ''
-                
-                # Highlight search terms in the Hebrew text
-                highlighted = hebrew_text
-                if search_term:
-                    highlighted = highlighted.replace(
-                        search_term,
-                        f'<span class="search-highlight">{search_term}</span>'
-                    )
-                if search_term2:
-                    highlighted = highlighted.replace(
-                        search_term2,
-                        f'<span class="search-highlight-2">{search_term2}</span>'
-                    )
-                
-                results.append({
-                    'ref': ref,
-                    'book': book,
-                    'chapter': chapter,
-                    'verse': verse,
-                    'hebrew': hebrew_text,
-                    'hebrew_highlighted': highlighted
-                })
-        
-        return JsonResponse({
-            'success': True,
-            'results': results,
-            'count': len(results)
-        })
-        
-    except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
-    except Exception as e:
-        logger.error(f"Error searching consonantal Hebrew: {e}")
-        return JsonResponse({'error': str(e)}, status=500)
-
-
-@login_required
-@require_POST
-def update_interlinear_word(request):
-    """
-    Real-time interlinear word update endpoint.
-    Updates the Greek lexicon (strongs_greek) with new English translation
-    and persists to InterlinearConfig.
-    
-    POST params:
-    - strongs: Strong's number (e.g., 'G932')
-    - lemma: Greek lemma
-    - new_english: New English translation
-    """
-    try:
-        request_id = uuid.uuid4().hex[:10]
-        total_start = time.monotonic()
-        logger.info("[INTERLINEAR] (%s) update_interlinear_word start", request_id)
-        data = json.loads(request.body)
-        strongs = data.get('strongs', '').strip()
-        lemma = data.get('lemma', '').strip()
-        new_english = data.get('new_english', '').strip()
-        
-        if not strongs or not lemma or not new_english:
-            return JsonResponse({
-                'success': False,
-                'error': 'Missing required parameters: strongs, lemma, new_english'
-            }, status=400)
-        
-        # Load current mappings from InterlinearConfig
-        from search.models import InterlinearConfig
-
-        mapping_start = time.monotonic()
-        
-        try:
-            config = InterlinearConfig.objects.order_by('-updated_at').first()
-            if config and config.mapping:
-                # Ensure mapping is a dict, not a string
-                if isinstance(config.mapping, str):
-                    try:
-                        replacements = json.loads(config.mapping)
-                    except json.JSONDecodeError:
-                        replacements = {}
-                elif isinstance(config.mapping, dict):
-                    replacements = dict(config.mapping)  # Create a copy
-                else:
-                    replacements = {}
-            else:
-                replacements = {}
-        except Exception as e:
-            logger.warning(f"[INTERLINEAR] Could not load from InterlinearConfig: {e}")
-            replacements = {}
-
-        logger.info(
-            "[INTERLINEAR] (%s) mapping load took %.3fs",
-            request_id,
-            time.monotonic() - mapping_start
-        )
-        
-        # Ensure replacements is a dict
-        if not isinstance(replacements, dict):
-            logger.error(f"[INTERLINEAR] replacements is not a dict: {type(replacements)}")
-            replacements = {}
-        
-        # Update the mapping - store by lemma (exact Greek form)
-        # If a Strongs-keyed entry already exists for this Strongs number, update it too
-        # so it doesn't override the lemma update (replace_words checks strongs first)
-        replacements[lemma] = new_english
-        if strongs in replacements:
-            replacements[strongs] = new_english
-            logger.info(f"[INTERLINEAR] Also updated strongs-keyed entry {strongs} -> '{new_english}'")
-        
-        # Apply update to database immediately (following interlinear_apply.py logic)
-        db_start = time.monotonic()
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get current value for logging
-            cursor.execute(
-                "SELECT english FROM rbt_greek.strongs_greek WHERE strongs = %s AND lemma = %s",
-                (strongs, lemma)
-            )
-            result = cursor.fetchone()
-            old_english = result[0] if result else None
-            
-            if not old_english:
-                return JsonResponse({
-                    'success': False,
-                    'error': f'No entry found for strongs={strongs}, lemma={lemma}'
-                }, status=404)
-            
-            # Update the database
-            cursor.execute(
-                "UPDATE rbt_greek.strongs_greek SET english = %s WHERE strongs = %s AND lemma = %s",
-                (new_english, strongs, lemma)
-            )
-            conn.commit()
-            
-            logger.info(f"[INTERLINEAR] Updated {strongs}/{lemma}: '{old_english}' -> '{new_english}'")
-
-        logger.info(
-            "[INTERLINEAR] (%s) db update took %.3fs",
-            request_id,
-            time.monotonic() - db_start
-        )
-        
-        # Persist to InterlinearConfig
-        config_start = time.monotonic()
-        try:
-            user = getattr(request, 'user', None)
-            username = getattr(user, 'username', None) or 'web-edit'
-            
-            if config:
-                config.mapping = replacements
-                config.updated_by = username
-                config.save()
-            else:
-                InterlinearConfig.objects.create(
-                    mapping=replacements,
-                    updated_by=username
-                )
-        except Exception as e:
-            logger.warning(f"[INTERLINEAR] Could not save to InterlinearConfig: {e}")
-
-        logger.info(
-            "[INTERLINEAR] (%s) config save took %.3fs",
-            request_id,
-            time.monotonic() - config_start
-        )
-        
-        # Also save to file for backward compatibility
-        file_start = time.monotonic()
-        try:
-            with open('interlinear_english.json', 'w', encoding='utf-8') as f:
-                json.dump(replacements, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            logger.warning(f"[INTERLINEAR] Could not save to JSON file: {e}")
-
-        logger.info(
-            "[INTERLINEAR] (%s) json save took %.3fs",
-            request_id,
-            time.monotonic() - file_start
-        )
-        
-        # Clear all verse caches since we updated a word that could appear anywhere
-        # The cache keys use patterns like: book_chapter_verse_language_v2
-        logger.info(f"[INTERLINEAR] Clearing all verse caches for updated word: {strongs}/{lemma}")
-        
-        cache_start = time.monotonic()
-        try:
-            # Try to use cache.delete_pattern if available (Redis)
-            from search.views.chapter_views_part1 import INTERLINEAR_CACHE_VERSION
-            cache_pattern = f'*_{INTERLINEAR_CACHE_VERSION}'
-            backend = settings.CACHES.get('default', {}).get('BACKEND', '')
-
-            if backend.endswith('DatabaseCache'):
-                table_name = settings.CACHES.get('default', {}).get('LOCATION', 'django_cache_table')
-                if not re.match(r'^[A-Za-z0-9_]+$', table_name):
-                    raise ValueError('Invalid cache table name')
-
-                # Use TRUNCATE inside a local transaction to avoid long DELETE scans
-                with transaction.atomic():
-                    with connection.cursor() as cursor:
-                        cursor.execute("SET LOCAL statement_timeout TO 0")
-                        cursor.execute(f"TRUNCATE TABLE {table_name}")
-                logger.info("[INTERLINEAR] Cleared cache table via TRUNCATE: %s", table_name)
-            elif hasattr(cache, 'delete_pattern'):
-                deleted_count = cache.delete_pattern(cache_pattern)
-                logger.info(f"[INTERLINEAR] Cleared {deleted_count} cache keys with pattern: {cache_pattern}")
-            else:
-                # Fallback: clear entire cache (aggressive but ensures consistency)
-                logger.warning("[INTERLINEAR] Cache backend doesn't support pattern deletion, clearing all cache")
-                cache.clear()
-                logger.info("[INTERLINEAR] Cleared entire cache")
-
-        except Exception as e:
-            logger.error(f"[INTERLINEAR] Error clearing cache: {e}")
-
-        logger.info(
-            "[INTERLINEAR] (%s) cache clear took %.3fs",
-            request_id,
-            time.monotonic() - cache_start
-        )
-
-        logger.info(
-            "[INTERLINEAR] (%s) total took %.3fs",
-            request_id,
-            time.monotonic() - total_start
-        )
-        
-        return JsonResponse({
-            'success': True,
-            'old_english': old_english,
-            'new_english': new_english,
-            'strongs': strongs,
-            'lemma': lemma,
-            'cache_cleared': True,
-            'message': f"Updated '{old_english}' → '{new_english}'"
-        })
-        
-    except json.JSONDecodeError:
-        return JsonResponse({
-            'success': False,
-            'error': 'Invalid JSON'
-        }, status=400)
-    except Exception as e:
-        logger.error(f"[INTERLINEAR] Error updating word: {e}")
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        }, status=500)
-
-@login_required
-def scrape_lexicon(request):
-    """
-    Scrapes content from Biblehub, Logeion, or Perseus URLs.
-    Caches the result for 24 hours to avoid repeated external requests.
-    """
-    url = request.GET.get('url')
-    if not url:
-        return JsonResponse({'error': 'No URL provided'}, status=400)
-
-    # Check cache first
-    cache_key = f"lexicon_scrape_{url}"
-    cached_content = cache.get(cache_key)
-    if cached_content:
-        return JsonResponse({'content': cached_content, 'cached': True})
-
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-
-        # --- Logeion: use its JSON API directly (it's an AngularJS SPA, static scraping returns nothing) ---
-        if 'logeion.uchicago.edu' in url:
-            import time
-            from urllib.parse import urlparse, unquote
-            from django.conf import settings as django_settings
-            LOGEION_KEY = django_settings.LOGEION_KEY
-            BASE = 'https://anastrophe.uchicago.edu/logeion-api'
-
-            logeion_headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                'Accept': 'application/json, text/plain, */*',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Origin': 'https://logeion.uchicago.edu',
-                'Referer': 'https://logeion.uchicago.edu/',
-                'Connection': 'keep-alive',
-            }
-
-            import ssl
-            from requests.adapters import HTTPAdapter
-
-            class _LogeionSSLAdapter(HTTPAdapter):
-                """
-                Handles two SSL-EOF variants from api.logeion.org:
-                  - SSLEOFError (code 8): suppressed via OP_IGNORE_UNEXPECTED_EOF
-                  - SSLZeroReturnError (code 6): server sends close_notify mid-response;
-                    handled by creating a fresh session per retry attempt.
-                """
-                def init_poolmanager(self, *args, **kwargs):
-                    ctx = ssl.create_default_context()
-                    ctx.options |= getattr(ssl, 'OP_IGNORE_UNEXPECTED_EOF', 0)
-                    kwargs['ssl_context'] = ctx
-                    super().init_poolmanager(*args, **kwargs)
-
-            def _new_logeion_session():
-                sess = requests.Session()
-                sess.mount('https://', _LogeionSSLAdapter())
-                return sess
-
-            def logeion_get(endpoint_url, retries=3, backoff=1.5):
-                last_exc = None
-                for attempt in range(retries):
-                    # Fresh session each attempt: clears stale SSL pool connections
-                    # that cause SSLZeroReturnError on reuse.
-                    sess = _new_logeion_session()
-                    try:
-                        r = sess.get(endpoint_url, headers=logeion_headers, timeout=15)
-                        r.raise_for_status()
-                        return r
-                    except Exception as exc:
-                        last_exc = exc
-                        if attempt < retries - 1:
-                            time.sleep(backoff * (attempt + 1))
-                    finally:
-                        sess.close()
-                raise last_exc
-
-            # Step 1: resolve inflected form → lemma + morphological parse
-            raw_word = unquote(urlparse(url).path.lstrip('/'))
-            try:
-                find_resp = logeion_get(
-                    f"{BASE}/find?key={LOGEION_KEY}&w={requests.utils.quote(raw_word)}"
-                )
-            except Exception as _logeion_exc:
-                logger.warning(f"Logeion API unreachable for '{raw_word}': {_logeion_exc}")
-                unavail_html = (
-                    f'<p style="color:#888;font-style:italic;">'
-                    f'Logeion is temporarily unavailable. '
-                    f'<a href="{url}" target="_blank" style="color:#0056b3;">Open directly ↗</a></p>'
-                )
-                return JsonResponse({'content': unavail_html})
-            find_data = find_resp.json()
-
-            lemma = find_data.get('word', raw_word)          # normalised lemma
-            parses = find_data.get('parses', [])
-
-            # Step 2: fetch full lexicon detail for the lemma
-            try:
-                detail_resp = logeion_get(
-                    f"{BASE}/detail?key={LOGEION_KEY}&type=normal&w={requests.utils.quote(lemma)}"
-                )
-                detail = detail_resp.json().get('detail', {})
-            except Exception as _logeion_exc:
-                logger.warning(f"Logeion detail API unreachable for '{lemma}': {_logeion_exc}")
-                detail = {}
-
-            # Priority order of dictionaries to display
-            priority = ['Abbott-Smith NT', 'LSJ', 'Middle Liddell', 'Brill-Montanari']
-            dicos = {d['dname']: d for d in detail.get('dicos', [])}
-            shortdef = detail.get('shortdef', '')
-
-            html_parts = []
-
-            # Word heading + morph info
-            if raw_word.lower() != lemma.lower():
-                html_parts.append(
-                    f'<h2 style="margin:0 0 4px;font-size:1.2em;">{raw_word}'
-                    f' <span style="font-size:0.75em;color:#888;">→ {lemma}</span></h2>'
-                )
-            else:
-                html_parts.append(f'<h2 style="margin:0 0 4px;font-size:1.2em;">{lemma}</h2>')
-
-            if parses:
-                morph = parses[0].get('parse', '').strip(' -')
-                html_parts.append(
-                    f'<p style="font-size:0.8em;color:#666;margin:0 0 10px;font-style:italic;">{morph}</p>'
-                )
-
-            if shortdef:
-                html_parts.append(
-                    f'<p style="background:#fffbe6;border-left:3px solid #e6a800;padding:8px 10px;margin:0 0 12px;font-style:italic;">'
-                    f'{shortdef}</p>'
-                )
-
-            shown = False
-            for name in priority:
-                if name in dicos:
-                    entries = dicos[name].get('es', [])
-                    if entries:
-                        open_attr = ' open' if name == 'LSJ' else ''
-                        html_parts.append(
-                            f'<details{open_attr} style="margin-bottom:10px;">'
-                            f'<summary style="font-weight:bold;cursor:pointer;padding:4px 0;">{name}</summary>'
-                            f'<div style="padding:8px 4px;font-size:0.9em;line-height:1.5;">'
-                            + ''.join(entries) +
-                            f'</div></details>'
-                        )
-                        shown = True
-
-            # Add any remaining lexicons collapsed
-            for dico in detail.get('dicos', []):
-                if dico['dname'] not in priority and dico.get('es'):
-                    html_parts.append(
-                        f'<details style="margin-bottom:10px;">'
-                        f'<summary style="font-weight:bold;cursor:pointer;padding:4px 0;">{dico["dname"]}</summary>'
-                        f'<div style="padding:8px 4px;font-size:0.9em;line-height:1.5;">'
-                        + ''.join(dico['es']) +
-                        f'</div></details>'
-                    )
-
-            if not shown and not shortdef:
-                html_parts.append(f'<p style="color:#888;">No lexicon entries found for <strong>{lemma}</strong>.</p>')
-
-            html_parts.append(
-                f'<p style="margin-top:12px;text-align:center;">'
-                f'<a href="{url}" target="_blank" style="font-size:0.85em;color:#0056b3;">Open full Logeion entry ↗</a></p>'
-            )
-
-            content = '\n'.join(html_parts)
-            cache.set(cache_key, content, 60 * 60 * 24)
-            return JsonResponse({'content': content})
-
-        # --- All other URLs: fetch and parse HTML ---
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        content = ""
-
-        if 'biblehub.com' in url:
-            # Extract main content area from Biblehub
-            main_content = soup.find('div', id='leftbox') or soup.find('div', class_='main')
-            if main_content:
-                # Remove unwanted elements like ads or navigation
-                for unwanted in main_content.find_all(['script', 'style', 'nav', 'iframe']):
-                    unwanted.decompose()
-                content = str(main_content)
-            else:
-                content = "Could not locate main content on Biblehub page."
-
-        elif 'perseus.tufts.edu' in url:
-            # Perseus dictionary entries
-            main_content = soup.find('div', class_='text_container') or soup.find('div', id='main_col')
-            if main_content:
-                content = str(main_content)
-            else:
-                content = "Could not locate main content on Perseus page."
-        else:
-            # Generic fallback: try to get the body text
-            content = str(soup.body) if soup.body else "No body content found."
-
-        # Basic sanitization: remove scripts and styles
-        clean_soup = BeautifulSoup(content, 'html.parser')
-        for tag in clean_soup(['script', 'style', 'link', 'meta', 'iframe']):
-            tag.decompose()
-        
-        # Convert relative links to absolute (optional, but helpful)
-        from urllib.parse import urljoin
-        for a in clean_soup.find_all('a', href=True):
-            a['href'] = urljoin(url, a['href'])
-            a['target'] = '_blank' # Open links in new tab
-
-        final_content = str(clean_soup)
-        
-        # Cache for 24 hours
-        cache.set(cache_key, final_content, 60 * 60 * 24)
-        
-        return JsonResponse({'content': final_content, 'cached': False})
-
-    except requests.RequestException as e:
-        logger.error(f"Error scraping {url}: {e}")
-        return JsonResponse({'error': f"Failed to fetch URL: {str(e)}"}, status=500)
-    except Exception as e:
-        logger.error(f"Unexpected error scraping {url}: {e}")
-        return JsonResponse({'error': "An unexpected error occurred"}, status=500)
-
-@login_required
-@require_POST
-def chat_with_lexicon(request):
-    """
-    Handles chat messages with Gemini, providing the scraped lexicon text as context.
-    """
-    try:
-        data = json.loads(request.body)
-        message = data.get('message')
-        context_text = data.get('context', '')
-        history = data.get('history', []) # Optional: pass previous messages
-        requested_model = data.get('model', '')
-
-        # Whitelist allowed models; fall back to default
-        ALLOWED_CHAT_MODELS = {
-            'gemini-3-flash-preview': 'gemini-3-flash-preview',
-            'gemini-3.1-pro-preview': 'gemini-3.1-pro-preview',
-        }
-        chat_model = ALLOWED_CHAT_MODELS.get(requested_model, DEFAULT_GEMINI_MODEL)
-
-        if not message:
-            return JsonResponse({'error': 'Message is required'}, status=400)
-
-        # Construct the prompt
-        system_prompt = (
-            "You are a careful philologist and lexicographer specializing in ancient Greek, "
-            "with a particular interest in how translation choices can reflect doctrinal "
-            "assumptions rather than the full range of a word's attested meaning.\n\n"
-            "Your core operating principles:\n"
-            "- Classical, Hellenistic, LXX, papyri, and patristic evidence represent the broader "
-            "documented semantic range of a word. When NT usage is narrower, note that narrowing "
-            "explicitly rather than treating it as the word's only meaning.\n"
-            "- Where traditional English glosses (e.g. 'righteousness', 'grace', 'faith', 'repent', "
-            "'lord', 'church', 'eternal') may flatten or theologise a word's semantic range, "
-            "point this out clearly and present the fuller range from the lexicon first.\n"
-            "- When a user proposes a rendering that appears to carry unexamined theological assumptions, "
-            "note the concern and suggest alternatives better grounded in the lexical evidence.\n"
-            "- Where lexical evidence supports a reading different from a standard English translation, "
-            "give that evidence clearly and let the user weigh it.\n"
-            "- Maintain a scholarly, analytical tone. Avoid devotional framing, but also avoid "
-            "unnecessary rhetorical hostility. The goal is clarity about what the Greek words "
-            "communicated to educated Greek speakers — not polemic.\n"
-            "- Your training-data glosses may reflect the same traditional biases you are analysing. "
-            "Always defer to the lexicon context provided below over anything you recall from training.\n\n"
-            "You have access to the following lexicon/dictionary entry:\n\n"
-            f"--- LEXICON CONTEXT ---\n{context_text}\n--- END CONTEXT ---\n\n"
-            "Ground every claim in this evidence. If the context is empty, say so rather than "
-            "supplying glosses from memory. When drafting footnotes, write in terse scholarly prose: "
-            "cite the lexicon, note where the received tradition may have narrowed or skewed the "
-            "meaning, and state the better-attested rendering."
-        )
-
-        # Initialize Gemini client (using the one already defined in views.py)
-        # We use generate_content for a single turn, or we could use a chat session if we manage history
-        
-        # For simplicity, we'll construct a single prompt with history included
-        full_prompt = system_prompt + "\n\n"
-        for msg in history:
-            role = "User" if msg.get('role') == 'user' else "Assistant"
-            full_prompt += f"{role}: {msg.get('content')}\n"
-        
-        full_prompt += f"User: {message}\nAssistant:"
-
-        response = client.models.generate_content(
-            model=chat_model,
-            contents=full_prompt,
-        )
-
-        return JsonResponse({
-            'reply': response.text,
-            'model_used': chat_model,
-        })
-
-    except Exception as e:
-        logger.error(f"Error in chat_with_lexicon: {e}")
-        return JsonResponse({'error': str(e)}, status=500)
-
-
-@xframe_options_exempt
-@login_required
-def biblehub_proxy(request):
-    """Proxy BibleHub interlinear pages, stripping X-Frame-Options so they can be embedded in a panel."""
-    book = request.GET.get('book', '').strip()
-    chapter = request.GET.get('chapter', '').strip()
-    verse = request.GET.get('verse', '').strip()
-
-    # Validate inputs
-    if not re.match(r'^[A-Za-z0-9 ]+$', book) or not re.match(r'^\d+$', chapter) or not re.match(r'^\d+$', verse):
-        return HttpResponse("<p>Invalid parameters.</p>", status=400)
-
-    book_slug = re.sub(r'[^a-z0-9]+', '_', book.lower()).strip('_')
-    url = f"https://biblehub.com/interlinear/{book_slug}/{chapter}-{verse}.htm"
-
-    headers = {
-        'User-Agent': (
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) '
-            'Chrome/123.0.0.0 Safari/537.36'
-        ),
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Referer': 'https://biblehub.com/',
-    }
-
-    try:
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        # Force UTF-8 — requests defaults to ISO-8859-1 for HTML which garbles Hebrew/Greek
-        content = resp.content.decode('utf-8', errors='replace')
-        # Rewrite root-relative and protocol-relative URLs so assets load from BibleHub
-        content = content.replace('href="/', 'href="https://biblehub.com/')
-        content = content.replace("href='/", "href='https://biblehub.com/")
-        content = content.replace('src="/', 'src="https://biblehub.com/')
-        content = content.replace("src='/", "src='https://biblehub.com/")
-        content = content.replace('action="/', 'action="https://biblehub.com/')
-        # Fix protocol-relative URLs (//fonts.googleapis.com etc.)
-        content = content.replace('href="//', 'href="https://')
-        content = content.replace("href='//", "href='https://")
-        content = content.replace('src="//', 'src="https://')
-        content = content.replace("src='//", "src='https://")
-        # Make all links open in a new tab by injecting a <base> tag after <head>
-        content = content.replace('<head>', '<head><base target="_blank">', 1)
-        response = HttpResponse(content, content_type='text/html; charset=utf-8')
-        # Do NOT set X-Frame-Options so the iframe can embed this response
-        return response
-    except requests.exceptions.HTTPError as e:
-        return HttpResponse(
-            f"<p style='font-family:sans-serif;padding:12px;'>BibleHub returned an error: {e}</p>",
-            status=502,
-        )
-    except Exception as e:
-        logger.error(f"biblehub_proxy error: {e}")
-        return HttpResponse(
-            f"<p style='font-family:sans-serif;padding:12px;'>Could not load BibleHub page.</p>",
-            status=502,
-        )
-
-
-@login_required(login_url='/accounts/login/')
-def gemini_dashboard_view(request):
-    if not request.user.is_superuser:
-        return HttpResponse("Unauthorized", status=403)
-        
-    from search.models import GeminiUsageLog
-    from django.db.models import Count, Q
-    
-    # 50 recent requests
-    logs = GeminiUsageLog.objects.all().order_by('-timestamp')[:50]
-    
-    # Summary by key over last 1000 requests
-    recent = GeminiUsageLog.objects.order_by('-timestamp')[:1000]
-    recent_ids = [r.id for r in recent]
-    
-    key_stats = GeminiUsageLog.objects.filter(id__in=recent_ids).values('api_key_abbrev').annotate(
-        success_count=Count('id', filter=Q(status_code=200)),
-        rate_limit_count=Count('id', filter=Q(status_code=429)),
-        error_count=Count('id', filter=Q(status_code=500)),
-    ).order_by('-success_count')
-    
-    # Target stats all time (to show all chapters being requested)
-    target_stats = GeminiUsageLog.objects.filter(status_code=200)\
-        .values('book', 'chapter', 'language_code').annotate(count=Count('id'))
-        
-    return render(request, 'gemini_dashboard.html', {
-        'logs': logs,
-        'key_stats': key_stats,
-        'target_stats': target_stats
-    })
+# Views that pull in the LLM SDKs / requests / bs4 live in their own modules and
+# are only imported on first use. Keep `from translate import views; views.X`
+# working for callers that still reference them here.
+_LAZY_VIEW_MODULES = {
+    'translate.llm_views': (
+        'request_chatgpt_translation',
+        'request_gemini_translation',
+        'save_gemini_preferences',
+        'gemini_dashboard_view',
+        'gemini_translate',
+        'gemini_translate_hebrew',
+        'chatgpt_translate',
+        'chatgpt_translate_hebrew',
+        'get_gemini_client',
+        'get_openai_client',
+    ),
+    'translate.lexicon_views': (
+        'lexicon_viewer',
+        'add_manual_lexicon_mapping',
+        'get_lexicon_strongs',
+        'update_lexicon_entry',
+        'get_lexicon_search_results',
+        'search_consonantal',
+        'update_interlinear_word',
+        'scrape_lexicon',
+        'chat_with_lexicon',
+        'biblehub_proxy',
+    ),
+}
+_LAZY_VIEW_LOOKUP = {name: module for module, names in _LAZY_VIEW_MODULES.items() for name in names}
+
+
+def __getattr__(name):
+    module_path = _LAZY_VIEW_LOOKUP.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module_path), name)